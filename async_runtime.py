@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步自动化运行时
+在后台线程中运行一个 asyncio 事件循环，把核心流程的每一步写成协程：
+1. 等待（画面稳定、固定延时）是可 await 的，任务取消时立即结束
+2. 截图、OCR 等阻塞操作放到线程池中执行，事件循环可以同时推进其他步骤
+   （例如在等待搜索结果渲染的同时对搜索框做OCR验证）
+3. 提供同步外观（search_contact_sync / search_group_sync / run），GUI 线程按原来的方式调用
+
+协程只负责编排：每一步都通过 run_blocking 调用核心引擎的步骤函数（打开搜索框、输入搜索内容、
+查找搜索结果、发送消息），与同步流程共用同一份实现。
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import CancelledError as FutureCancelledError
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from cancellation import LEGACY_POLL_INTERVAL, CancellationToken
+from input_scheduler import input_scheduler
+from logging_config import get_logger
+from profiling import profiler
+from timing_profile import get_timing_profile
+from ui_wait import capture_probe, wait_until_stable
+import wechat_core_engine as engine
+
+logger = get_logger("async_runtime")
+
+EXECUTOR_WORKERS = 4          # 截图/OCR/阻塞等待使用的线程数
+
+
+class AutomationRuntime:
+    """后台事件循环 + 阻塞操作线程池"""
+
+    def __init__(self, workers=EXECUTOR_WORKERS):
+        self.workers = workers
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="automation")
+            self._loop = asyncio.new_event_loop()
+            self._loop.set_default_executor(self._executor)
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(ready.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="automation_loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def submit(self, coro):
+        """提交协程到事件循环，返回 concurrent.futures.Future"""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, stop_flag_func=None):
+        """同步外观：运行协程并阻塞等待结果
+
+        Args:
+            coro: 协程对象
+            stop_flag_func: CancellationToken 或停止标志函数；令牌取消时立即取消任务，
+                            普通函数每 0.1 秒检查一次
+
+        Returns:
+            协程的返回值，任务被取消时返回 False
+        """
+        future = self.submit(coro)
+        poll_interval = None
+        if isinstance(stop_flag_func, CancellationToken):
+            # 任务结束后注销回调，同一个令牌在群发多个目标时不会累积回调
+            stop_flag_func.add_callback(future.cancel)
+            future.add_done_callback(lambda _: stop_flag_func.remove_callback(future.cancel))
+        elif stop_flag_func is not None:
+            poll_interval = LEGACY_POLL_INTERVAL
+
+        while True:
+            try:
+                return future.result(timeout=poll_interval)
+            except FutureTimeoutError:
+                if stop_flag_func():
+                    future.cancel()
+            except FutureCancelledError:
+                logger.info("⏹️ 异步任务已取消")
+                return False
+
+    def shutdown(self):
+        """停止事件循环和线程池"""
+        with self._start_lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+            self._executor.shutdown(wait=False)
+            self._loop = None
+
+
+runtime = AutomationRuntime()
+
+
+# ==================== 可等待的基础操作 ====================
+
+async def run_blocking(func, *args, **kwargs):
+    """在线程池中执行阻塞函数（沿用当前上下文，输入动作计入协程中正在统计的操作）"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(profiler.attach(func), *args, **kwargs)
+    return await loop.run_in_executor(None, context.run, call)
+
+
+class _TaskToken:
+    """把当前任务的取消转换为 CancellationToken，传给线程池中的阻塞等待"""
+
+    def __init__(self):
+        self.token = CancellationToken()
+
+    async def call(self, func, *args, **kwargs):
+        try:
+            return await run_blocking(func, *args, stop_flag_func=self.token, **kwargs)
+        except asyncio.CancelledError:
+            self.token.cancel()
+            raise
+
+
+async def wait_stable(region=None, timeout=2.0, baseline=None, description="界面", kind=None):
+    """等待画面稳定（阻塞轮询在线程池中进行，任务取消时立即结束）"""
+    profile = get_timing_profile()
+    options = {}
+    if kind is not None:
+        timeout = profile.timeout(kind, default=timeout)
+        options['poll_interval'] = profile.poll_interval(kind)
+    result = await _TaskToken().call(wait_until_stable, region, timeout=timeout, baseline=baseline, **options)
+    if kind is not None and result.reason in ("stable", "timeout"):
+        profile.record(kind, result.elapsed)
+    logger.info("⏱️ %s%s（%s），用时 %.2f 秒", description, '已稳定' if result.ok else '等待结束',
+                result.reason, result.elapsed)
+    return result
+
+
+# ==================== 协程版本的核心流程 ====================
+
+async def search_and_send_async(search_term, message=None, is_group=False, ensure_active=True):
+    """协程版本的 search_contact / search_group
+
+    各步骤调用核心引擎的步骤函数；输入搜索内容后，搜索框OCR验证与等待搜索结果渲染同时进行。
+    """
+    target_type = "群聊" if is_group else "联系人"
+    logger.info("🔍 开始搜索%s: %s", target_type, search_term)
+    if not search_term:
+        logger.info("❌ 未提供搜索内容")
+        return False
+
+    with input_scheduler.operation("搜索群聊" if is_group else "搜索联系人"):
+        # 激活窗口并打开搜索框（搜索框已打开时跳过 Ctrl+F，搜索群聊时先点击确保焦点）
+        if not await _TaskToken().call(engine.prepare_search, ensure_active, is_group):
+            return False
+
+        window_rect = engine.get_wechat_window_rect()
+        baseline = await run_blocking(capture_probe, window_rect)
+        input_success = await _TaskToken().call(engine.input_search_term, search_term, wait_results=False)
+
+        # 等待搜索结果渲染，同时对搜索框做OCR验证
+        render = asyncio.ensure_future(wait_stable(window_rect, 2, baseline, "搜索结果", "search_results"))
+        try:
+            if input_success and any('\u4e00' <= char <= '\u9fff' for char in search_term):
+                verified = await _TaskToken().call(engine.verify_search_input_with_ocr, search_term)
+                if not verified:
+                    render.cancel()
+                    return False
+            await render
+        except asyncio.CancelledError:
+            render.cancel()
+            raise
+
+        # 查找并点击搜索结果（点击后仍停留在搜索界面时判定失败）
+        find_results = engine.find_group_in_search_results if is_group else engine.find_contact_in_search_results
+        if not await run_blocking(find_results, search_term):
+            logger.info("❌ 未找到%s '%s'", target_type, search_term)
+            return False
+
+        logger.info("✅ 在微信中搜索%s '%s' 完成", target_type, search_term)
+        return await _TaskToken().call(engine.send_message_to_contact, search_term, message)
+
+
+async def multi_dianzan_async(target_names, wait_seconds=0, status_callback=None, enable_comment=False,
+                              comment_text=""):
+    """协程版本的朋友圈多目标点赞：流程在线程池中运行，任务取消时通过令牌立即停止"""
+    return await _TaskToken().call(engine.pengyouquan_multi_dianzan_action, target_names, wait_seconds,
+                                   status_callback, enable_comment, comment_text)
+
+
+# ==================== 同步外观 ====================
+
+def search_contact_sync(search_term=None, ensure_active=True, message=None, stop_flag_func=None):
+    """与 search_contact 参数相同的同步接口，内部由异步运行时执行"""
+    return runtime.run(search_and_send_async(search_term, message, False, ensure_active), stop_flag_func)
+
+
+def search_group_sync(search_term=None, ensure_active=True, message=None, stop_flag_func=None):
+    """与 search_group 参数相同的同步接口，内部由异步运行时执行"""
+    return runtime.run(search_and_send_async(search_term, message, True, ensure_active), stop_flag_func)
+
+
+def pengyouquan_multi_dianzan_sync(target_names, wait_seconds=0, status_callback=None, enable_comment=False,
+                                   comment_text="", stop_flag_func=None):
+    """与 pengyouquan_multi_dianzan_action 参数相同的同步接口，内部由异步运行时执行"""
+    return runtime.run(multi_dianzan_async(target_names, wait_seconds, status_callback, enable_comment,
+                                           comment_text), stop_flag_func)
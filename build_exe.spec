@@ -60,6 +60,7 @@ a = Analysis(
         'PyQt5.QtWidgets',
         'pyautogui',
         'pyperclip',
+        'mss',
         'cv2',
         'numpy',
         'PIL',
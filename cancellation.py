@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+取消令牌模块
+用 threading.Event 实现操作取消：等待通过 event.wait(timeout) 完成，
+点击停止后所有等待立即返回，长时间等待期间不需要反复唤醒检查。
+令牌本身可以像原来的 stop_flag_func 一样调用（token() 返回是否已取消），
+因此可以直接传给所有接受 stop_flag_func 的函数。
+"""
+
+import threading
+import time
+
+from logging_config import get_logger
+from tracing import tracer
+
+logger = get_logger(__name__)
+
+LEGACY_POLL_INTERVAL = 0.1    # 普通 stop_flag_func 回调只能轮询，轮询间隔（秒）
+
+
+class CancellationToken:
+    """取消令牌
+
+    用法：
+        token = CancellationToken()
+        search_contact(..., stop_flag_func=token)   # 与 stop_flag_func 兼容
+        token.cancel()                              # 所有等待立即返回
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消操作，唤醒所有正在等待的线程并执行取消回调"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning("⚠️ 取消回调执行出错: %s", e)
+
+    def add_callback(self, callback):
+        """注册取消时执行的回调；已取消时立即执行"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        """注销尚未执行的取消回调（任务正常结束后调用，避免回调在长期使用的令牌上累积）"""
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    @property
+    def cancelled(self):
+        """是否已取消"""
+        return self._event.is_set()
+
+    def __call__(self):
+        """兼容 stop_flag_func 的调用方式"""
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """等待 timeout 秒或直到被取消
+
+        Returns:
+            True 表示已取消，False 表示正常等待结束
+        """
+        return self._event.wait(timeout)
+
+    def __repr__(self):
+        return f"CancellationToken(cancelled={self.cancelled})"
+
+
+def sleep(seconds, stop_flag_func=None):
+    """可取消的等待
+
+    Args:
+        seconds: 等待秒数
+        stop_flag_func: CancellationToken 或普通的停止标志函数；
+                        令牌通过 event.wait 等待，普通函数退回按 LEGACY_POLL_INTERVAL 轮询
+
+    Returns:
+        True 表示等待被取消，False 表示正常等待结束
+    """
+    with tracer.span("sleep", "wait", seconds=seconds):
+        return _sleep(seconds, stop_flag_func)
+
+
+def _sleep(seconds, stop_flag_func):
+    if stop_flag_func is None:
+        if seconds > 0:
+            time.sleep(seconds)
+        return False
+    if isinstance(stop_flag_func, CancellationToken):
+        return stop_flag_func.wait(max(0, seconds))
+
+    deadline = time.perf_counter() + seconds
+    while True:
+        if stop_flag_func():
+            return True
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        time.sleep(min(LEGACY_POLL_INTERVAL, remaining))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置文件读写模块
+wechat_config.json 由 GUI（上次输入）、界面时序档案、性能分析设置和微信启动器共同写入，
+且时序档案在工作线程中保存。所有写入都通过 update_config 在同一把锁下完成"读取-修改-写回"，
+先写临时文件再用 os.replace 替换：并发写入不会互相覆盖对方的节点，中途退出也不会留下半个文件。
+配置文件位于程序目录（打包后为exe所在目录），所有模块都使用这里的 CONFIG_FILE，与启动时的工作目录无关。
+"""
+
+import json
+import os
+import sys
+import threading
+
+
+def get_app_path(relative_path):
+    """获取程序目录下文件的绝对路径，兼容开发环境和打包后的exe环境
+
+    与 get_resource_path 不同，打包后使用exe所在目录而不是 PyInstaller 的临时解压目录，
+    配置文件、量化模型等需要长期保存的文件写在这里。绝对路径原样返回。
+    """
+    if os.path.isabs(relative_path):
+        return os.path.normpath(relative_path)
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.normpath(os.path.join(base_path, relative_path))
+
+
+CONFIG_FILE = get_app_path("wechat_config.json")
+
+# 所有配置写入共用的锁（可重入：update 回调中可以再读取配置）
+config_lock = threading.RLock()
+
+
+def read_config(config_file=CONFIG_FILE):
+    """读取配置文件，文件不存在时返回空字典"""
+    if not os.path.exists(config_file):
+        return {}
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_config(config, config_file=CONFIG_FILE):
+    """原子写入整个配置：先写临时文件，再替换原文件"""
+    temp_file = config_file + ".tmp"
+    with config_lock:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, config_file)
+
+
+def update_config(update, config_file=CONFIG_FILE):
+    """在配置锁内读取配置、调用 update(config) 就地修改，再原子写回
+
+    Args:
+        update: 修改配置字典的函数，返回 False 表示放弃本次写入
+        config_file: 配置文件路径
+
+    Returns:
+        修改后的配置字典
+    """
+    with config_lock:
+        config = read_config(config_file)
+        if update(config) is False:
+            return config
+        write_config(config, config_file)
+        return config
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+帧分析模块
+对相邻两帧朋友圈截图做轻量分析，供滚动查找流程使用：
+1. 估计两帧之间的垂直滚动距离（行特征匹配，基于降采样灰度图），向下和向上滚动都可以估计
+2. 给出滚动后新露出的行范围
+   固定的标题栏/底栏只有在连续两对画面中都没有变化时才裁掉（ScrollOffsetEstimator 负责确认），
+   避免把恰好相同的空白行当作标题栏
+3. 判断滚动是否真的发生（到达底部时避免无意义的OCR）
+"""
+
+import numpy as np
+import cv2
+from PIL import Image
+
+from frame_buffers import frame_pool
+
+# 行特征参数
+SIGNATURE_BANDS = 8          # 每行按列分成的条带数
+DOWNSAMPLE = 2               # 行方向降采样倍数（粗搜索）
+STILL_THRESHOLD = 1.5        # 平均灰度差低于该值视为两行/两帧相同
+MATCH_THRESHOLD = 6.0        # 最优偏移的平均灰度差高于该值视为匹配不可靠
+MIN_OVERLAP_RATIO = 0.3      # 偏移后两帧至少需要重叠的内容高度比例
+
+
+def to_gray(frame, pooled=False):
+    """将截图（PIL图像或RGB/灰度numpy数组）转换为灰度numpy数组
+
+    Args:
+        frame: 截图
+        pooled: 为True时灰度数组取自帧缓冲池，用完后需调用 frame_pool.release() 归还
+    """
+    if isinstance(frame, Image.Image):
+        frame = np.asarray(frame)
+    if frame.ndim == 3:
+        if pooled:
+            gray = frame_pool.acquire(frame.shape[:2])
+            return cv2.cvtColor(frame[:, :, :3], cv2.COLOR_RGB2GRAY, dst=gray)
+        return cv2.cvtColor(frame[:, :, :3], cv2.COLOR_RGB2GRAY)
+    return frame
+
+
+def row_signatures(gray, bands=SIGNATURE_BANDS):
+    """计算每一行的特征：将行按列分成若干条带，取每个条带的平均灰度
+
+    Returns:
+        形状为 (行数, 条带数) 的 float32 数组
+    """
+    height, width = gray.shape[:2]
+    bands = max(1, min(bands, width))
+    # INTER_AREA 缩放到 bands 列，相当于每个条带取平均
+    return cv2.resize(gray, (bands, height), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+class ScrollOffset:
+    """一次滚动的估计结果
+
+    Attributes:
+        moved: 内容是否发生了滚动
+        offset: 内容向上移动的像素数（按下键后为正数，按上键后为负数），无法估计时为 None
+        new_rows: 当前帧中新露出的行范围 (top, bottom)（向下滚动在内容区域底部，向上滚动在顶部），
+                  未滚动时为 None，无法估计时为整个内容区域
+        content_rows: 参与滚动的内容区域 (top, bottom)，不包含已确认的固定标题栏/底栏
+        score: 最优偏移处的平均灰度差（越小越可靠）
+        static_margins: 这对画面中位置不变的顶部/底部行数 (top, bottom)，画面尺寸变化时为 None
+    """
+
+    def __init__(self, moved, offset, new_rows, content_rows, score, static_margins=None):
+        self.moved = moved
+        self.offset = offset
+        self.new_rows = new_rows
+        self.content_rows = content_rows
+        self.score = score
+        self.static_margins = static_margins
+
+    @property
+    def reliable(self):
+        """是否可靠地估计出了偏移量"""
+        return self.offset is not None
+
+    def __repr__(self):
+        return (f"ScrollOffset(moved={self.moved}, offset={self.offset}, new_rows={self.new_rows}, "
+                f"content_rows={self.content_rows}, score={self.score:.2f})")
+
+
+def _static_margins(prev_sig, curr_sig):
+    """计算两帧中位置不变的顶部/底部行数（固定的标题栏、底栏）"""
+    row_diff = np.abs(prev_sig - curr_sig).mean(axis=1)
+    changed = np.nonzero(row_diff > STILL_THRESHOLD)[0]
+    if len(changed) == 0:
+        return len(row_diff), 0
+    return int(changed[0]), int(len(row_diff) - 1 - changed[-1])
+
+
+def _shift_candidates(low, high):
+    """[low, high] 范围内的非零偏移，按绝对值从小到大排列（差异相同时取较小的偏移，正偏移优先）"""
+    return sorted((shift for shift in range(low, high + 1) if shift), key=lambda shift: (abs(shift), shift < 0))
+
+
+def _best_shift(prev_sig, curr_sig, candidates, min_overlap):
+    """在候选偏移中找出平均差异最小的一个：curr[r] 对应 prev[r + d]（d 为负数表示向上滚动）
+
+    candidates 需按绝对值从小到大排列，重叠不足时停止搜索。
+    """
+    height = len(prev_sig)
+    best_shift, best_score = None, float('inf')
+    for shift in candidates:
+        overlap = height - abs(shift)
+        if overlap < min_overlap:
+            break
+        if shift > 0:
+            score = float(np.abs(prev_sig[shift:] - curr_sig[:overlap]).mean())
+        else:
+            score = float(np.abs(prev_sig[:overlap] - curr_sig[-shift:]).mean())
+        if score < best_score:
+            best_shift, best_score = shift, score
+    return best_shift, best_score
+
+
+def estimate_scroll_offset(prev_frame, curr_frame, max_offset=None, margins=None):
+    """估计两帧之间的垂直滚动偏移（向下滚动为正，向上滚动为负）
+
+    Args:
+        prev_frame: 滚动前的截图
+        curr_frame: 滚动后的截图（尺寸需与 prev_frame 相同）
+        max_offset: 最大搜索偏移（像素，两个方向相同），默认为内容高度减去最小重叠
+        margins: 已确认的固定标题栏/底栏行数 (top, bottom)，只裁掉其中这对画面也没有变化的部分；
+                 None表示不裁剪（单独一对画面中相同的行可能只是空白行）
+
+    Returns:
+        ScrollOffset 估计结果
+    """
+    prev_gray = to_gray(prev_frame)
+    curr_gray = to_gray(curr_frame)
+    height = curr_gray.shape[0]
+
+    if prev_gray.shape != curr_gray.shape:
+        # 窗口尺寸变化，无法对比，按整帧都是新内容处理
+        return ScrollOffset(True, None, (0, height), (0, height), float('inf'))
+
+    prev_sig = row_signatures(prev_gray)
+    curr_sig = row_signatures(curr_gray)
+
+    static_margins = _static_margins(prev_sig, curr_sig)
+    if static_margins[0] >= height:
+        # 所有行都没有变化：滚动没有发生（例如已到达底部）
+        return ScrollOffset(False, 0, None, (0, height), 0.0, static_margins)
+    top, bottom_margin = (0, 0) if margins is None else (min(margins[0], static_margins[0]),
+                                                         min(margins[1], static_margins[1]))
+    bottom = height - bottom_margin
+
+    content_prev = prev_sig[top:bottom]
+    content_curr = curr_sig[top:bottom]
+    content_height = bottom - top
+    min_overlap = max(1, int(content_height * MIN_OVERLAP_RATIO))
+    limit = content_height - min_overlap if max_offset is None else min(max_offset, content_height - min_overlap)
+
+    # 粗搜索：行方向降采样，两个方向都搜索
+    coarse_prev = content_prev[::DOWNSAMPLE]
+    coarse_curr = content_curr[::DOWNSAMPLE]
+    coarse_limit = limit // DOWNSAMPLE
+    coarse_shift, _ = _best_shift(coarse_prev, coarse_curr, _shift_candidates(-coarse_limit, coarse_limit),
+                                  max(1, min_overlap // DOWNSAMPLE))
+    if coarse_shift is None:
+        return ScrollOffset(True, None, (top, bottom), (top, bottom), float('inf'), static_margins)
+
+    # 精搜索：在粗结果附近逐行匹配
+    center = coarse_shift * DOWNSAMPLE
+    fine_candidates = _shift_candidates(max(-limit, center - DOWNSAMPLE), min(limit, center + DOWNSAMPLE))
+    shift, score = _best_shift(content_prev, content_curr, fine_candidates, min_overlap)
+
+    if shift is None or score > MATCH_THRESHOLD:
+        # 找不到可靠的匹配（内容整体刷新、弹窗等），整个内容区域都需要重新识别
+        return ScrollOffset(True, None, (top, bottom), (top, bottom), score, static_margins)
+
+    # 向下滚动时新内容出现在底部，向上滚动时出现在顶部
+    new_rows = (bottom - shift, bottom) if shift > 0 else (top, top - shift)
+    return ScrollOffset(True, shift, new_rows, (top, bottom), score, static_margins)
+
+
+class ScrollOffsetEstimator:
+    """保存上一帧，逐帧估计滚动偏移（参考帧的灰度数组取自帧缓冲池，被替换时归还）
+
+    固定标题栏/底栏：每对发生滚动的画面给出位置不变的顶部/底部行数，
+    连续两对都不变的部分才作为确认的边距（margins）裁掉；画面尺寸变化时重新确认。
+    """
+
+    def __init__(self):
+        self.prev_gray = None
+        self.margins = None           # 已确认的固定标题栏/底栏行数 (top, bottom)
+        self._pair_margins = None     # 上一对滚动画面中位置不变的行数
+
+    def _set_reference(self, gray):
+        frame_pool.release(self.prev_gray)
+        self.prev_gray = gray
+
+    def reset(self, frame=None):
+        """重置参考帧（例如点赞弹窗改变了画面之后）"""
+        self._set_reference(to_gray(frame, pooled=True) if frame is not None else None)
+
+    def update(self, frame):
+        """传入新的一帧，返回相对上一帧的 ScrollOffset；第一帧返回 None"""
+        curr_gray = to_gray(frame, pooled=True)
+        result = None
+        if self.prev_gray is not None:
+            if self.prev_gray.shape != curr_gray.shape:
+                self.margins = self._pair_margins = None
+            result = estimate_scroll_offset(self.prev_gray, curr_gray, margins=self.margins)
+            self._confirm_margins(result)
+        self._set_reference(curr_gray)
+        return result
+
+    def _confirm_margins(self, result):
+        """用连续两对滚动画面都不变的顶部/底部行数更新确认的边距"""
+        if not result.moved or result.static_margins is None:
+            return
+        if self._pair_margins is not None:
+            self.margins = (min(self._pair_margins[0], result.static_margins[0]),
+                            min(self._pair_margins[1], result.static_margins[1]))
+        self._pair_margins = result.static_margins
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+帧缓冲池
+朋友圈长时间滚动识别时，每一步都会为灰度图、颜色掩码、颜色过滤图像分配新的整帧数组，
+整窗高度下每步有几十MB的分配和释放。缓冲池按 (形状, dtype) 保存用完的 uint8 数组，
+下次需要同样形状的数组时直接复用，减少分配器压力和GC停顿。
+
+释放是显式的：acquire() 取得的数组用完后调用 release() 归还（或使用 lease() 上下文管理器）。
+归还后不能再使用该数组及其视图；对不是由缓冲池分配的数组调用 release() 会被忽略，
+因此调用方可以统一释放"可能来自缓冲池"的数组。忘记归还的数组被回收后只从占用统计中扣除，不会回到池中。
+
+占用字节数（in_use / pooled / high_water）记录在 metrics 的 wechat_frame_pool_bytes 中。
+
+用法：
+    mask = frame_pool.acquire(frame.shape[:2])
+    try:
+        cv2.inRange(frame, lower, upper, dst=mask)
+        ...
+    finally:
+        frame_pool.release(mask)
+"""
+
+import contextlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import FRAME_POOL_ACQUIRE, FRAME_POOL_BYTES
+
+MAX_FREE_PER_SHAPE = 4                # 每种形状最多保留的空闲数组数
+MAX_POOLED_BYTES = 256 * 1024 * 1024  # 空闲数组总字节数上限，超出时先丢弃最久未使用的形状
+
+
+class FrameBufferPool:
+    """按形状复用的 numpy 数组池（线程安全）"""
+
+    def __init__(self, max_free_per_shape=MAX_FREE_PER_SHAPE, max_pooled_bytes=MAX_POOLED_BYTES):
+        self.max_free_per_shape = max_free_per_shape
+        self.max_pooled_bytes = max_pooled_bytes
+        self._free = OrderedDict()    # (形状, dtype) -> [空闲数组]，按最近使用排序
+        self._leased = {}             # id(数组) -> ((形状, dtype), 字节数, 弱引用)
+        self._lock = threading.RLock()
+        self.in_use_bytes = 0
+        self.pooled_bytes = 0
+        self.high_water_bytes = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        """取得一个形状为 shape 的数组（内容未初始化）
+
+        Args:
+            shape: 数组形状，如 (高, 宽) 或 (高, 宽, 3)
+            dtype: 元素类型，默认 uint8
+
+        Returns:
+            numpy 数组，用完后需调用 release() 归还
+        """
+        key = (tuple(int(size) for size in shape), np.dtype(dtype).str)
+        with self._lock:
+            buffers = self._free.get(key)
+            if buffers:
+                array = buffers.pop()
+                self._free.move_to_end(key)
+                self.pooled_bytes -= array.nbytes
+                outcome = "reused"
+            else:
+                array = None
+        if array is None:
+            array = np.empty(key[0], dtype=dtype)
+            outcome = "allocated"
+        with self._lock:
+            self._leased[id(array)] = (key, array.nbytes, weakref.ref(array, self._forget(id(array))))
+            self.in_use_bytes += array.nbytes
+            self.high_water_bytes = max(self.high_water_bytes, self.in_use_bytes + self.pooled_bytes)
+            self._publish()
+        FRAME_POOL_ACQUIRE.inc(outcome=outcome)
+        return array
+
+    def release(self, *arrays):
+        """归还 acquire() 取得的数组；None 和不是由缓冲池分配的数组会被忽略"""
+        with self._lock:
+            for array in arrays:
+                if array is None:
+                    continue
+                entry = self._leased.get(id(array))
+                if entry is None or entry[2]() is not array:
+                    continue
+                del self._leased[id(array)]
+                key = entry[0]
+                self.in_use_bytes -= array.nbytes
+                buffers = self._free.setdefault(key, [])
+                self._free.move_to_end(key)
+                if len(buffers) < self.max_free_per_shape:
+                    buffers.append(array)
+                    self.pooled_bytes += array.nbytes
+            self._evict()
+            self._publish()
+
+    def _forget(self, array_id):
+        """借出的数组未归还就被回收时，从占用统计中扣除"""
+        def callback(reference):
+            with self._lock:
+                entry = self._leased.get(array_id)
+                if entry is not None and entry[2] is reference:
+                    del self._leased[array_id]
+                    self.in_use_bytes -= entry[1]
+                    self._publish()
+        return callback
+
+    def _evict(self):
+        while self.pooled_bytes > self.max_pooled_bytes and self._free:
+            key, buffers = next(iter(self._free.items()))
+            if buffers:
+                self.pooled_bytes -= buffers.pop(0).nbytes
+            if not buffers:
+                del self._free[key]
+
+    def _publish(self):
+        FRAME_POOL_BYTES.set(self.in_use_bytes, state="in_use")
+        FRAME_POOL_BYTES.set(self.pooled_bytes, state="pooled")
+        FRAME_POOL_BYTES.set(self.high_water_bytes, state="high_water")
+
+    @contextlib.contextmanager
+    def lease(self, shape, dtype=np.uint8):
+        """with 块内使用的数组，退出时自动归还"""
+        array = self.acquire(shape, dtype)
+        try:
+            yield array
+        finally:
+            self.release(array)
+
+    def clear(self):
+        """丢弃所有空闲数组（已借出的数组不受影响）"""
+        with self._lock:
+            self._free.clear()
+            self.pooled_bytes = 0
+            self._publish()
+
+    def stats(self):
+        """当前占用情况"""
+        with self._lock:
+            return {"in_use_bytes": self.in_use_bytes, "pooled_bytes": self.pooled_bytes,
+                    "high_water_bytes": self.high_water_bytes, "leased": len(self._leased),
+                    "shapes": len(self._free)}
+
+
+frame_pool = FrameBufferPool()
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+画面录制与回放模块
+真实运行时录制感知阶段的输入和决策，离线回放验证识别优化：
+1. 录制：包装当前平台后端，记录每次截图（画面、截图区域、前台窗口位置）和每个输入/窗口动作；
+   用 @recorded_stage 标记的感知函数记录输入画面、参数、返回值（决策）和耗时
+2. 存储：画面按内容去重，每 CHUNK_SIZE 帧写入一个压缩的 npz 分块（后台线程写入），
+   截图、动作和阶段记录写入 index.json
+3. 回放：读取录制目录，把画面重新送入同名感知函数，报告各阶段的耗时和与录制时不同的决策
+
+用法：
+    start_recording("recordings/run1")     # 或设置环境变量 WECHAT_RECORD_DIR 后启动程序
+    ...                                    # 正常运行
+    stop_recording()
+    python frame_recorder.py recordings/run1 [--stage smart_ocr_recognition] [--json report.json]
+"""
+
+import atexit
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+from PIL import Image
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+RECORD_DIR_ENV = "WECHAT_RECORD_DIR"
+CHUNK_SIZE = 32               # 每个 npz 分块保存的画面数
+INDEX_FILE = "index.json"
+FORMAT_VERSION = 1
+
+# 阶段名 → 感知函数（回放时按阶段名调用）
+STAGES = {}
+
+_recorder = None
+_recorder_lock = threading.Lock()
+_local = threading.local()
+
+
+def _to_json(value):
+    """把返回值/参数转换为可写入JSON的值（元组转列表、numpy标量转Python数值），无法转换时抛出TypeError"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    raise TypeError(f"无法序列化: {type(value).__name__}")
+
+
+def _is_image(value):
+    return isinstance(value, (np.ndarray, Image.Image))
+
+
+class FrameRecorder:
+    """录制器：画面去重后分块压缩保存，截图/动作/阶段记录保存在 index.json"""
+
+    def __init__(self, directory, chunk_size=CHUNK_SIZE):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+        self.start_time = time.perf_counter()
+        self.frames = {}          # 画面ID → {"chunk": 分块文件名, "shape": 形状}
+        self.captures = []
+        self.actions = []
+        self.stages = []
+        self._hashes = {}
+        self._pending = {}
+        self._chunk_index = 0
+        self._lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._write_chunks, name="frame_recorder", daemon=True)
+        self._writer.start()
+        self.closed = False
+
+    def _now(self):
+        return round(time.perf_counter() - self.start_time, 4)
+
+    def add_frame(self, image):
+        """保存一帧画面（内容相同的画面只保存一次），返回画面ID"""
+        array = np.ascontiguousarray(np.asarray(image))
+        digest = hashlib.blake2b(array.data, digest_size=16)
+        digest.update(str(array.shape).encode())
+        key = digest.hexdigest()
+        with self._lock:
+            frame_id = self._hashes.get(key)
+            if frame_id is not None:
+                return frame_id
+            frame_id = len(self._hashes)
+            self._hashes[key] = frame_id
+            chunk = f"chunk_{self._chunk_index:05d}.npz"
+            self.frames[frame_id] = {"chunk": chunk, "shape": list(array.shape)}
+            self._pending[f"frame_{frame_id}"] = array.copy()
+            if len(self._pending) >= self.chunk_size:
+                self._flush_locked()
+            return frame_id
+
+    def _flush_locked(self):
+        if self._pending:
+            self._writes.put((f"chunk_{self._chunk_index:05d}.npz", self._pending))
+            self._pending = {}
+            self._chunk_index += 1
+
+    def _write_chunks(self):
+        while True:
+            item = self._writes.get()
+            if item is None:
+                return
+            name, arrays = item
+            try:
+                np.savez_compressed(os.path.join(self.directory, name), **arrays)
+            except Exception as e:
+                logger.warning("⚠️ 写入录制分块失败: %s, %s", name, e)
+
+    def add_capture(self, image, region=None, window=None):
+        """记录一次截图：画面、截图区域 (left, top, width, height)、前台窗口位置 (left, top, right, bottom)"""
+        frame_id = self.add_frame(image)
+        entry = {"time": self._now(), "frame": frame_id,
+                 "region": _to_json(region), "window": _to_json(window)}
+        with self._lock:
+            self.captures.append(entry)
+        return frame_id
+
+    def add_action(self, name, args=(), kwargs=None):
+        """记录一个输入/窗口动作"""
+        try:
+            args, kwargs = _to_json(list(args)), _to_json(kwargs or {})
+        except TypeError:
+            args, kwargs = [repr(arg) for arg in args], {key: repr(value) for key, value in (kwargs or {}).items()}
+        with self._lock:
+            self.actions.append({"time": self._now(), "action": name, "args": args, "kwargs": kwargs})
+
+    def add_stage(self, stage, arguments, result, elapsed):
+        """记录一次感知阶段调用：图像参数保存为画面，其余参数保存为JSON值（无法序列化的参数回放时使用默认值）"""
+        inputs, args = {}, {}
+        for name, value in arguments.items():
+            if _is_image(value):
+                inputs[name] = self.add_frame(value)
+            else:
+                try:
+                    args[name] = _to_json(value)
+                except TypeError:
+                    continue
+        try:
+            result = _to_json(result)
+        except TypeError:
+            result = repr(result)
+        entry = {"time": self._now(), "stage": stage, "inputs": inputs, "args": args,
+                 "result": result, "elapsed": round(elapsed, 6)}
+        with self._lock:
+            self.stages.append(entry)
+
+    def close(self):
+        """写出剩余画面和索引，等待后台写入完成"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._flush_locked()
+        self._writes.put(None)
+        self._writer.join()
+        index = {"version": FORMAT_VERSION, "chunk_size": self.chunk_size,
+                 "frames": {str(frame_id): info for frame_id, info in self.frames.items()},
+                 "captures": self.captures, "actions": self.actions, "stages": self.stages}
+        with open(os.path.join(self.directory, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        logger.info("💾 录制已保存: %s（%d 帧画面，%d 次截图，%d 个动作，%d 次感知调用）",
+                    self.directory, len(self.frames), len(self.captures), len(self.actions), len(self.stages))
+
+
+class FrameArchive:
+    """读取录制目录，按需加载画面分块"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.frames = index["frames"]
+        self.captures = index["captures"]
+        self.actions = index["actions"]
+        self.stages = index["stages"]
+        self._chunk_name = None
+        self._chunk = None
+
+    def frame(self, frame_id):
+        """加载画面（numpy数组）"""
+        chunk = self.frames[str(frame_id)]["chunk"]
+        if chunk != self._chunk_name:
+            with np.load(os.path.join(self.directory, chunk)) as data:
+                self._chunk = dict(data)
+            self._chunk_name = chunk
+        return self._chunk[f"frame_{frame_id}"]
+
+
+# ==================== 录制 ====================
+
+def get_recorder():
+    """当前录制器，未录制时返回None"""
+    return _recorder
+
+
+def recorded_stage(func=None, name=None):
+    """标记感知阶段：录制时记录输入画面、参数、返回值和耗时，并注册为可回放的阶段
+
+    嵌套调用（阶段内部调用的其他阶段）只记录最外层。未录制时只多一次全局变量判断。
+    """
+    if func is None:
+        return functools.partial(recorded_stage, name=name)
+    stage = name or func.__name__
+    STAGES[stage] = func
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        recorder = _recorder
+        if recorder is None or getattr(_local, 'in_stage', False):
+            return func(*args, **kwargs)
+        _local.in_stage = True
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            _local.in_stage = False
+        elapsed = time.perf_counter() - start
+        try:
+            recorder.add_stage(stage, signature.bind(*args, **kwargs).arguments, result, elapsed)
+        except Exception as e:
+            logger.warning("⚠️ 记录感知阶段失败: %s, %s", stage, e)
+        return result
+
+    return wrapper
+
+
+def _register_backend_stages():
+    from platform_backend import locate_all_in_image, locate_in_image
+    STAGES.setdefault("locate_on_screen", locate_in_image)
+    STAGES.setdefault("locate_all_on_screen", locate_all_in_image)
+
+
+class RecordingBackend:
+    """包装平台后端：截图、模板查找和输入/窗口动作都交给原后端执行，同时写入录制器"""
+
+    RECORDED_ACTIONS = ('click', 'press', 'hotkey', 'typewrite', 'copy_to_clipboard', 'restore_window',
+                        'maximize_window', 'set_foreground', 'move_window')
+
+    def __init__(self, inner, recorder):
+        self.inner = inner
+        self.recorder = recorder
+        self.name = f"recording:{inner.name}"
+
+    def __getattr__(self, name):
+        attribute = getattr(self.inner, name)
+        if name not in self.RECORDED_ACTIONS:
+            return attribute
+
+        def recorded(*args, **kwargs):
+            self.recorder.add_action(name, args, kwargs)
+            return attribute(*args, **kwargs)
+
+        return recorded
+
+    def _foreground_rect(self):
+        try:
+            hwnd = self.inner.foreground_window()
+            return self.inner.window_rect(hwnd) if hwnd else None
+        except Exception:
+            return None
+
+    def screenshot(self, region=None):
+        image = self.inner.screenshot(region=region)
+        try:
+            self.recorder.add_capture(image, region, self._foreground_rect())
+        except Exception as e:
+            logger.warning("⚠️ 录制截图失败: %s", e)
+        return image
+
+    def grab(self, region=None, out=None):
+        frame = self.inner.grab(region=region, out=out)
+        try:
+            # 传入的 out 数组之后会被复用，录制其副本
+            self.recorder.add_capture(frame if out is None else frame.copy(), region, self._foreground_rect())
+        except Exception as e:
+            logger.warning("⚠️ 录制截图失败: %s", e)
+        return frame
+
+    def grab_gray(self, region=None, out=None):
+        frame = self.inner.grab_gray(region=region, out=out)
+        try:
+            self.recorder.add_capture(frame if out is None else frame.copy(), region, self._foreground_rect())
+        except Exception as e:
+            logger.warning("⚠️ 录制截图失败: %s", e)
+        return frame
+
+    def _record_locate(self, stage, image, confidence, region, grayscale, locate):
+        """模板查找：原后端给出决策，另截一帧同区域画面与模板一起记录（灰度匹配时两者都记录灰度，
+        结果换算为相对截图区域）"""
+        from platform_backend import Box, _gray, _load_rgb
+        start = time.perf_counter()
+        result = locate()
+        elapsed = time.perf_counter() - start
+        try:
+            template = np.asarray(_load_rgb(image))
+            if grayscale:
+                haystack, template = self.grab_gray(region), _gray(template)
+            else:
+                haystack = self.grab(region)[:, :, :3]
+            offset_x, offset_y = (int(region[0]), int(region[1])) if region else (0, 0)
+            boxes = result if stage == "locate_all_on_screen" else [result] if result else []
+            relative = [Box(box[0] - offset_x, box[1] - offset_y, box[2], box[3]) for box in boxes]
+            decision = relative if stage == "locate_all_on_screen" else (relative[0] if relative else None)
+            self.recorder.add_stage(stage, {"haystack": haystack, "template": template,
+                                            "confidence": confidence}, decision, elapsed)
+        except Exception as e:
+            logger.warning("⚠️ 录制模板查找失败: %s", e)
+        return result
+
+    def locate_on_screen(self, image, confidence=0.8, region=None, grayscale=False):
+        return self._record_locate("locate_on_screen", image, confidence, region, grayscale,
+                                   lambda: self.inner.locate_on_screen(image, confidence=confidence, region=region,
+                                                                       grayscale=grayscale))
+
+    def locate_all_on_screen(self, image, confidence=0.8, region=None, grayscale=False):
+        return self._record_locate("locate_all_on_screen", image, confidence, region, grayscale,
+                                   lambda: self.inner.locate_all_on_screen(image, confidence=confidence, region=region,
+                                                                           grayscale=grayscale))
+
+
+def start_recording(directory, chunk_size=CHUNK_SIZE):
+    """开始录制：包装当前平台后端，启用感知阶段记录，程序退出时自动保存
+
+    Returns:
+        FrameRecorder 实例
+    """
+    global _recorder
+    from platform_backend import get_backend, set_backend
+    with _recorder_lock:
+        if _recorder is not None:
+            return _recorder
+        _register_backend_stages()
+        _recorder = FrameRecorder(directory, chunk_size)
+        set_backend(RecordingBackend(get_backend(), _recorder))
+    atexit.register(stop_recording)
+    logger.info("🎥 开始录制画面和感知决策: %s", directory)
+    return _recorder
+
+
+def stop_recording():
+    """停止录制：恢复原平台后端并写出索引，返回录制目录（未在录制时返回None）"""
+    global _recorder
+    from platform_backend import get_backend, set_backend
+    with _recorder_lock:
+        recorder, _recorder = _recorder, None
+        if recorder is None:
+            return None
+        current = get_backend()
+        if isinstance(current, RecordingBackend) and current.recorder is recorder:
+            set_backend(current.inner)
+    recorder.close()
+    return recorder.directory
+
+
+# ==================== 回放 ====================
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def replay(directory, stages=None, quiet=True):
+    """回放录制的感知阶段，比较决策并统计耗时
+
+    Args:
+        directory: 录制目录
+        stages: 只回放这些阶段名，None表示全部
+        quiet: 是否屏蔽感知函数自身的输出
+
+    Returns:
+        {"stages": {阶段名: {"count", "recorded_mean", "replay_mean", "replay_p95", "diffs": [...]}},
+         "skipped": {阶段名: 次数}}
+    """
+    # 导入核心引擎以注册其中的感知阶段
+    import wechat_core_engine  # noqa: F401
+    _register_backend_stages()
+
+    archive = FrameArchive(directory)
+    timings, diffs, skipped = {}, {}, {}
+    for index, record in enumerate(archive.stages):
+        stage = record["stage"]
+        if stages and stage not in stages:
+            continue
+        func = STAGES.get(stage)
+        if func is None:
+            skipped[stage] = skipped.get(stage, 0) + 1
+            continue
+
+        kwargs = dict(record["args"])
+        kwargs.update({name: archive.frame(frame_id) for name, frame_id in record["inputs"].items()})
+        output = io.StringIO()
+        start = time.perf_counter()
+        try:
+            if quiet:
+                with redirect_stdout(output):
+                    result = func(**kwargs)
+            else:
+                result = func(**kwargs)
+            result = _to_json(result)
+        except Exception as e:
+            result = f"异常: {e}"
+        elapsed = time.perf_counter() - start
+
+        recorded, replayed = timings.setdefault(stage, ([], []))
+        recorded.append(record["elapsed"])
+        replayed.append(elapsed)
+        if result != record["result"]:
+            diffs.setdefault(stage, []).append({"index": index, "time": record["time"],
+                                                "recorded": record["result"], "replayed": result})
+
+    report = {"directory": directory, "stages": {}, "skipped": skipped}
+    for stage, (recorded, replayed) in timings.items():
+        report["stages"][stage] = {
+            "count": len(replayed),
+            "recorded_mean": sum(recorded) / len(recorded),
+            "replay_mean": sum(replayed) / len(replayed),
+            "replay_p95": _percentile(replayed, 95),
+            "diffs": diffs.get(stage, []),
+        }
+    return report
+
+
+def print_replay_report(report, max_diffs=5):
+    """打印回放报告"""
+    print(f"\n📊 回放报告: {report['directory']}")
+    for stage, stats in report["stages"].items():
+        print(f"   {stage}: n={stats['count']} 录制 {stats['recorded_mean'] * 1000:.1f}ms → "
+              f"回放 {stats['replay_mean'] * 1000:.1f}ms (p95={stats['replay_p95'] * 1000:.1f}ms)，"
+              f"决策差异 {len(stats['diffs'])} 处")
+    for stage, count in report["skipped"].items():
+        print(f"   ⚠️ 未注册的阶段 {stage}: 跳过 {count} 次")
+    for stage, stats in report["stages"].items():
+        for diff in stats["diffs"][:max_diffs]:
+            print(f"   ❗ {stage} #{diff['index']}（{diff['time']:.2f}s）: 录制 {diff['recorded']} → 回放 {diff['replayed']}")
+        if len(stats["diffs"]) > max_diffs:
+            print(f"   ❗ {stage} 另有 {len(stats['diffs']) - max_diffs} 处差异")
+
+
+if os.environ.get(RECORD_DIR_ENV) and __name__ != "__main__":
+    start_recording(os.environ[RECORD_DIR_ENV])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="回放录制的画面，比较感知阶段的决策和耗时")
+    parser.add_argument("directory", help="录制目录")
+    parser.add_argument("--stage", action="append", help="只回放指定阶段（可重复）")
+    parser.add_argument("--json", help="把报告写入JSON文件")
+    parser.add_argument("--verbose", action="store_true", help="显示感知函数自身的输出")
+    options = parser.parse_args()
+
+    # 以脚本运行时通过模块名导入，与核心引擎共用同一个阶段注册表
+    from frame_recorder import print_replay_report, replay
+
+    replay_report = replay(options.directory, options.stage, quiet=not options.verbose)
+    print_replay_report(replay_report)
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as f:
+            json.dump(replay_report, f, ensure_ascii=False, indent=2)
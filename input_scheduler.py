@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输入动作调度模块
+代替全局的 pyautogui.PAUSE（每次调用后固定等待0.5秒）：
+1. 每个输入动作单独指定动作后的等待时间
+2. 连续的按键事件合并为一组，组内只保留很短的间隔，组后统一等待
+3. 按操作（发送消息、点赞等）统计输入动作数、输入耗时、等待耗时和总耗时
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+import cancellation
+from logging_config import get_logger
+from metrics import OPERATION_ACTIONS, OPERATION_SECONDS, OPERATION_WAIT
+from platform_backend import backend
+from tracing import tracer
+
+logger = get_logger(__name__)
+
+# 当前正在统计的操作（上下文变量：异步运行时在线程池中执行的步骤沿用提交时的上下文，计入协程中的操作）
+_active_operations = contextvars.ContextVar("active_operations", default=())
+
+KEY_GAP = 0.05                # 合并的连续按键之间的间隔（秒）
+DEFAULT_POST_DELAY = KEY_GAP  # 未指定时的动作后等待；需要等待界面变化的调用处自行指定或等待画面
+
+
+class OperationStats:
+    """一次操作的输入统计"""
+
+    def __init__(self, name, stop_flag_func=None):
+        self.name = name
+        self.stop_flag_func = stop_flag_func  # 动作后等待使用的停止标志（令牌或停止标志函数）
+        self.actions = 0          # 输入动作数
+        self.input_time = 0.0     # 执行输入动作本身的耗时
+        self.delay_time = 0.0     # 动作后等待的耗时
+        self.start = time.perf_counter()
+        self.total_time = 0.0
+
+    def summary(self):
+        return (f"⌨️ {self.name}: {self.actions} 个输入动作，输入 {self.input_time:.2f}s，"
+                f"等待 {self.delay_time:.2f}s，总计 {self.total_time:.2f}s")
+
+
+class ActionScheduler:
+    """输入动作调度器
+
+    用法：
+        input_scheduler.click(x, y, post_delay=0.3)
+        input_scheduler.keys(('ctrl', 'a'), 'delete', post_delay=0.1)
+        with input_scheduler.operation("发送消息"):
+            ...
+    operation 也可以作为函数装饰器使用。
+    """
+
+    def __init__(self, default_post_delay=DEFAULT_POST_DELAY, key_gap=KEY_GAP):
+        self.default_post_delay = default_post_delay
+        self.key_gap = key_gap
+        self.totals = {}          # {操作名: {"count", "actions", "input_time", "delay_time", "total_time"}}
+        self._totals_lock = threading.Lock()
+
+    # ==================== 操作统计 ====================
+
+    def operation(self, name, verbose=True, stop_flag_func=None):
+        """统计一次操作内的输入动作（可嵌套，外层操作包含内层操作的统计）
+
+        Args:
+            name: 操作名
+            verbose: 操作结束时是否输出统计日志
+            stop_flag_func: 操作的停止标志，点击停止后动作后等待立即返回；
+                            作为装饰器时未指定则取被装饰函数的 stop_flag_func 参数
+
+        Returns:
+            可用于 with 语句，也可作为函数装饰器
+        """
+        return _OperationScope(self, name, verbose, stop_flag_func)
+
+    @contextmanager
+    def _operation(self, name, verbose, stop_flag_func):
+        stats = OperationStats(name, stop_flag_func)
+        token = _active_operations.set(_active_operations.get() + (stats,))
+        try:
+            with tracer.span(name, "operation"):
+                yield stats
+        finally:
+            _active_operations.reset(token)
+            stats.total_time = time.perf_counter() - stats.start
+            with self._totals_lock:
+                total = self.totals.setdefault(name, {"count": 0, "actions": 0, "input_time": 0.0,
+                                                      "delay_time": 0.0, "total_time": 0.0})
+                total["count"] += 1
+                total["actions"] += stats.actions
+                total["input_time"] += stats.input_time
+                total["delay_time"] += stats.delay_time
+                total["total_time"] += stats.total_time
+            OPERATION_SECONDS.observe(stats.total_time, operation=name)
+            OPERATION_WAIT.observe(stats.delay_time, operation=name)
+            OPERATION_ACTIONS.inc(stats.actions, operation=name)
+            if verbose:
+                logger.info("%s", stats.summary())
+
+    def _account(self, actions=0, input_time=0.0, delay_time=0.0):
+        for stats in _active_operations.get():
+            stats.actions += actions
+            stats.input_time += input_time
+            stats.delay_time += delay_time
+
+    # ==================== 输入动作 ====================
+
+    def sleep(self, seconds, stop_flag_func=None):
+        """显式等待（计入当前操作的等待耗时）
+
+        Args:
+            seconds: 等待秒数
+            stop_flag_func: 停止标志，未指定时使用最内层操作的停止标志
+
+        Returns:
+            True 表示等待被取消
+        """
+        if not seconds or seconds <= 0:
+            return False
+        if stop_flag_func is None:
+            stop_flag_func = next((stats.stop_flag_func for stats in reversed(_active_operations.get())
+                                   if stats.stop_flag_func is not None), None)
+        start = time.perf_counter()
+        cancelled = cancellation.sleep(seconds, stop_flag_func)
+        self._account(delay_time=time.perf_counter() - start)
+        return cancelled
+
+    def _run(self, func, args, kwargs, post_delay):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self._account(actions=1, input_time=time.perf_counter() - start)
+        self.sleep(self.default_post_delay if post_delay is None else post_delay)
+        return result
+
+    def click(self, *args, post_delay=None, **kwargs):
+        """鼠标点击，参数与 pyautogui.click 相同（由平台后端执行）"""
+        return self._run(backend.click, args, kwargs, post_delay)
+
+    def press(self, *args, post_delay=None, **kwargs):
+        """按键，参数与 pyautogui.press 相同"""
+        return self._run(backend.press, args, kwargs, post_delay)
+
+    def hotkey(self, *keys, post_delay=None):
+        """组合键，例如 hotkey('ctrl', 'v')"""
+        return self._run(backend.hotkey, keys, {}, post_delay)
+
+    def typewrite(self, *args, post_delay=None, **kwargs):
+        """键入文字，参数与 pyautogui.typewrite 相同"""
+        return self._run(backend.typewrite, args, kwargs, post_delay)
+
+    def keys(self, *events, post_delay=None):
+        """合并执行一组连续的按键事件：组内间隔 key_gap，组后统一等待 post_delay
+
+        Args:
+            events: 单个按键（如 'delete'）或组合键元组（如 ('ctrl', 'a')）
+            post_delay: 整组按键完成后的等待时间
+        """
+        for index, event in enumerate(events):
+            if isinstance(event, (tuple, list)):
+                self._run(backend.hotkey, tuple(event), {}, 0)
+            else:
+                self._run(backend.press, (event,), {}, 0)
+            if index < len(events) - 1:
+                self.sleep(self.key_gap)
+        self.sleep(self.default_post_delay if post_delay is None else post_delay)
+
+
+
+class _OperationScope:
+    """operation() 的返回值：with 语句使用时统计块内的输入，作为装饰器时每次调用统计一次"""
+
+    def __init__(self, scheduler, name, verbose, stop_flag_func):
+        self.scheduler = scheduler
+        self.name = name
+        self.verbose = verbose
+        self.stop_flag_func = stop_flag_func
+        self._context = None
+
+    def __enter__(self):
+        self._context = self.scheduler._operation(self.name, self.verbose, self.stop_flag_func)
+        return self._context.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._context.__exit__(*exc_info)
+
+    def __call__(self, func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stop_flag_func = self.stop_flag_func
+            if stop_flag_func is None:
+                stop_flag_func = signature.bind_partial(*args, **kwargs).arguments.get("stop_flag_func")
+            with self.scheduler._operation(self.name, self.verbose, stop_flag_func):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+input_scheduler = ActionScheduler()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志配置模块
+用分级日志代替热路径上的 print：
+1. 按级别过滤：调试信息（每行OCR结果、匹配像素数、区域坐标等）默认不输出，
+   调用方用 %-格式参数延迟格式化，耗时的调试计算放在 logger.isEnabledFor(logging.DEBUG) 判断之后
+2. 异步输出：日志记录放入队列，由后台线程写到控制台/文件，识别线程不等待控制台 I/O
+3. 结构化：可选写入 JSON Lines 日志文件（时间、级别、模块、线程、消息和附加字段）
+
+设置保存在 wechat_config.json 的 log_settings 节点中，环境变量 WECHAT_LOG_LEVEL 优先。
+
+用法：
+    logger = get_logger("engine")
+    logger.info("✅ 找到目标: %s", name)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("📊 匹配像素数量: %d", int(np.count_nonzero(mask)))
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+from config_store import CONFIG_FILE
+
+LOG_LEVEL_ENV = "WECHAT_LOG_LEVEL"
+ROOT_LOGGER = "wechat"
+DEFAULT_LOG_SETTINGS = {
+    "level": "INFO",              # DEBUG / INFO / WARNING / ERROR
+    "file": "",                   # JSON Lines 日志文件路径，空表示不写文件
+}
+
+_listener = None
+_setup_lock = threading.Lock()
+
+# 本模块自身的日志器（不能用 get_logger：读取设置时日志尚未配置，此时的警告由 logging 的默认处理器输出到 stderr）
+logger = logging.getLogger(f"{ROOT_LOGGER}.logging_config")
+
+
+def load_log_settings(config_file=CONFIG_FILE):
+    """从配置文件读取日志设置，缺失项使用默认值"""
+    settings = dict(DEFAULT_LOG_SETTINGS)
+    try:
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            settings.update(config.get('log_settings', {}))
+    except Exception as e:
+        logger.warning("⚠️ 读取日志设置失败，使用默认设置: %s", e)
+    return settings
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """每条日志一行JSON；通过 extra={"fields": {...}} 传入的附加字段原样写出"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """写到当前的 sys.stdout（与 print 输出到同一处，stdout 被替换后也能跟随）"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    def emit(self, record):
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+def setup_logging(level=None, config_file=CONFIG_FILE):
+    """配置 wechat 日志器：队列处理器 + 后台监听线程（重复调用只更新级别）
+
+    Args:
+        level: 日志级别名或数值，None表示按环境变量/配置文件
+        config_file: 配置文件路径
+    """
+    global _listener
+    settings = load_log_settings(config_file)
+    level = level or os.environ.get(LOG_LEVEL_ENV) or settings.get("level", "INFO")
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    with _setup_lock:
+        if _listener is not None:
+            return root
+        handlers = [_ConsoleHandler()]
+        handlers[0].setFormatter(logging.Formatter("%(message)s"))
+        file_error = None
+        if settings.get("file"):
+            try:
+                file_handler = logging.FileHandler(settings["file"], encoding='utf-8')
+                file_handler.setFormatter(JsonLinesFormatter())
+                handlers.append(file_handler)
+            except OSError as e:
+                file_error = e
+
+        log_queue = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        if file_error is not None:
+            # 监听线程启动后再输出，这条警告经由控制台处理器显示
+            logger.warning("⚠️ 无法打开日志文件 %s: %s", settings['file'], file_error)
+    return root
+
+
+def shutdown_logging():
+    """输出队列中剩余的日志并停止后台线程"""
+    global _listener
+    with _setup_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def set_level(level):
+    """运行时调整日志级别（例如GUI中切换调试输出）"""
+    logging.getLogger(ROOT_LOGGER).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def get_logger(name):
+    """获取 wechat.<name> 日志器，首次调用时完成配置"""
+    if _listener is None:
+        setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
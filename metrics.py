@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行指标模块
+用计数器和 HDR 风格的直方图（对数分段、每段内线性细分，相对误差约 1%）记录：
+1. OCR 调用次数和耗时（按调用位置）
+2. 模板匹配耗时（按图标）
+3. 每个目标的滚动次数
+4. 识别走过的回退路径（颜色过滤OCR / 普通OCR / 通用 dianzan.png 等）
+5. 每个操作的等待耗时、每类界面变化的等待耗时
+
+定期写入本地的 Prometheus 文本文件（可由 node_exporter 的 textfile 收集器读取）和 JSON 快照，
+每次流程结束时打印汇总表，并把快照追加到历史文件，便于按天比较调优效果。
+设置保存在 wechat_config.json 的 metrics_settings 节点中。
+"""
+
+import json
+import os
+import threading
+import time
+
+from config_store import CONFIG_FILE
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_METRICS_SETTINGS = {
+    "enabled": True,                  # 是否写出指标文件并打印汇总
+    "directory": "metrics",           # 指标文件目录（相对于配置文件）
+    "export_interval": 60,            # 定期写出的间隔（秒）
+}
+PROMETHEUS_FILE = "wechat_metrics.prom"
+SNAPSHOT_FILE = "wechat_metrics.json"
+HISTORY_FILE = "wechat_metrics_history.jsonl"
+
+SIGNIFICANT_BITS = 7                  # 每个二进制数量级内细分为 2^7 段
+SECONDS_RESOLUTION = 1e-6             # 耗时直方图以微秒为最小单位
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SUMMARY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def load_metrics_settings(config_file=CONFIG_FILE):
+    """从配置文件读取指标设置，缺失项使用默认值"""
+    settings = dict(DEFAULT_METRICS_SETTINGS)
+    try:
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            settings.update(config.get('metrics_settings', {}))
+    except Exception as e:
+        logger.warning("⚠️ 读取指标设置失败，使用默认设置: %s", e)
+    return settings
+
+
+def _label_key(labels):
+    return tuple(sorted((str(key), str(value)) for key, value in labels.items()))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+class HdrHistogram:
+    """对数-线性分段直方图：记录任意多个样本只占用少量分段，分位数的相对误差不超过 1/2^(SIGNIFICANT_BITS-1)"""
+
+    def __init__(self, resolution=1.0):
+        self.resolution = resolution
+        self.counts = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def _bucket(units):
+        exponent = max(0, units.bit_length() - SIGNIFICANT_BITS)
+        return (exponent << SIGNIFICANT_BITS) | (units >> exponent)
+
+    @staticmethod
+    def _bounds(bucket):
+        """分段的单位值范围 [下界, 上界]"""
+        exponent, mantissa = bucket >> SIGNIFICANT_BITS, bucket & ((1 << SIGNIFICANT_BITS) - 1)
+        return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+    def record(self, value):
+        units = max(0, int(round(value / self.resolution)))
+        bucket = self._bucket(units)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction):
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        cumulative = 0
+        for bucket in sorted(self.counts):
+            cumulative += self.counts[bucket]
+            if cumulative >= threshold:
+                lower, upper = self._bounds(bucket)
+                value = (lower + upper) / 2 * self.resolution
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def cumulative_counts(self, boundaries):
+        """各边界（含）以下的样本数，用于 Prometheus 的 _bucket 行"""
+        ordered = sorted(self.counts.items())
+        result = []
+        for boundary in boundaries:
+            limit = boundary / self.resolution
+            result.append(sum(count for bucket, count in ordered if self._bounds(bucket)[1] <= limit))
+        return result
+
+
+class Counter:
+    """带标签的计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def prometheus_lines(self):
+        with self._lock:
+            items = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in items]
+
+    def snapshot(self):
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    """带标签的当前值（内存占用、峰值等）"""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = value
+
+
+class Histogram:
+    """带标签的直方图，每组标签一个 HdrHistogram"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, resolution=SECONDS_RESOLUTION, buckets=SECONDS_BUCKETS, unit="s"):
+        self.name = name
+        self.help = help_text
+        self.resolution = resolution
+        self.buckets = buckets
+        self.unit = unit
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            histogram = self.series.get(key)
+            if histogram is None:
+                histogram = self.series[key] = HdrHistogram(self.resolution)
+            histogram.record(value)
+
+    def prometheus_lines(self):
+        lines = []
+        with self._lock:
+            for key, histogram in sorted(self.series.items()):
+                for boundary, count in zip(self.buckets, histogram.cumulative_counts(self.buckets)):
+                    lines.append(f"{self.name}_bucket{_format_labels(key + (('le', str(boundary)),))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {histogram.count}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            series = []
+            for key, histogram in sorted(self.series.items()):
+                entry = {"labels": dict(key), "count": histogram.count, "sum": round(histogram.sum, 6),
+                         "min": histogram.min, "max": histogram.max}
+                for quantile in SUMMARY_QUANTILES:
+                    entry[f"p{int(quantile * 100)}"] = histogram.percentile(quantile)
+                series.append(entry)
+            return series
+
+
+class MetricsRegistry:
+    """指标注册表：创建指标、导出 Prometheus 文本和 JSON 快照、打印汇总表"""
+
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self.settings = load_metrics_settings(config_file)
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._exporter = None
+        self._stop_exporter = threading.Event()
+
+    def _register(self, metric):
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name, help_text):
+        return self._register(Gauge(name, help_text))
+
+    def histogram(self, name, help_text, **options):
+        return self._register(Histogram(name, help_text, **options))
+
+    @property
+    def enabled(self):
+        return bool(self.settings.get("enabled", True))
+
+    def output_directory(self):
+        base = os.path.dirname(os.path.abspath(self.config_file))
+        return os.path.join(base, self.settings.get("directory", DEFAULT_METRICS_SETTINGS["directory"]))
+
+    # ==================== 导出 ====================
+
+    def prometheus_text(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "counters": {name: metric.snapshot() for name, metric in self.metrics.items() if metric.kind == "counter"},
+            "gauges": {name: metric.snapshot() for name, metric in self.metrics.items() if metric.kind == "gauge"},
+            "histograms": {name: metric.snapshot() for name, metric in self.metrics.items()
+                           if metric.kind == "histogram"},
+        }
+
+    def export(self):
+        """写出 Prometheus 文本文件和 JSON 快照（先写临时文件再替换，读取方不会读到半个文件）"""
+        if not self.enabled:
+            return
+        directory = self.output_directory()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for file_name, content in ((PROMETHEUS_FILE, self.prometheus_text()),
+                                       (SNAPSHOT_FILE, json.dumps(self.snapshot(), ensure_ascii=False, indent=2))):
+                path = os.path.join(directory, file_name)
+                with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(path + ".tmp", path)
+        except Exception as e:
+            logger.warning("⚠️ 写出指标文件失败: %s", e)
+
+    def start_exporter(self):
+        """启动定期写出指标的后台线程（重复调用无副作用）"""
+        if not self.enabled or (self._exporter and self._exporter.is_alive()):
+            return
+        interval = float(self.settings.get("export_interval", DEFAULT_METRICS_SETTINGS["export_interval"]))
+
+        def run():
+            while not self._stop_exporter.wait(interval):
+                self.export()
+
+        self._stop_exporter.clear()
+        self._exporter = threading.Thread(target=run, name="metrics_exporter", daemon=True)
+        self._exporter.start()
+
+    def stop_exporter(self):
+        self._stop_exporter.set()
+        self.export()
+
+    # ==================== 汇总 ====================
+
+    def print_summary(self, title="运行指标"):
+        """打印汇总表（程序启动以来的累计值）"""
+        logger.info("\n📈 %s（程序启动以来累计）:", title)
+        for metric in list(self.metrics.values()):
+            if metric.kind in ("counter", "gauge"):
+                for entry in metric.snapshot():
+                    logger.info("   %s%s: %s", metric.name, _format_labels(_label_key(entry['labels'])), entry['value'])
+                continue
+            for entry in metric.snapshot():
+                labels = _format_labels(_label_key(entry["labels"]))
+                if metric.unit == "s":
+                    values = " ".join(f"{name}={entry[name] * 1000:.0f}ms" for name in ("p50", "p95", "max"))
+                else:
+                    values = " ".join(f"{name}={entry[name]:g}" for name in ("p50", "p95", "max"))
+                logger.info("   %s%s: n=%d %s", metric.name, labels, entry['count'], values)
+
+    def report(self, flow):
+        """流程结束时调用：打印汇总表、写出指标文件，并把快照追加到历史文件"""
+        if not self.enabled:
+            return
+        self.print_summary()
+        self.export()
+        try:
+            with open(os.path.join(self.output_directory(), HISTORY_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"flow": flow, **self.snapshot()}, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logger.warning("⚠️ 写入指标历史失败: %s", e)
+
+
+def template_label(image):
+    """模板匹配指标的图标标签：图片路径取文件名，由 assets 加载的图片取 info['asset']"""
+    if isinstance(image, str):
+        return os.path.basename(image)
+    info = getattr(image, 'info', None)
+    if isinstance(info, dict) and info.get('asset'):
+        return info['asset']
+    return "unnamed"
+
+
+metrics = MetricsRegistry()
+
+OCR_LATENCY = metrics.histogram("wechat_ocr_latency_seconds", "OCR识别耗时（按调用位置）")
+TEMPLATE_MATCH_LATENCY = metrics.histogram("wechat_template_match_seconds", "模板匹配耗时（按图标）")
+SCROLL_STEPS = metrics.histogram("wechat_scroll_steps_per_target", "找到（或放弃）每个目标时已滚动的次数",
+                                 resolution=1, buckets=COUNT_BUCKETS, unit="")
+PERCEPTION_PATH = metrics.counter("wechat_perception_path_total", "识别走过的路径（含回退路径）")
+UI_WAIT = metrics.histogram("wechat_ui_wait_seconds", "界面变化的等待耗时（按变化类型）")
+OPERATION_SECONDS = metrics.histogram("wechat_operation_seconds", "操作总耗时（按操作）")
+OPERATION_WAIT = metrics.histogram("wechat_operation_wait_seconds", "操作内输入后等待的耗时（按操作）")
+OPERATION_ACTIONS = metrics.counter("wechat_operation_input_actions_total", "操作内的输入动作数（按操作）")
+FRAME_POOL_BYTES = metrics.gauge("wechat_frame_pool_bytes", "帧缓冲池占用的字节数（in_use / pooled / high_water）")
+FRAME_POOL_ACQUIRE = metrics.counter("wechat_frame_pool_acquire_total", "帧缓冲池分配次数（reused / allocated）")
+LOCATOR_LOOKUPS = metrics.counter("wechat_locator_lookups_total", "界面元素定位走过的路径（fast / fast_miss / full / not_found / layout）")
+SCREEN_STATE_LATENCY = metrics.histogram("wechat_screen_state_seconds", "界面状态识别耗时（按识别结果）")
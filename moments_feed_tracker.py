@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+朋友圈动态跟踪模块
+首次对整个朋友圈窗口做OCR，之后每次滚动只识别新露出的条带：
+已识别的文字行按滚动偏移整体上移，新条带的识别结果合并到持续维护的动态模型中。
+"""
+
+import numpy as np
+import cv2
+
+from frame_analysis import ScrollOffsetEstimator
+from perception import color_mask
+
+# 朋友圈用户名颜色 #576b95 和时间戳颜色 #9e9e9e
+NICKNAME_COLOR_RGB = (87, 107, 149)
+TIMESTAMP_COLOR_RGB = (158, 158, 158)
+YESTERDAY_VARIANTS = ["昨天", "咋天", "作天", "昨夭", "咋夭", "作夭"]
+
+
+class FeedLine:
+    """动态模型中的一行文字
+
+    Attributes:
+        text: 识别的文字
+        confidence: 置信度
+        left, top, right, bottom: 在当前窗口截图中的坐标
+        feed_y: 在整个动态流中的绝对纵坐标（不随滚动变化）
+        color_ratios: 文字框内各关注颜色的像素占比 {颜色: 占比}
+    """
+
+    def __init__(self, text, confidence, box, feed_y, color_ratios):
+        self.text = text
+        self.confidence = confidence
+        self.left, self.top, self.right, self.bottom = box
+        self.feed_y = feed_y
+        self.color_ratios = color_ratios
+
+    @property
+    def center(self):
+        """文字框中心点（窗口截图坐标）"""
+        return (int((self.left + self.right) / 2), int((self.top + self.bottom) / 2))
+
+    def has_color(self, color_rgb, min_ratio=0.03):
+        """文字框内是否有足够多的指定颜色像素"""
+        return self.color_ratios.get(color_rgb, 0.0) >= min_ratio
+
+    def shift(self, offset):
+        """画面向上滚动 offset 像素（负数表示向下移动）"""
+        self.top -= offset
+        self.bottom -= offset
+
+    def __repr__(self):
+        return f"FeedLine('{self.text}', conf={self.confidence:.2f}, box=({self.left}, {self.top}, {self.right}, {self.bottom}))"
+
+
+def color_ratio(region, color_rgb, tolerance=40):
+    """计算区域内与指定颜色相近的像素占比"""
+    if region.size == 0 or region.ndim != 3:
+        return 0.0
+    return cv2.countNonZero(color_mask(region, color_rgb, tolerance)) / (region.shape[0] * region.shape[1])
+
+
+class MomentsFeedTracker:
+    """朋友圈动态跟踪器
+
+    用法：每次截图后调用 update(frame)，然后用 find_targets()/has_yesterday_marker() 查询；
+    点赞、评论等操作改变了画面布局后调用 invalidate()，下一帧会重新整窗识别。
+    """
+
+    def __init__(self, ocr_func, strip_margin=40, tracked_colors=(NICKNAME_COLOR_RGB, TIMESTAMP_COLOR_RGB)):
+        """
+        Args:
+            ocr_func: OCR函数，输入RGB numpy数组，返回 [(bbox, text, confidence), ...]
+            strip_margin: 新条带向上多识别的像素数，覆盖跨越条带边界的文字行
+            tracked_colors: 需要记录像素占比的颜色
+        """
+        self.ocr_func = ocr_func
+        self.strip_margin = strip_margin
+        self.tracked_colors = tracked_colors
+        self.estimator = ScrollOffsetEstimator()
+        self.lines = []          # 当前可见的文字行
+        self.initialized = False  # 是否已整窗识别过（画面中没有文字时 lines 可能为空）
+        self.scroll_total = 0    # 累计滚动距离
+        self.frame_height = 0
+        self.last_offset = None
+        # 统计：实际识别的像素行数 / 整窗识别所需的像素行数
+        self.ocr_rows = 0
+        self.full_rows = 0
+
+    def invalidate(self):
+        """画面被操作改变（弹窗、展开点赞列表等），下一帧重新整窗识别"""
+        self.estimator.reset()
+        self.lines = []
+        self.initialized = False
+
+    def update(self, frame):
+        """处理新的一帧，只识别新露出的区域
+
+        Args:
+            frame: 朋友圈窗口截图（PIL图像或RGB numpy数组）
+
+        Returns:
+            本帧的 ScrollOffset，首帧或重新整窗识别时为 None
+        """
+        frame = np.asarray(frame)
+        height = frame.shape[0]
+        self.frame_height = height
+        self.full_rows += height
+
+        scroll_offset = self.estimator.update(frame)
+        self.last_offset = scroll_offset
+
+        if scroll_offset is None or not self.initialized:
+            # 首帧或模型已失效：整窗识别
+            self.lines = self._recognize_rows(frame, 0, height)
+            self.initialized = True
+            return None
+
+        if not scroll_offset.moved:
+            # 画面没有移动，沿用已有识别结果
+            return scroll_offset
+
+        if not scroll_offset.reliable:
+            # 无法估计偏移：整个内容区域重新识别
+            top, bottom = scroll_offset.content_rows
+            self._replace_rows(frame, top, bottom)
+            return scroll_offset
+
+        # 已识别的行整体移动（向上滚动时下移），滚出内容区域的行直接丢弃
+        self.scroll_total += scroll_offset.offset
+        content_top, content_bottom = scroll_offset.content_rows
+        visible = []
+        for line in self.lines:
+            line.shift(scroll_offset.offset)
+            if content_top < line.bottom and line.top < content_bottom:
+                visible.append(line)
+        self.lines = visible
+
+        # 只识别新露出的条带（向已识别的一侧多取一段，覆盖被截断的文字行）
+        strip_top, strip_bottom = scroll_offset.new_rows
+        if scroll_offset.offset > 0:
+            self._replace_rows(frame, max(content_top, strip_top - self.strip_margin), strip_bottom)
+        else:
+            self._replace_rows(frame, strip_top, min(content_bottom, strip_bottom + self.strip_margin))
+        return scroll_offset
+
+    def _replace_rows(self, frame, top, bottom):
+        """重新识别 [top, bottom) 行，替换中心落在该区域内的旧文字行"""
+        kept = []
+        for line in self.lines:
+            if top <= line.center[1] < bottom:
+                continue
+            # 与条带相交但中心在条带外的行（被截断的部分）以旧结果为准
+            kept.append(line)
+        new_lines = [line for line in self._recognize_rows(frame, top, bottom)
+                     if not any(self._overlaps(line, old) for old in kept)]
+        self.lines = sorted(kept + new_lines, key=lambda line: (line.top, line.left))
+
+    @staticmethod
+    def _overlaps(a, b):
+        """两行文字框是否在纵向上大部分重叠（同一行的重复识别）"""
+        overlap = min(a.bottom, b.bottom) - max(a.top, b.top)
+        return overlap > 0.5 * min(a.bottom - a.top, b.bottom - b.top) and min(a.right, b.right) > max(a.left, b.left)
+
+    def _recognize_rows(self, frame, top, bottom):
+        """对 [top, bottom) 行做OCR，返回窗口坐标系下的 FeedLine 列表"""
+        if bottom - top <= 0:
+            return []
+        self.ocr_rows += bottom - top
+        strip = np.ascontiguousarray(frame[top:bottom])
+        results = self.ocr_func(strip) or []
+
+        lines = []
+        for detection in results:
+            if len(detection) < 3:
+                continue
+            bbox, text, confidence = detection[0], detection[1], detection[2]
+            try:
+                xs = [point[0] for point in bbox]
+                ys = [point[1] for point in bbox]
+                box = (int(min(xs)), int(min(ys)) + top, int(max(xs)), int(max(ys)) + top)
+            except (TypeError, IndexError):
+                continue
+            region = frame[max(0, box[1]):box[3], max(0, box[0]):box[2]]
+            ratios = {color: color_ratio(region, color) for color in self.tracked_colors}
+            lines.append(FeedLine(text, float(confidence), box, self.scroll_total + box[1], ratios))
+        return lines
+
+    def find_targets(self, target_names, min_confidence=0.8):
+        """在可见文字行中查找目标用户名
+
+        优先匹配用户名颜色 (#576b95) 的文字，其次匹配置信度足够高的普通文字。
+
+        Returns:
+            {用户名: (x, y)}，坐标相对于窗口截图
+        """
+        found = {}
+        for target_name in target_names:
+            candidates = [line for line in self.lines if target_name in line.text]
+            nickname_lines = [line for line in candidates if line.has_color(NICKNAME_COLOR_RGB)]
+            if nickname_lines:
+                found[target_name] = nickname_lines[0].center
+                continue
+            confident_lines = [line for line in candidates if line.confidence > min_confidence]
+            if confident_lines:
+                found[target_name] = confident_lines[0].center
+        return found
+
+    def has_yesterday_marker(self):
+        """可见区域中是否有灰色的"昨天"时间戳"""
+        for line in self.lines:
+            if line.has_color(TIMESTAMP_COLOR_RGB) and any(variant in line.text for variant in YESTERDAY_VARIANTS):
+                return True
+        return False
+
+    @property
+    def ocr_area_ratio(self):
+        """实际OCR面积占整窗识别面积的比例"""
+        return self.ocr_rows / self.full_rows if self.full_rows else 1.0
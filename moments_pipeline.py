@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+朋友圈滚动查找流水线
+把 "滚动 → 截图 → OCR → 决策" 拆成三个阶段并行执行：
+1. 滚动/截图阶段（生产者线程）：按下键、等待画面稳定、截图，放入有界帧队列
+2. 识别阶段（工作线程）：用 MomentsFeedTracker 增量识别每一帧，结果放入有界结果队列
+3. 决策阶段（调用者线程）：读取识别结果，判断是否到底、是否到达"昨天"、是否找到目标
+
+队列有界，识别跟不上时滚动阶段会被阻塞（背压）。
+找到目标需要点赞时先暂停滚动并排空流水线，按当前画面重新定位目标（必要时向上回滚），
+点赞改变画面后跟踪器失效，流水线从新画面重新开始。
+长列表上每一步的耗时接近 max(滚动耗时, OCR耗时)，而不是两者之和。
+"""
+
+import queue
+import threading
+import time
+
+from logging_config import get_logger
+from profiling import profiler
+from tracing import tracer
+
+logger = get_logger(__name__)
+
+PIPELINE_DEPTH = 2            # 帧队列/结果队列的容量（滚动阶段最多领先的帧数）
+QUEUE_TIMEOUT = 0.1           # 队列读写的超时（秒），用于及时响应停止
+
+
+class FrameResult:
+    """识别阶段对一帧的处理结果
+
+    Attributes:
+        seq: 帧序号
+        epoch: 所属的画面纪元（每次点赞后加一，旧纪元的结果会被丢弃）
+        moved: 相对上一帧是否发生了滚动
+        found: {用户名: (x, y)}，坐标相对于朋友圈窗口截图
+        yesterday: 是否识别到"昨天"标记
+        scroll_time: 滚动并等待稳定的耗时
+        ocr_time: 识别耗时
+    """
+
+    def __init__(self, seq, epoch, moved, found, yesterday, scroll_time, ocr_time):
+        self.seq = seq
+        self.epoch = epoch
+        self.moved = moved
+        self.found = found
+        self.yesterday = yesterday
+        self.scroll_time = scroll_time
+        self.ocr_time = ocr_time
+
+    def __repr__(self):
+        return (f"FrameResult(seq={self.seq}, epoch={self.epoch}, moved={self.moved}, "
+                f"found={list(self.found)}, yesterday={self.yesterday})")
+
+
+class MomentsScanPipeline:
+    """朋友圈滚动查找流水线
+
+    用法：
+        pipeline = MomentsScanPipeline(tracker, capture_frame, scroll, lambda: remaining_targets)
+        pipeline.start()
+        result = pipeline.next_result()
+        positions = pipeline.pause_and_locate(names)   # 点赞前暂停并重新定位
+        pipeline.resume()                              # 点赞后从新画面继续
+        pipeline.stop()
+    """
+
+    def __init__(self, tracker, capture_func, scroll_func, targets_func, depth=PIPELINE_DEPTH,
+                 stop_flag_func=None):
+        """
+        Args:
+            tracker: MomentsFeedTracker 实例（运行期间只由识别阶段使用）
+            capture_func: 截图函数，返回朋友圈窗口RGB数组，失败时返回None
+            scroll_func: 滚动函数，参数为 'down' 或 'up'，返回时画面已稳定
+            targets_func: 返回当前仍需查找的用户名列表
+            depth: 队列容量
+            stop_flag_func: 停止标志检查函数
+        """
+        self.tracker = tracker
+        self.capture_func = capture_func
+        self.scroll_func = scroll_func
+        self.targets_func = targets_func
+        self.depth = depth
+        self.stop_flag_func = stop_flag_func
+
+        self._frames = queue.Queue(maxsize=depth)
+        self._results = queue.Queue(maxsize=depth)
+        self._running = threading.Event()      # 滚动阶段允许继续
+        self._producer_idle = threading.Event()
+        self._stopped = threading.Event()
+        self._epoch = 0
+        self._seq = 0
+        self._threads = []
+        # 统计
+        self.scroll_time = 0.0
+        self.ocr_time = 0.0
+        self.frames = 0
+        self.start_time = None
+
+    # ==================== 生命周期 ====================
+
+    def start(self):
+        """启动滚动阶段和识别阶段"""
+        self.start_time = time.perf_counter()
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=profiler.attach(self._scroll_stage), name="moments_scroll", daemon=True),
+            threading.Thread(target=profiler.attach(self._recognition_stage), name="moments_ocr", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """停止流水线并等待线程退出"""
+        self._stopped.set()
+        self._running.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        if self.frames:
+            elapsed = time.perf_counter() - self.start_time
+            logger.info("📊 流水线: %d 帧，总用时 %.2fs，滚动 %.2fs，OCR %.2fs（串行需 %.2fs）", self.frames, elapsed,
+                        self.scroll_time, self.ocr_time, self.scroll_time + self.ocr_time)
+
+    def _should_stop(self):
+        return self._stopped.is_set() or bool(self.stop_flag_func and self.stop_flag_func())
+
+    def _put(self, target_queue, item):
+        """带背压的入队：队列满时阻塞，停止时放弃"""
+        while not self._should_stop():
+            try:
+                target_queue.put(item, timeout=QUEUE_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ==================== 阶段实现 ====================
+
+    def _scroll_stage(self):
+        """滚动/截图阶段：滚动一次、截图，放入帧队列"""
+        while not self._should_stop():
+            if not self._running.is_set():
+                self._producer_idle.set()
+                self._running.wait(QUEUE_TIMEOUT)
+                continue
+            self._producer_idle.clear()
+
+            epoch = self._epoch
+            start = time.perf_counter()
+            try:
+                with tracer.span("pipeline.scroll_capture", "pipeline", seq=self._seq + 1):
+                    self.scroll_func('down')
+                    frame = self.capture_func()
+            except Exception as e:
+                logger.warning("⚠️ 流水线滚动阶段出错: %s", e)
+                frame = None
+            scroll_time = time.perf_counter() - start
+            if frame is None:
+                continue
+
+            self._seq += 1
+            if not self._put(self._frames, (self._seq, epoch, frame, scroll_time)):
+                break
+        self._producer_idle.set()
+
+    def _recognition_stage(self):
+        """识别阶段：增量OCR，生成 FrameResult"""
+        while not self._should_stop():
+            try:
+                seq, epoch, frame, scroll_time = self._frames.get(timeout=QUEUE_TIMEOUT)
+            except queue.Empty:
+                continue
+            try:
+                if epoch != self._epoch:
+                    # 画面已被点赞操作改变，丢弃旧帧
+                    continue
+                result = self._recognize(seq, epoch, frame, scroll_time)
+                self._put(self._results, result)
+            except Exception as e:
+                logger.warning("⚠️ 流水线识别阶段出错: %s", e)
+            finally:
+                self._frames.task_done()
+
+    def _recognize(self, seq, epoch, frame, scroll_time):
+        start = time.perf_counter()
+        with tracer.span("pipeline.recognize", "pipeline", seq=seq):
+            scroll_offset = self.tracker.update(frame)
+            targets = list(self.targets_func())
+            found = self.tracker.find_targets(targets) if targets else {}
+        ocr_time = time.perf_counter() - start
+
+        self.frames += 1
+        self.scroll_time += scroll_time
+        self.ocr_time += ocr_time
+        moved = scroll_offset is None or scroll_offset.moved
+        return FrameResult(seq, epoch, moved, found, self.tracker.has_yesterday_marker(), scroll_time, ocr_time)
+
+    # ==================== 决策阶段接口 ====================
+
+    def next_result(self):
+        """读取下一帧的识别结果，停止时返回None"""
+        while not self._should_stop():
+            try:
+                result = self._results.get(timeout=QUEUE_TIMEOUT)
+            except queue.Empty:
+                continue
+            if result.epoch == self._epoch:
+                return result
+        return None
+
+    def _drain(self):
+        """暂停滚动阶段并等待流水线中的帧全部识别完，返回最后一个结果
+
+        等待期间持续读取结果队列，避免滚动阶段和识别阶段因队列已满而互相阻塞。
+        """
+        self._running.clear()
+        latest = None
+        while not self._should_stop():
+            try:
+                result = self._results.get(timeout=QUEUE_TIMEOUT)
+                if result.epoch == self._epoch:
+                    latest = result
+            except queue.Empty:
+                pass
+            if self._producer_idle.is_set() and self._frames.unfinished_tasks == 0 and self._results.empty():
+                break
+        return latest
+
+    def pause_and_locate(self, target_names):
+        """暂停流水线并按当前画面重新定位目标（回滚）
+
+        暂停时滚动阶段可能已经领先若干帧，之前结果中的坐标已经过时：
+        排空流水线后跟踪器反映的是当前画面，从中重新查找目标；
+        目标已滚出画面顶部时向上滚动，最多回滚 depth + 1 次。向上滚动按负偏移增量识别新露出的顶部条带，
+        估计出的偏移与滚动方向不符（向下或无法估计）时跟踪器失效，整窗重新识别，避免目标被归到错误的行。
+
+        Returns:
+            {用户名: (x, y)}，只包含当前画面中能定位到的目标
+        """
+        self._drain()
+        found = self.tracker.find_targets(target_names)
+        missing = [name for name in target_names if name not in found]
+        rollback = 0
+        while missing and rollback <= self.depth and not self._should_stop():
+            rollback += 1
+            logger.info("⏪ 目标已滚出画面，向上回滚第 %s 次: %s", rollback, ', '.join(missing))
+            self.scroll_func('up')
+            frame = self.capture_func()
+            if frame is None:
+                break
+            scroll_offset = self.tracker.update(frame)
+            if scroll_offset is not None and scroll_offset.moved and not (scroll_offset.reliable
+                                                                          and scroll_offset.offset < 0):
+                self.tracker.invalidate()
+                self.tracker.update(frame)
+            found.update(self.tracker.find_targets(missing))
+            missing = [name for name in target_names if name not in found]
+        return found
+
+    def resume(self):
+        """点赞等操作改变画面后继续：跟踪器失效，丢弃旧纪元的帧，从新画面重新开始"""
+        self._epoch += 1
+        self.tracker.invalidate()
+        self._producer_idle.clear()
+        self._running.set()
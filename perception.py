@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+感知模块
+以灰度为主的画面表示：每帧只派生一次灰度平面，颜色只以单通道掩码的形式参与识别。
+1. 靠形状区分的模板（点赞/评论/发送图标）和帧差不需要颜色，在灰度平面上进行，
+   同一帧上检查多个灰度条件时共用同一个灰度平面；已赞/未赞图标只靠颜色区分，仍按颜色匹配
+2. 颜色条件、颜色占比和颜色过滤OCR只需要"像素是否接近目标颜色"，用 cv2.inRange 直接得到单通道掩码，
+   不再生成 int16 的三通道差值数组，也不再把掩码扩展回三通道RGB
+3. 灰度平面和掩码取自帧缓冲池，Frame.release() 时统一归还
+
+单通道数组的内存是RGB的1/3，匹配、对比的计算量也相应减少。
+
+用法：
+    with Frame(backend.grab(region=region), region) as frame:
+        box = match_gray_template(frame.gray, template_gray)
+        count = cv2.countNonZero(frame.mask((87, 107, 149), 20))
+"""
+
+import numpy as np
+import cv2
+
+from frame_analysis import to_gray
+from frame_buffers import frame_pool
+
+
+def color_mask(image, color_rgb, tolerance, dst=None, pooled=False):
+    """单通道颜色掩码：三个通道都在 目标值±容差 范围内的像素为255，其余为0
+
+    Args:
+        image: RGB numpy数组（多于3个通道时忽略其余通道）
+        color_rgb: 目标颜色 (R, G, B)
+        tolerance: 每个通道的容差
+        dst: 可选的 (高, 宽) uint8 输出数组
+        pooled: 为True且未提供 dst 时，掩码取自帧缓冲池，用完后需调用 frame_pool.release() 归还
+    """
+    lower = np.array([max(0, c - tolerance) for c in color_rgb], dtype=np.uint8)
+    upper = np.array([min(255, c + tolerance) for c in color_rgb], dtype=np.uint8)
+    if dst is None and pooled:
+        dst = frame_pool.acquire(image.shape[:2])
+    if dst is None:
+        return cv2.inRange(image[:, :, :3], lower, upper)
+    try:
+        return cv2.inRange(image[:, :, :3], lower, upper, dst=dst)
+    except Exception:
+        if pooled:
+            frame_pool.release(dst)
+        raise
+
+
+class Frame:
+    """一帧画面：截取的RGB数组，以及按需派生（每帧只派生一次）的灰度平面和颜色掩码
+
+    Attributes:
+        rgb: 截取的RGB数组（OCR等需要颜色的识别使用）
+        region: 截图区域 (left, top, width, height)，None表示全屏
+    """
+
+    def __init__(self, rgb, region=None):
+        self.rgb = rgb
+        self.region = region
+        self._gray = None
+        self._masks = {}
+
+    @property
+    def shape(self):
+        return self.rgb.shape
+
+    @property
+    def gray(self):
+        """灰度平面（首次访问时转换，之后复用）"""
+        if self._gray is None:
+            self._gray = to_gray(self.rgb, pooled=True)
+        return self._gray
+
+    def mask(self, color_rgb, tolerance):
+        """指定颜色的单通道掩码（同一颜色和容差只计算一次）"""
+        key = (tuple(color_rgb), tolerance)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._masks[key] = color_mask(self.rgb, color_rgb, tolerance, pooled=True)
+        return mask
+
+    def release(self):
+        """归还灰度平面和掩码，之后不能再使用它们"""
+        frame_pool.release(self._gray, *self._masks.values())
+        self._gray = None
+        self._masks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.release()
+        return False
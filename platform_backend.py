@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+平台后端模块
+把核心引擎用到的系统能力抽象成统一接口：
+1. 窗口：枚举、激活、恢复/最大化、位置和大小
+2. 屏幕：截图（PIL图像或直接截到 numpy 数组）、屏幕尺寸、模板查找
+3. 输入：鼠标点击、按键、组合键、键入文字
+4. 剪贴板：写入文字
+
+WindowsBackend 使用 win32gui / pyautogui / pyperclip（只在创建后端时导入），安装了 mss 时
+grab() 把屏幕像素直接截到 numpy 数组，不经过 PIL 图像；
+SimulatedBackend 从图片提供画面并记录所有输入动作，可以在无界面的 Linux 上运行核心流程。
+默认在 Windows 上使用 WindowsBackend，其他平台使用 SimulatedBackend，
+也可以通过环境变量 WECHAT_PLATFORM_BACKEND=windows/simulated 指定。
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from logging_config import get_logger
+from metrics import TEMPLATE_MATCH_LATENCY, template_label
+from tracing import tracer
+
+logger = get_logger(__name__)
+
+BACKEND_ENV = "WECHAT_PLATFORM_BACKEND"
+
+# 与 pyautogui 的 Box 字段相同：(left, top, width, height)
+Box = namedtuple('Box', 'left top width height')
+# 与 pyautogui 的 Size 字段相同：(width, height)
+Size = namedtuple('Size', 'width height')
+
+
+class PlatformBackend:
+    """平台后端接口
+
+    窗口句柄对调用者是不透明的值，只能传回同一个后端使用。
+    矩形统一为 (left, top, right, bottom)，截图区域统一为 (left, top, width, height)。
+    """
+
+    name = "base"
+
+    # ==================== 窗口 ====================
+
+    def list_windows(self):
+        """返回所有可见且有效的窗口 [(句柄, 标题)]"""
+        raise NotImplementedError
+
+    def foreground_window(self):
+        """当前前台窗口句柄，没有时返回None"""
+        raise NotImplementedError
+
+    def window_title(self, hwnd):
+        raise NotImplementedError
+
+    def window_process_name(self, hwnd):
+        """窗口所属进程名，无法获取时返回None"""
+        return None
+
+    def is_window(self, hwnd):
+        raise NotImplementedError
+
+    def is_minimized(self, hwnd):
+        raise NotImplementedError
+
+    def restore_window(self, hwnd):
+        raise NotImplementedError
+
+    def maximize_window(self, hwnd):
+        raise NotImplementedError
+
+    def set_foreground(self, hwnd):
+        raise NotImplementedError
+
+    def window_rect(self, hwnd):
+        """窗口矩形 (left, top, right, bottom)"""
+        raise NotImplementedError
+
+    def move_window(self, hwnd, left, top, width, height):
+        """调整窗口位置和大小并置于顶层"""
+        raise NotImplementedError
+
+    # ==================== 屏幕 ====================
+
+    def screen_size(self):
+        """屏幕尺寸 Size(width, height)"""
+        raise NotImplementedError
+
+    def screenshot(self, region=None):
+        """截图，返回RGB格式的PIL图像
+
+        Args:
+            region: (left, top, width, height)，None表示全屏
+        """
+        raise NotImplementedError
+
+    def grab(self, region=None, out=None):
+        """截图，返回RGB格式的 uint8 numpy 数组 (高, 宽, 3)，识别流程使用这个接口而不是 screenshot()
+
+        返回的数组可能是只读的（例如画面缓存的视图），调用方不应修改。
+
+        Args:
+            region: (left, top, width, height)，None表示全屏
+            out: 可选的预分配数组（例如帧缓冲池中的数组），形状相同时直接写入并返回它
+        """
+        frame = np.asarray(self.screenshot(region=region))
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            return out
+        return frame
+
+    def grab_gray(self, region=None, out=None):
+        """截图，返回灰度 uint8 numpy 数组 (高, 宽)，用于只需要灰度的探测帧和帧差
+
+        Args:
+            region: (left, top, width, height)，None表示全屏
+            out: 可选的预分配 (高, 宽) 数组，形状相同时直接写入并返回它
+        """
+        frame = self.grab(region=region)
+        if out is not None and out.shape == frame.shape[:2]:
+            return cv2.cvtColor(frame[:, :, :3], cv2.COLOR_RGB2GRAY, dst=out)
+        return cv2.cvtColor(frame[:, :, :3], cv2.COLOR_RGB2GRAY)
+
+    def locate_on_screen(self, image, confidence=0.8, region=None, grayscale=False):
+        """在屏幕上查找模板图像，返回 Box，找不到时返回None
+
+        Args:
+            image: 模板（PIL图像或图片路径）
+            grayscale: 是否按灰度匹配（更快）；只靠颜色区分的图标（已赞/未赞）必须按颜色匹配
+        """
+        raise NotImplementedError
+
+    def locate_all_on_screen(self, image, confidence=0.8, region=None, grayscale=False):
+        """在屏幕上查找模板图像的所有位置，返回 Box 列表"""
+        raise NotImplementedError
+
+    # ==================== 输入 ====================
+
+    def click(self, x=None, y=None, **kwargs):
+        raise NotImplementedError
+
+    def press(self, key, **kwargs):
+        raise NotImplementedError
+
+    def hotkey(self, *keys, **kwargs):
+        raise NotImplementedError
+
+    def typewrite(self, text, **kwargs):
+        raise NotImplementedError
+
+    # ==================== 剪贴板 ====================
+
+    def copy_to_clipboard(self, text):
+        """写入剪贴板；后端不支持剪贴板时抛出 ImportError"""
+        raise NotImplementedError
+
+
+class WindowsBackend(PlatformBackend):
+    """Windows 后端：win32gui + pyautogui + pyperclip"""
+
+    name = "windows"
+
+    def __init__(self):
+        import pyautogui
+        import win32con
+        import win32gui
+        import win32process
+
+        self.pyautogui = pyautogui
+        self.win32con = win32con
+        self.win32gui = win32gui
+        self.win32process = win32process
+
+        # mss 截图对象不能跨线程使用，每个线程单独创建
+        try:
+            import mss
+            self.mss = mss
+        except ImportError:
+            self.mss = None
+        self._capture_local = threading.local()
+
+        # 配置pyautogui
+        #pyautogui.FAILSAFE = True
+        pyautogui.FAILSAFE = False
+        # 不再使用全局的 PAUSE：输入动作后的等待由 input_scheduler 按动作分别指定
+        pyautogui.PAUSE = 0
+
+    # ==================== 窗口 ====================
+
+    def list_windows(self):
+        win32gui = self.win32gui
+        windows = []
+
+        def enum_windows_callback(hwnd, windows):
+            try:
+                if win32gui.IsWindowVisible(hwnd) and win32gui.IsWindow(hwnd):
+                    windows.append((hwnd, win32gui.GetWindowText(hwnd)))
+            except:
+                # 忽略无效窗口
+                pass
+            return True
+
+        win32gui.EnumWindows(enum_windows_callback, windows)
+        return windows
+
+    def foreground_window(self):
+        return self.win32gui.GetForegroundWindow() or None
+
+    def window_title(self, hwnd):
+        return self.win32gui.GetWindowText(hwnd)
+
+    def window_process_name(self, hwnd):
+        try:
+            import psutil
+            pid = self.win32process.GetWindowThreadProcessId(hwnd)[1]
+            return psutil.Process(pid).name()
+        except Exception:
+            return None
+
+    def is_window(self, hwnd):
+        return bool(self.win32gui.IsWindow(hwnd))
+
+    def is_minimized(self, hwnd):
+        return bool(self.win32gui.IsIconic(hwnd))
+
+    def restore_window(self, hwnd):
+        self.win32gui.ShowWindow(hwnd, self.win32con.SW_RESTORE)
+
+    def maximize_window(self, hwnd):
+        self.win32gui.ShowWindow(hwnd, self.win32con.SW_MAXIMIZE)
+
+    def set_foreground(self, hwnd):
+        self.win32gui.SetForegroundWindow(hwnd)
+
+    def window_rect(self, hwnd):
+        return tuple(self.win32gui.GetWindowRect(hwnd))
+
+    def move_window(self, hwnd, left, top, width, height):
+        self.win32gui.SetWindowPos(
+            hwnd,
+            self.win32con.HWND_TOP,  # 置于顶层
+            left, top,  # 新位置
+            width, height,  # 新尺寸
+            self.win32con.SWP_SHOWWINDOW  # 显示窗口
+        )
+
+    # ==================== 屏幕 ====================
+
+    def screen_size(self):
+        width, height = self.pyautogui.size()
+        return Size(width, height)
+
+    def screenshot(self, region=None):
+        return self.pyautogui.screenshot(region=region)
+
+    def _grab_bgra(self, region):
+        """用 mss 截图，返回 BGRA 像素缓冲区的零拷贝视图"""
+        grabber = getattr(self._capture_local, 'grabber', None)
+        if grabber is None:
+            grabber = self._capture_local.grabber = self.mss.mss()
+        if region is None:
+            width, height = self.pyautogui.size()
+            region = (0, 0, width, height)
+        left, top, width, height = (int(value) for value in region)
+        shot = grabber.grab({"left": left, "top": top, "width": width, "height": height})
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def grab(self, region=None, out=None):
+        if self.mss is None:
+            return super().grab(region, out)
+        # shot.raw 是 BGRA 像素缓冲区：先取零拷贝视图，转换为RGB时是唯一的一次拷贝
+        bgra = self._grab_bgra(region)
+        if out is not None and out.shape == bgra.shape[:2] + (3,):
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB, dst=out)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+
+    def grab_gray(self, region=None, out=None):
+        if self.mss is None:
+            return super().grab_gray(region, out)
+        # 直接从 BGRA 转换为灰度，不经过RGB中间数组
+        bgra = self._grab_bgra(region)
+        if out is not None and out.shape == bgra.shape[:2]:
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=out)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY)
+
+    def locate_on_screen(self, image, confidence=0.8, region=None, grayscale=False):
+        # 新版 pyscreeze 找不到时抛出异常而不是返回None，这里统一为返回None
+        try:
+            box = self.pyautogui.locateOnScreen(image, confidence=confidence, region=region, grayscale=grayscale)
+        except self.pyautogui.ImageNotFoundException:
+            return None
+        return Box(*box) if box else None
+
+    def locate_all_on_screen(self, image, confidence=0.8, region=None, grayscale=False):
+        try:
+            return [Box(*box) for box in self.pyautogui.locateAllOnScreen(image, confidence=confidence,
+                                                                          region=region, grayscale=grayscale)]
+        except self.pyautogui.ImageNotFoundException:
+            return []
+
+    # ==================== 输入 ====================
+
+    def click(self, x=None, y=None, **kwargs):
+        return self.pyautogui.click(x, y, **kwargs)
+
+    def press(self, key, **kwargs):
+        return self.pyautogui.press(key, **kwargs)
+
+    def hotkey(self, *keys, **kwargs):
+        return self.pyautogui.hotkey(*keys, **kwargs)
+
+    def typewrite(self, text, **kwargs):
+        return self.pyautogui.typewrite(text, **kwargs)
+
+    # ==================== 剪贴板 ====================
+
+    def copy_to_clipboard(self, text):
+        import pyperclip
+        pyperclip.copy(text)
+
+
+# ==================== 模拟后端 ====================
+
+def _load_rgb(image):
+    """把图片路径 / PIL图像 / numpy数组统一转换为RGB的PIL图像"""
+    if isinstance(image, Image.Image):
+        return image.convert('RGB')
+    if isinstance(image, np.ndarray):
+        return Image.fromarray(image).convert('RGB')
+    with open(image, 'rb') as f:
+        data = np.frombuffer(f.read(), dtype=np.uint8)
+    bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError(f"无法读取图片: {image}")
+    return Image.fromarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+
+
+def _match_scores(haystack, template):
+    """归一化相关系数匹配得分矩阵，画面比模板小时返回None"""
+    height, width = template.shape[:2]
+    if haystack.shape[0] < height or haystack.shape[1] < width:
+        return None
+    return cv2.matchTemplate(haystack, template, cv2.TM_CCOEFF_NORMED)
+
+
+def _gray(image):
+    """RGB数组转换为灰度平面，已是单通道时原样返回"""
+    return cv2.cvtColor(image[:, :, :3], cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+
+
+def locate_in_image(haystack, template, confidence=0.8):
+    """在画面中查找模板（与 pyautogui 的 opencv 匹配方式相同，两者需同为RGB或同为灰度），返回相对画面的 Box 或None"""
+    scores = _match_scores(haystack, template)
+    if scores is None:
+        return None
+    _, max_val, _, max_loc = cv2.minMaxLoc(scores)
+    if max_val < confidence:
+        return None
+    return Box(max_loc[0], max_loc[1], template.shape[1], template.shape[0])
+
+
+def locate_all_in_image(haystack, template, confidence=0.8):
+    """查找画面中模板的所有不重叠的匹配，按从上到下排序"""
+    scores = _match_scores(haystack, template)
+    if scores is None:
+        return []
+    height, width = template.shape[:2]
+    boxes = []
+    ys, xs = np.where(scores >= confidence)
+    # 按得分从高到低，去掉与已选位置重叠的匹配
+    for index in np.argsort(-scores[ys, xs]):
+        x, y = int(xs[index]), int(ys[index])
+        if all(abs(x - bx) >= width or abs(y - by) >= height for bx, by in boxes):
+            boxes.append((x, y))
+    boxes.sort(key=lambda point: (point[1], point[0]))
+    return [Box(x, y, width, height) for x, y in boxes]
+
+
+class FrameSequence:
+    """按顺序提供的屏幕画面：按下键/PageDown时切到下一张，按上键/PageUp时回到上一张
+
+    SimulatedBackend 的画面源需要提供 render() 方法，可选提供 handle_input(action, args, kwargs)
+    用于响应输入动作；更完整的界面模拟器也按这个接口接入。
+    """
+
+    def __init__(self, frames):
+        self.frames = [_load_rgb(frame) for frame in frames]
+        if not self.frames:
+            raise ValueError("FrameSequence 至少需要一张画面")
+        self.index = 0
+
+    def render(self):
+        return self.frames[self.index]
+
+    def handle_input(self, action, args, kwargs):
+        if action == 'press' and args:
+            if args[0] in ('down', 'pagedown'):
+                self.index = min(self.index + 1, len(self.frames) - 1)
+            elif args[0] in ('up', 'pageup'):
+                self.index = max(self.index - 1, 0)
+
+
+class SimulatedWindow:
+    """模拟窗口"""
+
+    def __init__(self, hwnd, title, rect, process_name="WeChat.exe"):
+        self.hwnd = hwnd
+        self.title = title
+        self.rect = tuple(rect)
+        self.process_name = process_name
+        self.minimized = False
+        self.visible = True
+
+
+class SimulatedBackend(PlatformBackend):
+    """模拟后端：从画面源提供截图，记录所有输入动作和窗口操作
+
+    用法：
+        backend = SimulatedBackend(FrameSequence(["feed1.png", "feed2.png"]))
+        backend.add_window("微信", (0, 0, 1200, 800))
+        set_backend(backend)
+        ...
+        backend.actions   # [(时间, 动作, 参数, 关键字参数)]
+    """
+
+    name = "simulated"
+
+    def __init__(self, screen=None, size=(1920, 1080)):
+        """
+        Args:
+            screen: 画面源（带 render() 方法的对象）、单张图片或图片列表；None表示纯白屏幕
+            size: 没有画面源时的屏幕尺寸
+        """
+        if screen is None:
+            screen = FrameSequence([Image.new('RGB', size, (255, 255, 255))])
+        elif not hasattr(screen, 'render'):
+            screen = FrameSequence(screen if isinstance(screen, (list, tuple)) else [screen])
+        self.screen = screen
+        self.actions = []
+        self.clipboard = ""
+        self.windows = {}
+        self._foreground = None
+        self._next_hwnd = 1
+        self.lock = threading.RLock()       # 画面源的状态也由这把锁保护
+
+    def record(self, action, *args, **kwargs):
+        """记录一个动作，并转交给画面源处理"""
+        with self.lock:
+            self.actions.append((time.perf_counter(), action, args, kwargs))
+            handler = getattr(self.screen, 'handle_input', None)
+            if handler:
+                handler(action, args, kwargs)
+
+    def actions_named(self, action):
+        """按动作名筛选已记录的动作 [(参数, 关键字参数)]"""
+        return [(args, kwargs) for _, name, args, kwargs in self.actions if name == action]
+
+    # ==================== 窗口 ====================
+
+    def add_window(self, title, rect=None, process_name="WeChat.exe"):
+        """添加一个模拟窗口并置于前台，返回句柄"""
+        with self.lock:
+            if rect is None:
+                width, height = self.screen_size()
+                rect = (0, 0, width, height)
+            hwnd = self._next_hwnd
+            self._next_hwnd += 1
+            self.windows[hwnd] = SimulatedWindow(hwnd, title, rect, process_name)
+            self._foreground = hwnd
+            return hwnd
+
+    def bring_to_front(self, hwnd):
+        """画面源内部切换前台窗口（例如点击窗口），不记录为动作"""
+        with self.lock:
+            if hwnd in self.windows:
+                self._foreground = hwnd
+
+    def close_window(self, hwnd):
+        with self.lock:
+            self.windows.pop(hwnd, None)
+            if self._foreground == hwnd:
+                self._foreground = None
+
+    def list_windows(self):
+        with self.lock:
+            return [(window.hwnd, window.title) for window in self.windows.values() if window.visible]
+
+    def foreground_window(self):
+        return self._foreground
+
+    def window_title(self, hwnd):
+        window = self.windows.get(hwnd)
+        return window.title if window else ""
+
+    def window_process_name(self, hwnd):
+        window = self.windows.get(hwnd)
+        return window.process_name if window else None
+
+    def is_window(self, hwnd):
+        return hwnd in self.windows
+
+    def is_minimized(self, hwnd):
+        window = self.windows.get(hwnd)
+        return bool(window and window.minimized)
+
+    def restore_window(self, hwnd):
+        self.record('restore_window', hwnd)
+        if hwnd in self.windows:
+            self.windows[hwnd].minimized = False
+
+    def maximize_window(self, hwnd):
+        self.record('maximize_window', hwnd)
+        if hwnd in self.windows:
+            width, height = self.screen_size()
+            self.windows[hwnd].minimized = False
+            self.windows[hwnd].rect = (0, 0, width, height)
+
+    def set_foreground(self, hwnd):
+        self.record('set_foreground', hwnd)
+        if hwnd in self.windows:
+            self._foreground = hwnd
+
+    def window_rect(self, hwnd):
+        window = self.windows.get(hwnd)
+        if window is None:
+            raise ValueError(f"无效的窗口句柄: {hwnd}")
+        if window.minimized:
+            # 与 Windows 一致：最小化窗口的坐标是 (-32000, -32000)
+            return (-32000, -32000, -32000 + 160, -32000 + 28)
+        return window.rect
+
+    def move_window(self, hwnd, left, top, width, height):
+        self.record('move_window', hwnd, left, top, width, height)
+        if hwnd in self.windows:
+            self.windows[hwnd].rect = (left, top, left + width, top + height)
+
+    # ==================== 屏幕 ====================
+
+    def screen_size(self):
+        size = getattr(self.screen, 'size', None)
+        return Size(*(size or self.screen.render().size))
+
+    def screenshot(self, region=None):
+        with self.lock:
+            image = self.screen.render()
+        if region is None:
+            return image.copy()
+        left, top, width, height = (int(value) for value in region)
+        return image.crop((left, top, left + width, top + height))
+
+    def grab(self, region=None, out=None):
+        with self.lock:
+            frame = np.asarray(self.screen.render())
+        if region is not None:
+            left, top, width, height = (int(value) for value in region)
+            frame = frame[top:top + height, left:left + width]
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            return out
+        return frame
+
+    def _haystack(self, image, region, grayscale):
+        """查找用的画面和模板（同为灰度或同为RGB）以及画面区域的偏移"""
+        offset = (int(region[0]), int(region[1])) if region else (0, 0)
+        template = np.asarray(_load_rgb(image))
+        if grayscale:
+            return self.grab_gray(region), _gray(template), offset
+        return self.grab(region)[:, :, :3], template, offset
+
+    def locate_on_screen(self, image, confidence=0.8, region=None, grayscale=False):
+        haystack, template, (offset_x, offset_y) = self._haystack(image, region, grayscale)
+        box = locate_in_image(haystack, template, confidence)
+        return Box(box.left + offset_x, box.top + offset_y, box.width, box.height) if box else None
+
+    def locate_all_on_screen(self, image, confidence=0.8, region=None, grayscale=False):
+        haystack, template, (offset_x, offset_y) = self._haystack(image, region, grayscale)
+        return [Box(box.left + offset_x, box.top + offset_y, box.width, box.height)
+                for box in locate_all_in_image(haystack, template, confidence)]
+
+    # ==================== 输入 ====================
+
+    def click(self, x=None, y=None, **kwargs):
+        self.record('click', x, y, **kwargs)
+
+    def press(self, key, **kwargs):
+        self.record('press', key, **kwargs)
+
+    def hotkey(self, *keys, **kwargs):
+        self.record('hotkey', *keys, **kwargs)
+
+    def typewrite(self, text, **kwargs):
+        self.record('typewrite', text, **kwargs)
+
+    # ==================== 剪贴板 ====================
+
+    def copy_to_clipboard(self, text):
+        self.clipboard = text
+        self.record('copy', text)
+
+
+# ==================== 全局后端 ====================
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_default_backend():
+    """根据环境变量和当前平台创建后端"""
+    choice = os.environ.get(BACKEND_ENV, "").strip().lower()
+    if not choice:
+        choice = "windows" if sys.platform == "win32" else "simulated"
+    if choice == "windows":
+        return WindowsBackend()
+    if choice == "simulated":
+        logger.info("🧪 使用模拟平台后端（不会操作真实窗口）")
+        return SimulatedBackend()
+    raise ValueError(f"未知的平台后端: {choice}（可选 windows / simulated）")
+
+
+def get_backend():
+    """获取当前平台后端，首次调用时创建默认后端"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_default_backend()
+        return _backend
+
+
+def set_backend(new_backend):
+    """替换当前平台后端（例如在测试或回放时注入 SimulatedBackend），返回旧后端"""
+    global _backend
+    with _backend_lock:
+        old, _backend = _backend, new_backend
+        return old
+
+
+# 启用耗时追踪时，通过代理的这些调用记录为区间：方法名 → 追踪类别
+TRACED_CALLS = {
+    'screenshot': 'capture', 'grab': 'capture', 'grab_gray': 'capture',
+    'locate_on_screen': 'template', 'locate_all_on_screen': 'template',
+    'restore_window': 'window', 'maximize_window': 'window', 'set_foreground': 'window', 'move_window': 'window',
+    'click': 'input', 'press': 'input', 'hotkey': 'input', 'typewrite': 'input', 'copy_to_clipboard': 'input',
+}
+
+
+def _timed_locate(locate):
+    """模板查找计入按图标统计的匹配耗时"""
+    def timed(image, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return locate(image, *args, **kwargs)
+        finally:
+            TEMPLATE_MATCH_LATENCY.observe(time.perf_counter() - start, asset=template_label(image))
+    return timed
+
+
+class _BackendProxy:
+    """转发到当前平台后端的代理，模块可以在导入时引用，调用时才解析具体后端"""
+
+    def __getattr__(self, name):
+        attribute = getattr(get_backend(), name)
+        if name in ('locate_on_screen', 'locate_all_on_screen'):
+            attribute = _timed_locate(attribute)
+        if tracer.enabled and name in TRACED_CALLS:
+            return tracer.wrap(attribute, name, TRACED_CALLS[name])
+        return attribute
+
+    def __repr__(self):
+        return f"<platform backend proxy: {get_backend().name}>"
+
+
+backend = _BackendProxy()
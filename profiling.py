@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能分析模块
+按需对单次操作（一次 pengyouquan_multi_dianzan_action、群发中的一个目标等）做 cProfile 和 tracemalloc 分析：
+1. 保存 .prof 文件，可用 snakeviz / pstats 查看函数级耗时
+2. 保存内存分配报告：操作前后 tracemalloc 快照的差异（按代码行排序）、峰值内存和耗时最多的函数
+
+"我的电脑上很慢" 时，可以开启后运行一次，把 profiles/ 目录下的文件附在问题里，代替日志截图。
+默认关闭；由 wechat_config.json 的 profile_settings 节点、GUI 设置页的开关或环境变量 WECHAT_PROFILE=1 开启。
+未开启时 profile() 只做一次属性判断。同一时间只分析一个操作，嵌套或并发的操作直接执行不分析。
+cProfile 只记录调用它的线程；操作中交给线程池、流水线线程执行的函数用 profiler.attach() 包装，
+分析期间在各自线程中单独记录，保存时合并到同一个 .prof 文件。
+
+用法：
+    with profiler.profile("群发_张三"):
+        ...
+
+    @profiled("pengyouquan_multi_dianzan_action")
+    def pengyouquan_multi_dianzan_action(...):
+        ...
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+
+from config_store import CONFIG_FILE, update_config
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_ENV = "WECHAT_PROFILE"
+DEFAULT_PROFILE_SETTINGS = {
+    "enabled": False,                 # 是否分析每个操作
+    "directory": "profiles",          # 输出目录（相对于配置文件所在目录）
+    "top_allocations": 30,            # 报告中列出的内存分配行数
+    "top_functions": 30,              # 报告中列出的累计耗时最多的函数数
+    "traceback_frames": 10,           # tracemalloc 记录的调用栈深度
+}
+
+
+def load_profile_settings(config_file=CONFIG_FILE):
+    """从配置文件读取性能分析设置，缺失项使用默认值"""
+    settings = dict(DEFAULT_PROFILE_SETTINGS)
+    try:
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            settings.update(config.get('profile_settings', {}))
+    except Exception as e:
+        logger.warning("⚠️ 读取性能分析设置失败，使用默认设置: %s", e)
+    return settings
+
+
+def _format_size(size):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class OperationProfiler:
+    """对单次操作执行 cProfile + tracemalloc 分析并保存报告"""
+
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self.settings = load_profile_settings(config_file)
+        self.enabled = bool(self.settings.get("enabled")) or bool(os.environ.get(PROFILE_ENV))
+        self._lock = threading.Lock()
+        self._session = None          # 分析中的操作：[(线程名, cProfile.Profile), ...]
+        self._local = threading.local()
+
+    def set_enabled(self, enabled, persist=True):
+        """开启或关闭分析（GUI 开关），persist=True 时写回配置文件
+
+        Args:
+            enabled: 是否开启
+            persist: 是否保存到 wechat_config.json 的 profile_settings 节点
+        """
+        self.enabled = bool(enabled)
+        self.settings["enabled"] = self.enabled
+        if not persist:
+            return
+        def apply(config):
+            config.setdefault('profile_settings', {})['enabled'] = self.enabled
+
+        try:
+            update_config(apply, self.config_file)
+        except Exception as e:
+            logger.warning("⚠️ 保存性能分析设置失败: %s", e)
+
+    def output_directory(self):
+        """报告目录：配置文件所在目录下的 profile_settings.directory"""
+        base = os.path.dirname(os.path.abspath(self.config_file))
+        return os.path.join(base, self.settings.get("directory", "profiles"))
+
+    def _start_session(self):
+        with self._lock:
+            if self._session is not None:
+                return None
+            self._session = []
+            return self._session
+
+    def _end_session(self):
+        with self._lock:
+            self._session = None
+
+    def attach(self, func):
+        """包装在其他线程中执行的函数：有操作正在分析时，在当前线程中单独记录这次调用"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            session = self._session
+            if session is None or getattr(self._local, "profiling", False):
+                return func(*args, **kwargs)
+            profile = cProfile.Profile()
+            self._local.profiling = True
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._local.profiling = False
+                with self._lock:
+                    session.append((threading.current_thread().name, profile))
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def profile(self, name):
+        """在 cProfile 和 tracemalloc 下执行 with 块，结束后保存报告
+
+        Args:
+            name: 操作名称，用于文件名和报告标题
+        """
+        if not self.enabled:
+            yield
+            return
+        session = self._start_session()
+        if session is None:
+            yield
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(int(self.settings.get("traceback_frames", 10)))
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        self._local.profiling = True
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._local.profiling = False
+            self._end_session()
+            with self._lock:
+                session.insert(0, (threading.current_thread().name, profile))
+            elapsed = time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            try:
+                self._save(name, session, before, after, elapsed, current, peak)
+            except Exception as e:
+                logger.warning("⚠️ 保存性能分析报告失败: %s", e)
+
+    def _save(self, name, session, before, after, elapsed, current, peak):
+        directory = self.output_directory()
+        os.makedirs(directory, exist_ok=True)
+        safe_name = re.sub(r'[^\w\-]+', '_', name).strip('_') or "operation"
+        stem = os.path.join(directory, f"{time.strftime('%Y%m%d_%H%M%S')}_{safe_name}")
+        prof_path = stem + ".prof"
+        report_path = stem + "_allocations.txt"
+        stats_text = io.StringIO()
+        stats = pstats.Stats(*[profile for _, profile in session], stream=stats_text)
+        stats.dump_stats(prof_path)
+
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+                  tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                  tracemalloc.Filter(False, "<unknown>"))
+        after = after.filter_traces(ignore)
+        before = before.filter_traces(ignore)
+        top_allocations = int(self.settings.get("top_allocations", 30))
+        differences = [stat for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0]
+
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(int(self.settings.get("top_functions", 30)))
+
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(f"操作: {name}\n")
+            f.write(f"耗时: {elapsed:.2f}s\n")
+            f.write(f"内存: 结束时 {_format_size(current)}，峰值 {_format_size(peak)}（仅统计 Python 分配）\n")
+            f.write(f"函数级耗时: {os.path.basename(prof_path)}（snakeviz 或 python -m pstats 打开）\n")
+            threads = sorted({thread for thread, _ in session})
+            f.write(f"记录的线程: {', '.join(threads)}\n\n")
+            f.write(f"新增内存分配最多的 {top_allocations} 行:\n")
+            for index, stat in enumerate(differences[:top_allocations], 1):
+                frame = stat.traceback[0]
+                f.write(f"{index:3d}. {frame.filename}:{frame.lineno}  "
+                        f"+{_format_size(stat.size_diff)}（{stat.count_diff:+d} 块）\n")
+            if differences:
+                f.write("\n新增分配最多的位置的调用栈:\n")
+                for line in differences[0].traceback.format():
+                    f.write(line + "\n")
+            f.write("\n累计耗时最多的函数:\n")
+            f.write(stats_text.getvalue())
+
+        logger.info("🔬 性能分析已保存: %s", prof_path)
+        logger.info("   内存分配报告: %s（耗时 %.2fs，峰值内存 %s）", report_path, elapsed, _format_size(peak))
+
+
+profiler = OperationProfiler()
+
+
+def profiled(name=None):
+    """函数装饰器：开启性能分析时，每次调用作为一个操作分析"""
+    def decorator(func):
+        operation = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.profile(operation):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
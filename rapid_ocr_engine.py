@@ -6,30 +6,76 @@ RapidOCR 核心引擎模块
 
 import os
 import sys
+import glob
+import hashlib
+import json
+import time
+import queue
+import threading
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional, Union
+from typing import List, Tuple, Optional, Union, Dict
+from contextlib import contextmanager
 import logging
 
+from config_store import CONFIG_FILE, get_app_path
+from metrics import OCR_LATENCY
+from tracing import tracer
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# OCR 配置（保存在 wechat_config.json 的 ocr_settings 节点中）
+DEFAULT_OCR_SETTINGS = {
+    "rec_int8": False,                                   # 是否启用INT8量化识别模型
+    "int8_model_path": "ocr_models/rec_int8.onnx",       # 量化模型保存位置
+    "int8_regression_corpus": "ocr_regression_corpus",   # 回归测试截图目录
+    "int8_min_accuracy": 0.98,                           # 昵称识别准确率下限
+    "session_pool_size": 2,                              # 推理会话池大小（可并发识别的数量）
+}
+
+def load_ocr_settings(config_file: str = CONFIG_FILE) -> Dict:
+    """从配置文件读取OCR设置，缺失项使用默认值
+
+    配置文件、量化模型和回归截图目录的相对路径都按程序目录解析，与启动时的工作目录无关。
+    """
+    settings = dict(DEFAULT_OCR_SETTINGS)
+    config_file = get_app_path(config_file)
+    try:
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            settings.update(config.get('ocr_settings', {}))
+    except Exception as e:
+        logger.warning(f"读取OCR配置失败，使用默认配置: {e}")
+    for key in ("int8_model_path", "int8_regression_corpus"):
+        settings[key] = get_app_path(settings[key])
+    return settings
+
 class RapidOCREngine:
     """RapidOCR 核心引擎类"""
     
-    def __init__(self):
-        """初始化 RapidOCR 引擎"""
+    def __init__(self, rec_model_path: Optional[str] = None):
+        """
+        初始化 RapidOCR 引擎
+        
+        Args:
+            rec_model_path: 自定义识别模型路径（如INT8量化模型），None表示使用默认FP32模型
+        """
         self.engine = None
         self.available = False
+        self.rec_model_path = rec_model_path
         self._init_engine()
     
     def _init_engine(self):
         """初始化 OCR 引擎"""
+        # 指定了识别模型时，通过参数覆盖默认配置
+        engine_kwargs = {"rec_model_path": self.rec_model_path} if self.rec_model_path else {}
         try:
             # 尝试导入 rapidocr
             from rapidocr_onnxruntime import RapidOCR
-            self.engine = RapidOCR()
+            self.engine = RapidOCR(**engine_kwargs)
             self.available = True
             logger.info("✅ RapidOCR 引擎初始化成功")
         except ImportError as e:
@@ -37,13 +83,21 @@ class RapidOCREngine:
             try:
                 # 备选方案：尝试导入 rapidocr
                 from rapidocr import RapidOCR
-                self.engine = RapidOCR()
+                try:
+                    self.engine = RapidOCR(**engine_kwargs)
+                except TypeError:
+                    # rapidocr 2.x 不接受 rec_model_path 参数，识别模型通过 params 指定
+                    self.engine = RapidOCR(params={"Rec.model_path": self.rec_model_path})
                 self.available = True
                 logger.info("✅ RapidOCR 引擎初始化成功 (备选导入)")
             except ImportError as e2:
                 logger.warning(f"❌ RapidOCR 未安装 (rapidocr): {e2}")
                 logger.warning("RapidOCR不可用，将使用基础模式")
                 self.available = False
+            except Exception as e2:
+                logger.error(f"❌ RapidOCR 引擎初始化失败 (备选导入): {e2}")
+                logger.warning("RapidOCR不可用，将使用基础模式")
+                self.available = False
         except Exception as e:
             logger.error(f"❌ RapidOCR 引擎初始化失败: {e}")
             logger.warning("RapidOCR不可用，将使用基础模式")
@@ -144,6 +198,39 @@ class RapidOCREngine:
         
         return matches
     
+    def recognize_crop(self, image: np.ndarray) -> Tuple[str, float]:
+        """
+        对已裁剪好的单行文字图像只做识别（跳过检测和方向分类）
+        
+        Args:
+            image: 单行文字截图的numpy数组
+            
+        Returns:
+            (文字, 置信度)，识别失败时返回 ("", 0.0)
+        """
+        if not self.is_available():
+            return "", 0.0
+        
+        try:
+            result = self.engine(image, use_det=False, use_cls=False, use_rec=True)
+            ocr_data = result[0] if isinstance(result, tuple) else result
+            if not ocr_data:
+                return "", 0.0
+            
+            item = ocr_data[0]
+            # 只识别模式返回 [文字, 置信度]，兼容带边界框的 [bbox, 文字, 置信度]
+            if len(item) >= 3:
+                text, confidence = item[1], item[2]
+            else:
+                text, confidence = item[0], item[1]
+            if isinstance(confidence, (list, tuple)):
+                confidence = confidence[0] if len(confidence) > 0 else 0.0
+            return str(text), float(confidence)
+            
+        except Exception as e:
+            logger.error(f"单行文字识别失败: {e}")
+            return "", 0.0
+    
     def recognize_with_color_filter(self, image: np.ndarray, target_color: Tuple[int, int, int],
                                    color_tolerance: int = 30) -> List[Tuple]:
         """
@@ -179,7 +266,7 @@ class RapidOCREngine:
             color_tolerance: 颜色容差
             
         Returns:
-            过滤后的图像
+            过滤后的单通道图像（白底黑字）
         """
         # 转换为RGB格式（如果需要）
         if len(image.shape) == 3 and image.shape[2] == 3:
@@ -195,21 +282,299 @@ class RapidOCREngine:
         # 创建掩码
         mask = cv2.inRange(image_rgb, lower_bound, upper_bound)
         
-        # 创建白色背景
-        result = np.ones_like(image_rgb) * 255
+        # 白色背景，匹配的像素为黑色（单通道即可，不需要扩展为三通道）
+        return cv2.bitwise_not(mask)
+
+
+def find_default_rec_model_path() -> Optional[str]:
+    """查找 rapidocr_onnxruntime 自带的FP32识别模型路径"""
+    try:
+        import rapidocr_onnxruntime
+        package_dir = os.path.dirname(rapidocr_onnxruntime.__file__)
+    except ImportError:
+        logger.warning("未安装 rapidocr_onnxruntime，无法定位识别模型")
+        return None
+    
+    candidates = sorted(glob.glob(os.path.join(package_dir, "models", "*rec*.onnx")))
+    if not candidates:
+        logger.warning(f"未在 {package_dir} 中找到识别模型")
+        return None
+    return candidates[0]
+
+def quantize_rec_model(fp32_model_path: str, int8_model_path: str) -> bool:
+    """
+    对识别模型做动态INT8量化（只量化权重，激活值在运行时量化）
+    
+    Args:
+        fp32_model_path: 原始FP32模型路径
+        int8_model_path: 量化后模型保存路径
+        
+    Returns:
+        是否量化成功
+    """
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError as e:
+        logger.error(f"❌ onnxruntime 量化工具不可用: {e}")
+        return False
+    
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(int8_model_path)), exist_ok=True)
+        quantize_dynamic(fp32_model_path, int8_model_path, weight_type=QuantType.QUInt8)
+        logger.info(f"✅ 识别模型已量化: {int8_model_path}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ 识别模型量化失败: {e}")
+        return False
+
+def load_regression_corpus(corpus_dir: str) -> List[Tuple[str, np.ndarray, Optional[str]]]:
+    """
+    加载回归测试截图（昵称、"昨天"、"联系人"、"群聊"等单行文字截图）
+    
+    目录中可放置 labels.json（{文件名: 正确文字}），没有标注的截图以FP32识别结果为准。
+    
+    Returns:
+        [(文件名, 图像数组, 标注文字或None), ...]
+    """
+    labels = {}
+    labels_file = os.path.join(corpus_dir, "labels.json")
+    if os.path.exists(labels_file):
+        with open(labels_file, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+    
+    from PIL import Image
+    corpus = []
+    for file_name in sorted(os.listdir(corpus_dir)):
+        if not file_name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+            continue
+        try:
+            # 使用PIL读取，兼容中文路径
+            image = np.array(Image.open(os.path.join(corpus_dir, file_name)).convert('RGB'))
+            corpus.append((file_name, image, labels.get(file_name)))
+        except Exception as e:
+            logger.warning(f"读取回归截图失败: {file_name}, 错误: {e}")
+    return corpus
+
+def run_int8_regression(fp32_engine: RapidOCREngine, int8_engine: RapidOCREngine,
+                        corpus_dir: str, min_accuracy: float = 0.98) -> Dict:
+    """
+    INT8识别模型回归测试：在截图样本上对比INT8与FP32的识别结果
+    
+    Args:
+        fp32_engine: 使用FP32识别模型的引擎
+        int8_engine: 使用INT8识别模型的引擎
+        corpus_dir: 回归截图目录
+        min_accuracy: 允许启用INT8模型的最低准确率
+        
+    Returns:
+        测试报告字典，passed 为 True 时才允许启用INT8模型
+    """
+    report = {
+        "total": 0,
+        "matched": 0,
+        "accuracy": 0.0,
+        "min_accuracy": min_accuracy,
+        "fp32_avg_ms": 0.0,
+        "int8_avg_ms": 0.0,
+        "mismatches": [],
+        "passed": False,
+    }
+    
+    if not os.path.isdir(corpus_dir):
+        logger.warning(f"回归截图目录不存在: {corpus_dir}")
+        return report
+    
+    corpus = load_regression_corpus(corpus_dir)
+    if not corpus:
+        logger.warning(f"回归截图目录为空: {corpus_dir}")
+        return report
+    
+    fp32_total = 0.0
+    int8_total = 0.0
+    for file_name, image, label in corpus:
+        start = time.perf_counter()
+        fp32_text, _ = fp32_engine.recognize_crop(image)
+        fp32_total += time.perf_counter() - start
         
-        # 将匹配的像素设为黑色
-        result[mask > 0] = [0, 0, 0]
+        start = time.perf_counter()
+        int8_text, _ = int8_engine.recognize_crop(image)
+        int8_total += time.perf_counter() - start
         
-        return result
+        expected = label if label is not None else fp32_text
+        if int8_text.strip() == expected.strip():
+            report["matched"] += 1
+        else:
+            report["mismatches"].append({"file": file_name, "expected": expected, "int8": int8_text})
+    
+    report["total"] = len(corpus)
+    report["accuracy"] = report["matched"] / report["total"]
+    report["fp32_avg_ms"] = fp32_total * 1000 / report["total"]
+    report["int8_avg_ms"] = int8_total * 1000 / report["total"]
+    report["passed"] = report["accuracy"] >= min_accuracy
+    
+    logger.info(f"INT8回归测试: 准确率 {report['accuracy']:.2%} (下限 {min_accuracy:.2%}), "
+                f"单张耗时 FP32 {report['fp32_avg_ms']:.1f}ms / INT8 {report['int8_avg_ms']:.1f}ms")
+    return report
+
+def _model_fingerprint(model_path: str) -> str:
+    """模型文件指纹（大小+修改时间），用于判断回归结果是否仍然有效"""
+    stat = os.stat(model_path)
+    return f"{stat.st_size}-{int(stat.st_mtime)}"
+
+def _corpus_fingerprint(corpus_dir: str) -> str:
+    """回归截图目录的内容哈希（文件名+文件内容，包括 labels.json），样本或标注变化时重新测试"""
+    digest = hashlib.sha1()
+    if os.path.isdir(corpus_dir):
+        for file_name in sorted(os.listdir(corpus_dir)):
+            file_path = os.path.join(corpus_dir, file_name)
+            if not os.path.isfile(file_path):
+                continue
+            digest.update(file_name.encode('utf-8'))
+            with open(file_path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def prepare_int8_rec_model(settings: Dict, fp32_engine: RapidOCREngine) -> Optional[str]:
+    """
+    准备INT8识别模型：必要时执行量化，并通过回归测试门禁
+    
+    回归结果缓存在量化模型旁的 .gate.json 文件中，模型、回归截图或阈值变化时重新测试。
+    
+    Returns:
+        通过门禁的INT8模型路径，未通过或无法验证时返回 None
+    """
+    fp32_model_path = find_default_rec_model_path()
+    if not fp32_model_path:
+        return None
+    
+    int8_model_path = get_app_path(settings["int8_model_path"])
+    corpus_dir = get_app_path(settings["int8_regression_corpus"])
+    if not os.path.exists(int8_model_path):
+        logger.info("🔧 首次启用INT8识别模型，正在量化...")
+        if not quantize_rec_model(fp32_model_path, int8_model_path):
+            return None
+    
+    min_accuracy = float(settings["int8_min_accuracy"])
+    fingerprint = (f"{_model_fingerprint(fp32_model_path)}/{_model_fingerprint(int8_model_path)}"
+                   f"/{_corpus_fingerprint(corpus_dir)}")
+    gate_file = int8_model_path + ".gate.json"
+    
+    # 复用上次的回归结果
+    try:
+        if os.path.exists(gate_file):
+            with open(gate_file, 'r', encoding='utf-8') as f:
+                gate = json.load(f)
+            if gate.get("fingerprint") == fingerprint and gate.get("min_accuracy") == min_accuracy:
+                return int8_model_path if gate.get("passed") else None
+    except Exception as e:
+        logger.warning(f"读取INT8回归结果失败，重新测试: {e}")
+    
+    int8_engine = RapidOCREngine(rec_model_path=int8_model_path)
+    if not int8_engine.is_available():
+        logger.error("❌ INT8识别模型加载失败")
+        return None
+    
+    report = run_int8_regression(fp32_engine, int8_engine, corpus_dir, min_accuracy)
+    if report["total"] == 0:
+        # 没有样本无法验证准确率，不缓存结果，补充样本后可再次测试
+        logger.warning("⚠️ 缺少回归截图样本，无法验证INT8模型，继续使用FP32模型")
+        return None
+    
+    try:
+        with open(gate_file, 'w', encoding='utf-8') as f:
+            json.dump(dict(report, fingerprint=fingerprint), f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        logger.warning(f"保存INT8回归结果失败: {e}")
+    
+    if not report["passed"]:
+        logger.warning(f"⚠️ INT8模型准确率 {report['accuracy']:.2%} 低于下限 {min_accuracy:.2%}，拒绝启用")
+        return None
+    return int8_model_path
 
 
 class EnhancedOCREngine:
-    """简化的OCR引擎，只使用RapidOCR"""
+    """简化的OCR引擎，只使用RapidOCR
+    
+    内部维护一个推理会话池：GUI线程和工作线程并发调用时，每次识别借出一个独立的
+    RapidOCREngine 会话，用完归还。会话按需创建，最多 session_pool_size 个，
+    会话全部借出时调用方阻塞等待，避免多个线程同时调用同一个会话。
+    """
     
-    def __init__(self):
-        """初始化OCR引擎"""
+    def __init__(self, settings: Optional[Dict] = None):
+        """
+        初始化OCR引擎
+        
+        Args:
+            settings: OCR设置，None表示从配置文件读取
+        """
+        self.settings = settings if settings is not None else load_ocr_settings()
+        self.rec_precision = "fp32"
         self.rapid_ocr = RapidOCREngine()
+        
+        if self.settings.get("rec_int8") and self.rapid_ocr.is_available():
+            self._enable_int8_rec_model()
+        
+        # 会话池：第一个会话即 rapid_ocr，其余按需创建
+        self.pool_size = max(1, int(self.settings.get("session_pool_size", 1)))
+        self._sessions = [self.rapid_ocr]
+        self._idle_sessions = queue.Queue()
+        self._idle_sessions.put(self.rapid_ocr)
+        self._pool_lock = threading.Lock()
+    
+    def _enable_int8_rec_model(self):
+        """尝试切换到INT8识别模型，回归测试未通过时保持FP32"""
+        try:
+            int8_model_path = prepare_int8_rec_model(self.settings, self.rapid_ocr)
+            if not int8_model_path:
+                return
+            int8_engine = RapidOCREngine(rec_model_path=int8_model_path)
+            if int8_engine.is_available():
+                self.rapid_ocr = int8_engine
+                self.rec_precision = "int8"
+                logger.info("✅ 已启用INT8量化识别模型")
+        except Exception as e:
+            logger.error(f"❌ 启用INT8识别模型失败，继续使用FP32模型: {e}")
+    
+    def checkout(self) -> RapidOCREngine:
+        """从会话池借出一个推理会话，没有空闲会话且未达上限时新建，否则阻塞等待"""
+        try:
+            return self._idle_sessions.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._pool_lock:
+            can_create = len(self._sessions) < self.pool_size
+            if can_create:
+                # 先占位，模型加载放在锁外进行
+                self._sessions.append(None)
+        
+        if can_create:
+            session = RapidOCREngine(rec_model_path=self.rapid_ocr.rec_model_path)
+            with self._pool_lock:
+                self._sessions[self._sessions.index(None)] = session
+            if session.is_available():
+                logger.info(f"✅ 新建OCR推理会话 ({len(self._sessions)}/{self.pool_size})")
+                return session
+            # 新会话不可用（内存不足等）：会话池缩小到已有会话数，之后不再尝试加载模型，退回到等待已有会话
+            with self._pool_lock:
+                self._sessions.remove(session)
+                self.pool_size = max(1, len(self._sessions))
+            logger.warning(f"⚠️ 新建OCR推理会话失败，会话池大小降为 {self.pool_size}")
+        
+        return self._idle_sessions.get()
+    
+    def checkin(self, session: RapidOCREngine):
+        """归还推理会话"""
+        self._idle_sessions.put(session)
+    
+    @contextmanager
+    def session(self):
+        """借出推理会话的上下文管理器，退出时自动归还"""
+        session = self.checkout()
+        try:
+            yield session
+        finally:
+            self.checkin(session)
     
     def is_available(self) -> bool:
         """检查RapidOCR是否可用"""
@@ -222,23 +587,43 @@ class EnhancedOCREngine:
         else:
             return "None"
     
-    def recognize_text(self, image: Union[str, np.ndarray], method: str = "rapid") -> List[Tuple]:
+    def recognize_text(self, image: Union[str, np.ndarray], method: str = "rapid",
+                       site: str = "unknown") -> List[Tuple]:
         """
-        文字识别（只使用RapidOCR）
+        文字识别（只使用RapidOCR），线程安全
         
         Args:
             image: 图像路径或numpy数组
             method: 识别方法（只支持"rapid"）
+            site: 调用位置，作为OCR耗时指标的 site 标签
             
         Returns:
             识别结果列表
         """
         if self.rapid_ocr.is_available():
-            return self.rapid_ocr.recognize_image(image)
+            start = time.perf_counter()
+            try:
+                with tracer.span("ocr.recognize_text", "ocr", shape=getattr(image, 'shape', None)):
+                    with self.session() as session:
+                        return session.recognize_image(image)
+            finally:
+                OCR_LATENCY.observe(time.perf_counter() - start, site=site)
         else:
             logger.error("RapidOCR引擎不可用")
             return []
     
+    def recognize_crop(self, image: np.ndarray, site: str = "unknown") -> Tuple[str, float]:
+        """单行文字识别（跳过检测），线程安全；site 为OCR耗时指标的调用位置标签"""
+        if not self.rapid_ocr.is_available():
+            return "", 0.0
+        start = time.perf_counter()
+        try:
+            with tracer.span("ocr.recognize_crop", "ocr", shape=getattr(image, 'shape', None)):
+                with self.session() as session:
+                    return session.recognize_crop(image)
+        finally:
+            OCR_LATENCY.observe(time.perf_counter() - start, site=site)
+    
     def find_text_position(self, image: Union[str, np.ndarray], target_text: str,
                           target_color: Optional[Tuple[int, int, int]] = None,
                           confidence_threshold: float = 0.7) -> Optional[Tuple[int, int]]:
@@ -262,9 +647,10 @@ class EnhancedOCREngine:
                 else:
                     image_array = image
                 
-                matches = self.rapid_ocr.recognize_with_color_filter(
-                    image_array, target_color, color_tolerance=30
-                )
+                with self.session() as session:
+                    matches = session.recognize_with_color_filter(
+                        image_array, target_color, color_tolerance=30
+                    )
                 
                 for bbox, text, confidence in matches:
                     if confidence >= confidence_threshold and target_text in text:
@@ -274,7 +660,7 @@ class EnhancedOCREngine:
                         return (center_x, center_y)
             
             # 普通识别
-            results = self.recognize_text(image)
+            results = self.recognize_text(image, site="find_text_position")
             for bbox, text, confidence in results:
                 if confidence >= confidence_threshold and target_text in text:
                     # 计算中心点
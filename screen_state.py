@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面状态识别模块
+不做OCR，在几毫秒内判断微信当前处于哪个界面，供流程跳过多余的操作（搜索框已打开时不再按 Ctrl+F）、
+在操作没有生效时及时发现（点击搜索结果后仍停留在搜索界面）：
+1. 窗口：前台窗口标题区分主窗口和朋友圈窗口，微信不在前台时为 unknown
+2. 降采样画面：截取前台窗口后缩小一半，派生一次灰度平面（perception.Frame）
+3. 布局特征（主窗口）：搜索框底色变白表示搜索已打开，框内有文字表示正在显示搜索结果，
+   聊天区域标题栏有文字表示已打开聊天
+4. 颜色直方图 + 模板探测（朋友圈窗口）：直方图中点赞弹出界面的深灰底色、评论框发送按钮的绿色
+   占比足够时，只在降采样画面中该颜色所在的小区域内按原始分辨率匹配 赞/取消/评论 或发送图标确认
+
+主窗口布局按 100% 缩放时的像素给出，识别时按左侧深色侧边栏的实际宽度换算缩放比例（125%/150% 等DPI缩放），
+找不到侧边栏或画面不是浅色主题（例如深色模式）时返回 unknown。
+跳过操作只依据有把握的结果（ScreenState.confident）：搜索框打开的判断要求框内几乎全白、没有文字、
+与上方背景有明显区别且缩放比例对得上标准DPI档位；判断错误时多按一次 Ctrl+F 无害，错误地跳过却会
+把搜索内容粘贴到聊天输入框中。调用方在 unknown 或没有把握时按原流程执行。
+
+用法：
+    state = screen_state.classify()
+    if state.state == SEARCH_OPEN:
+        ...
+"""
+
+import time
+
+import numpy as np
+import cv2
+
+from metrics import SCREEN_STATE_LATENCY
+from frame_analysis import to_gray
+from perception import Frame
+from platform_backend import backend
+from tracing import traced
+from ui_locator import locator
+from ui_wait import clamp_region
+
+# 界面状态
+MAIN = "main"                        # 主窗口，未打开聊天
+SEARCH_OPEN = "search_open"          # 搜索框已打开（尚未输入）
+SEARCH_RESULTS = "search_results"    # 搜索框中有内容，显示搜索结果
+CHAT_OPEN = "chat_open"              # 已打开聊天
+MOMENTS_FEED = "moments_feed"        # 朋友圈动态列表
+LIKE_POPUP = "like_popup"            # 点赞弹出界面（赞/取消、评论）
+COMMENT_BOX = "comment_box"          # 评论输入框
+UNKNOWN = "unknown"                  # 微信不在前台或无法判断
+
+SEARCH_STATES = (SEARCH_OPEN, SEARCH_RESULTS)
+MOMENTS_STATES = (MOMENTS_FEED, LIKE_POPUP, COMMENT_BOX)
+
+# 默认参数
+DOWNSAMPLE = 0.5                     # 识别用画面的缩放比例
+INK_LEVEL = 160                      # 灰度低于该值视为文字笔画
+WHITE_LEVEL = 250                    # 灰度不低于该值视为白色
+LIGHT_THEME_LEVEL = 200              # 会话列表平均灰度低于该值视为非浅色主题
+MIN_INK_RATIO = 0.01                 # 区域内文字笔画占比达到该值视为有文字
+DARK_LEVEL = 80                      # 侧边栏列平均灰度低于该值视为深色
+SIDEBAR_WIDTH = 60                   # 100% 缩放时侧边栏的宽度（像素）
+DPI_STEPS = (1.0, 1.25, 1.5, 1.75, 2.0, 2.5, 3.0)  # Windows 的标准缩放档位
+DPI_SNAP = 0.06                      # 测得的缩放比例与标准档位相差不超过该值时取该档位
+MIN_SEARCH_WHITE = 0.6               # 搜索框内白色像素占比达到该值视为已打开（有文字时）
+CONFIDENT_SEARCH_WHITE = 0.95        # 空搜索框"有把握"所需的白色像素占比
+MIN_SEARCH_CONTRAST = 4              # 搜索框与上方背景的最小灰度差
+PROBE_CONFIDENCE = 0.8               # 模板探测的匹配阈值
+
+# 主窗口布局（100% 缩放时的窗口坐标，像素）：搜索框、搜索框上方背景、会话列表、聊天标题栏
+MAIN_LAYOUT = {
+    "search_box": (76, 26, 294, 46),
+    "search_above": (76, 6, 294, 16),
+    "list": (60, 60, 310, None),
+    "chat_title": (320, 8, None, 52),
+}
+
+# 朋友圈窗口：颜色直方图特征 (颜色, 最低占比) 和模板探测
+POPUP_COLOR = (76, 76, 76)           # 点赞弹出界面底色 #4c4c4c
+SEND_COLOR = (7, 193, 96)            # 发送按钮绿色 #07c160
+MIN_POPUP_RATIO = 0.004
+MIN_SEND_RATIO = 0.0008
+COLOR_TOLERANCE = 12
+PROBE_KERNEL = np.ones((3, 3), np.uint8)  # 探测前腐蚀颜色掩码，去掉文字边缘的零散像素
+PROBE_MARGIN = 8                     # 探测区域在颜色外接框四周扩展的像素数
+PROBES = {
+    LIKE_POPUP: ("nozan.png", "yizan.png", "pinglun.png"),
+    COMMENT_BOX: ("fasong.png",),
+}
+HISTOGRAM_BINS = 8
+
+
+class ScreenState:
+    """一次识别的结果
+
+    Attributes:
+        state: 界面状态（见模块常量）
+        window: 前台窗口（"main" / "moments"），微信不在前台时为None
+        confident: 各特征是否都明确支持该状态；只有为True时才可以据此跳过操作
+        elapsed: 识别耗时（秒）
+        cues: 判断依据（各特征的取值），用于调试日志
+    """
+
+    def __init__(self, state, window=None, confident=False, elapsed=0.0, cues=None):
+        self.state = state
+        self.window = window
+        self.confident = confident and state != UNKNOWN
+        self.elapsed = elapsed
+        self.cues = cues or {}
+
+    def __repr__(self):
+        return (f"ScreenState('{self.state}', window={self.window}, confident={self.confident}, "
+                f"elapsed={self.elapsed * 1000:.1f}ms)")
+
+
+def color_histogram(image, bins=HISTOGRAM_BINS):
+    """RGB画面的归一化三维颜色直方图（每个通道 bins 个区间）"""
+    hist = cv2.calcHist([np.ascontiguousarray(image[:, :, :3])], [0, 1, 2], None,
+                        [bins] * 3, [0, 256] * 3)
+    total = hist.sum()
+    return hist / total if total else hist
+
+
+def _histogram_ratio(hist, color_rgb):
+    """颜色所在直方图区间的像素占比"""
+    bins = hist.shape[0]
+    index = tuple(min(bins - 1, int(c) * bins // 256) for c in color_rgb)
+    return float(hist[index])
+
+
+def _scaled_region(region, shape, scale=1.0):
+    """把 100% 缩放时窗口坐标的 (left, top, right, bottom)（None表示到边缘）换算为降采样画面中的切片范围"""
+    height, width = shape[:2]
+    factor = DOWNSAMPLE * scale
+    left, top, right, bottom = region
+    right = width if right is None else min(width, int(right * factor))
+    bottom = height if bottom is None else min(height, int(bottom * factor))
+    return int(left * factor), int(top * factor), right, bottom
+
+
+def _crop(gray, region, scale=1.0):
+    left, top, right, bottom = _scaled_region(region, gray.shape, scale)
+    return gray[top:bottom, left:right]
+
+
+def measure_layout_scale(gray):
+    """按左侧深色侧边栏的宽度估计主窗口的缩放比例
+
+    Args:
+        gray: 降采样后的主窗口灰度画面
+
+    Returns:
+        (缩放比例, 是否对得上标准DPI档位)，找不到侧边栏时返回 (None, False)
+    """
+    height = gray.shape[0]
+    columns = gray[int(height * 0.4):int(height * 0.6) + 1].mean(axis=0)
+    light = np.flatnonzero(columns >= DARK_LEVEL)
+    dark_columns = int(light[0]) if light.size else columns.size
+    if dark_columns < 2 or dark_columns >= columns.size:
+        return None, False
+    scale = dark_columns / DOWNSAMPLE / SIDEBAR_WIDTH
+    step = min(DPI_STEPS, key=lambda candidate: abs(candidate - scale))
+    if abs(step - scale) <= DPI_SNAP:
+        return step, True
+    return scale, False
+
+
+def _ink_ratio(area):
+    return float(np.count_nonzero(area < INK_LEVEL)) / area.size if area.size else 0.0
+
+
+class ScreenStateClassifier:
+    """降采样画面 + 布局/颜色/模板特征的界面状态识别"""
+
+    def __init__(self):
+        self._templates = {}
+        self.last = ScreenState(UNKNOWN)
+
+    def clear_templates(self):
+        """丢弃缓存的探测模板（图标目录改变后调用）"""
+        self._templates.clear()
+
+    def _foreground(self):
+        """前台微信窗口 ("main"/"moments", 区域)，微信不在前台时返回 (None, None)"""
+        hwnd = backend.foreground_window()
+        if not hwnd:
+            return None, None
+        title = backend.window_title(hwnd) or ""
+        if "朋友圈" in title:
+            window = "moments"
+        elif "微信" in title or "wechat" in (backend.window_process_name(hwnd) or "").lower():
+            window = "main"
+        else:
+            return None, None
+        left, top, right, bottom = backend.window_rect(hwnd)
+        region = clamp_region(left, top, right - left, bottom - top)
+        return (window, region) if region else (None, None)
+
+    def _probe_template(self, asset):
+        """灰度模板（带缓存），图标不可用时返回None"""
+        if asset not in self._templates:
+            image = locator.asset_loader(asset) if locator.asset_loader else None
+            self._templates[asset] = to_gray(image) if image is not None else None
+        return self._templates[asset]
+
+    def _probe(self, image, frame, color, assets):
+        """在降采样画面中颜色所在的区域内，按原始分辨率匹配模板，找到任一模板时返回True"""
+        mask = cv2.erode(frame.mask(color, COLOR_TOLERANCE), PROBE_KERNEL)
+        if not cv2.countNonZero(mask):
+            return False
+        x, y, width, height = cv2.boundingRect(mask)
+        left, top = max(0, int(x / DOWNSAMPLE) - PROBE_MARGIN), max(0, int(y / DOWNSAMPLE) - PROBE_MARGIN)
+        right = min(image.shape[1], int((x + width) / DOWNSAMPLE) + PROBE_MARGIN)
+        bottom = min(image.shape[0], int((y + height) / DOWNSAMPLE) + PROBE_MARGIN)
+        area = to_gray(image[top:bottom, left:right])
+        for asset in assets:
+            template = self._probe_template(asset)
+            if template is None or area.shape[0] < template.shape[0] or area.shape[1] < template.shape[1]:
+                continue
+            _, score, _, _ = cv2.minMaxLoc(cv2.matchTemplate(area, template, cv2.TM_CCOEFF_NORMED))
+            if score >= PROBE_CONFIDENCE:
+                return True
+        return False
+
+    def _classify_main(self, frame, cues):
+        """主窗口状态，返回 (状态, 是否有把握)"""
+        gray = frame.gray
+        scale, standard_scale = measure_layout_scale(gray)
+        cues["scale"] = None if scale is None else round(scale, 2)
+        if scale is None:
+            return UNKNOWN, False
+        list_level = float(_crop(gray, MAIN_LAYOUT["list"], scale).mean())
+        cues["list_level"] = round(list_level, 1)
+        if list_level < LIGHT_THEME_LEVEL:
+            return UNKNOWN, False
+
+        search_box = _crop(gray, MAIN_LAYOUT["search_box"], scale)
+        above = _crop(gray, MAIN_LAYOUT["search_above"], scale)
+        if not search_box.size or not above.size:
+            return UNKNOWN, False
+        search_white = float(np.count_nonzero(search_box >= WHITE_LEVEL)) / search_box.size
+        # 框内文字会拉低平均值，对比两处的背景灰度
+        search_contrast = float(np.percentile(search_box, 75)) - float(np.median(above))
+        search_ink = _ink_ratio(search_box)
+        chat_ink = _ink_ratio(_crop(gray, MAIN_LAYOUT["chat_title"], scale))
+        cues.update(search_white=round(search_white, 3), search_contrast=round(search_contrast, 1),
+                    search_ink=round(search_ink, 4), chat_ink=round(chat_ink, 4))
+
+        search_white_enough = search_white >= MIN_SEARCH_WHITE
+        if search_white_enough and search_contrast >= MIN_SEARCH_CONTRAST:
+            if search_ink >= MIN_INK_RATIO:
+                return SEARCH_RESULTS, standard_scale
+            confident = standard_scale and search_white >= CONFIDENT_SEARCH_WHITE and search_ink == 0
+            return SEARCH_OPEN, confident
+        # 搜索框位置是白色但与背景分不开时，无法确定搜索框是否打开
+        state = CHAT_OPEN if chat_ink >= MIN_INK_RATIO else MAIN
+        return state, standard_scale and not search_white_enough
+
+    def _classify_moments(self, image, frame, cues):
+        """朋友圈窗口状态，返回 (状态, 是否有把握)"""
+        hist = color_histogram(frame.rgb)
+        popup_ratio = _histogram_ratio(hist, POPUP_COLOR)
+        send_ratio = _histogram_ratio(hist, SEND_COLOR)
+        cues.update(popup_ratio=round(popup_ratio, 4), send_ratio=round(send_ratio, 4))
+
+        # 颜色特征先筛选，模板探测确认；图标不可用时只按颜色判断（没有把握）
+        for state, color, ratio, minimum in ((COMMENT_BOX, SEND_COLOR, send_ratio, MIN_SEND_RATIO),
+                                             (LIKE_POPUP, POPUP_COLOR, popup_ratio, MIN_POPUP_RATIO)):
+            if ratio < minimum:
+                continue
+            assets = PROBES[state]
+            templates_available = any(self._probe_template(asset) is not None for asset in assets)
+            if not templates_available or self._probe(image, frame, color, assets):
+                cues["probe"] = state
+                return state, templates_available
+        return MOMENTS_FEED, True
+
+    @traced("classify_screen", "perception")
+    def classify(self):
+        """识别当前界面状态
+
+        Returns:
+            ScreenState，微信不在前台、截图失败或无法判断时 state 为 UNKNOWN；
+            confident 为False时调用方不应据此跳过操作
+        """
+        start = time.perf_counter()
+        cues = {}
+        window = None
+        confident = False
+        try:
+            window, region = self._foreground()
+            if window is None:
+                state = UNKNOWN
+            else:
+                image = backend.grab(region=region)
+                small = cv2.resize(image[:, :, :3], None, fx=DOWNSAMPLE, fy=DOWNSAMPLE, interpolation=cv2.INTER_AREA)
+                with Frame(small, region) as frame:
+                    if window == "moments":
+                        state, confident = self._classify_moments(image, frame, cues)
+                    else:
+                        state, confident = self._classify_main(frame, cues)
+        except Exception as e:
+            cues["error"] = str(e)
+            state = UNKNOWN
+        elapsed = time.perf_counter() - start
+        SCREEN_STATE_LATENCY.observe(elapsed, state=state)
+        self.last = ScreenState(state, window, confident, elapsed, cues)
+        return self.last
+
+
+screen_state = ScreenStateClassifier()
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# 模块都在仓库根目录下（扁平结构），测试直接按模块名导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    """接入核心引擎的微信界面模拟器（测试结束后恢复平台后端和OCR引擎）"""
+    from platform_backend import set_backend
+    from timing_profile import set_timing_profile
+    from wechat_simulator import WeChatSimulator, default_posts, install
+    import wechat_core_engine as engine
+
+    previous_backend, previous_profile = set_backend(None), set_timing_profile(None)
+    monkeypatch.setattr(engine, "ocr_engine", engine.ocr_engine)
+    monkeypatch.setattr(engine, "RAPID_OCR_AVAILABLE", engine.RAPID_OCR_AVAILABLE)
+    simulator = WeChatSimulator(posts=default_posts(["Alice Wang", "Bob Li"]), groups=["Project Team"])
+    install(simulator)
+    yield simulator
+    set_backend(previous_backend)
+    set_timing_profile(previous_profile)
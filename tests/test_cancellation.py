@@ -0,0 +1,62 @@
+"""取消令牌：等待立即返回，回调只执行一次，注销的回调不再执行"""
+
+import threading
+import time
+
+import cancellation
+from cancellation import CancellationToken
+
+
+def test_token_acts_as_stop_flag():
+    token = CancellationToken()
+    assert not token() and not token.cancelled
+    token.cancel()
+    assert token() and token.cancelled
+
+
+def test_callbacks_run_once():
+    token = CancellationToken()
+    calls = []
+    token.add_callback(lambda: calls.append("a"))
+    token.cancel()
+    token.cancel()
+    assert calls == ["a"]
+
+    # 已取消的令牌上注册回调立即执行
+    token.add_callback(lambda: calls.append("b"))
+    assert calls == ["a", "b"]
+
+
+def test_removed_callback_is_not_called():
+    token = CancellationToken()
+    calls = []
+    callback = lambda: calls.append(1)
+    token.add_callback(callback)
+    token.remove_callback(callback)
+    token.remove_callback(callback)
+    token.cancel()
+    assert calls == []
+
+
+def test_failing_callback_does_not_block_others():
+    token = CancellationToken()
+    calls = []
+    token.add_callback(lambda: 1 / 0)
+    token.add_callback(lambda: calls.append(1))
+    token.cancel()
+    assert calls == [1]
+
+
+def test_sleep_returns_as_soon_as_cancelled():
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel).start()
+    start = time.perf_counter()
+    assert cancellation.sleep(5, token) is True
+    assert time.perf_counter() - start < 1
+
+
+def test_sleep_without_cancellation():
+    assert cancellation.sleep(0.01, CancellationToken()) is False
+    assert cancellation.sleep(0.01) is False
+    assert cancellation.sleep(0.01, lambda: False) is False
+    assert cancellation.sleep(5, lambda: True) is True
@@ -0,0 +1,51 @@
+"""配置写入：并发 update_config 不丢失其他模块的节点，写入是原子的"""
+
+import json
+import os
+import threading
+
+from config_store import get_app_path, read_config, update_config
+
+
+def test_concurrent_updates_keep_every_key(tmp_path):
+    config_file = str(tmp_path / "wechat_config.json")
+    start = threading.Barrier(8)
+
+    def writer(index):
+        start.wait()
+        for round_index in range(20):
+            update_config(lambda config: config.update({f"writer_{index}": round_index}), config_file)
+
+    threads = [threading.Thread(target=writer, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(config_file, encoding='utf-8') as f:
+        config = json.load(f)
+    assert config == {f"writer_{index}": 19 for index in range(8)}
+    assert os.listdir(tmp_path) == ["wechat_config.json"]
+
+
+def test_update_returning_false_skips_write(tmp_path):
+    config_file = str(tmp_path / "wechat_config.json")
+    update_config(lambda config: config.update({"last_input": "Alice"}), config_file)
+    modified = os.path.getmtime(config_file)
+
+    def abort(config):
+        config["last_input"] = "Bob"
+        return False
+
+    assert update_config(abort, config_file)["last_input"] == "Bob"
+    assert read_config(config_file) == {"last_input": "Alice"}
+    assert os.path.getmtime(config_file) == modified
+
+
+def test_missing_file_reads_empty(tmp_path):
+    assert read_config(str(tmp_path / "missing.json")) == {}
+
+
+def test_app_path_is_absolute():
+    assert os.path.isabs(get_app_path("wechat_config.json"))
+    assert get_app_path(os.path.abspath("x.json")) == os.path.abspath("x.json")
@@ -0,0 +1,72 @@
+"""滚动偏移估计：用合成画面检查向下/向上滚动和固定标题栏的确认"""
+
+import numpy as np
+import pytest
+
+from frame_analysis import ScrollOffsetEstimator, estimate_scroll_offset
+
+HEIGHT = 600
+HEADER = 40
+
+
+@pytest.fixture(scope="module")
+def feed():
+    """随机灰度行组成的长画面（每行内容不同，列方向有渐变）"""
+    rng = np.random.default_rng(1)
+    rows = rng.integers(0, 255, (3000, 1), dtype=np.uint8).repeat(200, axis=1)
+    return (rows.astype(np.int32) + np.arange(200)).clip(0, 255).astype(np.uint8)
+
+
+def window(feed, position, header=HEADER):
+    """从 position 开始的一屏画面，顶部 header 行是固定标题栏"""
+    frame = feed[position:position + HEIGHT].copy()
+    frame[:header] = 200
+    return frame
+
+
+@pytest.mark.parametrize("prev, curr", [(100, 160), (160, 100), (300, 520), (520, 300)])
+def test_offset_both_directions(feed, prev, curr):
+    result = estimate_scroll_offset(window(feed, prev), window(feed, curr))
+    assert result.moved and result.reliable
+    assert result.offset == curr - prev
+    if result.offset > 0:
+        assert result.new_rows == (HEIGHT - result.offset, HEIGHT)
+    else:
+        assert result.new_rows == (0, -result.offset)
+
+
+def test_still_frames(feed):
+    result = estimate_scroll_offset(window(feed, 100), window(feed, 100))
+    assert not result.moved
+
+
+def test_offset_beyond_overlap_is_unreliable(feed):
+    result = estimate_scroll_offset(window(feed, 500), window(feed, 900))
+    assert result.moved and not result.reliable
+    assert result.new_rows == (0, HEIGHT)
+
+
+def test_margins_confirmed_across_two_pairs(feed):
+    estimator = ScrollOffsetEstimator()
+    assert estimator.update(window(feed, 0)) is None
+    estimator.update(window(feed, 120))
+    # 只有一对画面中相同的行可能只是空白行，不裁剪
+    assert estimator.margins is None
+    estimator.update(window(feed, 240))
+    assert estimator.margins == (HEADER, 0)
+
+    # 向上滚动：新露出的区域在固定标题栏下方
+    result = estimator.update(window(feed, 180))
+    assert result.offset == -60
+    assert result.content_rows == (HEADER, HEIGHT)
+    assert result.new_rows == (HEADER, HEADER + 60)
+
+
+def test_margins_reset_when_frame_size_changes(feed):
+    estimator = ScrollOffsetEstimator()
+    for position in (0, 120, 240):
+        estimator.update(window(feed, position))
+    assert estimator.margins == (HEADER, 0)
+    result = estimator.update(feed[0:400].copy())
+    assert not result.reliable
+    assert estimator.margins is None
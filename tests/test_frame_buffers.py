@@ -0,0 +1,61 @@
+"""画面缓冲池：归还的数组被复用，占用统计与借出/归还一致"""
+
+import numpy as np
+
+from frame_buffers import FrameBufferPool
+
+
+def test_released_array_is_reused():
+    pool = FrameBufferPool()
+    array = pool.acquire((60, 80))
+    assert array.shape == (60, 80) and array.dtype == np.uint8
+    pool.release(array)
+    assert pool.acquire((60, 80)) is array
+    # 形状或类型不同时分配新数组
+    assert pool.acquire((60, 80, 3)) is not array
+    assert pool.acquire((60, 80), dtype=np.float32).dtype == np.float32
+
+
+def test_stats_track_leases():
+    pool = FrameBufferPool()
+    first = pool.acquire((10, 10))
+    second = pool.acquire((10, 10))
+    stats = pool.stats()
+    assert stats["leased"] == 2 and stats["in_use_bytes"] == 200
+    pool.release(first, second, None)
+    stats = pool.stats()
+    assert stats["leased"] == 0 and stats["in_use_bytes"] == 0
+    assert stats["pooled_bytes"] == 200 and stats["high_water_bytes"] == 200
+
+
+def test_foreign_and_double_release_ignored():
+    pool = FrameBufferPool()
+    array = pool.acquire((10, 10))
+    pool.release(np.empty((10, 10), dtype=np.uint8))
+    assert pool.stats()["leased"] == 1
+    pool.release(array)
+    pool.release(array)
+    assert pool.stats()["pooled_bytes"] == 100
+
+
+def test_free_list_limits():
+    pool = FrameBufferPool(max_free_per_shape=2)
+    arrays = [pool.acquire((10, 10)) for _ in range(4)]
+    pool.release(*arrays)
+    assert pool.stats()["pooled_bytes"] == 200
+
+    pool = FrameBufferPool(max_pooled_bytes=120)
+    old, new = pool.acquire((10, 10)), pool.acquire((5, 10))
+    pool.release(old)
+    pool.release(new)
+    # 超出总字节数上限时先丢弃最久未使用的形状
+    assert pool.stats()["pooled_bytes"] == 50
+    assert pool.acquire((5, 10)) is new
+
+
+def test_lease_returns_array_on_exit():
+    pool = FrameBufferPool()
+    with pool.lease((20, 20)) as array:
+        assert pool.stats()["leased"] == 1
+    assert pool.stats()["leased"] == 0
+    assert pool.acquire((20, 20)) is array
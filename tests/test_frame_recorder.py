@@ -0,0 +1,75 @@
+"""画面录制与回放：画面去重分块保存后可原样读回，回放同名感知阶段可以发现决策变化"""
+
+import numpy as np
+
+import frame_recorder
+from frame_recorder import FrameArchive, FrameRecorder, recorded_stage, replay
+
+
+@recorded_stage(name="test_brightest_row")
+def brightest_row(frame, threshold=100):
+    rows = np.nonzero(frame.mean(axis=1) > threshold)[0]
+    return int(rows[0]) if len(rows) else None
+
+
+def gradient(offset):
+    return (np.arange(40 * 30, dtype=np.uint32).reshape(40, 30) * 7 + offset).astype(np.uint8)
+
+
+def test_frames_round_trip_across_chunks(tmp_path):
+    recorder = FrameRecorder(str(tmp_path), chunk_size=2)
+    frames = [gradient(offset) for offset in (0, 1, 2)]
+    ids = [recorder.add_capture(frame, region=(0, 0, 30, 40)) for frame in frames]
+    # 内容相同的画面只保存一次
+    assert recorder.add_frame(frames[0].copy()) == ids[0]
+    recorder.add_action("click", (10, np.int64(20)), {"button": "left"})
+    recorder.close()
+
+    archive = FrameArchive(str(tmp_path))
+    assert len({info["chunk"] for info in archive.frames.values()}) == 2
+    for frame_id, frame in zip(ids, frames):
+        np.testing.assert_array_equal(archive.frame(frame_id), frame)
+    assert [capture["region"] for capture in archive.captures] == [[0, 0, 30, 40]] * 3
+    assert archive.actions[0]["args"] == [10, 20]
+
+
+def test_recorded_stage_replays_without_diffs(tmp_path, simulator):
+    import wechat_core_engine as engine
+    from input_scheduler import input_scheduler
+    from platform_backend import backend
+
+    frame_recorder.start_recording(str(tmp_path))
+    try:
+        for offset in range(3):
+            frame = np.zeros((20, 10), np.uint8)
+            frame[5 + offset:] = 200
+            brightest_row(frame)
+        backend.grab(region=engine.get_wechat_window_rect())
+        input_scheduler.click(300, 300, post_delay=0)
+    finally:
+        assert frame_recorder.stop_recording() == str(tmp_path)
+
+    archive = FrameArchive(str(tmp_path))
+    assert [stage["result"] for stage in archive.stages if stage["stage"] == "test_brightest_row"] == [5, 6, 7]
+    assert len(archive.captures) == 1
+    assert any(action["action"] == "click" for action in archive.actions)
+
+    report = replay(str(tmp_path), stages=["test_brightest_row"])
+    stats = report["stages"]["test_brightest_row"]
+    assert stats["count"] == 3 and stats["diffs"] == []
+
+
+def test_replay_reports_changed_decisions(tmp_path, simulator, monkeypatch):
+    frame_recorder.start_recording(str(tmp_path))
+    try:
+        frame = np.zeros((20, 10), np.uint8)
+        frame[8:] = 150
+        brightest_row(frame)
+    finally:
+        frame_recorder.stop_recording()
+
+    # 改变阈值后同一画面的决策不同
+    monkeypatch.setitem(frame_recorder.STAGES, "test_brightest_row",
+                        lambda frame, threshold=100: brightest_row.__wrapped__(frame, threshold=180))
+    diffs = replay(str(tmp_path), stages=["test_brightest_row"])["stages"]["test_brightest_row"]["diffs"]
+    assert [(diff["recorded"], diff["replayed"]) for diff in diffs] == [(8, None)]
@@ -0,0 +1,64 @@
+"""输入动作调度：默认只保留很短的动作后等待，等待可被操作的停止令牌打断"""
+
+import time
+
+from cancellation import CancellationToken
+from input_scheduler import KEY_GAP, ActionScheduler, input_scheduler
+
+
+def test_operation_accounts_actions_and_delays(simulator):
+    scheduler = ActionScheduler()
+    with scheduler.operation("测试", verbose=False) as stats:
+        scheduler.press('esc')
+        scheduler.keys(('ctrl', 'a'), 'delete', post_delay=0.1)
+    assert stats.actions == 3
+    # 默认等待 + 组内间隔 + 组后等待
+    assert stats.delay_time >= KEY_GAP * 2 + 0.1
+    assert stats.delay_time < 0.5
+    assert scheduler.totals["测试"]["count"] == 1
+
+
+def test_post_delay_stops_with_operation_token(simulator):
+    scheduler = ActionScheduler()
+    token = CancellationToken()
+    token.cancel()
+    start = time.perf_counter()
+    with scheduler.operation("测试", verbose=False, stop_flag_func=token):
+        scheduler.click(10, 10, post_delay=5)
+        assert scheduler.sleep(5) is True
+    assert time.perf_counter() - start < 1
+
+
+def test_decorator_uses_stop_flag_argument(simulator):
+    scheduler = ActionScheduler()
+
+    @scheduler.operation("测试", verbose=False)
+    def flow(stop_flag_func=None):
+        return scheduler.sleep(5)
+
+    token = CancellationToken()
+    token.cancel()
+    start = time.perf_counter()
+    assert flow(stop_flag_func=token) is True
+    assert time.perf_counter() - start < 1
+
+
+def test_pasted_comment_wait_returns_when_text_appears(simulator):
+    import wechat_core_engine as engine
+
+    simulator.open_moments()
+    simulator.comment_post, simulator.focus = 0, 'comment'
+    window_rect = engine.get_pengyouquan_window_rect()
+    entry, offset = simulator._post_layout()[0], simulator._visible_offset()
+    comment_box = entry["comment_box"]
+    send = simulator._send_button_rect((comment_box[0], comment_box[1] + offset,
+                                        comment_box[2], comment_box[3] + offset))
+    send_box = (window_rect[0] + send[0], window_rect[1] + send[1], send[2] - send[0], send[3] - send[1])
+
+    simulator.backend.copy_to_clipboard("很好看的照片")
+    start = time.perf_counter()
+    result = engine.wait_pasted_comment(lambda: input_scheduler.hotkey('ctrl', 'v', post_delay=0),
+                                        "很好看的照片", send_box, window_rect)
+    assert result.ok and result.reason == "found"
+    assert time.perf_counter() - start < 1
+    assert simulator.comment_text == "很好看的照片"
@@ -0,0 +1,61 @@
+"""指标：HdrHistogram 分位数在分段精度以内，OCR耗时按显式的调用位置标记，停止的流程同样输出汇总"""
+
+import numpy as np
+import pytest
+
+from metrics import SIGNIFICANT_BITS, HdrHistogram
+
+RELATIVE_ERROR = 1 / 2 ** (SIGNIFICANT_BITS - 1)
+
+
+def test_empty_histogram_has_no_percentile():
+    assert HdrHistogram().percentile(0.5) is None
+
+
+@pytest.mark.parametrize("fraction", [0.5, 0.9, 0.95, 0.99])
+def test_percentile_within_relative_error(fraction):
+    histogram = HdrHistogram()
+    for value in range(1, 10001):
+        histogram.record(value)
+    exact = fraction * 10000
+    assert histogram.percentile(fraction) == pytest.approx(exact, rel=RELATIVE_ERROR)
+
+
+def test_percentile_with_resolution():
+    # 以毫秒为单位记录秒级耗时
+    histogram = HdrHistogram(resolution=0.001)
+    for value in range(1, 1001):
+        histogram.record(value / 1000)
+    assert histogram.percentile(0.5) == pytest.approx(0.5, rel=RELATIVE_ERROR)
+    assert histogram.percentile(0.95) == pytest.approx(0.95, rel=RELATIVE_ERROR)
+
+
+def test_percentile_clamped_to_recorded_range():
+    histogram = HdrHistogram()
+    for value in (1000, 1001, 1002):
+        histogram.record(value)
+    assert 1000 <= histogram.percentile(0.0) <= 1002
+    assert 1000 <= histogram.percentile(1.0) <= 1002
+    assert histogram.count == 3 and histogram.min == 1000 and histogram.max == 1002
+
+
+def test_ocr_latency_labelled_by_explicit_site(simulator):
+    import wechat_core_engine as engine
+    from metrics import OCR_LATENCY
+
+    frame = np.asarray(simulator.render())[:100, :200]
+    engine.ocr_engine.recognize_text(frame, site="test_site")
+    assert (("site", "test_site"),) in OCR_LATENCY.series
+
+
+def test_stopped_moments_run_still_reported(simulator, monkeypatch):
+    import wechat_core_engine as engine
+    from cancellation import CancellationToken
+
+    calls = []
+    monkeypatch.setattr(engine, "save_timing_profile", lambda: calls.append("timing"))
+    monkeypatch.setattr(engine.metrics, "report", lambda flow: calls.append(flow))
+    token = CancellationToken()
+    token.cancel()
+    assert engine.pengyouquan_multi_dianzan_action(["Alice Wang"], stop_flag_func=token) is None
+    assert calls == ["timing", "pengyouquan_multi_dianzan_action"]
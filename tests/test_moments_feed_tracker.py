@@ -0,0 +1,103 @@
+"""朋友圈动态跟踪：上下滚动后，合并的识别结果与整窗识别一致，且只识别新露出的条带"""
+
+import numpy as np
+import pytest
+
+from moments_feed_tracker import MomentsFeedTracker
+
+BLOCK = 50          # 每条动态占 50 行
+BAR_TOP = 10        # 文字条在动态内的位置 [10, 30)
+BAR_HEIGHT = 20
+HEIGHT = 400
+
+
+@pytest.fixture(scope="module")
+def feed():
+    """每条动态一个灰度唯一、宽度不同的文字条"""
+    image = np.full((2000, 120, 3), 245, np.uint8)
+    for i in range(len(image) // BLOCK):
+        top = i * BLOCK + BAR_TOP
+        image[top:top + BAR_HEIGHT, 10:10 + (i * 7) % 80 + 20] = 20 + i
+    return image
+
+
+def fake_ocr(strip):
+    """按灰度识别文字条，被条带边界截断的文字条不返回"""
+    gray = strip[:, :, 0]
+    results = []
+    for level in np.unique(gray):
+        if level >= 200:
+            continue
+        ys, xs = np.nonzero(gray == level)
+        if ys.max() - ys.min() + 1 < BAR_HEIGHT:
+            continue
+        box = [[xs.min(), ys.min()], [xs.max(), ys.min()], [xs.max(), ys.max()], [xs.min(), ys.max()]]
+        results.append((box, f"user{level - 20}", 0.99))
+    return results
+
+
+def window(feed, position):
+    return feed[position:position + HEIGHT].copy()
+
+
+def expected_tops(position):
+    """整窗可见的完整文字条 {文字: 窗口内的上沿}"""
+    tops = {}
+    for i in range(2000 // BLOCK):
+        top = i * BLOCK + BAR_TOP - position
+        if 0 <= top and top + BAR_HEIGHT <= HEIGHT:
+            tops[f"user{i}"] = top
+    return tops
+
+
+def test_merge_matches_full_recognition_after_up_and_down_scrolls(feed):
+    tracker = MomentsFeedTracker(fake_ocr, strip_margin=40)
+    offsets = []
+    for position in (0, 100, 200, 140):
+        result = tracker.update(window(feed, position))
+        offsets.append(result and result.offset)
+        assert {line.text: line.top for line in tracker.lines} == expected_tops(position)
+
+    assert offsets == [None, 100, 100, -60]
+    assert tracker.ocr_area_ratio < 1
+
+
+def test_find_targets_returns_window_coordinates(feed):
+    tracker = MomentsFeedTracker(fake_ocr, strip_margin=40)
+    for position in (0, 100, 200):
+        tracker.update(window(feed, position))
+    found = tracker.find_targets(["user5", "user2"])
+    # user2 已滚出窗口
+    assert "user2" not in found
+    x, y = found["user5"]
+    assert y == pytest.approx(5 * BLOCK + BAR_TOP - 200 + (BAR_HEIGHT - 1) / 2, abs=1)
+
+
+def test_invalidate_recognizes_whole_window(feed):
+    tracker = MomentsFeedTracker(fake_ocr, strip_margin=40)
+    tracker.update(window(feed, 0))
+    tracker.update(window(feed, 100))
+    tracker.invalidate()
+    assert tracker.lines == []
+    assert tracker.update(window(feed, 160)) is None
+    assert {line.text: line.top for line in tracker.lines} == expected_tops(160)
+
+
+def test_first_frame_without_text_stays_incremental(feed):
+    # 第一屏识别不到文字（加载中或纯图片动态）时，后续帧仍只识别新露出的条带
+    calls = []
+
+    def ocr(strip):
+        calls.append(len(strip))
+        return [] if len(calls) == 1 else fake_ocr(strip)
+
+    tracker = MomentsFeedTracker(ocr, strip_margin=40)
+    assert tracker.update(window(feed, 0)) is None
+    assert tracker.lines == []
+    assert tracker.update(window(feed, 100)).offset == 100
+    assert calls[1] < HEIGHT
+    assert tracker.lines
+
+    tracker.invalidate()
+    assert tracker.update(window(feed, 100)) is None
+    assert calls[2] == HEIGHT
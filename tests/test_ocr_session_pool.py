@@ -0,0 +1,66 @@
+"""OCR推理会话池：并发借出不同会话，达到上限后等待归还，新建失败时不再扩大会话池"""
+
+import threading
+
+import pytest
+
+import rapid_ocr_engine
+from rapid_ocr_engine import EnhancedOCREngine
+
+
+class FakeSession:
+    fail = False
+
+    def __init__(self, rec_model_path=None):
+        self.rec_model_path = rec_model_path
+        self.available = not FakeSession.fail
+
+    def is_available(self):
+        return self.available
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(rapid_ocr_engine, "RapidOCREngine", FakeSession)
+    FakeSession.fail = False
+    return EnhancedOCREngine(settings=dict(rapid_ocr_engine.DEFAULT_OCR_SETTINGS, session_pool_size=2))
+
+
+def test_sessions_created_on_demand_up_to_pool_size(pool):
+    first = pool.checkout()
+    second = pool.checkout()
+    assert first is pool.rapid_ocr and second is not first
+    assert len(pool._sessions) == 2
+
+    # 会话全部借出时阻塞，直到有会话归还
+    borrowed = []
+    waiter = threading.Thread(target=lambda: borrowed.append(pool.checkout()))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    pool.checkin(second)
+    waiter.join(1)
+    assert borrowed == [second]
+    assert len(pool._sessions) == 2
+
+
+def test_session_context_returns_session(pool):
+    with pool.session() as session:
+        assert session is pool.rapid_ocr
+    assert pool.checkout() is session
+
+
+def test_failed_session_shrinks_pool(pool):
+    first = pool.checkout()
+    FakeSession.fail = True
+    pool.checkin(first)
+    assert pool.checkout() is first
+    # 已有会话全部借出、新会话加载失败：会话池缩小并等待已有会话
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(pool.checkout()))
+    waiter.start()
+    waiter.join(0.2)
+    assert pool.pool_size == 1 and len(pool._sessions) == 1
+    pool.checkin(first)
+    waiter.join(1)
+    assert result == [first]
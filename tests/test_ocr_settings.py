@@ -0,0 +1,117 @@
+"""OCR设置与INT8门禁：配置路径按程序目录解析，INT8模型只在回归截图上达到准确率下限时启用"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import config_store
+import rapid_ocr_engine
+from rapid_ocr_engine import load_ocr_settings, prepare_int8_rec_model
+
+TEXTS = ["张三", "昨天", "联系人", "群聊"]
+
+
+class FakeRecEngine:
+    """按截图灰度返回固定文字的识别引擎；misread 中的文字会被 INT8 模型识别错"""
+
+    created = []
+    misread = set()
+
+    def __init__(self, rec_model_path=None):
+        self.rec_model_path = rec_model_path
+        FakeRecEngine.created.append(rec_model_path)
+
+    def is_available(self):
+        return True
+
+    def recognize_crop(self, image):
+        text = TEXTS[int(image[0, 0, 0]) // 40]
+        if self.rec_model_path and text in FakeRecEngine.misread:
+            return text[:-1], 0.5
+        return text, 0.99
+
+
+@pytest.fixture
+def gate(tmp_path, monkeypatch):
+    fp32_model = tmp_path / "rec_fp32.onnx"
+    fp32_model.write_bytes(b"fp32")
+    int8_model = tmp_path / "models" / "rec_int8.onnx"
+    int8_model.parent.mkdir()
+    int8_model.write_bytes(b"int8")
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for index, text in enumerate(TEXTS):
+        Image.fromarray(np.full((20, 60, 3), index * 40, np.uint8)).save(corpus / f"{index}.png")
+    (corpus / "labels.json").write_text(json.dumps({f"{i}.png": t for i, t in enumerate(TEXTS)}), encoding="utf-8")
+
+    monkeypatch.setattr(rapid_ocr_engine, "find_default_rec_model_path", lambda: str(fp32_model))
+    monkeypatch.setattr(rapid_ocr_engine, "RapidOCREngine", FakeRecEngine)
+    FakeRecEngine.created, FakeRecEngine.misread = [], set()
+    settings = dict(rapid_ocr_engine.DEFAULT_OCR_SETTINGS, rec_int8=True, int8_model_path=str(int8_model),
+                    int8_regression_corpus=str(corpus))
+    return settings, str(int8_model), corpus
+
+
+def test_int8_enabled_when_accuracy_passes_and_result_cached(gate):
+    settings, int8_model, _ = gate
+    assert prepare_int8_rec_model(settings, FakeRecEngine()) == int8_model
+    with open(int8_model + ".gate.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["passed"] and report["total"] == len(TEXTS)
+
+    # 模型和截图未变化时复用上次结果，不再加载INT8模型
+    FakeRecEngine.created.clear()
+    assert prepare_int8_rec_model(settings, FakeRecEngine()) == int8_model
+    assert FakeRecEngine.created == [None]
+
+
+def test_int8_rejected_below_min_accuracy(gate):
+    settings, _, _ = gate
+    FakeRecEngine.misread = {"联系人"}
+    assert prepare_int8_rec_model(settings, FakeRecEngine()) is None
+
+
+def test_corpus_change_invalidates_cached_result(gate):
+    settings, int8_model, corpus = gate
+    assert prepare_int8_rec_model(settings, FakeRecEngine()) == int8_model
+    FakeRecEngine.misread = {"群聊"}
+    # 标注不变时沿用缓存；修改标注后重新测试
+    assert prepare_int8_rec_model(settings, FakeRecEngine()) == int8_model
+    labels = json.loads((corpus / "labels.json").read_text(encoding="utf-8"))
+    labels["0.png"] = "张三 "
+    (corpus / "labels.json").write_text(json.dumps(labels), encoding="utf-8")
+    assert prepare_int8_rec_model(settings, FakeRecEngine()) is None
+
+
+def test_empty_corpus_keeps_fp32_without_caching(gate, tmp_path):
+    settings, int8_model, _ = gate
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    settings["int8_regression_corpus"] = str(empty)
+    assert prepare_int8_rec_model(settings, FakeRecEngine()) is None
+    assert not os.path.exists(int8_model + ".gate.json")
+
+
+def test_config_path_independent_of_working_directory(tmp_path, monkeypatch):
+    (tmp_path / "wechat_config.json").write_text(
+        json.dumps({"ocr_settings": {"session_pool_size": 7}}), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    assert os.path.isabs(config_store.CONFIG_FILE)
+    assert os.path.dirname(config_store.CONFIG_FILE) == os.path.dirname(os.path.abspath(config_store.__file__))
+    settings = load_ocr_settings(str(tmp_path / "missing.json"))
+    assert settings["session_pool_size"] == rapid_ocr_engine.DEFAULT_OCR_SETTINGS["session_pool_size"]
+    assert os.path.isabs(settings["int8_model_path"])
+    assert not settings["int8_model_path"].startswith(str(tmp_path))
+
+
+def test_modules_share_one_config_file():
+    import logging_config
+    import metrics
+    import profiling
+    import timing_profile
+
+    for module in (rapid_ocr_engine, logging_config, metrics, profiling, timing_profile):
+        assert module.CONFIG_FILE == config_store.CONFIG_FILE
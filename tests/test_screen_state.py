@@ -0,0 +1,43 @@
+"""界面状态识别：在模拟器上逐步切换界面，识别结果与模拟器状态一致"""
+
+from input_scheduler import input_scheduler
+from screen_state import (CHAT_OPEN, COMMENT_BOX, LIKE_POPUP, MAIN, MOMENTS_FEED, SEARCH_OPEN, SEARCH_RESULTS,
+                          UNKNOWN, screen_state)
+
+
+def assert_state(expected):
+    result = screen_state.classify()
+    assert (result.state, result.confident) == (expected, True), result.cues
+    assert result.elapsed < 0.5
+
+
+def test_main_window_states(simulator):
+    assert_state(MAIN)
+    input_scheduler.hotkey('ctrl', 'f', post_delay=simulator.latency["search_box"] + 0.1)
+    assert_state(SEARCH_OPEN)
+    simulator.backend.copy_to_clipboard("Project Team")
+    input_scheduler.hotkey('ctrl', 'v', post_delay=simulator.latency["search_results"] + 0.1)
+    assert_state(SEARCH_RESULTS)
+    input_scheduler.press('esc', post_delay=0)
+    assert_state(MAIN)
+
+    simulator.current_chat, simulator.focus = "Project Team", 'chat_input'
+    simulator._changed()
+    assert_state(CHAT_OPEN)
+
+
+def test_moments_states(simulator):
+    simulator.open_moments()
+    assert_state(MOMENTS_FEED)
+    simulator.popup_post = 0
+    simulator._changed()
+    assert_state(LIKE_POPUP)
+    simulator.popup_post, simulator.comment_post, simulator.focus = None, 0, 'comment'
+    simulator._changed()
+    assert_state(COMMENT_BOX)
+
+
+def test_unknown_without_wechat_window(simulator):
+    simulator.backend.close_window(simulator.main_hwnd)
+    result = screen_state.classify()
+    assert result.state == UNKNOWN and not result.confident
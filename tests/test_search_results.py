@@ -0,0 +1,68 @@
+"""搜索结果点击：联系人/群聊共用的定位与点击流程，在模拟器上确认进入正确的聊天"""
+
+import numpy as np
+import pytest
+
+import wechat_core_engine as engine
+
+
+def search(term):
+    assert engine.prepare_search(ensure_active=True)
+    engine.input_search_term(term)
+
+
+@pytest.mark.parametrize("term, find, chat", [
+    ("Bob", engine.find_contact_in_search_results, "Bob"),
+    ("Project", engine.find_group_in_search_results, "Project Team"),
+])
+def test_click_opens_chat(simulator, term, find, chat):
+    search(term)
+    assert find(term)
+    assert simulator.current_chat == chat
+    assert not simulator.search_active
+
+
+def test_missing_section_does_not_click(simulator):
+    # 只有联系人结果时按群聊查找：不点击，停留在搜索界面
+    search("Alice")
+    assert not engine.find_group_in_search_results("Alice")
+    assert simulator.current_chat is None
+    assert simulator.search_active
+
+
+class FakeOCR:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def recognize_text(self, image, site="unknown"):
+        return self.lines
+
+
+def line(text, top):
+    return [[0, top], [100, top], [100, top + 20], [0, top + 20]], text, 0.9
+
+
+@pytest.fixture
+def ocr_lines(monkeypatch):
+    def install(lines):
+        monkeypatch.setattr(engine, "ocr_engine", FakeOCR(lines))
+        monkeypatch.setattr(engine, "RAPID_OCR_AVAILABLE", True)
+    return install
+
+
+def test_locate_target_under_section(ocr_lines):
+    ocr_lines([line("联系人", 0), line("Alice Wang", 40), line("群聊", 100), line("Alice Team", 140)])
+    screenshot = np.zeros((200, 100, 3), np.uint8)
+    assert engine.locate_contact_in_search_results(screenshot, "Alice") == (50, 50)
+    assert engine.locate_group_in_search_results(screenshot, "Alice") == (50, 150)
+
+
+def test_locate_falls_back_to_first_result(ocr_lines):
+    ocr_lines([line("群聊", 10), line("项目组", 40)])
+    screenshot = np.zeros((100, 100, 3), np.uint8)
+    assert engine.locate_group_in_search_results(screenshot, "Team") == (50, 50)
+
+
+def test_locate_without_indicators(ocr_lines):
+    ocr_lines([line("无关文字", 0)])
+    assert engine.locate_contact_in_search_results(np.zeros((100, 100, 3), np.uint8), "Alice") is None
@@ -0,0 +1,61 @@
+"""界面时序档案：p50/p95 的插值、超时和轮询间隔的推导、保存时保留其他配置"""
+
+import json
+
+import pytest
+
+import timing_profile
+from timing_profile import TimingProfile, percentile
+
+
+def test_percentile_interpolates():
+    values = [0.1 * i for i in range(1, 11)]
+    assert percentile(values, 0.5) == pytest.approx(0.55)
+    assert percentile(values, 0.95) == pytest.approx(0.955)
+    assert percentile([0.3], 0.95) == 0.3
+    assert percentile([], 0.5) is None
+
+
+def test_stats_report_p50_and_p95(tmp_path):
+    profile = TimingProfile(str(tmp_path / "config.json"))
+    for value in (0.4, 0.1, 0.3, 0.2, 0.5):
+        profile.record("page_open", value)
+    stats = profile.stats("page_open")
+    assert stats["count"] == 5
+    assert stats["p50"] == pytest.approx(0.3)
+    assert stats["p95"] == pytest.approx(0.48)
+
+
+def test_defaults_until_enough_samples(tmp_path):
+    profile = TimingProfile(str(tmp_path / "config.json"))
+    for _ in range(timing_profile.MIN_SAMPLES - 1):
+        profile.record("page_open", 0.2)
+    assert profile.timeout("page_open", default=3.0) == 3.0
+    assert profile.poll_interval("page_open") == timing_profile.DEFAULT_POLL_INTERVAL
+
+    profile.record("page_open", 0.2)
+    expected = 0.2 * timing_profile.TIMEOUT_FACTOR + timing_profile.TIMEOUT_MARGIN
+    assert profile.timeout("page_open", default=3.0) == pytest.approx(max(timing_profile.MIN_TIMEOUT, expected))
+    assert profile.poll_interval("page_open") == pytest.approx(0.2 * timing_profile.POLL_FRACTION)
+
+
+def test_timeout_capped_relative_to_default(tmp_path):
+    profile = TimingProfile(str(tmp_path / "config.json"))
+    for _ in range(timing_profile.MIN_SAMPLES):
+        profile.record("page_open", 10.0)
+    assert profile.timeout("page_open", default=1.0) == pytest.approx(timing_profile.MAX_TIMEOUT_FACTOR)
+
+
+def test_save_keeps_other_config_and_reloads(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"last_inputs": {"name": "张三"}}), encoding="utf-8")
+    profile = TimingProfile(str(config_file))
+    for i in range(timing_profile.SAVE_EVERY):
+        profile.record("page_open", 0.1 * (i + 1))
+
+    config = json.loads(config_file.read_text(encoding="utf-8"))
+    assert config["last_inputs"] == {"name": "张三"}
+    assert config["timing_profile"]["page_open"]["count"] == timing_profile.SAVE_EVERY
+
+    reloaded = TimingProfile(str(config_file))
+    assert reloaded.stats("page_open") == profile.stats("page_open")
@@ -0,0 +1,67 @@
+"""界面元素定位：完整查找后记住位置，快速路径只搜索上次位置附近，元素移动或消失时重新查找"""
+
+import pytest
+
+from metrics import LOCATOR_LOOKUPS
+from ui_locator import ELEMENTS, ElementLocator, ElementSpec
+
+
+def lookups(name):
+    return {dict(key)["path"]: value for key, value in LOCATOR_LOOKUPS.values.items()
+            if dict(key)["element"] == name}
+
+
+@pytest.fixture
+def located(simulator):
+    """与核心引擎相同配置的独立定位器（不共享记住的位置）"""
+    import wechat_core_engine as engine
+
+    locator = ElementLocator(ELEMENTS)
+    locator.configure(windows={"main": engine.get_wechat_window_rect, "moments": engine.get_pengyouquan_window_rect},
+                      asset_loader=engine.load_asset_image, ocr_func=engine._locator_ocr)
+    return locator
+
+
+def test_fast_path_after_full_lookup(located, simulator):
+    LOCATOR_LOOKUPS.values.clear()
+    box = located.locate("pengyouquan_entry")
+    assert box is not None
+    left, top, _, _ = simulator.backend.window_rect(simulator.main_hwnd)
+    icon = simulator._main_layout()["moments_icon"]
+    assert abs(box.left - (left + icon[0])) <= 4 and abs(box.top - (top + icon[1])) <= 4
+
+    assert located.locate("pengyouquan_entry") == box
+    assert lookups("pengyouquan_entry") == {"full": 1, "fast": 1}
+
+
+def test_remembered_position_follows_window(located, simulator):
+    box = located.locate("pengyouquan_entry")
+    left, top, right, bottom = simulator.backend.window_rect(simulator.main_hwnd)
+    simulator.backend.move_window(simulator.main_hwnd, left + 100, top + 50, right - left, bottom - top)
+    simulator._changed()
+    moved = located.last_known("pengyouquan_entry")
+    assert (moved.left, moved.top) == (box.left + 100, box.top + 50)
+    assert located.locate("pengyouquan_entry") == moved
+
+
+def test_stale_position_forgotten_and_found_again(located, simulator):
+    LOCATOR_LOOKUPS.values.clear()
+    box = located.locate("pengyouquan_entry")
+    located.remember("pengyouquan_entry", (box.left, box.top + 300, box.width, box.height))
+    assert located.locate("pengyouquan_entry") == box
+    assert lookups("pengyouquan_entry") == {"full": 2, "fast_miss": 1}
+
+
+def test_color_text_and_layout_elements(located, simulator):
+    simulator.open_moments()
+    left, top, right, bottom = simulator.backend.window_rect(simulator.moments_hwnd)
+    located.register(ElementSpec("nickname", "昵称", color=(87, 107, 149), window="moments"))
+    located.register(ElementSpec("moments_title", "朋友圈标题", text="朋友圈", window="moments",
+                                 region=(0, 0, 1, 0.1)))
+    nickname = located.locate("nickname")
+    title = located.locate("moments_title")
+    assert nickname is not None and left <= nickname.left < right and top <= nickname.top < bottom
+    assert title is not None and top <= title.top < top + (bottom - top) * 0.1
+
+    left, top, right, bottom = simulator.backend.window_rect(simulator.main_hwnd)
+    assert located.point("chat_input") == (left + int((right - left) * 0.5), top + int((bottom - top) * 0.88))
@@ -0,0 +1,55 @@
+"""画面稳定检测：在模拟器上等待界面响应后稳定，无响应和停止时尽早返回"""
+
+import time
+
+from cancellation import CancellationToken
+from input_scheduler import input_scheduler
+from ui_wait import capture_probe, wait_until_stable
+
+
+def main_region(simulator):
+    import wechat_core_engine as engine
+    return engine.get_wechat_window_rect()
+
+
+def test_waits_for_delayed_response_to_settle(simulator):
+    import wechat_core_engine as engine
+
+    assert engine.prepare_search(True, focus_click=True)
+    # 只探测搜索结果列表（整个窗口的平均差异会被大面积不变的区域稀释）
+    left, top, _, height = main_region(simulator)
+    region = (left + 60, top + 60, 250, height // 2)
+    simulator.backend.copy_to_clipboard("Project Team")
+    baseline = capture_probe(region)
+    input_scheduler.hotkey('ctrl', 'v', post_delay=0)
+    result = wait_until_stable(region, timeout=2, baseline=baseline)
+    assert result.ok and result.reason == "stable"
+    # 搜索结果在模拟延迟之后才渲染，返回时已经可见
+    assert simulator.search_results_visible
+    assert simulator.latency["search_results"] <= result.elapsed < 1.5
+
+
+def test_returns_early_when_nothing_changes(simulator):
+    region = main_region(simulator)
+    result = wait_until_stable(region, timeout=2, baseline=capture_probe(region))
+    assert result.ok and result.reason == "unchanged"
+    assert result.elapsed < 1.5
+
+
+def test_stops_with_token(simulator):
+    token = CancellationToken()
+    token.cancel()
+    start = time.perf_counter()
+    result = wait_until_stable(main_region(simulator), timeout=5, stop_flag_func=token)
+    assert not result.ok and result.reason == "stopped"
+    assert time.perf_counter() - start < 1
+
+
+def test_search_shows_results_without_fixed_delay(simulator):
+    import wechat_core_engine as engine
+
+    assert engine.prepare_search(True, focus_click=True)
+    start = time.perf_counter()
+    engine.input_search_term("Project Team")
+    assert simulator.search_results_visible
+    assert time.perf_counter() - start < 1.5
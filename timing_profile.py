@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面时序档案模块
+记录本机每类界面变化（打开搜索框、搜索结果渲染、弹出界面、滚动稳定等）的实际耗时，
+把 p50/p95 保存到 wechat_config.json 的 timing_profile 节点中，
+并据此推导等待超时和轮询间隔：快的机器不再按最慢的电脑来等待。
+"""
+
+import json
+import os
+import threading
+
+from config_store import CONFIG_FILE, update_config
+from logging_config import get_logger
+from metrics import UI_WAIT
+
+logger = get_logger(__name__)
+
+# 界面变化类型及其默认超时（秒），样本不足时使用
+DEFAULT_TIMEOUTS = {
+    "search_box": 3.0,        # Ctrl+F 打开搜索框
+    "search_results": 2.0,    # 输入搜索内容后结果渲染
+    "chat_open": 3.0,         # 点击搜索结果打开聊天界面
+    "popup": 2.5,             # 点赞按钮弹出界面
+    "comment_box": 2.5,       # 评论输入框出现
+    "scroll": 2.0,            # 朋友圈滚动稳定
+}
+
+MAX_SAMPLES = 50              # 每类最多保留的样本数
+MIN_SAMPLES = 5               # 样本数达到该值后才使用档案推导
+SAVE_EVERY = 10               # 每新增多少个样本保存一次
+TIMEOUT_FACTOR = 2.0          # 超时 = p95 * 系数 + 余量
+TIMEOUT_MARGIN = 0.2
+MIN_TIMEOUT = 0.5
+MAX_TIMEOUT_FACTOR = 2.0      # 超时最多为默认值的多少倍（慢机器允许等更久）
+POLL_FRACTION = 0.25          # 轮询间隔 = p50 * 系数
+MIN_POLL_INTERVAL = 0.03
+MAX_POLL_INTERVAL = 0.2
+DEFAULT_POLL_INTERVAL = 0.05
+
+
+def percentile(values, fraction):
+    """计算百分位数（线性插值）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class TimingProfile:
+    """本机的界面时序档案
+
+    用法：等待结束后调用 record(kind, elapsed)，下次等待前用 timeout(kind)/poll_interval(kind) 取参数。
+    超时的等待也会以超时值记录（观测值被截断），使慢机器上的超时逐步放宽。
+    """
+
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self.samples = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """从配置文件读取历史样本"""
+        try:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                for kind, entry in config.get('timing_profile', {}).items():
+                    self.samples[kind] = [float(value) for value in entry.get('samples', [])][-MAX_SAMPLES:]
+        except Exception as e:
+            logger.warning("⚠️ 读取时序档案失败，使用默认等待参数: %s", e)
+
+    def save(self):
+        """将样本和 p50/p95 写回配置文件（保留文件中的其他配置）"""
+        def apply(config):
+            # 在配置锁内取样本快照，并发保存时后写入的总是较新的样本
+            with self._lock:
+                config['timing_profile'] = {kind: self.stats(kind) for kind in self.samples}
+                self._unsaved = 0
+
+        try:
+            # 与GUI等其他写入者共用配置锁，原子替换配置文件
+            update_config(apply, self.config_file)
+        except Exception as e:
+            logger.warning("⚠️ 保存时序档案失败: %s", e)
+
+    def record(self, kind, elapsed):
+        """记录一次界面变化的实际耗时（秒）"""
+        UI_WAIT.observe(elapsed, kind=kind)
+        with self._lock:
+            samples = self.samples.setdefault(kind, [])
+            samples.append(round(float(elapsed), 3))
+            del samples[:-MAX_SAMPLES]
+            self._unsaved += 1
+            should_save = self._unsaved >= SAVE_EVERY
+        if should_save:
+            self.save()
+
+    def stats(self, kind):
+        """某类界面变化的统计 {"p50", "p95", "count", "samples"}"""
+        samples = list(self.samples.get(kind, []))
+        return {
+            "p50": percentile(samples, 0.5),
+            "p95": percentile(samples, 0.95),
+            "count": len(samples),
+            "samples": samples,
+        }
+
+    def timeout(self, kind, default=None):
+        """根据 p95 推导等待超时，样本不足时返回默认值"""
+        if default is None:
+            default = DEFAULT_TIMEOUTS.get(kind, 2.0)
+        samples = self.samples.get(kind, [])
+        if len(samples) < MIN_SAMPLES:
+            return default
+        derived = percentile(samples, 0.95) * TIMEOUT_FACTOR + TIMEOUT_MARGIN
+        return max(MIN_TIMEOUT, min(derived, default * MAX_TIMEOUT_FACTOR))
+
+    def poll_interval(self, kind):
+        """根据 p50 推导轮询间隔，样本不足时返回默认值"""
+        samples = self.samples.get(kind, [])
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_POLL_INTERVAL
+        return max(MIN_POLL_INTERVAL, min(percentile(samples, 0.5) * POLL_FRACTION, MAX_POLL_INTERVAL))
+
+    def summary(self):
+        """各类界面变化的统计摘要（用于日志）"""
+        lines = []
+        for kind in sorted(self.samples):
+            stats = self.stats(kind)
+            if stats["count"]:
+                lines.append(f"{kind}: p50={stats['p50']:.2f}s p95={stats['p95']:.2f}s "
+                             f"n={stats['count']} → 超时 {self.timeout(kind):.2f}s")
+        return lines
+
+
+_timing_profile = None
+_timing_profile_lock = threading.Lock()
+
+
+def get_timing_profile():
+    """获取全局时序档案实例"""
+    global _timing_profile
+    with _timing_profile_lock:
+        if _timing_profile is None:
+            _timing_profile = TimingProfile()
+        return _timing_profile
+
+
+def set_timing_profile(profile):
+    """替换全局时序档案实例（例如模拟器基准使用独立的档案文件），返回旧实例"""
+    global _timing_profile
+    with _timing_profile_lock:
+        old, _timing_profile = _timing_profile, profile
+        return old
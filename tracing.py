@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+耗时追踪模块
+用上下文管理器记录截图、OCR、模板查找、窗口激活、输入、等待等阶段的耗时区间（span），
+导出为 Chrome trace-event JSON，可在 chrome://tracing 或 https://ui.perfetto.dev 中按时间线查看
+一次点赞流程的时间都花在了哪里。
+
+未启用时 span() 返回同一个空上下文管理器，开销只有一次属性判断。
+
+用法：
+    start_tracing()                      # 或设置环境变量 WECHAT_TRACE=trace.json 后启动程序
+    with tracer.span("ocr", "ocr", width=560):
+        ...
+    stop_tracing("trace.json")
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TRACE_ENV = "WECHAT_TRACE"
+
+
+class _NullSpan:
+    """追踪未启用时使用的空区间"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add_complete(self.name, self.category, self.start, end, self.args)
+        return False
+
+
+class Tracer:
+    """收集耗时区间，导出 Chrome trace-event 格式"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.thread_names = {}
+        self.origin = time.perf_counter()
+
+    def start(self):
+        """清空已有记录并开始追踪"""
+        self.events = []
+        self.thread_names = {}
+        self.origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def span(self, name, category="app", **args):
+        """耗时区间上下文管理器，args 会显示在时间线的详情中"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def wrap(self, func, name=None, category="app"):
+        """返回在区间内执行 func 的函数"""
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            with _Span(self, span_name, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def add_complete(self, name, category, start, end, args=None):
+        """记录一个已结束的区间（start/end 为 time.perf_counter() 的值）"""
+        thread = threading.current_thread()
+        if thread.ident not in self.thread_names:
+            self.thread_names[thread.ident] = thread.name
+        self.events.append({
+            "name": name, "cat": category, "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(), "tid": thread.ident, "args": args or {},
+        })
+
+    def instant(self, name, category="app", **args):
+        """记录一个时间点事件（例如找到目标、到达"昨天"）"""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        self.thread_names.setdefault(thread.ident, thread.name)
+        self.events.append({
+            "name": name, "cat": category, "ph": "i", "s": "t",
+            "ts": round((time.perf_counter() - self.origin) * 1e6, 1),
+            "pid": os.getpid(), "tid": thread.ident, "args": args,
+        })
+
+    def summary(self):
+        """按类别汇总区间耗时 {类别: (次数, 总秒数)}（嵌套区间会重复计入各自的类别）"""
+        totals = {}
+        for event in list(self.events):
+            if event["ph"] == "X":
+                count, seconds = totals.get(event["cat"], (0, 0.0))
+                totals[event["cat"]] = (count + 1, seconds + event["dur"] / 1e6)
+        return totals
+
+    def export_chrome_trace(self, path):
+        """写出 Chrome trace-event JSON"""
+        events = list(self.events)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": ident,
+                     "args": {"name": name}} for ident, name in self.thread_names.items()]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f,
+                      ensure_ascii=False, default=str)
+        logger.info("🧭 耗时追踪已导出: %s（%d 个事件）", path, len(events))
+        for category, (count, seconds) in sorted(self.summary().items(), key=lambda item: -item[1][1]):
+            logger.info("   %s: %d 次，%.2fs", category, count, seconds)
+
+
+tracer = Tracer()
+
+
+def traced(name=None, category="app"):
+    """函数装饰器：调用过程记录为一个区间"""
+    def decorator(func):
+        return tracer.wrap(func, name, category)
+    return decorator
+
+
+def start_tracing():
+    """开始追踪"""
+    tracer.start()
+    logger.info("🧭 已开始耗时追踪")
+
+
+def stop_tracing(path=None):
+    """停止追踪，指定路径时导出 Chrome trace-event JSON"""
+    tracer.stop()
+    if path:
+        tracer.export_chrome_trace(path)
+
+
+if os.environ.get(TRACE_ENV):
+    start_tracing()
+    atexit.register(stop_tracing, os.environ[TRACE_ENV])
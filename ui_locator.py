@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面元素定位模块
+用声明式的元素表代替每次临时编写的查找代码：每个元素描述为模板图标、颜色、OCR文字和相对于窗口的区域。
+定位器记住每个元素上次找到的位置（相对于窗口左上角），下次定位时：
+1. 快速路径：只在上次位置 ± margin 的小区域内重新匹配，命中则直接返回
+2. 完整查找：快速路径未命中（元素移动或消失）时丢弃记住的位置，在元素的查找区域内
+   按 模板 → 颜色 → OCR文字 的顺序查找
+3. 布局元素（聊天输入框、搜索框）没有可匹配的外观，只按窗口比例计算位置
+
+位置按相对窗口的坐标保存，窗口移动后快速路径仍然有效；快速路径的命中情况记录在运行指标
+wechat_locator_lookups_total 中。窗口位置、图标加载和OCR由核心引擎通过 configure() 提供。
+
+用法：
+    box = locator.locate("comment_icon")          # Box(left, top, width, height)，屏幕坐标，找不到时为None
+    x, y = locator.point("chat_input")            # 布局元素的位置
+    locator.remember("comment_icon", box)         # 其他途径（例如等待弹窗）找到元素时记下位置
+    locator.forget("send_button")                 # 界面布局变化后丢弃记住的位置
+"""
+
+import threading
+
+import cv2
+
+from metrics import LOCATOR_LOOKUPS
+from perception import color_mask
+from platform_backend import Box, backend
+from tracing import traced
+from ui_wait import clamp_region
+
+
+class ElementSpec:
+    """一个界面元素的描述
+
+    Attributes:
+        name: 元素名
+        description: 日志中显示的名称
+        template: assets 目录下的模板图标文件名
+        confidence: 模板匹配阈值，元组表示从高到低依次尝试
+        grayscale: 模板是否按灰度匹配（靠形状区分的图标可以开启，更快）
+        color: 元素的颜色 (R, G, B)，该颜色的像素外接框即为元素位置
+        color_tolerance: 颜色容差
+        min_pixels: 颜色像素数少于该值视为未找到
+        text: 元素上的文字（OCR查找）
+        window: 所在窗口（"main" / "moments"），None表示屏幕
+        region: 查找区域，相对窗口的比例 (left, top, width, height)，None表示整个窗口
+        anchor: 布局元素的位置，相对窗口的比例 (x, y)
+        margin: 快速路径在上次位置四周扩展的像素数
+    """
+
+    def __init__(self, name, description, template=None, confidence=0.8, grayscale=False, color=None,
+                 color_tolerance=20, min_pixels=30, text=None, window="main", region=None, anchor=None, margin=24):
+        self.name = name
+        self.description = description
+        self.template = template
+        self.confidence = confidence if isinstance(confidence, tuple) else (confidence,)
+        self.grayscale = grayscale
+        self.color = color
+        self.color_tolerance = color_tolerance
+        self.min_pixels = min_pixels
+        self.text = text
+        self.window = window
+        self.region = region
+        self.anchor = anchor
+        self.margin = margin
+
+    def __repr__(self):
+        return f"ElementSpec('{self.name}', template={self.template}, text={self.text}, window={self.window})"
+
+
+# 元素表
+ELEMENTS = (
+    ElementSpec("pengyouquan_entry", "朋友圈入口", template="pengyouquan.png", confidence=0.8, grayscale=True,
+                text="朋友圈", window="main"),
+    ElementSpec("search_box", "搜索框", window=None, region=(0.25, 0.08, 0.5, 0.08)),
+    ElementSpec("chat_input", "聊天输入框", window="main", anchor=(0.5, 0.88)),
+    ElementSpec("comment_icon", "评论图标", template="pinglun.png", confidence=0.8, grayscale=True,
+                window="moments"),
+    ElementSpec("send_button", "发送按钮", template="fasong.png", confidence=(0.8, 0.7, 0.6, 0.5), grayscale=True,
+                window="moments"),
+)
+
+
+class ElementLocator:
+    """按元素表定位界面元素，记住上次找到的位置"""
+
+    def __init__(self, elements=ELEMENTS):
+        self.specs = {spec.name: spec for spec in elements}
+        self.windows = {}             # 窗口名 -> 返回 (left, top, width, height) 或None的函数
+        self.asset_loader = None      # 图标文件名 -> 模板图像（加载失败时为None）
+        self.ocr_func = None          # RGB数组 -> [(bbox, text, confidence), ...]
+        self._last = {}               # 元素名 -> 相对窗口的 (x, y, w, h)
+        self._lock = threading.Lock()
+
+    def configure(self, windows=None, asset_loader=None, ocr_func=None):
+        """提供窗口位置、图标加载和OCR函数（核心引擎导入时调用）"""
+        if windows:
+            self.windows.update(windows)
+        if asset_loader:
+            self.asset_loader = asset_loader
+        if ocr_func:
+            self.ocr_func = ocr_func
+
+    def register(self, spec):
+        """注册或替换一个元素"""
+        self.specs[spec.name] = spec
+        self.forget(spec.name)
+
+    # ==================== 区域 ====================
+
+    def _frame_rect(self, spec):
+        """元素所在窗口的区域，找不到窗口时为整个屏幕"""
+        provider = self.windows.get(spec.window) if spec.window else None
+        rect = provider() if provider else None
+        if rect:
+            return rect
+        width, height = backend.screen_size()
+        return (0, 0, width, height)
+
+    def region(self, name):
+        """元素的查找区域（屏幕坐标）"""
+        spec = self.specs[name]
+        left, top, width, height = self._frame_rect(spec)
+        if spec.region is None:
+            return clamp_region(left, top, width, height)
+        fx, fy, fw, fh = spec.region
+        return clamp_region(left + int(width * fx), top + int(height * fy), int(width * fw), int(height * fh))
+
+    def point(self, name):
+        """布局元素的位置（屏幕坐标）"""
+        spec = self.specs[name]
+        left, top, width, height = self._frame_rect(spec)
+        fx, fy = spec.anchor
+        LOCATOR_LOOKUPS.inc(element=name, path="layout")
+        return (left + int(width * fx), top + int(height * fy))
+
+    # ==================== 记住的位置 ====================
+
+    def remember(self, name, box):
+        """记下元素的屏幕位置 (x, y, w, h)，按相对窗口的坐标保存"""
+        if box is None or name not in self.specs:
+            return
+        left, top = self._frame_rect(self.specs[name])[:2]
+        with self._lock:
+            self._last[name] = (int(box[0]) - left, int(box[1]) - top, int(box[2]), int(box[3]))
+
+    def forget(self, name=None):
+        """丢弃记住的位置，name为None时丢弃全部"""
+        with self._lock:
+            if name is None:
+                self._last.clear()
+            else:
+                self._last.pop(name, None)
+
+    def last_known(self, name):
+        """上次找到的屏幕位置，没有时返回None"""
+        with self._lock:
+            relative = self._last.get(name)
+        if relative is None:
+            return None
+        left, top = self._frame_rect(self.specs[name])[:2]
+        return Box(relative[0] + left, relative[1] + top, relative[2], relative[3])
+
+    # ==================== 定位 ====================
+
+    @traced("locate_element", "template")
+    def locate(self, name, stop_flag_func=None):
+        """定位元素：先检查上次位置附近的小区域，未命中时在查找区域内完整查找
+
+        Returns:
+            Box(left, top, width, height) 屏幕坐标，找不到时返回None
+        """
+        spec = self.specs[name]
+        last = self.last_known(name)
+        if last is not None:
+            fast_region = clamp_region(last.left - spec.margin, last.top - spec.margin,
+                                       last.width + spec.margin * 2, last.height + spec.margin * 2)
+            box = self._find(spec, fast_region, stop_flag_func) if fast_region else None
+            if box is not None:
+                LOCATOR_LOOKUPS.inc(element=name, path="fast")
+                self.remember(name, box)
+                return box
+            LOCATOR_LOOKUPS.inc(element=name, path="fast_miss")
+            self.forget(name)
+
+        if stop_flag_func and stop_flag_func():
+            return None
+        box = self._find(spec, self.region(name), stop_flag_func)
+        LOCATOR_LOOKUPS.inc(element=name, path="full" if box is not None else "not_found")
+        if box is not None:
+            self.remember(name, box)
+        return box
+
+    def _find(self, spec, region, stop_flag_func=None):
+        """在区域内按 模板 → 颜色 → OCR文字 的顺序查找元素"""
+        template = self.asset_loader(spec.template) if spec.template and self.asset_loader else None
+        if template is not None:
+            for confidence in spec.confidence:
+                if stop_flag_func and stop_flag_func():
+                    return None
+                box = backend.locate_on_screen(template, confidence=confidence, region=region,
+                                               grayscale=spec.grayscale)
+                if box:
+                    return Box(*box)
+
+        if spec.color is None and not (spec.text and self.ocr_func):
+            return None
+        frame = backend.grab(region=region)
+        offset_x, offset_y = (region[0], region[1]) if region else (0, 0)
+
+        if spec.color is not None:
+            mask = color_mask(frame, spec.color, spec.color_tolerance)
+            if cv2.countNonZero(mask) >= spec.min_pixels:
+                x, y, width, height = cv2.boundingRect(mask)
+                return Box(x + offset_x, y + offset_y, width, height)
+
+        if spec.text and self.ocr_func and not (stop_flag_func and stop_flag_func()):
+            for detection in self.ocr_func(frame) or []:
+                if len(detection) >= 2 and spec.text in detection[1]:
+                    xs = [point[0] for point in detection[0]]
+                    ys = [point[1] for point in detection[0]]
+                    return Box(int(min(xs)) + offset_x, int(min(ys)) + offset_y,
+                               int(max(xs) - min(xs)), int(max(ys) - min(ys)))
+        return None
+
+
+locator = ElementLocator()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面等待模块
+用"等待画面稳定"和"等待元素出现"代替固定的 time.sleep：
+1. wait_until_stable: 轮询截取小区域的低分辨率画面，相邻帧不再变化时立即返回
+2. wait_for: 轮询检查条件（模板匹配、颜色、文字），条件满足时立即返回
+快的机器不用白等，慢的机器也能等到界面真正就绪。
+探测帧直接截取灰度画面；条件函数收到的是 perception.Frame，灰度模板匹配共用每帧一次的灰度平面
+（只靠颜色区分的模板按颜色匹配），颜色条件使用单通道掩码。
+"""
+
+import time
+
+import numpy as np
+import cv2
+from frame_analysis import to_gray
+from frame_buffers import frame_pool
+from frame_recorder import recorded_stage
+from logging_config import get_logger
+from metrics import TEMPLATE_MATCH_LATENCY, template_label
+from perception import Frame
+from platform_backend import backend
+from tracing import traced
+
+import cancellation
+
+logger = get_logger(__name__)
+
+# 默认参数
+PROBE_WIDTH = 160            # 低分辨率探测帧的宽度（像素）
+POLL_INTERVAL = 0.05         # 轮询间隔（秒）
+STABLE_FRAMES = 2            # 连续多少次对比无变化视为稳定
+DIFF_THRESHOLD = 1.5         # 平均灰度差低于该值视为无变化
+MIN_WAIT = 0.1               # 最短等待时间，给界面开始响应留出时间
+
+
+class WaitResult:
+    """一次等待的结果
+
+    Attributes:
+        ok: 是否在超时前等到了预期状态
+        elapsed: 实际等待的秒数（即观测到的界面响应延迟）
+        reason: 结束原因（"stable" / "unchanged" / "found" / "timeout" / "stopped" / "fallback"）
+        value: wait_for 的条件函数返回值（例如模板匹配到的位置）
+    """
+
+    def __init__(self, ok, elapsed, reason, value=None):
+        self.ok = ok
+        self.elapsed = elapsed
+        self.reason = reason
+        self.value = value
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f"WaitResult(ok={self.ok}, elapsed={self.elapsed:.3f}s, reason='{self.reason}')"
+
+
+def _to_probe(image):
+    """将截图（灰度或RGB）缩小为低分辨率灰度探测帧"""
+    frame = to_gray(image)
+    height, width = frame.shape[:2]
+    if width > PROBE_WIDTH:
+        probe_height = max(1, int(height * PROBE_WIDTH / width))
+        frame = cv2.resize(frame, (PROBE_WIDTH, probe_height), interpolation=cv2.INTER_AREA)
+    return frame.astype(np.int16)
+
+
+def capture_probe(region=None):
+    """截取指定区域的低分辨率探测帧
+
+    Args:
+        region: (left, top, width, height)，None表示全屏
+
+    Returns:
+        探测帧数组，截图失败时返回None
+    """
+    try:
+        return _to_probe(backend.grab_gray(region=region))
+    except Exception:
+        return None
+
+
+def frame_diff(probe_a, probe_b):
+    """两张探测帧的平均灰度差，尺寸不同时视为完全不同"""
+    if probe_a is None or probe_b is None or probe_a.shape != probe_b.shape:
+        return float('inf')
+    return float(np.abs(probe_a - probe_b).mean())
+
+
+def clamp_region(left, top, width, height):
+    """将区域限制在屏幕范围内，无效时返回None（表示全屏）"""
+    screen_width, screen_height = backend.screen_size()
+    left, top = max(0, int(left)), max(0, int(top))
+    width = min(int(width), screen_width - left)
+    height = min(int(height), screen_height - top)
+    if width <= 0 or height <= 0:
+        return None
+    return (left, top, width, height)
+
+
+@traced("wait_until_stable", "wait")
+def wait_until_stable(region=None, timeout=2.0, baseline=None, change_timeout=None, min_wait=MIN_WAIT,
+                      poll_interval=POLL_INTERVAL, stable_frames=STABLE_FRAMES,
+                      threshold=DIFF_THRESHOLD, stop_flag_func=None):
+    """等待指定区域的画面稳定下来
+
+    Args:
+        region: 探测区域 (left, top, width, height)，None表示全屏
+        timeout: 最长等待时间（秒），超时后直接返回
+        baseline: 操作之前截取的探测帧（capture_probe），提供时先等待画面发生变化再等待稳定，
+                  避免在界面还没开始响应时就误判为稳定
+        change_timeout: 等待画面开始变化的最长时间，默认为 timeout 的一半；
+                        画面一直没有变化（例如操作本身无效果）时不再继续等待
+        min_wait: 最短等待时间（秒），在此之前不判定稳定
+        poll_interval: 轮询间隔（秒）
+        stable_frames: 连续多少次对比无变化视为稳定
+        threshold: 平均灰度差阈值
+        stop_flag_func: 停止标志检查函数
+
+    Returns:
+        WaitResult，ok 为 True 表示画面已稳定
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    if change_timeout is None:
+        change_timeout = timeout / 2
+
+    previous = capture_probe(region)
+    if previous is None:
+        # 截图失败时退回固定等待
+        logger.warning("⚠️ 探测截图失败，改为固定等待 %s 秒", timeout)
+        if cancellation.sleep(timeout, stop_flag_func):
+            return WaitResult(False, time.perf_counter() - start, "stopped")
+        return WaitResult(False, time.perf_counter() - start, "fallback")
+
+    changed = baseline is None or frame_diff(baseline, previous) > threshold
+    still_count = 0
+
+    while True:
+        if stop_flag_func and stop_flag_func():
+            return WaitResult(False, time.perf_counter() - start, "stopped")
+
+        now = time.perf_counter()
+        if now >= deadline:
+            return WaitResult(False, now - start, "timeout")
+        if cancellation.sleep(min(poll_interval, deadline - now), stop_flag_func):
+            return WaitResult(False, time.perf_counter() - start, "stopped")
+
+        current = capture_probe(region)
+        if current is None:
+            continue
+
+        diff = frame_diff(previous, current)
+        previous = current
+
+        if not changed:
+            if frame_diff(baseline, current) > threshold:
+                changed = True
+            elif time.perf_counter() - start >= change_timeout:
+                # 画面一直没有响应，视为已经稳定
+                return WaitResult(True, time.perf_counter() - start, "unchanged")
+            continue
+
+        if diff <= threshold:
+            still_count += 1
+            if still_count >= stable_frames and time.perf_counter() - start >= min_wait:
+                return WaitResult(True, time.perf_counter() - start, "stable")
+        else:
+            still_count = 0
+
+
+# ==================== 条件等待 ====================
+
+def capture_region(region=None):
+    """截取指定区域的RGB画面，失败时返回None"""
+    try:
+        return backend.grab(region=region)
+    except Exception:
+        return None
+
+
+def offset_box(box, region):
+    """将相对于探测区域的 (x, y, w, h) 转换为屏幕坐标"""
+    if box is None or region is None:
+        return box
+    return (box[0] + region[0], box[1] + region[1], box[2], box[3])
+
+
+def box_center(box):
+    """(x, y, w, h) 的中心点"""
+    return (box[0] + box[2] // 2, box[1] + box[3] // 2)
+
+
+@recorded_stage
+def match_gray_template(frame, template_gray, confidence=0.8):
+    """在灰度平面（或RGB画面）中查找灰度模板，找到时返回 (x, y, w, h)，否则返回None"""
+    template_height, template_width = template_gray.shape
+    if frame.shape[0] < template_height or frame.shape[1] < template_width:
+        return None
+    gray = to_gray(frame, pooled=True)
+    try:
+        scores = cv2.matchTemplate(gray, template_gray, cv2.TM_CCOEFF_NORMED)
+    finally:
+        frame_pool.release(gray)
+    _, max_score, _, max_location = cv2.minMaxLoc(scores)
+    if max_score >= confidence:
+        return (max_location[0], max_location[1], template_width, template_height)
+    return None
+
+
+@recorded_stage
+def match_color_template(frame, template_rgb, confidence=0.8):
+    """在RGB画面中按颜色查找RGB模板（只靠颜色区分的图标使用），找到时返回 (x, y, w, h)，否则返回None"""
+    template_height, template_width = template_rgb.shape[:2]
+    if frame.shape[0] < template_height or frame.shape[1] < template_width:
+        return None
+    scores = cv2.matchTemplate(np.ascontiguousarray(frame[:, :, :3]), template_rgb, cv2.TM_CCOEFF_NORMED)
+    _, max_score, _, max_location = cv2.minMaxLoc(scores)
+    if max_score >= confidence:
+        return (max_location[0], max_location[1], template_width, template_height)
+    return None
+
+
+def template_present(template, confidence=0.8, grayscale=False):
+    """生成模板匹配条件：在画面中找到模板时返回其位置 (x, y, w, h)
+
+    Args:
+        template: 模板图像（PIL图像或RGB numpy数组）
+        confidence: 匹配阈值（归一化相关系数）
+        grayscale: 是否在帧的灰度平面上匹配（同一帧上的多个灰度条件共用一次转换）；
+                   已赞/未赞这类只靠颜色区分的图标保持按颜色匹配
+    """
+    template_rgb = np.ascontiguousarray(np.asarray(template)[:, :, :3])
+    template_gray = cv2.cvtColor(template_rgb, cv2.COLOR_RGB2GRAY) if grayscale else None
+    asset = template_label(template)
+
+    def predicate(frame):
+        start = time.perf_counter()
+        try:
+            if grayscale:
+                return match_gray_template(frame.gray, template_gray, confidence)
+            return match_color_template(frame.rgb, template_rgb, confidence)
+        finally:
+            TEMPLATE_MATCH_LATENCY.observe(time.perf_counter() - start, asset=asset)
+
+    return predicate
+
+
+def color_present(color_rgb, tolerance=20, min_pixels=30):
+    """生成颜色条件：画面中与指定颜色相近的像素足够多时返回像素数"""
+    def predicate(frame):
+        count = cv2.countNonZero(frame.mask(color_rgb, tolerance))
+        return count if count >= min_pixels else None
+
+    return predicate
+
+
+def text_present(text, ocr_func=None, site="text_present"):
+    """生成文字条件：OCR识别到包含指定文字的行时返回其中心点（开销较大，轮询间隔应放宽）
+
+    ocr_func 为OCR引擎的 recognize_text（接受 site 参数），site 为OCR耗时指标的调用位置标签
+    """
+    def predicate(frame):
+        recognize = ocr_func
+        if recognize is None:
+            from rapid_ocr_engine import get_ocr_engine
+            recognize = get_ocr_engine().recognize_text
+        for detection in recognize(frame.rgb, site=site) or []:
+            if len(detection) >= 2 and text in detection[1]:
+                bbox = detection[0]
+                return (int(sum(point[0] for point in bbox) / 4), int(sum(point[1] for point in bbox) / 4))
+        return None
+
+    return predicate
+
+
+def any_of(**predicates):
+    """组合多个条件：返回第一个满足的 (条件名, 返回值)"""
+    def predicate(frame):
+        for name, check in predicates.items():
+            value = check(frame)
+            if value:
+                return (name, value)
+        return None
+
+    return predicate
+
+
+@traced("wait_for", "wait")
+def wait_for(predicate, region=None, timeout=2.0, poll_interval=POLL_INTERVAL, stop_flag_func=None):
+    """等待条件满足：轮询截取区域画面并检查条件，满足时立即返回
+
+    Args:
+        predicate: 条件函数，输入区域画面 perception.Frame，返回真值表示满足（返回值会保存在 WaitResult.value）
+        region: 截取区域 (left, top, width, height)，None表示全屏
+        timeout: 最长等待时间（秒）
+        poll_interval: 轮询间隔（秒）
+        stop_flag_func: 停止标志检查函数
+
+    Returns:
+        WaitResult，elapsed 为观测到的界面响应延迟
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+
+    while True:
+        if stop_flag_func and stop_flag_func():
+            return WaitResult(False, time.perf_counter() - start, "stopped")
+
+        rgb = capture_region(region)
+        if rgb is not None:
+            with Frame(rgb, region) as frame:
+                try:
+                    value = predicate(frame)
+                except Exception as e:
+                    logger.warning("⚠️ 等待条件检查出错: %s", e)
+                    value = None
+            if value:
+                return WaitResult(True, time.perf_counter() - start, "found", value)
+
+        now = time.perf_counter()
+        if now >= deadline:
+            return WaitResult(False, now - start, "timeout")
+        if cancellation.sleep(min(poll_interval, deadline - now), stop_flag_func):
+            return WaitResult(False, time.perf_counter() - start, "stopped")
+
+
+def wait_for_template(template, region=None, timeout=2.0, confidence=0.8,
+                      poll_interval=POLL_INTERVAL, stop_flag_func=None):
+    """等待模板出现，WaitResult.value 为屏幕坐标 (x, y, w, h)"""
+    result = wait_for(template_present(template, confidence), region, timeout, poll_interval, stop_flag_func)
+    result.value = offset_box(result.value, region)
+    return result
+
+
+def wait_for_text(text, region=None, timeout=3.0, ocr_func=None, poll_interval=0.3, stop_flag_func=None):
+    """等待文字出现，WaitResult.value 为屏幕坐标中心点 (x, y)"""
+    result = wait_for(text_present(text, ocr_func), region, timeout, poll_interval, stop_flag_func)
+    if result.value and region:
+        result.value = (result.value[0] + region[0], result.value[1] + region[1])
+    return result
@@ -17,6 +17,14 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QFont, QIcon, QPalette, QColor, QPixmap, QPainter, QLinearGradient, QTextCursor
 
+from cancellation import CancellationToken
+from config_store import CONFIG_FILE, update_config
+from logging_config import get_logger
+from metrics import metrics
+from profiling import profiler
+
+logger = get_logger(__name__)
+
 # 导入OCR引擎模块（延迟初始化）
 try:
     from rapid_ocr_engine import get_ocr_engine
@@ -52,7 +60,7 @@ try:
     from wechat_core_engine import (
         search_contact, search_group, find_and_click_pengyouquan_with_dianzan,
         ensure_wechat_is_active, pengyouquan_dianzan_action, pengyouquan_multi_dianzan_action,
-        find_and_click_pengyouquan, adjust_pengyouquan_window_size
+        find_and_click_pengyouquan, adjust_pengyouquan_window_size, common_countdown_wait
     )
     print("✅ GUI环境：微信核心引擎已加载")
 except ImportError as e:
@@ -294,8 +302,8 @@ class WeChatAutomationGUI(QMainWindow):
         self.worker_thread = None
         self._switching_type = False  # 初始化切换标志
         self._previous_mode = 'contact'  # 初始化为联系人模式
-        self._stop_broadcast = False  # 停止群发消息标志
-        self._stop_moments = False  # 停止朋友圈操作标志
+        self._stop_broadcast = CancellationToken()  # 停止群发消息令牌
+        self._stop_moments = CancellationToken()  # 停止朋友圈操作令牌
         self.init_ui()
         # 加载上次的输入内容（需要在UI创建后调用）
         self.load_last_inputs()
@@ -1125,6 +1133,31 @@ class WeChatAutomationGUI(QMainWindow):
         
         layout.addWidget(window_group)
         
+        # 性能分析设置区域
+        profile_group = QGroupBox("性能分析")
+        profile_group.setFont(QFont("Microsoft YaHei", 10, QFont.Bold))
+        profile_group.setStyleSheet(window_group.styleSheet())
+        
+        profile_layout = QVBoxLayout(profile_group)
+        profile_layout.setSpacing(15)
+        
+        self.enable_profiling_checkbox = QCheckBox("分析每次操作的耗时和内存分配")
+        self.enable_profiling_checkbox.setFont(QFont("Microsoft YaHei", 10))
+        self.enable_profiling_checkbox.setChecked(profiler.enabled)
+        self.enable_profiling_checkbox.setStyleSheet(self.enable_window_resize_checkbox.styleSheet())
+        self.enable_profiling_checkbox.setToolTip("勾选后每次朋友圈点赞、群发的每个目标都会保存 cProfile 文件和内存分配报告，运行会稍慢")
+        self.enable_profiling_checkbox.stateChanged.connect(
+            lambda state: profiler.set_enabled(state == Qt.Checked))
+        profile_layout.addWidget(self.enable_profiling_checkbox)
+        
+        profile_info_label = QLabel(f"• 报告保存在 {profiler.output_directory()}\n• 反馈运行缓慢的问题时，请附上其中的 .prof 和 _allocations.txt 文件")
+        profile_info_label.setFont(QFont("Microsoft YaHei", 9))
+        profile_info_label.setStyleSheet("color: #666666; padding-left: 25px;")
+        profile_info_label.setWordWrap(True)
+        profile_layout.addWidget(profile_info_label)
+        
+        layout.addWidget(profile_group)
+        
         # 设置区域
         settings_group = QGroupBox("说明")
         settings_group.setFont(QFont("Microsoft YaHei", 10, QFont.Bold))
@@ -1348,8 +1381,9 @@ class WeChatAutomationGUI(QMainWindow):
     
     def start_broadcast(self):
         """启动群发消息功能 - 支持多个联系人/群聊"""
-        # 重置停止标志
-        self._stop_broadcast = False
+        # 每次启动使用新的停止令牌，工作线程只持有本次的令牌
+        self._stop_broadcast = CancellationToken()
+        stop_token = self._stop_broadcast
         
         target_names_input = self.name_input.text().strip()
         if not target_names_input:
@@ -1382,13 +1416,14 @@ class WeChatAutomationGUI(QMainWindow):
         
         def broadcast_worker():
             # 在函数开始时立即检查停止标志
-            if self._stop_broadcast:
+            if stop_token.cancelled:
                 self.update_status("⏹️ 操作已停止", "#FF9800")
                 return
                 
             success_count = 0
             failed_count = 0
             failed_names = []
+            metrics.start_exporter()
             
             try:
                 # 首先启动微信（联系人和群聊都需要）
@@ -1414,12 +1449,8 @@ class WeChatAutomationGUI(QMainWindow):
                     
                     # 等待微信窗口出现
                     self.update_status("⏳ 等待微信窗口弹出...", "#FF9800")
-                    # 使用更小的时间片来保持GUI响应
-                    for _ in range(30):  # 将3秒分成30个0.1秒
-                        time.sleep(0.1)
-                        QApplication.processEvents()  # 处理GUI事件
-                        if self._stop_broadcast:  # 检查停止标志
-                            return
+                    if stop_token.wait(3):  # 停止时立即返回
+                        return
                     
                     self.update_status("✅ 微信窗口已弹出", "#4CAF50")
                     
@@ -1431,16 +1462,16 @@ class WeChatAutomationGUI(QMainWindow):
                 self.update_status("🎯 正在激活微信窗口...", "#FF9800")
                 ensure_wechat_is_active()
                 
-                # 根据类型选择搜索功能
+                # 根据类型选择搜索功能（异步运行时的同步接口，参数与原函数相同）
                 if is_contact:
-                    from wechat_core_engine import search_contact as real_search_function
+                    from async_runtime import search_contact_sync as real_search_function
                 else:
-                    from wechat_core_engine import search_group as real_search_function
+                    from async_runtime import search_group_sync as real_search_function
                 
                 # 逐个处理每个联系人/群聊
                 for i, target_name in enumerate(target_names, 1):
                     # 检查是否需要停止
-                    if self._stop_broadcast:
+                    if stop_token.cancelled:
                         self.update_status("⏹️ 用户停止了群发操作", "#FF9800")
                         break
                         
@@ -1469,11 +1500,12 @@ class WeChatAutomationGUI(QMainWindow):
                         builtins.input = mock_input
                         
                         try:
-                            # 传递search_term、message、ensure_active=False和停止检查函数
-                            result = real_search_function(search_term=target_name, message=message_content, ensure_active=False, stop_flag_func=lambda: self._stop_broadcast)
+                            # 传递search_term、message、ensure_active=False和停止检查函数（开启性能分析时每个目标单独分析）
+                            with profiler.profile(f"broadcast_{target_name}"):
+                                result = real_search_function(search_term=target_name, message=message_content, ensure_active=False, stop_flag_func=stop_token)
                             
                             # 检查是否在操作过程中被停止
-                            if self._stop_broadcast:
+                            if stop_token.cancelled:
                                 self.update_status("⏹️ 操作已停止", "#FF9800")
                                 return
                             
@@ -1492,28 +1524,11 @@ class WeChatAutomationGUI(QMainWindow):
                         if i < len(target_names):
                             self.update_status(f"⏳ 等待 {wait_minutes} 分钟后处理下一个{target_type}...", "#FF9800")
                             
-                            # 倒计时显示 - 使用更小的时间片来保持GUI响应
-                            for remaining_seconds in range(wait_seconds, 0, -1):
-                                # 检查是否需要停止
-                                if self._stop_broadcast:
-                                    self.update_status("⏹️ 用户在等待期间停止了群发操作", "#FF9800")
-                                    return
-                                    
-                                remaining_minutes = remaining_seconds // 60
-                                remaining_secs = remaining_seconds % 60
-                                if remaining_minutes > 0:
-                                    time_str = f"{remaining_minutes}分{remaining_secs:02d}秒"
-                                else:
-                                    time_str = f"{remaining_secs}秒"
-                                
-                                self.update_status(f"⏳ 倒计时: {time_str} (下一个: {target_names[i] if i < len(target_names) else '无'})", "#FF9800")
-                                
-                                # 使用更小的时间片来保持GUI响应
-                                for _ in range(10):  # 将1秒分成10个0.1秒
-                                    time.sleep(0.1)
-                                    QApplication.processEvents()  # 处理GUI事件
-                                    if self._stop_broadcast:  # 在每个时间片都检查停止标志
-                                        return
+                            # 倒计时显示，停止令牌取消时立即返回
+                            if not common_countdown_wait(wait_seconds, lambda message: self.update_status(message, "#FF9800"),
+                                                         target_names[i] if i < len(target_names) else '无', stop_token):
+                                self.update_status("⏹️ 用户在等待期间停止了群发操作", "#FF9800")
+                                return
                             
                     except Exception as e:
                         failed_count += 1
@@ -1528,6 +1543,12 @@ class WeChatAutomationGUI(QMainWindow):
             except Exception as e:
                 self.update_status(f"❌ 群发出错: {str(e)}", "#f44336")
             finally:
+                try:
+                    from wechat_core_engine import save_timing_profile
+                    save_timing_profile()
+                except Exception as e:
+                    logger.warning("⚠️ 保存时序档案失败: %s", e)
+                metrics.report("broadcast_worker")
                 self.show_progress(False)
                 self.broadcast_btn.setEnabled(True)
                 self.stop_broadcast_btn.setEnabled(False)
@@ -1536,7 +1557,7 @@ class WeChatAutomationGUI(QMainWindow):
     
     def stop_broadcast_operation(self):
         """停止群发消息操作"""
-        self._stop_broadcast = True  # 设置停止标志
+        self._stop_broadcast.cancel()  # 取消令牌，所有等待立即返回
         self.update_status("⏹️ 正在停止操作...", "#FF9800")
         self.show_progress(False)
         self.broadcast_btn.setEnabled(True)
@@ -1547,8 +1568,9 @@ class WeChatAutomationGUI(QMainWindow):
     
     def start_moments_function(self):
         """启动朋友圈功能 - 打开朋友圈并进行点赞"""
-        # 重置停止标志
-        self._stop_moments = False
+        # 每次启动使用新的停止令牌，工作线程只持有本次的令牌
+        self._stop_moments = CancellationToken()
+        stop_token = self._stop_moments
         
         user_names_input = self.moments_name_input.text().strip()
         if not user_names_input:
@@ -1588,7 +1610,7 @@ class WeChatAutomationGUI(QMainWindow):
         
         def moments_worker():
             # 在函数开始时立即检查停止标志
-            if self._stop_moments:
+            if stop_token.cancelled:
                 self.update_status("⏹️ 操作已停止", "#FF9800")
                 return
                 
@@ -1608,7 +1630,7 @@ class WeChatAutomationGUI(QMainWindow):
                     return
                 
                 # 然后打开朋友圈
-                if not find_and_click_pengyouquan(stop_flag_func=lambda: self._stop_moments):
+                if not find_and_click_pengyouquan(stop_flag_func=stop_token):
                     self.update_status("❌ 打开朋友圈失败", "#f44336")
                     return
                 
@@ -1621,7 +1643,7 @@ class WeChatAutomationGUI(QMainWindow):
                         from wechat_core_engine import get_pengyouquan_window_region
                         # 通过get_pengyouquan_window_region函数来触发窗口调整
                         pengyouquan_region = get_pengyouquan_window_region(
-                            stop_flag_func=lambda: self._stop_moments, 
+                            stop_flag_func=stop_token, 
                             enable_window_resize=True
                         )
                         if pengyouquan_region:
@@ -1647,10 +1669,10 @@ class WeChatAutomationGUI(QMainWindow):
                         self.update_status(message, "#FF9800")
                     
                     # 调用多用户并发点赞功能，传递等待时间参数、回调函数、评论参数和停止检查函数
-                    results = pengyouquan_multi_dianzan_action(user_names, wait_seconds, status_update_callback, enable_comment, comment_text, stop_flag_func=lambda: self._stop_moments)
+                    results = pengyouquan_multi_dianzan_action(user_names, wait_seconds, status_update_callback, enable_comment, comment_text, stop_flag_func=stop_token)
                     
                     # 检查是否在操作过程中被停止
-                    if self._stop_moments:
+                    if stop_token.cancelled:
                         self.update_status("⏹️ 操作已停止", "#FF9800")
                         return
                     
@@ -1677,17 +1699,17 @@ class WeChatAutomationGUI(QMainWindow):
                         # 逐个处理每个用户
                         for i, user_name in enumerate(user_names, 1):
                             # 检查是否需要停止
-                            if self._stop_moments:
+                            if stop_token.cancelled:
                                 self.update_status("⏹️ 用户停止了朋友圈操作", "#FF9800")
                                 break
                                 
                             self.update_status(f"👍 ({i}/{len(user_names)}) 正在查找并点赞: {user_name}", "#FF9800")
                             
                             try:
-                                result = pengyouquan_dianzan_action(user_name, enable_comment, comment_text, stop_flag_func=lambda: self._stop_moments)
+                                result = pengyouquan_dianzan_action(user_name, enable_comment, comment_text, stop_flag_func=stop_token)
                                 
                                 # 检查是否在操作过程中被停止
-                                if self._stop_moments:
+                                if stop_token.cancelled:
                                     self.update_status("⏹️ 操作已停止", "#FF9800")
                                     return
                                 
@@ -1703,28 +1725,11 @@ class WeChatAutomationGUI(QMainWindow):
                                 if i < len(user_names):
                                     self.update_status(f"⏳ 等待 {wait_minutes} 分钟后点赞下一个用户...", "#FF9800")
                                     
-                                    # 倒计时显示 - 使用更小的时间片来保持GUI响应
-                                    for remaining_seconds in range(wait_seconds, 0, -1):
-                                        # 检查是否需要停止
-                                        if self._stop_moments:
-                                            self.update_status("⏹️ 用户在等待期间停止了朋友圈操作", "#FF9800")
-                                            return
-                                            
-                                        remaining_minutes = remaining_seconds // 60
-                                        remaining_secs = remaining_seconds % 60
-                                        if remaining_minutes > 0:
-                                            time_str = f"{remaining_minutes}分{remaining_secs:02d}秒"
-                                        else:
-                                            time_str = f"{remaining_secs}秒"
-                                        
-                                        self.update_status(f"⏳ 倒计时: {time_str} (下一个: {user_names[i] if i < len(user_names) else '无'})", "#FF9800")
-                                        
-                                        # 使用更小的时间片来保持GUI响应
-                                        for _ in range(10):  # 将1秒分成10个0.1秒
-                                            time.sleep(0.1)
-                                            QApplication.processEvents()  # 处理GUI事件
-                                            if self._stop_moments:  # 在每个时间片都检查停止标志
-                                                return
+                                    # 倒计时显示，停止令牌取消时立即返回
+                                    if not common_countdown_wait(wait_seconds, lambda message: self.update_status(message, "#FF9800"),
+                                                                 user_names[i] if i < len(user_names) else '无', stop_token):
+                                        self.update_status("⏹️ 用户在等待期间停止了朋友圈操作", "#FF9800")
+                                        return
                                         
                             except Exception as e:
                                 failed_count += 1
@@ -1752,7 +1757,7 @@ class WeChatAutomationGUI(QMainWindow):
     
     def stop_moments_operation(self):
         """停止朋友圈操作"""
-        self._stop_moments = True  # 设置停止标志
+        self._stop_moments.cancel()  # 取消令牌，所有等待立即返回
         self.update_status("⏹️ 正在停止朋友圈操作...", "#FF9800")
         self.show_progress(False)
         self.start_moments_btn.setEnabled(True)
@@ -1810,66 +1815,56 @@ class WeChatAutomationGUI(QMainWindow):
             if hasattr(self, '_switching_type') and self._switching_type:
                 return
                 
-            import json
-            import os
-            
-            # 读取现有配置
-            config_file = "wechat_config.json"
-            config = {}
-            if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-            
-            # 确保last_inputs存在，但不清空现有数据
-            if 'last_inputs' not in config:
-                config['last_inputs'] = {}
-            
-            if hasattr(self, 'message_input'):
-                config['last_inputs']['message_content'] = self.message_input.toPlainText()
+            def apply(config):
+                # 确保last_inputs存在，但不清空现有数据
+                if 'last_inputs' not in config:
+                    config['last_inputs'] = {}
+                
+                if hasattr(self, 'message_input'):
+                    config['last_inputs']['message_content'] = self.message_input.toPlainText()
             
-            # 分别保存联系人和群聊名称
-            if hasattr(self, 'name_input') and hasattr(self, 'contact_radio'):
-                current_names = self.name_input.text()
+                # 分别保存联系人和群聊名称
+                if hasattr(self, 'name_input') and hasattr(self, 'contact_radio'):
+                    current_names = self.name_input.text()
                 
-                # 初始化字段（如果不存在）
-                if 'contact_names' not in config['last_inputs']:
-                    config['last_inputs']['contact_names'] = ""
-                if 'group_names' not in config['last_inputs']:
-                    config['last_inputs']['group_names'] = ""
+                    # 初始化字段（如果不存在）
+                    if 'contact_names' not in config['last_inputs']:
+                        config['last_inputs']['contact_names'] = ""
+                    if 'group_names' not in config['last_inputs']:
+                        config['last_inputs']['group_names'] = ""
                 
-                # 根据当前选择的模式保存到对应字段
-                if self.contact_radio.isChecked():
-                    #print(f"💾 保存联系人名称: '{current_names}' (联系人模式选中)")
-                    config['last_inputs']['contact_names'] = current_names
-                else:
-                    #print(f"💾 保存群聊名称: '{current_names}' (群聊模式选中)")
-                    config['last_inputs']['group_names'] = current_names
+                    # 根据当前选择的模式保存到对应字段
+                    if self.contact_radio.isChecked():
+                        #print(f"💾 保存联系人名称: '{current_names}' (联系人模式选中)")
+                        config['last_inputs']['contact_names'] = current_names
+                    else:
+                        #print(f"💾 保存群聊名称: '{current_names}' (群聊模式选中)")
+                        config['last_inputs']['group_names'] = current_names
                     
-                # 调试信息：显示保存后的配置
-                #print(f"📋 保存后配置: contact_names='{config['last_inputs'].get('contact_names', '')}', group_names='{config['last_inputs'].get('group_names', '')}'")
+                    # 调试信息：显示保存后的配置
+                    #print(f"📋 保存后配置: contact_names='{config['last_inputs'].get('contact_names', '')}', group_names='{config['last_inputs'].get('group_names', '')}'")
             
-            if hasattr(self, 'contact_radio'):
-                config['last_inputs']['is_contact'] = self.contact_radio.isChecked()
+                if hasattr(self, 'contact_radio'):
+                    config['last_inputs']['is_contact'] = self.contact_radio.isChecked()
             
-            if hasattr(self, 'moments_name_input'):
-                config['last_inputs']['moments_names'] = self.moments_name_input.text()
+                if hasattr(self, 'moments_name_input'):
+                    config['last_inputs']['moments_names'] = self.moments_name_input.text()
             
-            if hasattr(self, 'moments_wait_time_spinbox'):
-                config['last_inputs']['wait_minutes'] = self.moments_wait_time_spinbox.value()
+                if hasattr(self, 'moments_wait_time_spinbox'):
+                    config['last_inputs']['wait_minutes'] = self.moments_wait_time_spinbox.value()
             
-            if hasattr(self, 'enable_comment_checkbox'):
-                config['last_inputs']['enable_comment'] = self.enable_comment_checkbox.isChecked()
+                if hasattr(self, 'enable_comment_checkbox'):
+                    config['last_inputs']['enable_comment'] = self.enable_comment_checkbox.isChecked()
             
-            if hasattr(self, 'comment_text_input'):
-                config['last_inputs']['comment_text'] = self.comment_text_input.text()
+                if hasattr(self, 'comment_text_input'):
+                    config['last_inputs']['comment_text'] = self.comment_text_input.text()
             
-            # 保存窗口大小调整选项
-            if hasattr(self, 'enable_window_resize_checkbox'):
-                config['last_inputs']['enable_window_resize'] = self.enable_window_resize_checkbox.isChecked()
+                # 保存窗口大小调整选项
+                if hasattr(self, 'enable_window_resize_checkbox'):
+                    config['last_inputs']['enable_window_resize'] = self.enable_window_resize_checkbox.isChecked()
             
-            # 写入配置文件
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            # 在配置锁内读取-修改-原子写回，不会与时序档案等其他写入互相覆盖
+            update_config(apply)
                 
         except Exception as e:
             # 静默处理错误，避免频繁的错误提示
@@ -1883,28 +1878,21 @@ class WeChatAutomationGUI(QMainWindow):
                 print("🚫 正在切换类型，跳过名称保存")
                 return
                 
-            import json
-            import os
+            # 分别保存联系人和群聊名称
+            if not (hasattr(self, 'name_input') and hasattr(self, 'contact_radio')):
+                return
             
-            # 读取现有配置
-            config_file = "wechat_config.json"
-            config = {}
-            if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            current_names = self.name_input.text().strip()
             
-            # 确保last_inputs存在
-            if 'last_inputs' not in config:
-                config['last_inputs'] = {}
+            # 如果输入为空，跳过保存
+            if not current_names:
+                print("🚫 输入框为空，跳过名称保存")
+                return
             
-            # 分别保存联系人和群聊名称
-            if hasattr(self, 'name_input') and hasattr(self, 'contact_radio'):
-                current_names = self.name_input.text().strip()
-                
-                # 如果输入为空，跳过保存
-                if not current_names:
-                    print("🚫 输入框为空，跳过名称保存")
-                    return
+            def apply(config):
+                # 确保last_inputs存在
+                if 'last_inputs' not in config:
+                    config['last_inputs'] = {}
                 
                 # 初始化字段（如果不存在）
                 if 'contact_names' not in config['last_inputs']:
@@ -1923,9 +1911,8 @@ class WeChatAutomationGUI(QMainWindow):
                 # 调试信息：显示保存后的配置
                 #print(f"📋 [焦点保存] 保存后配置: contact_names='{config['last_inputs'].get('contact_names', '')}', group_names='{config['last_inputs'].get('group_names', '')}'")
             
-            # 写入配置文件
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            # 在配置锁内读取-修改-原子写回
+            update_config(apply)
                 
         except Exception as e:
             print(f"❌ 保存名称输入时发生错误: {e}")
@@ -1933,29 +1920,19 @@ class WeChatAutomationGUI(QMainWindow):
     def save_radio_state(self):
         """专门保存单选按钮的状态"""
         try:
-            import json
-            import os
-            
-            # 读取现有配置
-            config_file = "wechat_config.json"
-            config = {}
-            if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-            
-            # 确保last_inputs存在
-            if 'last_inputs' not in config:
-                config['last_inputs'] = {}
-            
-            # 保存单选按钮状态
-            if hasattr(self, 'contact_radio'):
-                is_contact = self.contact_radio.isChecked()
-                config['last_inputs']['is_contact'] = is_contact
-                #print(f"💾 [切换保存] 保存单选按钮状态: is_contact={is_contact}")
+            def apply(config):
+                # 确保last_inputs存在
+                if 'last_inputs' not in config:
+                    config['last_inputs'] = {}
+                
+                # 保存单选按钮状态
+                if hasattr(self, 'contact_radio'):
+                    is_contact = self.contact_radio.isChecked()
+                    config['last_inputs']['is_contact'] = is_contact
+                    #print(f"💾 [切换保存] 保存单选按钮状态: is_contact={is_contact}")
             
-            # 写入配置文件
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            # 在配置锁内读取-修改-原子写回
+            update_config(apply)
                 
         except Exception as e:
             print(f"❌ 保存单选按钮状态时发生错误: {e}")
@@ -1966,7 +1943,7 @@ class WeChatAutomationGUI(QMainWindow):
             import json
             import os
             
-            config_file = "wechat_config.json"
+            config_file = CONFIG_FILE
             if not os.path.exists(config_file):
                 return
             
@@ -2027,7 +2004,7 @@ class WeChatAutomationGUI(QMainWindow):
             import json
             import os
             
-            config_file = "wechat_config.json"
+            config_file = CONFIG_FILE
             if not os.path.exists(config_file):
                 print("⚠️ 配置文件不存在")
                 return
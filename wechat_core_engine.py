@@ -7,14 +7,14 @@
 2. 朋友圈功能（查找指定用户并点赞）
 """
 
-import pyautogui
+import functools
+import logging
+import threading
 import time
 import numpy as np
-import win32gui
-import win32con
-import win32process
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import cv2
 
@@ -43,12 +43,35 @@ def load_image_with_chinese_path(image_path):
         if pil_image.mode != 'RGB':
             pil_image = pil_image.convert('RGB')
         
+        # 记录图标文件名，模板匹配指标按图标统计
+        pil_image.info['asset'] = os.path.basename(image_path)
         return pil_image
         
     except Exception as e:
-        print(f"❌ 加载图像文件失败: {image_path}, 错误: {e}")
+        logger.error("❌ 加载图像文件失败: %s, 错误: %s", image_path, e)
         return None
 
+from frame_analysis import ScrollOffsetEstimator
+from frame_buffers import frame_pool
+from frame_recorder import recorded_stage
+from moments_feed_tracker import MomentsFeedTracker
+from moments_pipeline import MomentsScanPipeline
+from perception import color_mask
+import cancellation
+from input_scheduler import input_scheduler
+from logging_config import get_logger
+from platform_backend import backend
+from metrics import PERCEPTION_PATH, SCROLL_STEPS, metrics
+from profiling import profiled, profiler
+from timing_profile import get_timing_profile
+from tracing import traced
+from screen_state import COMMENT_BOX, MOMENTS_STATES, SEARCH_OPEN, SEARCH_STATES, screen_state
+from ui_locator import locator
+from ui_wait import (any_of, box_center, capture_probe, clamp_region, offset_box, template_present,
+                     text_present, wait_for, wait_until_stable)
+
+logger = get_logger("engine")
+
 # 导入微信启动器
 try:
     from wechat_launcher import WeChatLauncher
@@ -64,20 +87,30 @@ try:
     ocr_engine = get_ocr_engine()
     RAPID_OCR_AVAILABLE = ocr_engine and ocr_engine.is_available()
     if RAPID_OCR_AVAILABLE:
-        print("✅ RapidOCR核心引擎已加载")
+        logger.info("✅ RapidOCR核心引擎已加载")
     else:
-        print("❌ RapidOCR核心引擎加载失败")
+        logger.error("❌ RapidOCR核心引擎加载失败")
 except ImportError as e:
-    print(f"❌ RapidOCR引擎导入失败: {e}")
+    logger.error("❌ RapidOCR引擎导入失败: %s", e)
     ocr_engine = None
     RAPID_OCR_AVAILABLE = False
 
 # 只使用RapidOCR，不再导入其他OCR模块
 
-# 配置pyautogui
-#pyautogui.FAILSAFE = True
-pyautogui.FAILSAFE = False
-pyautogui.PAUSE = 0.5
+# 推测执行：颜色过滤OCR与普通OCR同时启动，颜色过滤未命中时直接使用已在进行的普通OCR结果
+# 需要OCR会话池中至少有2个会话才能真正并行
+SPECULATIVE_OCR = True
+_speculative_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative_ocr")
+_speculative_future = None
+_speculative_lock = threading.Lock()
+
+# 连续多少次按下键画面都没有移动，视为已到达朋友圈底部
+MAX_STILL_SCROLLS = 3
+
+# 朋友圈多目标点赞使用 滚动/截图 → OCR → 决策 流水线（需要动态跟踪器）
+PIPELINED_SCAN = True
+
+# 窗口、截图、输入和剪贴板都通过 platform_backend 访问（pyautogui 的配置也在其中完成）
 
 # 自动化配置已从 wechat_automation 模块导入
 
@@ -87,98 +120,80 @@ pyautogui.PAUSE = 0.5
 
 def find_wechat_main_window():
     """统一的微信主窗口查找函数"""
-    windows = []
-    def enum_windows_callback(hwnd, windows):
-        try:
-            if win32gui.IsWindowVisible(hwnd):
-                window_text = win32gui.GetWindowText(hwnd)
-                # 查找微信主窗口（不是朋友圈窗口）
-                if "微信" in window_text and "朋友圈" not in window_text:
-                    # 验证窗口句柄是否有效
-                    if win32gui.IsWindow(hwnd):
-                        windows.append((hwnd, window_text))
-        except:
-            # 忽略无效窗口
-            pass
-        return True
-    
-    win32gui.EnumWindows(enum_windows_callback, windows)
-    return windows
+    # 查找微信主窗口（不是朋友圈窗口）
+    return [(hwnd, window_text) for hwnd, window_text in backend.list_windows()
+            if "微信" in window_text and "朋友圈" not in window_text]
 
 def is_wechat_in_foreground():
     """检测微信窗口是否已在前台"""
     try:
         # 获取当前前台窗口
-        foreground_hwnd = win32gui.GetForegroundWindow()
+        foreground_hwnd = backend.foreground_window()
         if not foreground_hwnd:
             return False
         
         # 获取前台窗口标题
-        foreground_title = win32gui.GetWindowText(foreground_hwnd)
+        foreground_title = backend.window_title(foreground_hwnd)
         
         # 检查是否是微信窗口（包含"微信"关键字）
         if "微信" in foreground_title:
             return True
         
         # 如果标题检查失败，尝试通过进程名检查
-        try:
-            import psutil
-            pid = win32process.GetWindowThreadProcessId(foreground_hwnd)[1]
-            process = psutil.Process(pid)
-            if "wechat" in process.name().lower() or "weixin" in process.name().lower():
-                return True
-        except:
-            pass
+        process_name = (backend.window_process_name(foreground_hwnd) or "").lower()
+        if "wechat" in process_name or "weixin" in process_name:
+            return True
         
         return False
     except Exception as e:
         # 静默处理错误，避免过多输出
         return False
 
+@traced("ensure_wechat_is_active", "window")
 def ensure_wechat_is_active():
     """
     确保微信窗口处于活动状态的统一函数。
     优先使用subprocess.Popen避免系统托盘窗口失效问题，然后用win32gui验证效果。
     """
-    print("🚀 正在确保微信处于活动状态...")
+    logger.info("🚀 正在确保微信处于活动状态...")
 
     # 1. 优先使用subprocess.Popen启动/唤醒微信（更可靠）
-    print("🔄 使用subprocess.Popen启动/唤醒微信...")
+    logger.info("🔄 使用subprocess.Popen启动/唤醒微信...")
     try:
         if launch_wechat_internal():
             # 等待微信响应
-            time.sleep(2)
+            cancellation.sleep(2)
             
             # 使用win32gui验证窗口是否成功激活到前台
             if activate_wechat_window_internal():
-                print("✅ (Popen -> win32gui) 微信已成功启动并激活")
+                logger.info("✅ (Popen -> win32gui) 微信已成功启动并激活")
                 return True
             else:
-                print("⚠️ (Popen) 微信已启动，尝试强制激活到前台...")
+                logger.warning("⚠️ (Popen) 微信已启动，尝试强制激活到前台...")
                 # 再次尝试激活，有时需要多次尝试
-                time.sleep(1)
+                cancellation.sleep(1)
                 if activate_wechat_window_internal():
-                    print("✅ (Popen -> win32gui) 微信已强制激活到前台")
+                    logger.info("✅ (Popen -> win32gui) 微信已强制激活到前台")
                     return True
                 else:
-                    print("⚠️ (Popen) 微信已启动，但无法确保在前台")
+                    logger.warning("⚠️ (Popen) 微信已启动，但无法确保在前台")
                     return True  # 微信已启动，即使不在前台也可能可以使用
         else:
-            print("❌ (Popen) 启动微信失败，尝试win32gui备用方案...")
+            logger.info("❌ (Popen) 启动微信失败，尝试win32gui备用方案...")
     except Exception as e:
-        print(f"⚠️ (Popen) 启动/唤醒微信时出错: {e}，尝试win32gui备用方案...")
+        logger.warning("⚠️ (Popen) 启动/唤醒微信时出错: %s，尝试win32gui备用方案...", e)
 
     # 2. 如果subprocess.Popen失败，使用win32gui作为备用方案
-    print("🔄 使用win32gui备用方案...")
+    logger.info("🔄 使用win32gui备用方案...")
     try:
         if activate_wechat_window_internal():
-            print("✅ (win32gui) 微信窗口已成功激活")
+            logger.info("✅ (win32gui) 微信窗口已成功激活")
             return True
         else:
-            print("❌ (win32gui) 无法激活微信窗口")
+            logger.info("❌ (win32gui) 无法激活微信窗口")
             return False
     except Exception as e:
-        print(f"❌ (win32gui) 激活失败: {e}")
+        logger.error("❌ (win32gui) 激活失败: %s", e)
         return False
 
 def launch_wechat_internal():
@@ -186,61 +201,171 @@ def launch_wechat_internal():
     if wechat_launcher:
         wechat_path = wechat_launcher.find_wechat_path()
         if not wechat_path:
-            print("  -> (Popen) 未找到微信安装路径")
+            logger.info("  -> (Popen) 未找到微信安装路径")
             return False
     else:
-        print("  -> (Popen) 微信启动器不可用")
+        logger.info("  -> (Popen) 微信启动器不可用")
         return False
     
     try:
         import subprocess
         process = subprocess.Popen([wechat_path])
-        print(f"  -> (Popen) 微信进程已启动 (PID: {process.pid})")
+        logger.info("  -> (Popen) 微信进程已启动 (PID: %s)", process.pid)
         return True
     except Exception as e:
-        print(f"  -> (Popen) 启动微信失败: {str(e)}")
+        logger.error("  -> (Popen) 启动微信失败: %s", e)
         return False
 
+@traced("activate_wechat_window_internal", "window")
 def activate_wechat_window_internal():
     """内部函数：仅用于激活微信窗口"""
     wechat_windows = find_wechat_main_window()
     if not wechat_windows:
-        print("  -> (win32gui) 未找到微信主窗口")
+        logger.info("  -> (win32gui) 未找到微信主窗口")
         return False
 
     hwnd, window_title = wechat_windows[0]
     try:
-        if win32gui.IsWindow(hwnd):
-            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            time.sleep(0.2)
-            win32gui.SetForegroundWindow(hwnd)
-            print(f"  -> (win32gui) 正在激活窗口: {window_title}")
-            time.sleep(0.5) # 等待窗口响应
+        if backend.is_window(hwnd):
+            backend.restore_window(hwnd)
+            cancellation.sleep(0.2)
+            backend.set_foreground(hwnd)
+            logger.info("  -> (win32gui) 正在激活窗口: %s", window_title)
+            cancellation.sleep(0.5) # 等待窗口响应
             # 验证是否成功
-            if win32gui.GetForegroundWindow() == hwnd:
+            if backend.foreground_window() == hwnd:
                 return True
     except Exception as e:
-        print(f"  -> (win32gui) 激活窗口时出错: {e}")
+        logger.error("  -> (win32gui) 激活窗口时出错: %s", e)
     return False
 
+def get_wechat_window_rect():
+    """获取微信主窗口区域 (left, top, width, height)，不激活窗口，找不到时返回None"""
+    try:
+        wechat_windows = find_wechat_main_window()
+        if not wechat_windows:
+            return None
+        left, top, right, bottom = backend.window_rect(wechat_windows[0][0])
+        return clamp_region(left, top, right - left, bottom - top)
+    except Exception:
+        return None
+
+def _timing_params(kind, timeout):
+    """按时序档案推导等待超时和轮询间隔，未指定类型时使用默认值"""
+    if kind is None:
+        return timeout, None
+    profile = get_timing_profile()
+    return profile.timeout(kind, default=timeout), profile.poll_interval(kind)
+
+def _record_timing(kind, result):
+    """将观测到的界面耗时记入时序档案（画面无变化或被停止的等待不计入）"""
+    if kind is not None and result.reason in ("stable", "found", "timeout"):
+        get_timing_profile().record(kind, result.elapsed)
+
+def save_timing_profile():
+    """打印并保存本机的界面时序档案（p50/p95 写入 wechat_config.json）"""
+    profile = get_timing_profile()
+    summary = profile.summary()
+    if summary:
+        logger.info("⏱️ 本机界面时序档案:")
+        for line in summary:
+            logger.info("   %s", line)
+    profile.save()
+
+def act_and_wait_stable(action, region=None, timeout=2.0, stop_flag_func=None, description="界面", kind=None):
+    """执行界面操作后等待画面稳定，代替操作后的固定等待
+    
+    Args:
+        action: 无参数的操作函数（点击、按键等）
+        region: 探测区域 (left, top, width, height)，None表示全屏
+        timeout: 最长等待时间（秒），指定 kind 且样本充足时由时序档案推导
+        stop_flag_func: 停止标志检查函数
+        description: 日志中显示的等待对象
+        kind: 界面变化类型（见 timing_profile.DEFAULT_TIMEOUTS），用于记录和推导等待参数
+    
+    Returns:
+        WaitResult
+    """
+    timeout, poll_interval = _timing_params(kind, timeout)
+    baseline = capture_probe(region)
+    action()
+    if poll_interval is None:
+        result = wait_until_stable(region, timeout=timeout, baseline=baseline, stop_flag_func=stop_flag_func)
+    else:
+        result = wait_until_stable(region, timeout=timeout, baseline=baseline, poll_interval=poll_interval,
+                                   stop_flag_func=stop_flag_func)
+    _record_timing(kind, result)
+    if result.ok:
+        logger.info("⏱️ %s已稳定，用时 %.2f 秒", description, result.elapsed)
+    else:
+        logger.info("⏱️ %s等待结束（%s），用时 %.2f 秒", description, result.reason, result.elapsed)
+    return result
+
+def popup_probe_region(anchor_x, anchor_y):
+    """点赞按钮弹出界面的探测区域（弹出界面出现在按钮左侧）"""
+    return clamp_region(anchor_x - 420, anchor_y - 80, 460, 160)
+
+_asset_images = {}
+_asset_dir = None             # 图标目录，None表示程序的 assets 目录
+
+def set_asset_dir(directory=None):
+    """改用其他目录中的图标（例如模拟器生成的图标），None表示恢复为程序的 assets 目录"""
+    global _asset_dir
+    _asset_dir = directory
+    _asset_images.clear()
+    screen_state.clear_templates()
+
+def get_asset_path(asset_name):
+    """图标文件的路径"""
+    if _asset_dir:
+        return os.path.join(_asset_dir, asset_name)
+    return get_resource_path(f'assets/{asset_name}')
+
+def load_asset_image(asset_name):
+    """加载图标目录下的图标（带缓存），文件不存在或加载失败时返回None"""
+    if asset_name not in _asset_images:
+        asset_path = get_asset_path(asset_name)
+        _asset_images[asset_name] = load_image_with_chinese_path(asset_path) if os.path.exists(asset_path) else None
+    return _asset_images[asset_name]
+
+def act_and_wait_for(action, predicate, region=None, timeout=2.0, stop_flag_func=None, description="界面元素", kind=None):
+    """执行操作后等待界面元素出现，并打印观测到的响应延迟
+    
+    Args:
+        action: 无参数的操作函数（例如点击）
+        predicate: ui_wait 中的条件函数（template_present / any_of 等）
+        region: 截取区域 (left, top, width, height)，None表示全屏
+        timeout: 最长等待时间（秒），指定 kind 且样本充足时由时序档案推导
+        stop_flag_func: 停止标志检查函数
+        description: 日志中显示的等待对象
+        kind: 界面变化类型（见 timing_profile.DEFAULT_TIMEOUTS），用于记录和推导等待参数
+    
+    Returns:
+        WaitResult，value 为条件函数的返回值（坐标相对于 region）
+    """
+    timeout, poll_interval = _timing_params(kind, timeout)
+    action()
+    if poll_interval is None:
+        result = wait_for(predicate, region, timeout=timeout, stop_flag_func=stop_flag_func)
+    else:
+        result = wait_for(predicate, region, timeout=timeout, poll_interval=poll_interval,
+                          stop_flag_func=stop_flag_func)
+    _record_timing(kind, result)
+    if result.ok:
+        logger.info("⏱️ %s已出现，用时 %.2f 秒", description, result.elapsed)
+    else:
+        logger.info("⏱️ %s等待结束（%s），用时 %.2f 秒", description, result.reason, result.elapsed)
+    return result
+
 def verify_search_input_with_ocr(search_term, stop_flag_func=None):
     """统一的OCR验证搜索输入函数"""
-    print("🔍 使用OCR验证中文输入是否成功...")
+    logger.info("🔍 使用OCR验证中文输入是否成功...")
     try:
-        # 截取搜索框区域进行OCR识别
-        screenshot = pyautogui.screenshot()
-        
-        # 获取搜索框精确位置（微信搜索框通常在顶部中央）
-        screen_width, screen_height = pyautogui.size()
-        search_box_region = (
-            int(screen_width * 0.25),  # 左边界：屏幕宽度的25%
-            int(screen_height * 0.08),  # 上边界：屏幕高度的8%
-            int(screen_width * 0.5),   # 宽度：屏幕宽度的50%
-            int(screen_height * 0.08)  # 高度：屏幕高度的8%（更小的高度，只包含搜索框）
-        )
+        # 搜索框位置（微信搜索框通常在顶部中央，见 ui_locator 元素表）
+        search_box_region = locator.region("search_box")
         
-        # 裁剪搜索框区域
-        search_box_screenshot = screenshot.crop(search_box_region)
+        # 只截取搜索框区域进行OCR识别
+        search_box_screenshot = backend.grab(region=search_box_region)
         
         # 保存截图用于调试（可选）
         try:
@@ -251,20 +376,16 @@ def verify_search_input_with_ocr(search_term, stop_flag_func=None):
         
         # 使用全局OCR引擎识别搜索框内容
         if not RAPID_OCR_AVAILABLE or not ocr_engine:
-            print("⚠️ OCR引擎不可用，跳过验证")
+            logger.warning("⚠️ OCR引擎不可用，跳过验证")
             return True
         
-        # 将PIL图像转换为numpy数组
-        import numpy as np
-        img_array = np.array(search_box_screenshot)
-        
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 收到停止信号，中断OCR验证")
+            logger.info("⏹️ 收到停止信号，中断OCR验证")
             return True
             
         # 进行OCR识别
-        ocr_results = ocr_engine.recognize_text(img_array)
+        ocr_results = ocr_engine.recognize_text(search_box_screenshot, site="verify_search_input_with_ocr")
         
         if ocr_results:
             # 提取识别到的文本
@@ -273,16 +394,16 @@ def verify_search_input_with_ocr(search_term, stop_flag_func=None):
                 if len(result) >= 2:
                     recognized_text += result[1]
             
-            print(f"🔍 OCR识别结果: '{recognized_text}'")
+            logger.info("🔍 OCR识别结果: '%s'", recognized_text)
             
             # 检查识别结果是否包含搜索词
             if search_term in recognized_text or recognized_text in search_term:
-                print("✅ OCR验证成功：输入内容正确显示在搜索框中")
+                logger.info("✅ OCR验证成功：输入内容正确显示在搜索框中")
                 return True
             else:
-                print(f"⚠️ OCR验证警告：搜索框显示内容与预期不符")
-                print(f"   预期: '{search_term}'")
-                print(f"   实际: '{recognized_text}'")
+                logger.warning("⚠️ OCR验证警告：搜索框显示内容与预期不符")
+                logger.info("   预期: '%s'", search_term)
+                logger.info("   实际: '%s'", recognized_text)
                 
                 # GUI模式下自动继续搜索
                 return True
@@ -291,51 +412,43 @@ def verify_search_input_with_ocr(search_term, stop_flag_func=None):
             return True
                         
     except Exception as ocr_error:
-        print(f"⚠️ OCR验证失败: {ocr_error}")
-        print("💡 将继续执行搜索...")
+        logger.warning("⚠️ OCR验证失败: %s", ocr_error)
+        logger.info("💡 将继续执行搜索...")
         return True
 
-def create_color_filtered_image(image, target_color_rgb, tolerance=30):
-    """创建基于颜色过滤的图像，保留目标颜色的文字"""
-    if isinstance(image, Image.Image):
-        image_array = np.array(image)
-    else:
-        image_array = image.copy()
+def _filter_by_color(image_array, target_color_rgb, tolerance):
+    """白底黑字的单通道颜色过滤图像：三个通道都在 目标值±容差 范围内的像素为黑色，其余为白色
     
-    # 确保图像是RGB格式
-    if len(image_array.shape) == 3 and image_array.shape[2] == 3:
-        # 如果是BGR格式，转换为RGB
-        if hasattr(image, 'mode') and image.mode == 'RGB':
-            pass  # 已经是RGB
-        else:
-            # 假设是BGR，转换为RGB
-            image_array = cv2.cvtColor(image_array, cv2.COLOR_BGR2RGB)
-    
-    target_r, target_g, target_b = target_color_rgb
-    
-    # 使用更宽松的颜色匹配
-    # 计算每个通道的差异
-    r_diff = np.abs(image_array[:, :, 0].astype(np.int16) - target_r)
-    g_diff = np.abs(image_array[:, :, 1].astype(np.int16) - target_g)
-    b_diff = np.abs(image_array[:, :, 2].astype(np.int16) - target_b)
-    
-    # 创建掩码：所有通道都在容差范围内
-    mask = (r_diff <= tolerance) & (g_diff <= tolerance) & (b_diff <= tolerance)
-    
-    # 创建过滤后的图像：白色背景，黑色文字
-    filtered_image = np.ones_like(image_array) * 255  # 白色背景
-    filtered_image[mask] = [0, 0, 0]  # 匹配的像素设为黑色（文字）
-    
-    # 保存调试图像
+    返回的数组取自帧缓冲池，用完后需调用 frame_pool.release() 归还
+    """
+    # 单通道掩码：所有通道都在容差范围内（OCR引擎直接接受单通道图像，不再扩展为三通道RGB）
+    filtered_image = color_mask(image_array, target_color_rgb, tolerance, pooled=True)
     try:
-        # 调试代码已移除
-        print(f"🎨 目标颜色: RGB{target_color_rgb}, 容差: {tolerance}")
-        print(f"📊 匹配像素数量: {np.sum(mask)}")
-    except:
-        pass
-    
+        # 调试输出：匹配像素计数只在开启调试日志时计算
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🎨 目标颜色: RGB%s, 容差: %s", target_color_rgb, tolerance)
+            logger.debug("📊 匹配像素数量: %d", cv2.countNonZero(filtered_image))
+        
+        # 白色背景，匹配的像素为黑色（文字）
+        cv2.bitwise_not(filtered_image, dst=filtered_image)
+    except Exception:
+        frame_pool.release(filtered_image)
+        raise
     return filtered_image
 
+def create_color_filtered_image(image, target_color_rgb, tolerance=30):
+    """创建基于颜色过滤的图像，保留目标颜色的文字
+    
+    Args:
+        image: 截图（PIL图像或 backend.grab() 返回的RGB numpy数组）
+        target_color_rgb: 目标颜色 (R, G, B)
+        tolerance: 每个通道的容差
+    
+    Returns:
+        白底黑字的单通道数组，取自帧缓冲池，用完后调用 frame_pool.release() 归还
+    """
+    return _filter_by_color(np.asarray(image), target_color_rgb, tolerance)
+
 def color_targeted_ocr_recognition(image, target_name, target_color_rgb=(87, 107, 149), tolerance=20, stop_flag_func=None):
     """使用颜色过滤进行OCR识别"""
     if not RAPID_OCR_AVAILABLE or not ocr_engine or not ocr_engine.is_available():
@@ -343,38 +456,32 @@ def color_targeted_ocr_recognition(image, target_name, target_color_rgb=(87, 107
     
     # 检查停止标志
     if stop_flag_func and stop_flag_func():
-        print("⏹️ 颜色OCR识别被停止")
+        logger.info("⏹️ 颜色OCR识别被停止")
         return None
     
+    color_filtered_image = None
     try:
         # 创建颜色过滤图像
         color_filtered_image = create_color_filtered_image(image, target_color_rgb, tolerance)
         
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 颜色OCR识别被停止")
+            logger.info("⏹️ 颜色OCR识别被停止")
             return None
         
-        # 转换为PIL图像再转为numpy数组
-        if isinstance(color_filtered_image, np.ndarray):
-            filtered_pil = Image.fromarray(color_filtered_image.astype(np.uint8))
-            filtered_array = np.array(filtered_pil)
-        else:
-            filtered_array = np.array(color_filtered_image)
-        
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 颜色OCR识别被停止")
+            logger.info("⏹️ 颜色OCR识别被停止")
             return None
         
-        # 使用RapidOCR识别
-        result = ocr_engine.recognize_text(filtered_array)
+        # 使用RapidOCR识别（过滤图像是uint8单通道数组，直接识别）
+        result = ocr_engine.recognize_text(color_filtered_image, site="color_targeted_ocr_recognition")
         
         if result and len(result) > 0:
             for detection in result:
                 # 检查停止标志
                 if stop_flag_func and stop_flag_func():
-                    print("⏹️ 颜色OCR识别被停止")
+                    logger.info("⏹️ 颜色OCR识别被停止")
                     return None
                     
                 if len(detection) >= 2:
@@ -388,124 +495,147 @@ def color_targeted_ocr_recognition(image, target_name, target_color_rgb=(87, 107
         return None
         
     except Exception as e:
-        print(f"❌ 颜色OCR识别失败: {e}")
+        logger.error("❌ 颜色OCR识别失败: %s", e)
         return None
+    finally:
+        frame_pool.release(color_filtered_image)
 
+@recorded_stage
 def color_targeted_ocr_recognition_yesterday(image, target_name, target_color_rgb=(158, 158, 158), tolerance=40, stop_flag_func=None):
     """专门用于"昨天"标记检测的颜色过滤OCR识别，使用独立的调试文件名"""
     if not RAPID_OCR_AVAILABLE or not ocr_engine or not ocr_engine.is_available():
         return None
     
     try:
-        # 创建颜色过滤图像
-        image_array = np.array(image)
-        target_r, target_g, target_b = target_color_rgb
-        
-        # 计算每个像素与目标颜色的差异
-        r_diff = np.abs(image_array[:, :, 0].astype(np.int16) - target_r)
-        g_diff = np.abs(image_array[:, :, 1].astype(np.int16) - target_g)
-        b_diff = np.abs(image_array[:, :, 2].astype(np.int16) - target_b)
-        
-        # 创建掩码：所有通道都在容差范围内
-        mask = (r_diff <= tolerance) & (g_diff <= tolerance) & (b_diff <= tolerance)
-        
-        # 创建过滤后的图像：白色背景，黑色文字
-        filtered_image = np.ones_like(image_array) * 255  # 白色背景
-        filtered_image[mask] = [0, 0, 0]  # 匹配的像素设为黑色（文字）
-        
-        # 保存专用的调试图像
+        # 创建颜色过滤图像（白色背景，黑色文字）
+        filtered_image = _filter_by_color(np.asarray(image), target_color_rgb, tolerance)
         try:
-            # 调试代码已移除
-            print(f"🎨 目标颜色: RGB{target_color_rgb}, 容差: {tolerance}")
-            print(f"📊 匹配像素数量: {np.sum(mask)}")
-        except:
-            pass
-        
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 收到停止信号，中断OCR识别")
-            return None
-            
-        # 使用RapidOCR识别
-        result = ocr_engine.recognize_text(filtered_image.astype(np.uint8))
+            # 检查停止标志
+            if stop_flag_func and stop_flag_func():
+                logger.info("⏹️ 收到停止信号，中断OCR识别")
+                return None
+                
+            # 使用RapidOCR识别
+            result = ocr_engine.recognize_text(filtered_image, site="color_targeted_ocr_recognition_yesterday")
+        finally:
+            frame_pool.release(filtered_image)
         
         # 打印OCR识别结果用于调试
-        print(f"🔍 OCR识别结果: {result}")
+        logger.debug("🔍 OCR识别结果: %s", result)
         
         if result and len(result) > 0:
-            print(f"📝 识别到 {len(result)} 个文本区域:")
+            logger.debug("📝 识别到 %d 个文本区域:", len(result))
             for i, detection in enumerate(result):
                 if len(detection) >= 2:
                     text = detection[1]
                     confidence = detection[2] if len(detection) > 2 else "未知"
-                    print(f"   {i+1}. 文本: '{text}', 置信度: {confidence}")
+                    logger.debug("   %d. 文本: '%s', 置信度: %s", i + 1, text, confidence)
                     # 检查是否匹配"昨天"或其OCR识别变体
                     yesterday_variants = ["昨天", "咋天", "作天", "昨夭", "咋夭", "作夭"]
                     if any(variant in text for variant in yesterday_variants):
                         bbox = detection[0]
                         center_x = int((bbox[0][0] + bbox[2][0]) / 2)
                         center_y = int((bbox[0][1] + bbox[2][1]) / 2)
-                        print(f"✅ 找到'昨天'标记变体 '{text}' (匹配目标: {target_name})")
+                        logger.info("✅ 找到'昨天'标记变体 '%s' (匹配目标: %s)", text, target_name)
                         return (center_x, center_y)
         else:
-            print("📝 OCR未识别到任何文本")
+            logger.info("📝 OCR未识别到任何文本")
         
         return None
         
     except Exception as e:
-        print(f"❌ '昨天'标记颜色OCR识别失败: {e}")
+        logger.error("❌ '昨天'标记颜色OCR识别失败: %s", e)
         return None
 
-def smart_ocr_recognition(image, target_name, stop_flag_func=None):
-    """智能OCR识别函数，专门识别颜色#576b95的文字（朋友圈用户名颜色）"""
+@profiler.attach
+def _speculative_plain_ocr(img_array):
+    """推测执行的普通OCR（单独的函数，OCR耗时指标中的调用位置可以区分）"""
+    return ocr_engine.recognize_text(img_array, site="speculative_plain_ocr")
+
+def _submit_speculative_ocr(img_array):
+    """启动推测执行的普通OCR
+
+    上一次被放弃的推测OCR仍在运行时不再提交（单线程执行器中会排在它后面，反而比同步识别更慢），
+    返回 None，由调用方在颜色过滤未命中时同步识别。
+    """
+    global _speculative_future
+    with _speculative_lock:
+        if _speculative_future is not None and not _speculative_future.done():
+            logger.debug("⏭️ 上一次推测OCR仍在进行，本次不推测执行")
+            return None
+        _speculative_future = _speculative_executor.submit(_speculative_plain_ocr, img_array)
+        return _speculative_future
+
+@recorded_stage
+def smart_ocr_recognition(image, target_name, stop_flag_func=None, speculative=None):
+    """智能OCR识别函数，专门识别颜色#576b95的文字（朋友圈用户名颜色）
+    
+    Args:
+        image: 截图（PIL图像或numpy数组）
+        target_name: 目标用户名
+        stop_flag_func: 停止标志检查函数
+        speculative: 是否同时启动普通OCR（推测执行），None表示按 SPECULATIVE_OCR 和会话池大小自动决定
+    """
     if not RAPID_OCR_AVAILABLE or not ocr_engine or not ocr_engine.is_available():
-        print("⚠️ RapidOCR引擎不可用")
+        logger.warning("⚠️ RapidOCR引擎不可用")
         return None
     
+    if speculative is None:
+        speculative = SPECULATIVE_OCR and getattr(ocr_engine, 'pool_size', 1) > 1
+    
     # 检查停止标志
     if stop_flag_func and stop_flag_func():
-        print("⏹️ 智能OCR识别被停止")
+        logger.info("⏹️ 智能OCR识别被停止")
         return None
     
     try:
-        # 将PIL图像转换为numpy数组
-        if hasattr(image, 'save'):  # PIL Image
-            img_array = np.array(image)
-        else:
-            img_array = image
+        # PIL图像取数组（backend.grab() 的截图已是numpy数组，不再拷贝）
+        img_array = np.asarray(image)
         
         # 朋友圈用户名的颜色 #576b95 转换为RGB
         target_color_rgb = (87, 107, 149)  # #576b95
         tolerance = 40  # 增加颜色容差
         
-        print(f"\n🎨 使用颜色过滤OCR识别朋友圈用户名 (目标颜色: RGB{target_color_rgb}, 容差: {tolerance})")
+        logger.debug("\n🎨 使用颜色过滤OCR识别朋友圈用户名 (目标颜色: RGB%s, 容差: %s)", target_color_rgb, tolerance)
+        
+        # 推测执行：普通OCR在后台线程与颜色过滤OCR同时进行
+        normal_future = _submit_speculative_ocr(img_array) if speculative else None
         
         # 使用颜色过滤进行OCR识别
-        result = color_targeted_ocr_recognition(image, target_name, target_color_rgb, tolerance, stop_flag_func)
+        result = color_targeted_ocr_recognition(img_array, target_name, target_color_rgb, tolerance, stop_flag_func)
         
         if result:
-            print(f"✅ 找到目标用户名: '{target_name}' 在位置 {result}")
+            logger.info("✅ 找到目标用户名: '%s' 在位置 %s", target_name, result)
+            PERCEPTION_PATH.inc(stage="smart_ocr_recognition", path="color_ocr")
+            if normal_future:
+                # 尚未开始则取消，已在运行则忽略其结果
+                normal_future.cancel()
             return result
         else:
-            print(f"❌ 未找到目标用户名: '{target_name}'")
+            logger.debug("❌ 未找到目标用户名: '%s'", target_name)
             
             # 检查停止标志
             if stop_flag_func and stop_flag_func():
-                print("⏹️ 智能OCR识别被停止")
+                logger.info("⏹️ 智能OCR识别被停止")
+                if normal_future:
+                    normal_future.cancel()
                 return None
             
             # 如果颜色过滤失败，尝试使用普通OCR识别并打印蓝色文字
-            print("🔍 颜色过滤未找到目标，尝试普通OCR识别...")
-            normal_result = ocr_engine.recognize_text(img_array)
+            if normal_future:
+                logger.debug("🔍 颜色过滤未找到目标，使用同时进行的普通OCR识别结果...")
+                normal_result = normal_future.result()
+            else:
+                logger.debug("🔍 颜色过滤未找到目标，尝试普通OCR识别...")
+                normal_result = ocr_engine.recognize_text(img_array, site="smart_ocr_recognition")
             
             # 检查停止标志
             if stop_flag_func and stop_flag_func():
-                print("⏹️ 智能OCR识别被停止")
+                logger.info("⏹️ 智能OCR识别被停止")
                 return None
             
             if normal_result and len(normal_result) > 0:
-                print(f"\n📋 朋友圈OCR识别到的蓝色文字 (共{len(normal_result)}条):")
-                print("=" * 60)
+                logger.debug("\n📋 朋友圈OCR识别到的蓝色文字 (共%d条):\n%s", len(normal_result), "=" * 60)
                 
                 target_found = False
                 target_position = None
@@ -514,7 +644,7 @@ def smart_ocr_recognition(image, target_name, stop_flag_func=None):
                 for i, detection in enumerate(normal_result):
                     # 检查停止标志
                     if stop_flag_func and stop_flag_func():
-                        print("⏹️ 智能OCR识别被停止")
+                        logger.info("⏹️ 智能OCR识别被停止")
                         return None
                         
                     if len(detection) >= 3:
@@ -534,31 +664,35 @@ def smart_ocr_recognition(image, target_name, stop_flag_func=None):
                         # 这里我们假设短文字且置信度较高的可能是用户名
                         if len(text.strip()) <= 20 and confidence > 0.8:
                             blue_text_count += 1
-                            print(f"{blue_text_count:2d}. 可能的用户名: '{text}' | 置信度: {confidence:.3f} | 位置: {position_str}")
+                            logger.debug("%2d. 可能的用户名: '%s' | 置信度: %.3f | 位置: %s",
+                                         blue_text_count, text, confidence, position_str)
                             
                             # 检查是否找到目标文字
                             if target_name in text and not target_found:
                                 target_found = True
                                 try:
                                     target_position = (center_x, center_y)
-                                    print(f"    ✅ 找到目标用户名: '{target_name}' 在位置 {target_position}")
+                                    logger.debug("    ✅ 找到目标用户名: '%s' 在位置 %s", target_name, target_position)
                                 except:
-                                    print(f"    ✅ 找到目标用户名: '{target_name}' 但位置计算失败")
+                                    logger.debug("    ✅ 找到目标用户名: '%s' 但位置计算失败", target_name)
                 
-                print("=" * 60)
+                logger.debug("=" * 60)
                 
                 if target_found and target_position:
-                    print(f"🎯 目标用户名 '{target_name}' 定位成功: {target_position}")
+                    logger.info("🎯 目标用户名 '%s' 定位成功: %s", target_name, target_position)
+                    PERCEPTION_PATH.inc(stage="smart_ocr_recognition", path="plain_ocr")
                     return target_position
                 else:
-                    print(f"❌ 在可能的用户名中未找到目标: '{target_name}'")
+                    logger.info("❌ 在可能的用户名中未找到目标: '%s'", target_name)
+                    PERCEPTION_PATH.inc(stage="smart_ocr_recognition", path="miss")
                     return None
             else:
-                print("📋 普通OCR识别结果也为空")
+                logger.info("📋 普通OCR识别结果也为空")
+                PERCEPTION_PATH.inc(stage="smart_ocr_recognition", path="miss")
                 return None
         
     except Exception as e:
-        print(f"❌ 智能OCR识别失败: {e}")
+        logger.error("❌ 智能OCR识别失败: %s", e)
         return None
 
 # 已删除enhanced_ocr_with_umi函数，只使用RapidOCR进行识别
@@ -567,849 +701,544 @@ def smart_ocr_recognition(image, target_name, stop_flag_func=None):
 
 
 
-def get_wechat_window_screenshot():
-    """获取微信窗口的截图"""
+@traced("activate_wechat_window_for_capture", "window")
+def activate_wechat_window_for_capture():
+    """激活并恢复微信窗口（过小时最大化），返回窗口区域 (left, top, width, height)，失败时返回None"""
     try:
         # 使用统一的窗口查找函数
         wechat_windows = find_wechat_main_window()
         if not wechat_windows:
-            print("❌ 未找到微信窗口")
-            return None, None
+            logger.info("❌ 未找到微信窗口")
+            return None
         
         hwnd, window_title = wechat_windows[0]
-        print(f"✅ 找到微信窗口: {window_title}")
+        logger.info("✅ 找到微信窗口: %s", window_title)
         
         # 确保窗口被正确激活和恢复
         try:
             # 先恢复窗口（如果被最小化）
-            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            time.sleep(0.5)
+            backend.restore_window(hwnd)
+            cancellation.sleep(0.5)
             
             # 设置为前台窗口
-            win32gui.SetForegroundWindow(hwnd)
-            time.sleep(0.5)
+            backend.set_foreground(hwnd)
+            cancellation.sleep(0.5)
             
             # 再次检查窗口状态，如果太小则最大化
-            rect = win32gui.GetWindowRect(hwnd)
+            rect = backend.window_rect(hwnd)
             x, y, right, bottom = rect
             width = right - x
             height = bottom - y
             
             # 如果窗口太小（可能是最小化状态），尝试最大化
             if width < 400 or height < 300:
-                print(f"⚠️ 窗口尺寸过小 ({width}x{height})，尝试最大化...")
-                win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
-                time.sleep(1)
+                logger.warning("⚠️ 窗口尺寸过小 (%sx%s)，尝试最大化...", width, height)
+                backend.maximize_window(hwnd)
+                cancellation.sleep(1)
                 
                 # 重新获取窗口位置和大小
-                rect = win32gui.GetWindowRect(hwnd)
+                rect = backend.window_rect(hwnd)
                 x, y, right, bottom = rect
                 width = right - x
                 height = bottom - y
             
         except Exception as e:
-            print(f"⚠️ 窗口激活过程中出现问题: {e}")
+            logger.warning("⚠️ 窗口激活过程中出现问题: %s", e)
         
-        print(f"📐 微信窗口位置: ({x}, {y}) 尺寸: {width}x{height}")
-        
-        # 截取微信窗口
-        window_screenshot = pyautogui.screenshot(region=(x, y, width, height))
-        
-        return window_screenshot, (x, y, width, height)
+        logger.debug("📐 微信窗口位置: (%s, %s) 尺寸: %sx%s", x, y, width, height)
+        return (x, y, width, height)
         
     except Exception as e:
-        print(f"❌ 获取微信窗口截图失败: {e}")
-        return None, None
+        logger.error("❌ 获取微信窗口位置失败: %s", e)
+        return None
 
-def find_contact_in_search_results(search_term):
-    """使用OCR识别搜索结果，查找"联系人"标识并定位联系人"""
+def capture_search_results_region():
+    """只截取搜索结果区域，不截取整个窗口或全屏再裁剪
+
+    Returns:
+        (截图数组, 截图区域 (left, top, width, height) 屏幕坐标, 微信窗口区域)；
+        截图中的坐标加上截图区域的左上角即为屏幕坐标。找不到微信窗口时按屏幕估算区域，窗口区域为None
+    """
+    window_rect = activate_wechat_window_for_capture()
+    
+    if window_rect is None:
+        logger.info("❌ 无法获取微信窗口，按屏幕位置截取搜索结果区域作为备用方案")
+        screen_width, screen_height = backend.screen_size()
+        search_results_region = (
+            20,  # 左边界：向右移动20像素
+            int(screen_height * 0.15) - 10,  # 上边界：向上移动10像素
+            int(screen_width * 0.4) - 20,    # 宽度：减少20像素
+            int(screen_height * 0.7)    # 高度：屏幕高度的70%
+        )
+    else:
+        window_x, window_y, window_width, window_height = window_rect
+        
+        # 计算搜索结果区域（相对于微信窗口）
+        # 微信搜索结果通常在窗口的左侧部分
+        relative_region = (
+            0,  # 左边界：从窗口左边开始
+            int(window_height * 0.1) - 10,  # 上边界：窗口高度的10% - 10像素（向上调整）
+            int(window_width * 0.45),   # 宽度：窗口宽度的45%（搜索结果区域）
+            int(window_height * 0.8) + 10    # 高度：窗口高度的80% + 10像素（补偿向上移动）
+        )
+        logger.debug("📐 搜索结果区域（相对于微信窗口）: 左上角(%s, %s) 尺寸(%sx%s)", *relative_region)
+        search_results_region = (window_x + relative_region[0], window_y + relative_region[1],
+                                 relative_region[2], relative_region[3])
+    
+    # 限制在屏幕范围内，截图区域的左上角就是截图坐标到屏幕坐标的偏移
+    search_results_region = clamp_region(*search_results_region) or (0, 0) + backend.screen_size()
+    logger.debug("📐 截图区域: 左上角(%s, %s) 尺寸(%sx%s)", *search_results_region)
+    return backend.grab(region=search_results_region), search_results_region, window_rect
+
+def open_search_box(stop_flag_func=None):
+    """使用快捷键 Ctrl+F 打开搜索框，有把握确认搜索框已打开（且为空）时跳过
+
+    识别没有把握时照常按 Ctrl+F：多按一次无害，错误地跳过会把搜索内容粘贴到聊天输入框中。
+    """
+    state = screen_state.classify()
+    if state.state == SEARCH_OPEN and state.confident:
+        logger.info("✅ 搜索框已打开，跳过 Ctrl+F")
+        return
+    logger.info("⌨️ 在微信界面使用快捷键 Ctrl+F 打开搜索...")
+    # 等待搜索框出现
+    act_and_wait_stable(lambda: input_scheduler.hotkey('ctrl', 'f', post_delay=0), get_wechat_window_rect(), timeout=3,
+                        stop_flag_func=stop_flag_func, description="搜索框", kind="search_box")
+
+def confirm_left_search():
+    """点击搜索结果后确认已离开搜索界面（不做OCR），仍停留在搜索界面时返回False"""
+    state = screen_state.classify()
+    if state.state in SEARCH_STATES and state.confident:
+        logger.warning("⚠️ 点击后仍停留在搜索界面（%s），未进入聊天", state.state)
+        return False
+    return True
+
+
+def _click_search_result(search_term, locate, target_type):
+    """截取搜索结果区域，用 locate 定位目标并点击，确认已进入聊天界面
+
+    Args:
+        search_term: 搜索内容
+        locate: 定位函数 (截图, 搜索内容) -> 相对截图的 (x, y) 或None
+        target_type: 日志中显示的目标类型（"联系人" / "群聊"）
+    """
     try:
-        # 获取微信窗口截图
-        window_screenshot, window_rect = get_wechat_window_screenshot()
-        window_screenshot_used = False  # 标记是否使用了窗口截图
-        
-        if window_screenshot is None:
-            print("❌ 无法获取微信窗口截图，使用全屏截图作为备用方案")
-            # 备用方案：使用全屏截图
-            full_screenshot = pyautogui.screenshot()
-            screen_width, screen_height = pyautogui.size()
-            search_results_region = (
-                20,  # 左边界：向右移动20像素
-                int(screen_height * 0.15) - 10,  # 上边界：向上移动10像素
-                int(screen_width * 0.4) - 20,    # 宽度：减少20像素
-                int(screen_height * 0.7)    # 高度：屏幕高度的70%
-            )
-            screenshot = full_screenshot.crop(search_results_region)
-            window_offset_x, window_offset_y = 0, 0
-            window_screenshot_used = False
-        else:
-            # 使用微信窗口截图
-            window_x, window_y, window_width, window_height = window_rect
-            window_screenshot_used = True
-            
-            # 计算搜索结果区域（相对于微信窗口）
-            # 微信搜索结果通常在窗口的左侧部分
-            search_results_region = (
-                0,  # 左边界：从窗口左边开始
-                int(window_height * 0.1) - 10,  # 上边界：窗口高度的10% - 10像素（向上调整）
-                int(window_width * 0.45),   # 宽度：窗口宽度的45%（搜索结果区域）
-                int(window_height * 0.8) + 10    # 高度：窗口高度的80% + 10像素（补偿向上移动）
-            )
-            
-            # 裁剪搜索结果区域
-            screenshot = window_screenshot.crop(search_results_region)
-            window_offset_x, window_offset_y = window_x, window_y
-            
-            print(f"📐 搜索结果区域（相对于微信窗口）: 左上角({search_results_region[0]}, {search_results_region[1]}) 尺寸({search_results_region[2]}x{search_results_region[3]})")
-        
-        # 保存搜索结果截图用于调试
-        try:
-            # 调试代码已移除
-            print(f"📐 截图区域: 左上角({search_results_region[0]}, {search_results_region[1]}) 尺寸({search_results_region[2]}x{search_results_region[3]})")
-        except:
-            pass
-        
-        # 使用RapidOCR进行文字识别
-        if RAPID_OCR_AVAILABLE and ocr_engine:
-            print("🔍 使用RapidOCR识别搜索结果...")
-            
-            # 将PIL图像转换为numpy数组
-            img_array = np.array(screenshot)
-            
-            # 使用OCR识别文字
-            result = ocr_engine.recognize_text(img_array)
-            
-            if result and len(result) > 0:
-                # 首先进行预检查，确认是否有搜索结果
-                search_indicators = ["联系人", "搜索网络结果", "聊天记录", "文件", "公众号", "小程序"]
-                found_indicators = []
-                
-                for line in result:
-                    if len(line) >= 2:
-                        text = line[1]
-                        for indicator in search_indicators:
-                            if indicator in text and indicator not in found_indicators:
-                                found_indicators.append(indicator)
-                
-                if not found_indicators:
-                    print("⚠️ 预检查未发现搜索结果指示器")
-                    print("🔍 识别到的所有文字:")
-                    for line in result[:10]:  # 只显示前10行
-                        if len(line) >= 2:
-                            text = line[1]
-                            print(f"   - {text}")
-                    print("❌ 没有识别到有效的搜索结果，停止搜索操作")
-                    return False
-                
-                print(f"✅ 预检查发现搜索结果指示器: {', '.join(found_indicators)}")
-                
-                contact_section_found = False
-                contact_y_position = None
-                target_contact_position = None
-                
-                # 遍历OCR结果，查找"联系人"标识
-                for line in result:
-                    if len(line) >= 3:
-                        bbox = line[0]  # 边界框坐标
-                        text = line[1]  # 识别的文字
-                        confidence = line[2]  # 置信度
-                        
-                        # 查找"联系人"标识
-                        if "联系人" in text:
-                            print(f"✅ 找到联系人标识: {text}")
-                            contact_section_found = True
-                            # 获取"联系人"标识的Y坐标
-                            contact_y_position = bbox[0][1]  # 左上角Y坐标
-                            continue
-                        
-                        # 如果已经找到"联系人"标识，查找目标联系人名称
-                        if contact_section_found and search_term in text:
-                            print(f"✅ 在联系人区域找到目标: {text}")
-                            # 获取联系人的位置坐标
-                            try:
-                                if len(bbox) >= 3 and len(bbox[0]) >= 2 and len(bbox[2]) >= 2:
-                                    # 计算相对于截图区域的中心点
-                                    relative_center_x = (bbox[0][0] + bbox[2][0]) // 2
-                                    relative_center_y = (bbox[0][1] + bbox[2][1]) // 2
-                                    
-                                    # 如果使用的是窗口截图，坐标需要转换为窗口坐标
-                                    if window_screenshot_used:
-                                        # 窗口截图中的坐标需要加上搜索结果区域在窗口中的偏移
-                                        window_center_x = search_results_region[0] + relative_center_x
-                                        window_center_y = search_results_region[1] + relative_center_y
-                                        
-                                        # 再转换为屏幕绝对坐标
-                                        center_x = window_rect[0] + window_center_x
-                                        center_y = window_rect[1] + window_center_y
-                                    else:
-                                        # 屏幕截图，直接加上区域偏移
-                                        center_x = search_results_region[0] + relative_center_x
-                                        center_y = search_results_region[1] + relative_center_y
-                                    
-                                    target_contact_position = (center_x, center_y)
-                                    
-                                    # 点击找到的联系人
-                                    print(f"🎯 点击联系人位置: ({center_x}, {center_y})")
-                                    pyautogui.click(center_x, center_y)
-                                    time.sleep(1.5)
-                                    return True
-                                else:
-                                    print(f"⚠️ 边界框格式异常: {bbox}")
-                                    continue
-                            except (IndexError, TypeError, ZeroDivisionError) as e:
-                                print(f"⚠️ 计算联系人位置失败: {e}")
-                                continue
-                
-                # 如果找到了"联系人"标识但没有找到具体的联系人名称
-                if contact_section_found and not target_contact_position:
-                    print("⚠️ 找到联系人区域，但未找到具体联系人，尝试点击第一个联系人结果")
-                    # 查找"联系人"标识下方的第一个结果
-                    for line in result:
-                        if len(line) >= 3:
-                            bbox = line[0]
-                            text = line[1]
-                            confidence = line[2]
-                            
-                            # 如果这个文字在"联系人"标识下方，且不是"联系人"本身
-                            if (contact_y_position and bbox[0][1] > contact_y_position and 
-                                "联系人" not in text and len(text.strip()) > 0):
-                                try:
-                                    if len(bbox) >= 3 and len(bbox[0]) >= 2 and len(bbox[2]) >= 2:
-                                        # 计算相对于截图区域的中心点
-                                        relative_center_x = (bbox[0][0] + bbox[2][0]) // 2
-                                        relative_center_y = (bbox[0][1] + bbox[2][1]) // 2
-                                        
-                                        # 如果使用的是窗口截图，坐标需要转换为窗口坐标
-                                        if window_screenshot_used:
-                                            # 窗口截图中的坐标需要加上搜索结果区域在窗口中的偏移
-                                            window_center_x = search_results_region[0] + relative_center_x
-                                            window_center_y = search_results_region[1] + relative_center_y
-                                            
-                                            # 再转换为屏幕绝对坐标
-                                            center_x = window_rect[0] + window_center_x
-                                            center_y = window_rect[1] + window_center_y
-                                        else:
-                                            # 屏幕截图，直接加上区域偏移
-                                            center_x = search_results_region[0] + relative_center_x
-                                            center_y = search_results_region[1] + relative_center_y
-                                        
-                                        print(f"🎯 点击第一个联系人结果: {text} 位置: ({center_x}, {center_y})")
-                                        pyautogui.click(center_x, center_y)
-                                        time.sleep(1.5)
-                                        return True
-                                    else:
-                                        print(f"⚠️ 边界框格式异常: {bbox}")
-                                        continue
-                                except (IndexError, TypeError, ZeroDivisionError) as e:
-                                    print(f"⚠️ 计算第一个联系人位置失败: {e}")
-                                    continue
-                
-                if not contact_section_found:
-                    print("⚠️ 未找到'联系人'标识，可能没有联系人搜索结果")
-                    # 打印所有识别到的文字，帮助调试
-                    print("🔍 识别到的所有文字:")
-                    for line in result:
-                        if len(line) >= 3:
-                            text = line[1]
-                            confidence = line[2]
-                            print(f"   - {text} (置信度: {confidence:.2f})")
-                    print("❌ 没有识别到有效的联系人搜索结果，停止搜索操作")
-                    return False
-            else:
-                print("❌ OCR识别结果为空，没有识别到任何搜索结果")
-                print("❌ 没有识别到有效的搜索结果，停止搜索操作")
-                return False
+        # 只截取搜索结果区域（屏幕坐标偏移随截图一起返回）
+        screenshot, search_results_region, window_rect = capture_search_results_region()
         
-        # 备用方案：如果RapidOCR不可用
-        else:
-            print("⚠️ RapidOCR不可用，无法智能识别搜索结果")
-            print("❌ 停止搜索操作")
+        target = locate(screenshot, search_term)
+        if target is None:
             return False
+
+        # 相对于搜索结果截图的坐标 → 屏幕绝对坐标
+        relative_center_x, relative_center_y = target
+        center_x = search_results_region[0] + relative_center_x
+        center_y = search_results_region[1] + relative_center_y
+
+        logger.info("🎯 点击%s位置: (%s, %s)", target_type, center_x, center_y)
+        act_and_wait_stable(lambda: input_scheduler.click(center_x, center_y, post_delay=0),
+                            window_rect, timeout=3, description="聊天界面",
+                            kind="chat_open")
+        return confirm_left_search()
             
     except Exception as e:
-        print(f"❌ OCR识别搜索结果失败: {e}")
+        logger.error("❌ OCR识别%s搜索结果失败: %s", target_type, e)
         return False
 
+def find_contact_in_search_results(search_term):
+    """使用OCR识别搜索结果，查找"联系人"标识并定位联系人"""
+    return _click_search_result(search_term, locate_contact_in_search_results, "联系人")
+
 def find_group_in_search_results(search_term):
     """使用OCR识别搜索结果，查找"群聊"标识并定位群聊"""
+    return _click_search_result(search_term, locate_group_in_search_results, "群聊")
+
+def _bbox_center(bbox):
+    """OCR边界框（四个顶点）的中心点，格式异常时返回None"""
     try:
-        # 获取微信窗口截图
-        window_screenshot, window_rect = get_wechat_window_screenshot()
-        window_screenshot_used = False  # 标记是否使用了窗口截图
-        
-        if window_screenshot is None:
-            print("❌ 无法获取微信窗口截图，使用全屏截图作为备用方案")
-            # 备用方案：使用全屏截图
-            full_screenshot = pyautogui.screenshot()
-            screen_width, screen_height = pyautogui.size()
-            search_results_region = (
-                20,  # 左边界：向右移动20像素
-                int(screen_height * 0.15) - 10,  # 上边界：向上移动10像素
-                int(screen_width * 0.4) - 20,    # 宽度：减少20像素
-                int(screen_height * 0.7)    # 高度：屏幕高度的70%
-            )
-            screenshot = full_screenshot.crop(search_results_region)
-            window_offset_x, window_offset_y = 0, 0
-            window_screenshot_used = False
-        else:
-            # 使用微信窗口截图
-            window_x, window_y, window_width, window_height = window_rect
-            window_screenshot_used = True
-            
-            # 计算搜索结果区域（相对于微信窗口）
-            # 微信搜索结果通常在窗口的左侧部分
-            search_results_region = (
-                0,  # 左边界：从窗口左边开始
-                int(window_height * 0.1) - 10,  # 上边界：窗口高度的10% - 10像素（向上调整）
-                int(window_width * 0.45),   # 宽度：窗口宽度的45%（搜索结果区域）
-                int(window_height * 0.8) + 10    # 高度：窗口高度的80% + 10像素（补偿向上移动）
-            )
-            
-            # 裁剪搜索结果区域
-            screenshot = window_screenshot.crop(search_results_region)
-            window_offset_x, window_offset_y = window_x, window_y
-            
-            print(f"📐 搜索结果区域（相对于微信窗口）: 左上角({search_results_region[0]}, {search_results_region[1]}) 尺寸({search_results_region[2]}x{search_results_region[3]})")
+        if len(bbox) >= 3 and len(bbox[0]) >= 2 and len(bbox[2]) >= 2:
+            return ((bbox[0][0] + bbox[2][0]) // 2, (bbox[0][1] + bbox[2][1]) // 2)
+        logger.warning("⚠️ 边界框格式异常: %s", bbox)
+    except (IndexError, TypeError) as e:
+        logger.warning("⚠️ 计算搜索结果位置失败: %s", e)
+    return None
+
+# 搜索结果中出现任一分类标题即说明有搜索结果
+SEARCH_RESULT_INDICATORS = ["联系人", "搜索网络结果", "聊天记录", "文件", "公众号", "小程序"]
+
+def _locate_in_search_section(screenshot, search_term, section):
+    """在搜索结果截图中查找 section 分类（"联系人" / "群聊"）标题下方的目标
+
+    Returns:
+        要点击的位置 (x, y)，相对于截图；没有该分类的有效搜索结果时返回None
+    """
+    # 使用RapidOCR进行文字识别
+    if not (RAPID_OCR_AVAILABLE and ocr_engine):
+        logger.warning("⚠️ RapidOCR不可用，无法智能识别搜索结果")
+        logger.info("❌ 停止搜索操作")
+        return None
+
+    logger.info("🔍 使用RapidOCR识别%s搜索结果...", section)
+    result = ocr_engine.recognize_text(np.asarray(screenshot), site="search_results")
+    if not result:
+        logger.info("❌ OCR识别结果为空，没有识别到任何搜索结果")
+        logger.info("❌ 没有识别到有效的搜索结果，停止搜索操作")
+        return None
+
+    # 首先进行预检查，确认是否有搜索结果
+    search_indicators = [section] + [indicator for indicator in SEARCH_RESULT_INDICATORS if indicator != section]
+    found_indicators = []
+    for line in result:
+        if len(line) >= 2:
+            text = line[1]
+            for indicator in search_indicators:
+                if indicator in text and indicator not in found_indicators:
+                    found_indicators.append(indicator)
+
+    if not found_indicators:
+        logger.warning("⚠️ 预检查未发现搜索结果指示器")
+        logger.debug("🔍 识别到的所有文字:")
+        for line in result[:10]:  # 只显示前10行
+            if len(line) >= 2:
+                logger.debug("   - %s", line[1])
+        logger.info("❌ 没有识别到有效的搜索结果，停止搜索操作")
+        return None
+
+    logger.info("✅ 预检查发现搜索结果指示器: %s", ', '.join(found_indicators))
+
+    section_found = False
+    section_y_position = None
+
+    # 遍历OCR结果，查找分类标题，再在其后查找目标名称
+    for line in result:
+        if len(line) >= 3:
+            bbox, text = line[0], line[1]
+            if section in text:
+                logger.info("✅ 找到%s标识: %s", section, text)
+                section_found = True
+                section_y_position = bbox[0][1]  # 左上角Y坐标
+                continue
+
+            if section_found and search_term in text:
+                logger.info("✅ 在%s区域找到目标: %s", section, text)
+                center = _bbox_center(bbox)
+                if center:
+                    return center
+
+    if not section_found:
+        logger.warning("⚠️ 未找到'%s'标识，可能没有%s搜索结果", section, section)
+        # 打印所有识别到的文字，帮助调试
+        logger.debug("🔍 识别到的所有文字:")
+        for line in result:
+            if len(line) >= 3:
+                logger.debug("   - %s (置信度: %.2f)", line[1], line[2])
+        logger.info("❌ 没有识别到有效的%s搜索结果，停止搜索操作", section)
+        return None
+
+    # 找到了分类标题但没有找到具体名称：使用标题下方的第一个结果
+    logger.warning("⚠️ 找到%s区域，但未找到具体%s，尝试点击第一个%s结果", section, section, section)
+    for line in result:
+        if len(line) >= 3:
+            bbox, text = line[0], line[1]
+            if (section_y_position and bbox[0][1] > section_y_position and
+                    section not in text and len(text.strip()) > 0):
+                center = _bbox_center(bbox)
+                if center:
+                    logger.info("🎯 第一个%s结果: %s", section, text)
+                    return center
+    return None
+
+@recorded_stage
+def locate_contact_in_search_results(screenshot, search_term):
+    """在搜索结果截图中查找"联系人"区域里的目标联系人
+
+    Args:
+        screenshot: 搜索结果区域的截图（PIL图像或numpy数组）
+        search_term: 搜索内容
+
+    Returns:
+        要点击的位置 (x, y)，相对于截图；没有有效的联系人搜索结果时返回None
+    """
+    return _locate_in_search_section(screenshot, search_term, "联系人")
+
+@recorded_stage
+def locate_group_in_search_results(screenshot, search_term):
+    """在搜索结果截图中查找"群聊"区域里的目标群聊
+
+    Args:
+        screenshot: 搜索结果区域的截图（PIL图像或numpy数组）
+        search_term: 搜索内容
+
+    Returns:
+        要点击的位置 (x, y)，相对于截图；没有有效的群聊搜索结果时返回None
+    """
+    return _locate_in_search_section(screenshot, search_term, "群聊")
+
+def prepare_search(ensure_active=True, focus_click=False, stop_flag_func=None):
+    """激活微信窗口并打开搜索框（搜索联系人/群聊的第一步）
+
+    Args:
+        ensure_active: 是否先激活微信窗口
+        focus_click: 是否先点击屏幕中央确保焦点（搜索群聊时使用）
+        stop_flag_func: 停止标志检查函数
+
+    Returns:
+        bool: 搜索框是否已打开，激活失败或被停止时返回False
+    """
+    # 根据参数决定是否激活微信窗口
+    if ensure_active and not ensure_wechat_is_active():
+        return False
         
-        # 保存搜索结果截图用于调试
-        try:
-            # 调试代码已移除
-            print(f"📐 截图区域: 左上角({search_results_region[0]}, {search_results_region[1]}) 尺寸({search_results_region[2]}x{search_results_region[3]})")
-        except:
-            pass
+    # 检查停止标志
+    if stop_flag_func and stop_flag_func():
+        logger.info("⏹️ 搜索操作被停止")
+        return False
+    
+    if focus_click:
+        # 再次确保微信窗口处于活动状态
+        logger.info("🔄 再次确认微信窗口激活状态...")
+        input_scheduler.click(backend.screen_size().width // 2, backend.screen_size().height // 2)  # 点击屏幕中央确保焦点
+        cancellation.sleep(0.5, stop_flag_func)
+    
+    # 使用快捷键打开搜索框
+    open_search_box(stop_flag_func)
+    
+    # 检查停止标志
+    if stop_flag_func and stop_flag_func():
+        logger.info("⏹️ 搜索操作被停止")
+        return False
+    return True
+
+def input_search_term(search_term, stop_flag_func=None, wait_results=True):
+    """在已打开的搜索框中输入搜索内容（优先使用剪贴板粘贴，支持中文）
+
+    Args:
+        search_term: 搜索内容
+        stop_flag_func: 停止标志检查函数
+        wait_results: 粘贴后是否等待搜索结果渲染完成；为False时由调用方等待
+                      （异步运行时在等待的同时做搜索框OCR验证）
+
+    Returns:
+        bool: 是否通过剪贴板输入（只有剪贴板输入的中文需要OCR验证）
+    """
+    # 使用剪贴板方式输入中文（解决中文输入问题）
+    logger.info("📝 在微信搜索框中输入: %s", search_term)
+    
+    try:
+        # 将搜索内容复制到剪贴板（后端不支持剪贴板时抛出ImportError）
+        backend.copy_to_clipboard(search_term)
+        cancellation.sleep(0.3, stop_flag_func)
+        
+        # 使用Ctrl+V粘贴，等待搜索结果渲染完成
+        if wait_results:
+            act_and_wait_stable(lambda: input_scheduler.hotkey('ctrl', 'v', post_delay=0), get_wechat_window_rect(), timeout=2,
+                                stop_flag_func=stop_flag_func, description="搜索结果", kind="search_results")
+        else:
+            input_scheduler.hotkey('ctrl', 'v', post_delay=0)
+        logger.info("✅ 使用剪贴板成功输入中文")
+        return True
         
-        # 使用RapidOCR进行文字识别
-        if RAPID_OCR_AVAILABLE and ocr_engine:
-            print("🔍 使用RapidOCR识别群聊搜索结果...")
-            
-            # 将PIL图像转换为numpy数组
-            img_array = np.array(screenshot)
-            
-            # 使用OCR识别文字
-            result = ocr_engine.recognize_text(img_array)
-            
-            if result and len(result) > 0:
-                # 首先进行预检查，确认是否有搜索结果
-                search_indicators = ["群聊", "联系人", "搜索网络结果", "聊天记录", "文件", "公众号", "小程序"]
-                found_indicators = []
-                
-                for line in result:
-                    if len(line) >= 2:
-                        text = line[1]
-                        for indicator in search_indicators:
-                            if indicator in text and indicator not in found_indicators:
-                                found_indicators.append(indicator)
-                
-                if not found_indicators:
-                    print("⚠️ 预检查未发现搜索结果指示器")
-                    print("🔍 识别到的所有文字:")
-                    for line in result[:10]:  # 只显示前10行
-                        if len(line) >= 2:
-                            text = line[1]
-                            print(f"   - {text}")
-                    print("❌ 没有识别到有效的搜索结果，停止搜索操作")
-                    return False
-                
-                print(f"✅ 预检查发现搜索结果指示器: {', '.join(found_indicators)}")
-                
-                group_section_found = False
-                group_y_position = None
-                target_group_position = None
-                
-                # 遍历OCR结果，查找"群聊"标识
-                for line in result:
-                    if len(line) >= 3:
-                        bbox = line[0]  # 边界框坐标
-                        text = line[1]  # 识别的文字
-                        confidence = line[2]  # 置信度
-                        
-                        # 查找"群聊"标识
-                        if "群聊" in text:
-                            print(f"✅ 找到群聊标识: {text}")
-                            group_section_found = True
-                            # 获取"群聊"标识的Y坐标
-                            group_y_position = bbox[0][1]  # 左上角Y坐标
-                            continue
-                        
-                        # 如果已经找到"群聊"标识，查找目标群聊名称
-                        if group_section_found and search_term in text:
-                            print(f"✅ 在群聊区域找到目标: {text}")
-                            # 获取群聊的位置坐标
-                            try:
-                                if len(bbox) >= 3 and len(bbox[0]) >= 2 and len(bbox[2]) >= 2:
-                                    # 计算相对于截图区域的中心点
-                                    relative_center_x = (bbox[0][0] + bbox[2][0]) // 2
-                                    relative_center_y = (bbox[0][1] + bbox[2][1]) // 2
-                                    
-                                    # 如果使用的是窗口截图，坐标需要转换为窗口坐标
-                                    if window_screenshot_used:
-                                        # 窗口截图中的坐标需要加上搜索结果区域在窗口中的偏移
-                                        window_center_x = search_results_region[0] + relative_center_x
-                                        window_center_y = search_results_region[1] + relative_center_y
-                                        
-                                        # 再转换为屏幕绝对坐标
-                                        center_x = window_rect[0] + window_center_x
-                                        center_y = window_rect[1] + window_center_y
-                                    else:
-                                        # 屏幕截图，直接加上区域偏移
-                                        center_x = search_results_region[0] + relative_center_x
-                                        center_y = search_results_region[1] + relative_center_y
-                                    
-                                    target_group_position = (center_x, center_y)
-                                    
-                                    # 点击找到的群聊
-                                    print(f"🎯 点击群聊位置: ({center_x}, {center_y})")
-                                    pyautogui.click(center_x, center_y)
-                                    time.sleep(1.5)
-                                    return True
-                                else:
-                                    print(f"⚠️ 边界框格式异常: {bbox}")
-                                    continue
-                            except (IndexError, TypeError, ZeroDivisionError) as e:
-                                print(f"⚠️ 计算群聊位置失败: {e}")
-                                continue
-                
-                # 如果找到了"群聊"标识但没有找到具体的群聊名称
-                if group_section_found and not target_group_position:
-                    print("⚠️ 找到群聊区域，但未找到具体群聊，尝试点击第一个群聊结果")
-                    # 查找"群聊"标识下方的第一个结果
-                    for line in result:
-                        if len(line) >= 3:
-                            bbox = line[0]
-                            text = line[1]
-                            confidence = line[2]
-                            
-                            # 如果这个文字在"群聊"标识下方，且不是"群聊"本身
-                            if (group_y_position and bbox[0][1] > group_y_position and 
-                                "群聊" not in text and len(text.strip()) > 0):
-                                try:
-                                    if len(bbox) >= 3 and len(bbox[0]) >= 2 and len(bbox[2]) >= 2:
-                                        # 计算相对于截图区域的中心点
-                                        relative_center_x = (bbox[0][0] + bbox[2][0]) // 2
-                                        relative_center_y = (bbox[0][1] + bbox[2][1]) // 2
-                                        
-                                        # 如果使用的是窗口截图，坐标需要转换为窗口坐标
-                                        if window_screenshot_used:
-                                            # 窗口截图中的坐标需要加上搜索结果区域在窗口中的偏移
-                                            window_center_x = search_results_region[0] + relative_center_x
-                                            window_center_y = search_results_region[1] + relative_center_y
-                                            
-                                            # 再转换为屏幕绝对坐标
-                                            center_x = window_rect[0] + window_center_x
-                                            center_y = window_rect[1] + window_center_y
-                                        else:
-                                            # 屏幕截图，直接加上区域偏移
-                                            center_x = search_results_region[0] + relative_center_x
-                                            center_y = search_results_region[1] + relative_center_y
-                                        
-                                        print(f"🎯 点击第一个群聊结果: {text} 位置: ({center_x}, {center_y})")
-                                        pyautogui.click(center_x, center_y)
-                                        time.sleep(1.5)
-                                        return True
-                                    else:
-                                        print(f"⚠️ 边界框格式异常: {bbox}")
-                                        continue
-                                except (IndexError, TypeError, ZeroDivisionError) as e:
-                                    print(f"⚠️ 计算第一个群聊位置失败: {e}")
-                                    continue
-                
-                if not group_section_found:
-                    print("⚠️ 未找到'群聊'标识，可能没有群聊搜索结果")
-                    # 打印所有识别到的文字，帮助调试
-                    print("🔍 识别到的所有文字:")
-                    for line in result:
-                        if len(line) >= 3:
-                            text = line[1]
-                            confidence = line[2]
-                            print(f"   - {text} (置信度: {confidence:.2f})")
-                    print("❌ 没有识别到有效的群聊搜索结果，停止搜索操作")
-                    return False
-            else:
-                print("❌ OCR识别结果为空，没有识别到任何搜索结果")
-                print("❌ 没有识别到有效的搜索结果，停止搜索操作")
-                return False
+    except ImportError:
+        logger.warning("⚠️ pyperclip模块未安装，尝试直接输入...")
+        # 备用方案：检查是否包含中文字符
+        has_chinese = any('\u4e00' <= char <= '\u9fff' for char in search_term)
         
-        # 备用方案：如果RapidOCR不可用
+        if has_chinese:
+            logger.info("🔤 检测到中文字符，建议安装pyperclip模块以支持中文输入")
+            logger.info("💡 安装命令: pip install pyperclip")
+            # 尝试逐字符输入，但可能不支持中文
+            for char in search_term:
+                if '\u4e00' <= char <= '\u9fff':  # 中文字符
+                    logger.warning("⚠️ 跳过中文字符: %s", char)
+                    continue
+                input_scheduler.typewrite(char)
+                cancellation.sleep(0.15)
         else:
-            print("⚠️ RapidOCR不可用，无法智能识别搜索结果")
-            print("❌ 停止搜索操作")
+            # 纯英文或数字，直接输入
+            for char in search_term:
+                input_scheduler.typewrite(char)
+                cancellation.sleep(0.15)
+        
+        cancellation.sleep(1, stop_flag_func)
+    
+    except Exception as e:
+        logger.warning("⚠️ 剪贴板输入失败，尝试直接输入: %s", e)
+        # 备用方案：直接输入
+        for char in search_term:
+            input_scheduler.typewrite(char)
+            cancellation.sleep(0.15)
+        cancellation.sleep(1, stop_flag_func)
+    return False
+
+def _search_and_send(search_term, message, is_group, ensure_active, stop_flag_func):
+    """搜索联系人/群聊并发送消息（search_contact / search_group 的共同流程）"""
+    target_type = "群聊" if is_group else "联系人"
+    
+    # 检查停止标志
+    if stop_flag_func and stop_flag_func():
+        logger.info("⏹️ 搜索%s操作被停止", target_type)
+        return False
+        
+    # GUI模式下必须提供搜索内容
+    if search_term is None or not search_term:
+        logger.info("❌ 未提供搜索内容")
+        return False
+    
+    logger.info("📝 准备搜索%s: %s", target_type, search_term)
+    
+    # 激活窗口并打开搜索框（搜索群聊时先点击屏幕中央确保焦点）
+    if not prepare_search(ensure_active, focus_click=is_group, stop_flag_func=stop_flag_func):
+        return False
+    
+    input_success = input_search_term(search_term, stop_flag_func)
+    
+    # 如果使用了剪贴板输入中文，进行OCR验证
+    if input_success and any('\u4e00' <= char <= '\u9fff' for char in search_term):
+        if not verify_search_input_with_ocr(search_term, stop_flag_func):
             return False
-            
-    except Exception as e:
-        print(f"❌ OCR识别群聊搜索结果失败: {e}")
+    
+    # 检查停止标志
+    if stop_flag_func and stop_flag_func():
+        logger.info("⏹️ 搜索%s操作被停止", target_type)
+        return False
+    
+    # 使用OCR识别搜索结果，查找"联系人"/"群聊"标识（包含预检查功能）
+    logger.info("🔍 使用OCR识别搜索结果，查找%s...", target_type)
+    find_results = find_group_in_search_results if is_group else find_contact_in_search_results
+    if not find_results(search_term):
+        logger.info("❌ 未找到%s '%s'，请检查%s名称是否正确", target_type, search_term, target_type)
         return False
+    
+    logger.info("✅ 在微信中搜索%s '%s' 完成", target_type, search_term)
+    logger.info("💡 程序将自动进入%s界面并发送自定义消息", '群聊' if is_group else '聊天')
+    
+    # 直接进入发送消息流程
+    logger.info("\n" + "="*50)
+    logger.info("🎯 搜索完成！准备自动进入%s界面...", '群聊' if is_group else '聊天')
+    logger.info("="*50)
+    
+    # 直接调用发送消息功能（联系人和群聊共用）
+    return send_message_to_contact(search_term, message, stop_flag_func)
 
+@input_scheduler.operation("搜索群聊")
+@traced("search_group", "flow")
 def search_group(search_term=None, ensure_active=True, message=None, stop_flag_func=None):
     """搜索群聊功能 - 在微信主界面搜索群聊"""
-    print("🔍 开始搜索群聊...")
+    logger.info("🔍 开始搜索群聊...")
     
     try:
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 搜索群聊操作被停止")
-            return False
-            
-        # GUI模式下必须提供搜索内容
-        if search_term is None or not search_term:
-            print("❌ 未提供搜索内容")
-            return False
-        
-        print(f"📝 准备搜索群聊: {search_term}")
-        
-        # 根据参数决定是否激活微信窗口
-        if ensure_active and not ensure_wechat_is_active():
-            return False
-            
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 搜索群聊操作被停止")
-            return False
-        
-        # 再次确保微信窗口处于活动状态
-        print("🔄 再次确认微信窗口激活状态...")
-        pyautogui.click(pyautogui.size().width // 2, pyautogui.size().height // 2)  # 点击屏幕中央确保焦点
-        time.sleep(0.5)
-        
-        # 使用快捷键打开搜索框
-        print("⌨️ 在微信界面使用快捷键 Ctrl+F 打开搜索...")
-        pyautogui.hotkey('ctrl', 'f')
-        time.sleep(2)  # 等待搜索框出现
-        
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 搜索联系人操作被停止")
-            return False
-        
-        # 使用剪贴板方式输入中文（解决中文输入问题）
-        print(f"📝 在微信搜索框中输入: {search_term}")
-        input_success = False
-        
-        try:
-            import pyperclip
-            # 将搜索内容复制到剪贴板
-            pyperclip.copy(search_term)
-            time.sleep(0.3)
-            
-            # 使用Ctrl+V粘贴
-            pyautogui.hotkey('ctrl', 'v')
-            print("✅ 使用剪贴板成功输入中文")
-            time.sleep(1)
-            input_success = True
-            
-        except ImportError:
-            print("⚠️ pyperclip模块未安装，尝试直接输入...")
-            # 备用方案：检查是否包含中文字符
-            has_chinese = any('\u4e00' <= char <= '\u9fff' for char in search_term)
-            
-            if has_chinese:
-                print("🔤 检测到中文字符，建议安装pyperclip模块以支持中文输入")
-                print("💡 安装命令: pip install pyperclip")
-                # 尝试逐字符输入，但可能不支持中文
-                for char in search_term:
-                    if '\u4e00' <= char <= '\u9fff':  # 中文字符
-                        print(f"⚠️ 跳过中文字符: {char}")
-                        continue
-                    pyautogui.typewrite(char)
-                    time.sleep(0.15)
-            else:
-                # 纯英文或数字，直接输入
-                for char in search_term:
-                    pyautogui.typewrite(char)
-                    time.sleep(0.15)
-            
-            time.sleep(1)
-        
-        except Exception as e:
-            print(f"⚠️ 剪贴板输入失败，尝试直接输入: {e}")
-            # 备用方案：直接输入
-            for char in search_term:
-                pyautogui.typewrite(char)
-                time.sleep(0.15)
-            time.sleep(1)
-        
-        # 如果使用了剪贴板输入中文，进行OCR验证
-        if input_success and any('\u4e00' <= char <= '\u9fff' for char in search_term):
-            if not verify_search_input_with_ocr(search_term, stop_flag_func):
-                return False
-        
-        # 微信会自动显示搜索结果，无需按回车
-        print("🔍 等待微信自动显示搜索结果...")
-        time.sleep(1)  # 等待搜索结果自动显示
-        
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 搜索群聊操作被停止")
-            return False
-        
-        # 使用OCR识别搜索结果，查找"群聊"标识（包含预检查功能）
-        print("🔍 使用OCR识别搜索结果，查找群聊...")
-        group_found = find_group_in_search_results(search_term)
-        
-        if group_found:
-            print(f"✅ 在微信中搜索群聊 '{search_term}' 完成")
-            print("💡 程序将自动进入群聊界面并发送自定义消息")
-            
-            # 直接进入发送消息流程
-            print("\n" + "="*50)
-            print("🎯 搜索完成！准备自动进入群聊界面...")
-            print("="*50)
-            
-            # 直接调用发送消息功能
-            return send_message_to_contact(search_term, message, stop_flag_func)  # 复用联系人的发送消息功能
-        else:
-            print(f"❌ 未找到群聊 '{search_term}'，请检查群聊名称是否正确")
-            return False
-        
+        return _search_and_send(search_term, message, True, ensure_active, stop_flag_func)
     except Exception as e:
-        print(f"❌ 搜索群聊失败: {e}")
+        logger.error("❌ 搜索群聊失败: %s", e)
         return False
 
+@input_scheduler.operation("搜索联系人")
+@traced("search_contact", "flow")
 def search_contact(search_term=None, ensure_active=True, message=None, stop_flag_func=None):
     """搜索联系人功能 - 在微信主界面搜索"""
-    print("🔍 开始搜索联系人...")
+    logger.info("🔍 开始搜索联系人...")
     
     try:
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 搜索联系人操作被停止")
-            return False
-            
-        # GUI模式下必须提供搜索内容
-        if search_term is None or not search_term:
-            print("❌ 未提供搜索内容")
-            return False
-        
-        print(f"📝 准备搜索: {search_term}")
-        
-        # 根据参数决定是否激活微信窗口
-        if ensure_active and not ensure_wechat_is_active():
-            return False
-            
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 搜索联系人操作被停止")
-            return False
-        
-        # 使用快捷键打开搜索框
-        print("⌨️ 在微信界面使用快捷键 Ctrl+F 打开搜索...")
-        pyautogui.hotkey('ctrl', 'f')
-        time.sleep(2)  # 等待搜索框出现
-        
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 搜索群聊操作被停止")
-            return False
-        
-        # 使用剪贴板方式输入中文（解决中文输入问题）
-        print(f"📝 在微信搜索框中输入: {search_term}")
-        input_success = False
-        
-        try:
-            import pyperclip
-            # 将搜索内容复制到剪贴板
-            pyperclip.copy(search_term)
-            time.sleep(0.3)
-            
-            # 使用Ctrl+V粘贴
-            pyautogui.hotkey('ctrl', 'v')
-            print("✅ 使用剪贴板成功输入中文")
-            time.sleep(1)
-            input_success = True
-            
-        except ImportError:
-            print("⚠️ pyperclip模块未安装，尝试直接输入...")
-            # 备用方案：检查是否包含中文字符
-            has_chinese = any('\u4e00' <= char <= '\u9fff' for char in search_term)
-            
-            if has_chinese:
-                print("🔤 检测到中文字符，建议安装pyperclip模块以支持中文输入")
-                print("💡 安装命令: pip install pyperclip")
-                # 尝试逐字符输入，但可能不支持中文
-                for char in search_term:
-                    if '\u4e00' <= char <= '\u9fff':  # 中文字符
-                        print(f"⚠️ 跳过中文字符: {char}")
-                        continue
-                    pyautogui.typewrite(char)
-                    time.sleep(0.15)
-            else:
-                # 纯英文或数字，直接输入
-                for char in search_term:
-                    pyautogui.typewrite(char)
-                    time.sleep(0.15)
-            
-            time.sleep(1)
-        
-        except Exception as e:
-            print(f"⚠️ 剪贴板输入失败，尝试直接输入: {e}")
-            # 备用方案：直接输入
-            for char in search_term:
-                pyautogui.typewrite(char)
-                time.sleep(0.15)
-            time.sleep(1)
-        
-        # 如果使用了剪贴板输入中文，进行OCR验证
-        if input_success and any('\u4e00' <= char <= '\u9fff' for char in search_term):
-            if not verify_search_input_with_ocr(search_term, stop_flag_func):
-                return False
-        
-        # 微信会自动显示搜索结果，无需按回车
-        print("🔍 等待微信自动显示搜索结果...")
-        time.sleep(1)  # 等待搜索结果自动显示
-        
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 搜索联系人操作被停止")
-            return False
-        
-        # 使用OCR识别搜索结果，查找"联系人"标识（包含预检查功能）
-        print("🔍 使用OCR识别搜索结果，查找联系人...")
-        contact_found = find_contact_in_search_results(search_term)
-        
-        if contact_found:
-            print(f"✅ 在微信中搜索联系人 '{search_term}' 完成")
-            print("💡 程序将自动进入聊天界面并发送自定义消息")
-            
-            # 直接进入发送消息流程
-            print("\n" + "="*50)
-            print("🎯 搜索完成！准备自动进入聊天界面...")
-            print("="*50)
-            
-            # 直接调用发送消息功能
-            return send_message_to_contact(search_term, message, stop_flag_func)
-        else:
-            print(f"❌ 未找到联系人 '{search_term}'，请检查联系人名称是否正确")
-            return False
-        
+        return _search_and_send(search_term, message, False, ensure_active, stop_flag_func)
     except Exception as e:
-        print(f"❌ 搜索联系人失败: {e}")
+        logger.error("❌ 搜索联系人失败: %s", e)
         return False
 
+@input_scheduler.operation("发送消息")
+@traced("send_message_to_contact", "flow")
 def send_message_to_contact(contact_name, message=None, stop_flag_func=None):
     """点击第一个搜索结果并发送消息"""
-    print(f"💬 准备向 '{contact_name}' 发送消息...")
+    logger.info("💬 准备向 '%s' 发送消息...", contact_name)
     
     try:
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 发送消息操作被停止")
+            logger.info("⏹️ 发送消息操作被停止")
             return False
             
-        # 等待搜索结果显示
-        time.sleep(1.5)
+        # 等待聊天界面稳定
+        wait_until_stable(get_wechat_window_rect(), timeout=1.5, stop_flag_func=stop_flag_func)
         
         # 检查微信是否在前台，如果不在才激活
         if not is_wechat_in_foreground():
-            print("🔄 微信不在前台，正在激活...")
+            logger.info("🔄 微信不在前台，正在激活...")
             if not ensure_wechat_is_active():
                 return False
         else:
-            print("✅ 微信已在前台，无需重复激活")
+            logger.info("✅ 微信已在前台，无需重复激活")
         
         
-        print("✅ 已自动进入聊天界面")
+        logger.info("✅ 已自动进入聊天界面")
         
         # 再次确保微信窗口处于最前面（聊天界面可能是新窗口）
         #activate_wechat_window()
         
         # GUI模式下必须提供消息内容
         if message is None or not message:
-            print("❌ 未提供消息内容")
+            logger.info("❌ 未提供消息内容")
             return False
         
-        print(f"📝 准备发送消息: {message}")
+        logger.info("📝 准备发送消息: %s", message)
         
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 发送消息操作被停止")
+            logger.info("⏹️ 发送消息操作被停止")
             return False
         
-        # 获取微信窗口位置，在窗口内点击输入框
-        wechat_windows = find_wechat_main_window()
-        if wechat_windows:
-            # 获取第一个微信窗口的句柄
-            wechat_hwnd, window_title = wechat_windows[0]
-            
-            # 获取微信窗口的位置和大小
-            rect = win32gui.GetWindowRect(wechat_hwnd)
-            window_left, window_top, window_right, window_bottom = rect
-            window_width = window_right - window_left
-            window_height = window_bottom - window_top
-            
-            # 在微信窗口内的输入框位置点击（窗口下方中央）
-            input_box_x = window_left + window_width // 2
-            input_box_y = window_top + int(window_height * 0.88)
-            pyautogui.click(input_box_x, input_box_y)
-            time.sleep(0.5)
-        else:
-            # 备用方案：使用屏幕位置
-            screen_width, screen_height = pyautogui.size()
-            input_box_x = screen_width // 2
-            input_box_y = int(screen_height * 0.88)
-            pyautogui.click(input_box_x, input_box_y)
-            time.sleep(0.5)
-        
-        # 清空输入框（防止有残留内容）
-        pyautogui.hotkey('ctrl', 'a')  # 全选
-        time.sleep(0.2)
-        pyautogui.press('delete')  # 删除
-        time.sleep(0.3)
+        # 在微信窗口内的输入框位置点击（窗口下方中央，找不到窗口时按屏幕位置）
+        input_box_x, input_box_y = locator.point("chat_input")
+        # 点击后等待输入框获得焦点
+        input_scheduler.click(input_box_x, input_box_y, post_delay=0.3)
+        
+        # 清空输入框（防止有残留内容）：全选+删除合并为一组按键
+        input_scheduler.keys(('ctrl', 'a'), 'delete', post_delay=0.1)
         
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 发送消息操作被停止")
+            logger.info("⏹️ 发送消息操作被停止")
             return False
             
         # 发送消息（使用剪贴板方式支持中文）
-        print("📝 输入消息内容...")
+        logger.info("📝 输入消息内容...")
         
-        time.sleep(0.3)
         message_input_success = False
         
         try:
-            import pyperclip
-            # 将消息复制到剪贴板
-            pyperclip.copy(message)
-            time.sleep(0.3)
+            # 将消息复制到剪贴板（后端不支持剪贴板时抛出ImportError）
+            backend.copy_to_clipboard(message)
+            input_scheduler.sleep(0.1)
             
-            # 使用Ctrl+V粘贴
-            pyautogui.hotkey('ctrl', 'v')
-            print("✅ 使用剪贴板成功输入消息")
-            time.sleep(1)
+            # 使用Ctrl+V粘贴，等待输入框显示粘贴内容
+            input_scheduler.hotkey('ctrl', 'v', post_delay=0.3)
+            logger.info("✅ 使用剪贴板成功输入消息")
             message_input_success = True
             
         except ImportError:
-            print("⚠️ pyperclip模块未安装，尝试直接输入...")
+            logger.warning("⚠️ pyperclip模块未安装，尝试直接输入...")
             # 备用方案：逐字符输入
-            for char in message:
-                pyautogui.typewrite(char)
-                time.sleep(0.1)
-            time.sleep(0.8)
-        
-        # 消息输入完成，等待一下确保输入生效
-        time.sleep(0.5)
+            input_scheduler.typewrite(message, interval=0.1, post_delay=0.3)
         
         # 发送消息前最后确认微信在前台
         if not is_wechat_in_foreground():
-            print("🔄 发送前确认：微信不在前台，正在激活...")
+            logger.info("🔄 发送前确认：微信不在前台，正在激活...")
             ensure_wechat_is_active()
         # 如果微信在前台，直接发送（无需额外提示）
         
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 发送消息操作被停止")
+            logger.info("⏹️ 发送消息操作被停止")
             return False
             
         # 按回车发送消息
-        print("📤 发送消息...")
-        pyautogui.press('enter')
-        time.sleep(1.5)
+        logger.info("📤 发送消息...")
+        # 等待消息发出后再进行下一个联系人的操作
+        input_scheduler.press('enter', post_delay=1.0)
         
-        print(f"✅ 消息已成功发送给 '{contact_name}': {message}")
-        print("💡 提示：消息已发送，聊天界面保持打开状态")
+        logger.info("✅ 消息已成功发送给 '%s': %s", contact_name, message)
+        logger.info("💡 提示：消息已发送，聊天界面保持打开状态")
         return True
         
     except Exception as e:
-        print(f"❌ 发送消息失败: {e}")
+        logger.error("❌ 发送消息失败: %s", e)
         return False
 
 
@@ -1418,181 +1247,203 @@ def send_message_to_contact(contact_name, message=None, stop_flag_func=None):
 
 def find_and_click_pengyouquan(stop_flag_func=None):
     """查找并点击朋友圈图标"""
-    print("🔍 查找朋友圈图标...")
+    logger.info("🔍 查找朋友圈图标...")
     
     # 检查停止标志
     if stop_flag_func and stop_flag_func():
-        print("⏹️ 查找朋友圈操作被停止")
+        logger.info("⏹️ 查找朋友圈操作被停止")
         return False
     
     try:
-        # 尝试使用图像识别找到朋友圈图标
-        pengyouquan_icon_path = get_resource_path('assets/pengyouquan.png')
-        print(f"🔍 查找朋友圈图标路径: {pengyouquan_icon_path}")
-        if os.path.exists(pengyouquan_icon_path):
-            # 使用新的图像加载函数处理中文路径
-            pengyouquan_image = load_image_with_chinese_path(pengyouquan_icon_path)
-            if pengyouquan_image:
-                pengyouquan_icon = pyautogui.locateOnScreen(pengyouquan_image, confidence=0.8)
-            else:
-                print(f"❌ 无法加载朋友圈图标: {pengyouquan_icon_path}")
-                pengyouquan_icon = None
-        else:
-            print(f"⚠️ 朋友圈图标文件不存在: {pengyouquan_icon_path}")
-            pengyouquan_icon = None
+        # 朋友圈窗口已在前台时不再点击入口
+        if screen_state.classify().state in MOMENTS_STATES:
+            logger.info("✅ 朋友圈已打开，跳过点击入口")
+            return True
+        
+        # 先检查上次找到的位置，未命中时在微信窗口内按图标查找，再用RapidOCR查找"朋友圈"文字
+        pengyouquan_icon = locator.locate("pengyouquan_entry", stop_flag_func)
         if pengyouquan_icon:
             # 检查停止标志
             if stop_flag_func and stop_flag_func():
-                print("⏹️ 查找朋友圈操作被停止")
+                logger.info("⏹️ 查找朋友圈操作被停止")
                 return False
-            pyautogui.click(pengyouquan_icon)
-            print("✅ 通过图像识别找到并点击了朋友圈图标")
+            input_scheduler.click(*box_center(pengyouquan_icon))
+            logger.info("✅ 找到并点击了朋友圈入口: %s", pengyouquan_icon)
             return True
         
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 查找朋友圈操作被停止")
-            return False
-        
-        # 备用方案：使用RapidOCR查找"朋友圈"文字
-        if RAPID_OCR_AVAILABLE and ocr_engine:
-            screenshot = pyautogui.screenshot()
-            result = smart_ocr_recognition(screenshot, "朋友圈", stop_flag_func)
-            if result:
-                # 检查停止标志
-                if stop_flag_func and stop_flag_func():
-                    print("⏹️ 查找朋友圈操作被停止")
-                    return False
-                pyautogui.click(result[0], result[1])
-                print("✅ 通过RapidOCR找到并点击了朋友圈")
-                return True
-        
-        print("❌ 未找到朋友圈图标")
+        logger.info("❌ 未找到朋友圈图标")
         return False
         
     except Exception as e:
-        print(f"❌ 查找朋友圈图标失败: {e}")
+        logger.error("❌ 查找朋友圈图标失败: %s", e)
         return False
 
+@input_scheduler.operation("点赞")
 def check_and_perform_dianzan(dianzan_position, enable_comment=False, comment_text="", stop_flag_func=None):
     """检测点赞状态并执行点赞操作 - 返回操作结果"""
-    print("🔍 检测点赞状态...")
+    logger.info("🔍 检测点赞状态...")
     
     try:
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 收到停止信号，中断点赞操作")
+            logger.info("⏹️ 收到停止信号，中断点赞操作")
             return False
             
-        # 点击点赞按钮弹出界面
-        pyautogui.click(dianzan_position[0], dianzan_position[1])
-        print("✅ 已点击点赞按钮，等待界面弹出...")
-        time.sleep(1.5)  # 等待界面弹出
+        # 点击点赞按钮弹出界面，在弹出区域内等待已点赞/未点赞图标出现
+        logger.info("✅ 点击点赞按钮，等待界面弹出...")
+        popup_region = popup_probe_region(dianzan_position[0], dianzan_position[1])
+        click_dianzan = lambda: input_scheduler.click(dianzan_position[0], dianzan_position[1], post_delay=0)
+        # 已赞/未赞图标形状相同、只有颜色不同，按颜色匹配
+        state_predicates = {state: template_present(image, confidence=0.8)
+                            for state, image in (('yizan', load_asset_image('yizan.png')),
+                                                 ('nozan', load_asset_image('nozan.png'))) if image}
+        popup_state, popup_box = None, None
+        if state_predicates:
+            popup = act_and_wait_for(click_dianzan, any_of(**state_predicates), popup_region, timeout=2.5,
+                                     stop_flag_func=stop_flag_func, description="点赞弹出界面", kind="popup")
+            if popup.reason == "stopped":
+                logger.info("⏹️ 收到停止信号，中断点赞操作")
+                return False
+            if popup.ok:
+                popup_state, popup_box = popup.value[0], offset_box(popup.value[1], popup_region)
+                PERCEPTION_PATH.inc(stage="like_state", path="popup_template")
+        else:
+            act_and_wait_stable(click_dianzan, popup_region, timeout=2.5,
+                                stop_flag_func=stop_flag_func, description="点赞弹出界面", kind="popup")
         
         # 检测已点赞状态 (yizan.png)
-        print("🔍 正在识别已点赞状态图标 (yizan.png)...")
+        logger.info("🔍 正在识别已点赞状态图标 (yizan.png)...")
         try:
-            yizan_icon_path = get_resource_path('assets/yizan.png')
-            if os.path.exists(yizan_icon_path):
-                yizan_image = load_image_with_chinese_path(yizan_icon_path)
-                yizan_icon = pyautogui.locateOnScreen(yizan_image, confidence=0.8) if yizan_image else None
+            if popup_state is not None:
+                yizan_icon = popup_box if popup_state == 'yizan' else None
             else:
-                yizan_icon = None
+                # 弹出区域内未识别到，退回全屏查找
+                yizan_image = load_asset_image('yizan.png')
+                yizan_icon = backend.locate_on_screen(yizan_image, confidence=0.8) if yizan_image else None
             if yizan_icon:
-                print(f"✅ 检测到已点赞状态，位置: {yizan_icon}，无需重复点赞")
+                logger.info("✅ 检测到已点赞状态，位置: %s，无需重复点赞", yizan_icon)
+                if popup_state is None:
+                    PERCEPTION_PATH.inc(stage="like_state", path="fullscreen_template")
                 
                 # 即使已点赞，如果启用评论功能，仍然执行评论操作
                 if enable_comment and comment_text.strip():
-                    print("💬 检测到已点赞状态，但仍需执行评论操作...")
+                    logger.info("💬 检测到已点赞状态，但仍需执行评论操作...")
                     success = perform_comment_action(comment_text, dianzan_position, stop_flag_func)
                     if success:
-                        print("✅ 评论操作完成")
+                        logger.info("✅ 评论操作完成")
                     else:
-                        print("⚠️ 评论操作失败")
+                        logger.warning("⚠️ 评论操作失败")
                 
 
                 return True  # 已点赞，操作成功
             else:
-                print("❌ 未找到已点赞状态图标")
+                logger.info("❌ 未找到已点赞状态图标")
         except Exception as e:
-            print(f"❌ 识别已点赞状态时出错: {e}")
+            logger.error("❌ 识别已点赞状态时出错: %s", e)
         
         # 检测未点赞状态 (nozan.png)
-        print("🔍 正在识别未点赞状态图标 (nozan.png)...")
+        logger.info("🔍 正在识别未点赞状态图标 (nozan.png)...")
         try:
-            nozan_icon_path = get_resource_path('assets/nozan.png')
-            if os.path.exists(nozan_icon_path):
-                nozan_image = load_image_with_chinese_path(nozan_icon_path)
-                nozan_icon = pyautogui.locateOnScreen(nozan_image, confidence=0.8) if nozan_image else None
+            if popup_state is not None:
+                nozan_icon = popup_box if popup_state == 'nozan' else None
             else:
-                nozan_icon = None
+                nozan_image = load_asset_image('nozan.png')
+                nozan_icon = backend.locate_on_screen(nozan_image, confidence=0.8) if nozan_image else None
             if nozan_icon:
-                print(f"✅ 检测到未点赞状态，位置: {nozan_icon}，执行点赞操作")
+                logger.info("✅ 检测到未点赞状态，位置: %s，执行点赞操作", nozan_icon)
+                if popup_state is None:
+                    PERCEPTION_PATH.inc(stage="like_state", path="fullscreen_template")
                 # 点击点赞图标进行点赞
-                pyautogui.click(nozan_icon)
-                time.sleep(1)  # 等待点赞完成
-                print("👍 点赞操作完成")
+                input_scheduler.click(*box_center(nozan_icon))
+                cancellation.sleep(1)  # 等待点赞完成
+                logger.info("👍 点赞操作完成")
                 
                 # 如果启用评论功能，尝试点击评论
                 if enable_comment and comment_text.strip():
-                    print("💬 开始执行评论操作...")
+                    logger.info("💬 开始执行评论操作...")
                     success = perform_comment_action(comment_text, dianzan_position, stop_flag_func)
                     if success:
-                        print("✅ 评论操作完成")
+                        logger.info("✅ 评论操作完成")
                     else:
-                        print("⚠️ 评论操作失败")
+                        logger.warning("⚠️ 评论操作失败")
                 
                 return True  # 点赞成功
             else:
-                print("❌ 未找到未点赞状态图标")
+                logger.info("❌ 未找到未点赞状态图标")
         except Exception as e:
-            print(f"❌ 识别未点赞状态时出错: {e}")
+            logger.error("❌ 识别未点赞状态时出错: %s", e)
         
         # 如果都没检测到，尝试通用点赞操作
-        print("⚠️ 无法确定点赞状态，尝试通用点赞操作")
+        logger.warning("⚠️ 无法确定点赞状态，尝试通用点赞操作")
         # 在弹出界面中查找可能的点赞按钮
         try:
             # 尝试查找并点击点赞相关的图标
-            dianzan_in_popup_path = get_resource_path('assets/dianzan.png')
+            dianzan_in_popup_path = get_asset_path('dianzan.png')
             if os.path.exists(dianzan_in_popup_path):
                 dianzan_image = load_image_with_chinese_path(dianzan_in_popup_path)
-                dianzan_in_popup = pyautogui.locateOnScreen(dianzan_image, confidence=0.7) if dianzan_image else None
+                dianzan_in_popup = backend.locate_on_screen(dianzan_image, confidence=0.7, grayscale=True) if dianzan_image else None
             else:
                 dianzan_in_popup = None
             if dianzan_in_popup:
-                pyautogui.click(dianzan_in_popup)
-                time.sleep(1)
-                print("👍 通用点赞操作完成")
+                PERCEPTION_PATH.inc(stage="like_state", path="generic_dianzan")
+                input_scheduler.click(dianzan_in_popup)
+                cancellation.sleep(1)
+                logger.info("👍 通用点赞操作完成")
                 
                 # 如果启用评论功能，尝试点击评论
                 if enable_comment and comment_text.strip():
-                    print("💬 开始执行评论操作...")
+                    logger.info("💬 开始执行评论操作...")
                     success = perform_comment_action(comment_text, dianzan_position, stop_flag_func)
                     if success:
-                        print("✅ 评论操作完成")
+                        logger.info("✅ 评论操作完成")
                     else:
-                        print("⚠️ 评论操作失败")
+                        logger.warning("⚠️ 评论操作失败")
                 
                 return True
         except:
             pass
         
 
-        print("⚠️ 无法执行点赞操作")
+        logger.warning("⚠️ 无法执行点赞操作")
+        PERCEPTION_PATH.inc(stage="like_state", path="none")
         return False
         
     except Exception as e:
-        print(f"❌ 检测点赞状态失败: {e}")
+        logger.error("❌ 检测点赞状态失败: %s", e)
         return False
 
+def wait_pasted_comment(paste, comment, send_box, window_rect, stop_flag_func=None):
+    """粘贴评论内容，并等待它出现在评论框中
+    
+    评论框与发送按钮在同一行：只对这一行做OCR，识别到评论开头的文字即返回。
+    没有发送按钮位置或OCR不可用时，改为等待这一区域的画面变化后稳定。
+    
+    Args:
+        paste: 执行粘贴的无参数函数
+        comment: 评论内容
+        send_box: 发送按钮的屏幕坐标 (x, y, w, h)，未知时为None
+        window_rect: 朋友圈窗口区域，send_box 未知时作为等待区域
+        stop_flag_func: 停止标志检查函数
+    """
+    region = window_rect
+    if send_box is not None and window_rect is not None:
+        # 发送按钮所在行（上下各留出一些余量），宽度为整个窗口
+        region = clamp_region(window_rect[0], send_box[1] - 10, window_rect[2], send_box[3] + 20)
+    if send_box is None or not (RAPID_OCR_AVAILABLE and ocr_engine and ocr_engine.is_available()):
+        return act_and_wait_stable(paste, region, timeout=1.5, stop_flag_func=stop_flag_func, description="评论内容")
+    # 长评论可能换行或被截断，只匹配开头的几个字
+    pasted = text_present(comment.strip()[:8], ocr_engine.recognize_text, site="pasted_comment")
+    return act_and_wait_for(paste, pasted, region, timeout=1.5, stop_flag_func=stop_flag_func, description="评论内容")
+
+@input_scheduler.operation("评论")
 def perform_comment_action(comment_text, dianzan_position=None, stop_flag_func=None):
     """执行评论操作"""
     try:
-        print("🔍 开始执行评论操作...")
+        logger.info("🔍 开始执行评论操作...")
         
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 收到停止信号，中断评论操作")
+            logger.info("⏹️ 收到停止信号，中断评论操作")
             return False
         
         # 处理多条评论，随机选择一条
@@ -1601,138 +1452,153 @@ def perform_comment_action(comment_text, dianzan_position=None, stop_flag_func=N
             comment_list = [comment.strip() for comment in comment_text.split(',') if comment.strip()]
             if comment_list:
                 selected_comment = random.choice(comment_list)
-                print(f"💬 从 {len(comment_list)} 条评论中随机选择: {selected_comment}")
+                logger.info("💬 从 %s 条评论中随机选择: %s", len(comment_list), selected_comment)
             else:
-                print("❌ 评论内容为空")
+                logger.info("❌ 评论内容为空")
                 return False
         else:
             selected_comment = comment_text.strip()
-            print(f"💬 使用评论内容: {selected_comment}")
+            logger.info("💬 使用评论内容: %s", selected_comment)
         
         if not selected_comment:
-            print("❌ 评论内容为空")
+            logger.info("❌ 评论内容为空")
             return False
         
-        # 首先点击点赞按钮重新弹出界面
+        # 首先点击点赞按钮重新弹出界面，在弹出区域内等待评论图标出现
+        pinglun_image = load_asset_image('pinglun.png')
+        pinglun_icon = None
+        
+        def reopen_popup(anchor_x, anchor_y):
+            popup_region = popup_probe_region(anchor_x, anchor_y)
+            click_anchor = lambda: input_scheduler.click(anchor_x, anchor_y, post_delay=0)
+            if pinglun_image is None:
+                act_and_wait_stable(click_anchor, popup_region, timeout=2.5,
+                                    stop_flag_func=stop_flag_func, description="点赞弹出界面", kind="popup")
+                return None
+            popup = act_and_wait_for(click_anchor, template_present(pinglun_image, confidence=0.8, grayscale=True),
+                                     popup_region, timeout=2.5, stop_flag_func=stop_flag_func,
+                                     description="点赞弹出界面", kind="popup")
+            if not popup.ok:
+                return None
+            icon = offset_box(popup.value, popup_region)
+            locator.remember("comment_icon", icon)
+            return icon
+        
         if dianzan_position:
-            print(f"🔍 点击点赞按钮重新弹出界面，位置: {dianzan_position}")
+            logger.info("🔍 点击点赞按钮重新弹出界面，位置: %s", dianzan_position)
             try:
-                pyautogui.click(dianzan_position[0], dianzan_position[1])
-                time.sleep(1.5)  # 等待界面弹出
-                print("✅ 已重新弹出点赞界面")
+                pinglun_icon = reopen_popup(dianzan_position[0], dianzan_position[1])
+                logger.info("✅ 已重新弹出点赞界面")
             except Exception as e:
-                print(f"❌ 点击点赞按钮时出错: {e}，尝试继续查找评论图标")
+                logger.error("❌ 点击点赞按钮时出错: %s，尝试继续查找评论图标", e)
         else:
-            print("⚠️ 未提供点赞按钮位置，尝试查找点赞图标...")
+            logger.warning("⚠️ 未提供点赞按钮位置，尝试查找点赞图标...")
             try:
-                dianzan_icon_path = get_resource_path('assets/dianzan.png')
-                if os.path.exists(dianzan_icon_path):
-                    dianzan_image = load_image_with_chinese_path(dianzan_icon_path)
-                    dianzan_icon = pyautogui.locateOnScreen(dianzan_image, confidence=0.8) if dianzan_image else None
-                else:
-                    dianzan_icon = None
+                dianzan_image = load_asset_image('dianzan.png')
+                dianzan_icon = backend.locate_on_screen(dianzan_image, confidence=0.8, grayscale=True) if dianzan_image else None
                 if dianzan_icon:
-                    print(f"✅ 找到点赞图标，位置: {dianzan_icon}")
-                    pyautogui.click(dianzan_icon)
-                    time.sleep(1.5)  # 等待界面弹出
-                    print("✅ 已重新弹出点赞界面")
+                    logger.info("✅ 找到点赞图标，位置: %s", dianzan_icon)
+                    icon_x, icon_y = box_center(dianzan_icon)
+                    pinglun_icon = reopen_popup(icon_x, icon_y)
+                    logger.info("✅ 已重新弹出点赞界面")
                 else:
-                    print("❌ 未找到点赞图标，尝试继续查找评论图标")
+                    logger.info("❌ 未找到点赞图标，尝试继续查找评论图标")
             except Exception as e:
-                print(f"❌ 查找点赞图标时出错: {e}，尝试继续查找评论图标")
+                logger.error("❌ 查找点赞图标时出错: %s，尝试继续查找评论图标", e)
         
         # 查找评论图标
-        print("🔍 正在查找评论图标 (pinglun.png)...")
+        logger.info("🔍 正在查找评论图标 (pinglun.png)...")
         try:
-            pinglun_icon_path = get_resource_path('assets/pinglun.png')
-            if os.path.exists(pinglun_icon_path):
-                pinglun_image = load_image_with_chinese_path(pinglun_icon_path)
-                pinglun_icon = pyautogui.locateOnScreen(pinglun_image, confidence=0.8) if pinglun_image else None
-            else:
-                pinglun_icon = None
+            if pinglun_icon is None:
+                # 弹出区域内未识别到：先检查上次找到的位置，再在朋友圈窗口内查找
+                pinglun_icon = locator.locate("comment_icon", stop_flag_func)
             if pinglun_icon:
-                print(f"✅ 找到评论图标，位置: {pinglun_icon}")
-                # 点击评论图标
-                pyautogui.click(pinglun_icon)
-                time.sleep(1.5)  # 等待评论输入框出现
+                logger.info("✅ 找到评论图标，位置: %s", pinglun_icon)
+                # 点击评论图标，等待评论输入框（以发送按钮为标志）出现
+                click_pinglun = lambda: input_scheduler.click(*box_center(pinglun_icon), post_delay=0)
+                fasong_image = load_asset_image('fasong.png')
+                comment_region = get_pengyouquan_window_rect()
+                send_box = None
+                if fasong_image is not None:
+                    comment_box = act_and_wait_for(click_pinglun, template_present(fasong_image, confidence=0.6,
+                                                                                   grayscale=True),
+                                                   comment_region, timeout=2.5,
+                                                   stop_flag_func=stop_flag_func, description="评论输入框", kind="comment_box")
+                    if comment_box.ok:
+                        send_box = offset_box(comment_box.value, comment_region)
+                        locator.remember("send_button", send_box)
+                else:
+                    act_and_wait_stable(click_pinglun, comment_region, timeout=2.5,
+                                        stop_flag_func=stop_flag_func, description="评论输入框", kind="comment_box")
                 
-                print("💬 开始输入评论内容...")
-                print(f"💡 输入内容: {selected_comment}")
+                logger.info("💬 开始输入评论内容...")
+                logger.info("💡 输入内容: %s", selected_comment)
                 
                 # 使用剪贴板方式输入评论内容（支持中文）
                 try:
-                    import pyperclip
-                    # 将评论内容复制到剪贴板
-                    pyperclip.copy(selected_comment)
-                    time.sleep(0.3)
+                    # 将评论内容复制到剪贴板（后端不支持剪贴板时抛出ImportError）
+                    backend.copy_to_clipboard(selected_comment)
                     
-                    # 使用Ctrl+V粘贴
-                    pyautogui.hotkey('ctrl', 'v')
-                    print("✅ 使用剪贴板成功输入评论内容")
-                    time.sleep(0.8)
+                    # 使用Ctrl+V粘贴，之后只等待一次：评论框所在行识别到评论内容即可发送
+                    paste = lambda: input_scheduler.hotkey('ctrl', 'v', post_delay=0)
+                    wait_pasted_comment(paste, selected_comment, send_box, comment_region, stop_flag_func)
+                    logger.info("✅ 使用剪贴板成功输入评论内容")
                     
                 except ImportError:
-                    print("⚠️ pyperclip模块未安装，尝试直接输入...")
+                    logger.warning("⚠️ pyperclip模块未安装，尝试直接输入...")
                     # 备用方案：直接输入（可能不支持中文）
-                    pyautogui.typewrite(selected_comment, interval=0.05)
-                    time.sleep(0.5)
+                    input_scheduler.typewrite(selected_comment, interval=0.05)
+                    cancellation.sleep(0.5)
                     
                 except Exception as e:
-                    print(f"⚠️ 剪贴板输入失败，尝试直接输入: {e}")
+                    logger.warning("⚠️ 剪贴板输入失败，尝试直接输入: %s", e)
                     # 备用方案：直接输入
-                    pyautogui.typewrite(selected_comment, interval=0.05)
-                    time.sleep(0.5)
+                    input_scheduler.typewrite(selected_comment, interval=0.05)
+                    cancellation.sleep(0.5)
                 
-                print("📤 查找发送按钮 (fasong.png)...")
-                # 查找并点击发送按钮，尝试不同置信度
+                logger.info("📤 查找发送按钮 (fasong.png)...")
+                # 查找并点击发送按钮：先检查评论框出现时的位置，再在朋友圈窗口内依次降低置信度查找
                 fasong_found = False
-                confidence_levels = [0.8, 0.7, 0.6, 0.5]
-                
-                for confidence in confidence_levels:
-                    try:
-                        print(f"🔍 尝试置信度 {confidence} 查找发送按钮...")
-                        fasong_icon_path = get_resource_path('assets/fasong.png')
-                        if os.path.exists(fasong_icon_path):
-                            fasong_image = load_image_with_chinese_path(fasong_icon_path)
-                            fasong_icon = pyautogui.locateOnScreen(fasong_image, confidence=confidence) if fasong_image else None
+                try:
+                    fasong_icon = locator.locate("send_button", stop_flag_func)
+                    if fasong_icon:
+                        logger.info("✅ 找到发送按钮，位置: %s", fasong_icon)
+                        input_scheduler.click(*box_center(fasong_icon))
+                        cancellation.sleep(1)  # 等待发送完成
+                        # 评论框仍在说明点击没有生效，改用回车键发送
+                        if screen_state.classify().state == COMMENT_BOX:
+                            logger.warning("⚠️ 点击发送按钮后评论框仍在")
                         else:
-                            fasong_icon = None
-                        if fasong_icon:
-                            print(f"✅ 找到发送按钮，位置: {fasong_icon} (置信度: {confidence})")
-                            pyautogui.click(fasong_icon)
-                            time.sleep(1)  # 等待发送完成
-                            print("✅ 评论发送成功")
+                            logger.info("✅ 评论发送成功")
                             fasong_found = True
-                            break
-                    except Exception as e:
-                        print(f"❌ 置信度 {confidence} 检测出错: {e}")
-                        continue
+                except Exception as e:
+                    logger.error("❌ 查找发送按钮出错: %s", e)
                 
                 if not fasong_found:
-                    print("❌ 所有置信度都未找到发送按钮，尝试使用回车键发送")
-                    pyautogui.press('enter')
-                    time.sleep(1)
-                    print("✅ 评论发送完成（使用回车键）")
+                    logger.info("❌ 未能通过发送按钮发送评论，尝试使用回车键发送")
+                    input_scheduler.press('enter')
+                    cancellation.sleep(1)
+                    logger.info("✅ 评论发送完成（使用回车键）")
                 
                 return True
             else:
-                print("❌ 未找到评论图标")
+                logger.info("❌ 未找到评论图标")
                 return False
         except Exception as e:
-            print(f"❌ 查找评论图标时出错: {e}")
+            logger.error("❌ 查找评论图标时出错: %s", e)
             return False
             
     except Exception as e:
-        print(f"❌ 评论操作失败: {e}")
+        logger.error("❌ 评论操作失败: %s", e)
         return False
 
 def find_and_click_dianzan(target_name, name_position=None, max_scroll_attempts=3, enable_comment=False, comment_text="", stop_flag_func=None):
     """查找并点击点赞按钮 - 持续滚动查找下方最近的点赞按钮，并检测点赞状态"""
-    print("👍 查找点赞按钮...")
+    logger.info("👍 查找点赞按钮...")
     
     # 检查停止标志
     if stop_flag_func and stop_flag_func():
-        print("⏹️ 点赞操作被停止")
+        logger.info("⏹️ 点赞操作被停止")
         return False
     
     def try_find_dianzan_icon_with_name_position(current_name_position):
@@ -1741,8 +1607,9 @@ def find_and_click_dianzan(target_name, name_position=None, max_scroll_attempts=
             return None
             
         # 使用图像识别找到点赞图标
-        dianzan_icon_path = get_resource_path('assets/dianzan.png')
-        dianzan_icons = list(pyautogui.locateAllOnScreen(dianzan_icon_path, confidence=0.8)) if os.path.exists(dianzan_icon_path) else []
+        dianzan_icon_path = get_asset_path('dianzan.png')
+        dianzan_icons = (backend.locate_all_on_screen(dianzan_icon_path, confidence=0.8, grayscale=True)
+                         if os.path.exists(dianzan_icon_path) else [])
         if dianzan_icons:
             # 找到用户名下方最近的点赞按钮
             name_x, name_y = current_name_position
@@ -1771,12 +1638,12 @@ def find_and_click_dianzan(target_name, name_position=None, max_scroll_attempts=
         if not current_name_position:
             current_name_position = enhanced_recognition_in_current_view(target_name, stop_flag_func)
             if not current_name_position:
-                print(f"❌ 无法识别用户名 '{target_name}' 的位置")
+                logger.info("❌ 无法识别用户名 '%s' 的位置", target_name)
                 return False
         
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 点赞操作被停止")
+            logger.info("⏹️ 点赞操作被停止")
             return False
             
         # 第一次尝试查找点赞图标
@@ -1786,41 +1653,40 @@ def find_and_click_dianzan(target_name, name_position=None, max_scroll_attempts=
             # 检测点赞状态并执行相应操作
             result = check_and_perform_dianzan(dianzan_position, enable_comment, comment_text, stop_flag_func)
             if result:
-                print("✅ 找到并完成了用户名下方的点赞操作")
+                logger.info("✅ 找到并完成了用户名下方的点赞操作")
                 return True
             else:
-                print("❌ 点赞操作失败")
+                logger.info("❌ 点赞操作失败")
                 return False
         
         # 如果没有找到点赞图标，继续下键滚动查找
-        print("⚠️ 未找到点赞图标，开始下键滚动查找下方最近的点赞按钮...")
+        logger.warning("⚠️ 未找到点赞图标，开始下键滚动查找下方最近的点赞按钮...")
+        PERCEPTION_PATH.inc(stage="dianzan_button", path="rescroll")
         
         for scroll_attempt in range(max_scroll_attempts):
             # 检查停止标志
             if stop_flag_func and stop_flag_func():
-                print("⏹️ 点赞操作被停止")
+                logger.info("⏹️ 点赞操作被停止")
                 return False
                 
-            print(f"🔄 第 {scroll_attempt + 1}/{max_scroll_attempts} 次滚动查找点赞按钮")
+            logger.info("🔄 第 %s/%s 次滚动查找点赞按钮", scroll_attempt + 1, max_scroll_attempts)
             
-            # 按下键滚动
-            pyautogui.press('down')
-            print("⬇️ 已按下键滚动")
-            
-            # 等待滚动动画完成
-            time.sleep(0.8)
+            # 按下键滚动，等待滚动动画完成
+            act_and_wait_stable(lambda: input_scheduler.press('down', post_delay=0), get_pengyouquan_window_rect(), timeout=1.5,
+                                stop_flag_func=stop_flag_func, description="滚动画面", kind="scroll")
+            logger.info("⬇️ 已按下键滚动")
             
             # 重新识别用户名位置
-            print(f"🔍 重新识别用户名 '{target_name}' 的位置...")
+            logger.info("🔍 重新识别用户名 '%s' 的位置...", target_name)
             current_name_position = enhanced_recognition_in_current_view(target_name, stop_flag_func)
             
             if not current_name_position:
-                print(f"⚠️ 第 {scroll_attempt + 1} 次滚动后无法识别用户名位置，继续滚动...")
+                logger.warning("⚠️ 第 %s 次滚动后无法识别用户名位置，继续滚动...", scroll_attempt + 1)
                 continue
             
             # 检查停止标志
             if stop_flag_func and stop_flag_func():
-                print("⏹️ 点赞操作被停止")
+                logger.info("⏹️ 点赞操作被停止")
                 return False
                 
             # 基于新的用户名位置查找点赞图标
@@ -1830,22 +1696,23 @@ def find_and_click_dianzan(target_name, name_position=None, max_scroll_attempts=
                 # 检测点赞状态并执行相应操作
                 result = check_and_perform_dianzan(dianzan_position, enable_comment, comment_text, stop_flag_func)
                 if result:
-                    print(f"✅ 在第 {scroll_attempt + 1} 次滚动后找到并完成了点赞操作")
+                    logger.info("✅ 在第 %s 次滚动后找到并完成了点赞操作", scroll_attempt + 1)
                     return True
                 else:
-                    print(f"❌ 在第 {scroll_attempt + 1} 次滚动后点赞操作失败")
+                    logger.info("❌ 在第 %s 次滚动后点赞操作失败", scroll_attempt + 1)
                     return False
             else:
-                print(f"❌ 第 {scroll_attempt + 1} 次滚动后仍未找到点赞按钮，继续滚动...")
+                logger.info("❌ 第 %s 次滚动后仍未找到点赞按钮，继续滚动...", scroll_attempt + 1)
         
         # 如果滚动多次后还是找不到，直接放弃点赞
-        print(f"❌ 滚动 {max_scroll_attempts} 次后仍未找到点赞图标，放弃点赞操作")
+        logger.info("❌ 滚动 %s 次后仍未找到点赞图标，放弃点赞操作", max_scroll_attempts)
         return False
         
     except Exception as e:
-        print(f"❌ 查找点赞按钮失败: {e}")
+        logger.error("❌ 查找点赞按钮失败: %s", e)
         return False
 
+@traced("adjust_pengyouquan_window_size", "window")
 def adjust_pengyouquan_window_size(hwnd, stop_flag_func=None):
     """调整朋友圈窗口大小，使其高度适应屏幕并进行拉伸
     
@@ -1856,19 +1723,19 @@ def adjust_pengyouquan_window_size(hwnd, stop_flag_func=None):
     try:
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 调整朋友圈窗口大小操作被停止")
+            logger.info("⏹️ 调整朋友圈窗口大小操作被停止")
             return False
             
         # 获取屏幕尺寸
-        screen_width, screen_height = pyautogui.size()
-        print(f"📐 屏幕尺寸: {screen_width}x{screen_height}")
+        screen_width, screen_height = backend.screen_size()
+        logger.debug("📐 屏幕尺寸: %sx%s", screen_width, screen_height)
         
         # 获取当前窗口位置和大小
-        current_rect = win32gui.GetWindowRect(hwnd)
+        current_rect = backend.window_rect(hwnd)
         current_left, current_top, current_right, current_bottom = current_rect
         current_width = current_right - current_left
         current_height = current_bottom - current_top
-        print(f"📐 当前朋友圈窗口: 位置({current_left}, {current_top}) 尺寸({current_width}x{current_height})")
+        logger.debug("📐 当前朋友圈窗口: 位置(%s, %s) 尺寸(%sx%s)", current_left, current_top, current_width, current_height)
         
         # 计算新的窗口尺寸和位置
         # 保持窗口宽度不变，但调整高度为屏幕高度的100%
@@ -1879,34 +1746,102 @@ def adjust_pengyouquan_window_size(hwnd, stop_flag_func=None):
         new_left = 0  # 靠左边显示
         new_top = 0   # 靠顶部显示
         
-        print(f"📐 调整后朋友圈窗口: 位置({new_left}, {new_top}) 尺寸({new_width}x{new_height})")
+        logger.debug("📐 调整后朋友圈窗口: 位置(%s, %s) 尺寸(%sx%s)", new_left, new_top, new_width, new_height)
         
         # 调整窗口大小和位置
-        win32gui.SetWindowPos(
-            hwnd,
-            win32con.HWND_TOP,  # 置于顶层
-            new_left, new_top,  # 新位置
-            new_width, new_height,  # 新尺寸
-            win32con.SWP_SHOWWINDOW  # 显示窗口
-        )
+        backend.move_window(hwnd, new_left, new_top, new_width, new_height)
         
         # 等待窗口调整完成
-        time.sleep(0.5)
+        cancellation.sleep(0.5)
         
         # 验证调整结果
-        adjusted_rect = win32gui.GetWindowRect(hwnd)
+        adjusted_rect = backend.window_rect(hwnd)
         adjusted_left, adjusted_top, adjusted_right, adjusted_bottom = adjusted_rect
         adjusted_width = adjusted_right - adjusted_left
         adjusted_height = adjusted_bottom - adjusted_top
         
-        print(f"✅ 朋友圈窗口已调整: 位置({adjusted_left}, {adjusted_top}) 尺寸({adjusted_width}x{adjusted_height})")
+        logger.info("✅ 朋友圈窗口已调整: 位置(%s, %s) 尺寸(%sx%s)", adjusted_left, adjusted_top, adjusted_width, adjusted_height)
         return True
         
     except Exception as e:
-        print(f"❌ 调整朋友圈窗口大小失败: {e}")
+        logger.error("❌ 调整朋友圈窗口大小失败: %s", e)
         return False
 
 
+def find_pengyouquan_window():
+    """统一的朋友圈窗口查找函数"""
+    # 查找朋友圈窗口
+    return [(hwnd, window_text) for hwnd, window_text in backend.list_windows() if "朋友圈" in window_text]
+
+def get_pengyouquan_window_rect():
+    """获取朋友圈窗口区域 (left, top, width, height)，不激活、不调整窗口，找不到时返回None"""
+    try:
+        pengyouquan_windows = find_pengyouquan_window()
+        if not pengyouquan_windows:
+            return None
+        
+        left, top, right, bottom = backend.window_rect(pengyouquan_windows[0][0])
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0 or left < 0 or top < 0:
+            return None
+        return (left, top, width, height)
+    except Exception:
+        return None
+
+def _locator_ocr(image):
+    """界面元素定位器的OCR文字查找，OCR不可用时返回空结果"""
+    if not (RAPID_OCR_AVAILABLE and ocr_engine):
+        return []
+    return ocr_engine.recognize_text(image, site="ui_locator")
+
+# 界面元素定位器：窗口位置、图标加载和OCR由核心引擎提供
+locator.configure(windows={"main": get_wechat_window_rect, "moments": get_pengyouquan_window_rect},
+                  asset_loader=load_asset_image, ocr_func=_locator_ocr)
+
+def capture_pengyouquan_frame():
+    """截取朋友圈窗口当前画面（不激活、不调整窗口），用于帧间对比
+    
+    Returns:
+        RGB numpy数组，找不到窗口时返回None
+    """
+    try:
+        region = get_pengyouquan_window_rect()
+        if not region:
+            return None
+        return backend.grab(region=region)
+    except Exception as e:
+        logger.warning("⚠️ 截取朋友圈画面失败: %s", e)
+        return None
+
+def check_scroll_moved(scroll_estimator, reference_frame):
+    """对比滚动前后的朋友圈画面，判断这次滚动是否真的移动了内容
+    
+    Args:
+        scroll_estimator: ScrollOffsetEstimator 实例
+        reference_frame: 滚动前截取的画面（None表示无法对比）
+    
+    Returns:
+        True表示画面已滚动（或无法判断），False表示画面没有移动
+    """
+    if reference_frame is None:
+        return True
+    
+    current_frame = capture_pengyouquan_frame()
+    if current_frame is None:
+        return True
+    
+    scroll_estimator.reset(reference_frame)
+    scroll_offset = scroll_estimator.update(current_frame)
+    if not scroll_offset.moved:
+        return False
+    
+    if scroll_offset.reliable:
+        logger.info("📏 滚动偏移 %spx，新露出区域: 第 %s-%s 行",
+                    scroll_offset.offset, scroll_offset.new_rows[0], scroll_offset.new_rows[1])
+    else:
+        logger.info("📏 无法估计滚动偏移，按整屏新内容处理")
+    return True
+
 def get_pengyouquan_window_region(stop_flag_func=None, enable_window_resize=True):
     """获取朋友圈窗口的区域坐标 - 使用健壮的窗口查找机制
     
@@ -1915,25 +1850,6 @@ def get_pengyouquan_window_region(stop_flag_func=None, enable_window_resize=True
         enable_window_resize: 是否启用窗口大小调整
     """
     try:
-        def find_pengyouquan_window():
-            windows = []
-            def enum_windows_callback(hwnd, windows):
-                try:
-                    if win32gui.IsWindowVisible(hwnd):
-                        window_text = win32gui.GetWindowText(hwnd)
-                        # 查找朋友圈窗口
-                        if "朋友圈" in window_text:
-                            # 验证窗口句柄是否有效
-                            if win32gui.IsWindow(hwnd):
-                                windows.append((hwnd, window_text))
-                except:
-                    # 忽略无效窗口
-                    pass
-                return True
-            
-            win32gui.EnumWindows(enum_windows_callback, windows)
-            return windows
-        
         # 尝试多次查找和激活朋友圈窗口
         success = False
         rect = None
@@ -1941,80 +1857,80 @@ def get_pengyouquan_window_region(stop_flag_func=None, enable_window_resize=True
         for attempt in range(3):  # 最多尝试3次
             # 检查停止标志
             if stop_flag_func and stop_flag_func():
-                print("⏹️ 获取朋友圈窗口区域操作被停止")
+                logger.info("⏹️ 获取朋友圈窗口区域操作被停止")
                 return None
                 
-            print(f"🔄 第 {attempt + 1} 次尝试查找朋友圈窗口...")
+            logger.info("🔄 第 %s 次尝试查找朋友圈窗口...", attempt + 1)
             pengyouquan_windows = find_pengyouquan_window()
             
             if pengyouquan_windows:
                 hwnd, window_title = pengyouquan_windows[0]
                 try:
                     # 验证窗口句柄仍然有效
-                    if win32gui.IsWindow(hwnd):
+                    if backend.is_window(hwnd):
                         # 确保窗口不是最小化状态
-                        if win32gui.IsIconic(hwnd):
-                            print("⚠️ 朋友圈窗口被最小化，正在恢复...")
-                            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-                            time.sleep(1)  # 等待窗口恢复
+                        if backend.is_minimized(hwnd):
+                            logger.warning("⚠️ 朋友圈窗口被最小化，正在恢复...")
+                            backend.restore_window(hwnd)
+                            cancellation.sleep(1)  # 等待窗口恢复
                         
                         # 先尝试显示窗口
-                        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-                        time.sleep(0.5)
+                        backend.restore_window(hwnd)
+                        cancellation.sleep(0.5)
                         
                         # 再尝试设置前台窗口
-                        win32gui.SetForegroundWindow(hwnd)
-                        time.sleep(0.5)
+                        backend.set_foreground(hwnd)
+                        cancellation.sleep(0.5)
                         
                         # 根据用户设置决定是否调整朋友圈窗口大小
                         if enable_window_resize:
-                            print("📏 正在调整朋友圈窗口大小...")
+                            logger.info("📏 正在调整朋友圈窗口大小...")
                             adjust_pengyouquan_window_size(hwnd, stop_flag_func)
                         else:
-                            print("📏 跳过朋友圈窗口大小调整（用户已禁用）")
+                            logger.info("📏 跳过朋友圈窗口大小调整（用户已禁用）")
                         
                         # 获取调整后的窗口区域
-                        rect = win32gui.GetWindowRect(hwnd)
+                        rect = backend.window_rect(hwnd)
                         left, top, right, bottom = rect
                         
                         # 验证坐标是否有效（排除最小化窗口的异常坐标）
                         if left < -10000 or top < -10000 or (right - left) < 100 or (bottom - top) < 100:
-                            print(f"⚠️ 检测到异常朋友圈窗口坐标: {rect}")
+                            logger.warning("⚠️ 检测到异常朋友圈窗口坐标: %s", rect)
                             if attempt < 2:  # 不是最后一次尝试
-                                time.sleep(1)
+                                cancellation.sleep(1)
                                 continue
                             else:
                                 return None
                         
-                        print(f"✅ 获取朋友圈窗口区域: {rect}")
+                        logger.info("✅ 获取朋友圈窗口区域: %s", rect)
                         success = True
                         break
                     else:
-                        print(f"⚠️ 朋友圈窗口句柄已失效，重试...")
-                        time.sleep(0.5)
+                        logger.warning("⚠️ 朋友圈窗口句柄已失效，重试...")
+                        cancellation.sleep(0.5)
                         continue
                 except Exception as e:
-                    print(f"⚠️ 第 {attempt + 1} 次激活朋友圈窗口失败: {e}")
+                    logger.warning("⚠️ 第 %s 次激活朋友圈窗口失败: %s", attempt + 1, e)
                     if attempt < 2:  # 不是最后一次尝试
-                        time.sleep(1)
+                        cancellation.sleep(1)
                         continue
                     else:
-                        print("❌ 多次尝试后仍无法激活朋友圈窗口")
+                        logger.info("❌ 多次尝试后仍无法激活朋友圈窗口")
                         return None
             else:
-                print(f"⚠️ 第 {attempt + 1} 次未找到朋友圈窗口")
+                logger.warning("⚠️ 第 %s 次未找到朋友圈窗口", attempt + 1)
                 if attempt < 2:
-                    time.sleep(1)
+                    cancellation.sleep(1)
                     continue
         
         if success and rect:
             return rect  # (left, top, right, bottom)
         else:
-            print("❌ 未能成功获取朋友圈窗口区域")
+            logger.info("❌ 未能成功获取朋友圈窗口区域")
             return None
             
     except Exception as e:
-        print(f"❌ 获取朋友圈窗口区域失败: {e}")
+        logger.error("❌ 获取朋友圈窗口区域失败: %s", e)
         return None
 
 def check_yesterday_marker(stop_flag_func=None):
@@ -2033,25 +1949,25 @@ def check_yesterday_marker(stop_flag_func=None):
             
             # 确保坐标和尺寸都是正数
             if width > 0 and height > 0 and left >= 0 and top >= 0:
-                screenshot = pyautogui.screenshot(region=(left, top, width, height))
+                screenshot = backend.grab(region=(left, top, width, height))
             else:
-                screenshot = pyautogui.screenshot()
+                screenshot = backend.grab()
         else:
-            screenshot = pyautogui.screenshot()
+            screenshot = backend.grab()
         
         # 使用专用的颜色过滤识别"昨天"文字（颜色 #9e9e9e = RGB(158, 158, 158)）
         target_color_rgb = (158, 158, 158)
         result = color_targeted_ocr_recognition_yesterday(screenshot, "昨天", target_color_rgb, tolerance=30, stop_flag_func=stop_flag_func)
         
         if result:
-            print(f"✅ 检测到'昨天'标记: {result}")
+            logger.info("✅ 检测到'昨天'标记: %s", result)
             return True
         else:
-            print("❌ 未检测到'昨天'标记")
+            logger.info("❌ 未检测到'昨天'标记")
             return False
         
     except Exception as e:
-        print(f"❌ 检查'昨天'标记失败: {e}")
+        logger.error("❌ 检查'昨天'标记失败: %s", e)
         return False
 
 def common_countdown_wait(wait_seconds, status_callback=None, next_user="无", stop_flag_func=None):
@@ -2061,15 +1977,18 @@ def common_countdown_wait(wait_seconds, status_callback=None, next_user="无", s
         wait_seconds: 等待秒数
         status_callback: 状态回调函数
         next_user: 下一个用户名称
-        stop_flag_func: 停止标志检查函数
+        stop_flag_func: 停止标志检查函数，传入 CancellationToken 时停止立即生效
+    
+    Returns:
+        True 表示等待完成，False 表示被停止
     """
     if wait_seconds <= 0:
-        return
+        return True
     
     # 检查停止标志
     if stop_flag_func and stop_flag_func():
-        print("⏹️ 倒计时等待被停止")
-        return
+        logger.info("⏹️ 倒计时等待被停止")
+        return False
     
     wait_minutes = wait_seconds // 60
     wait_secs = wait_seconds % 60
@@ -2077,16 +1996,11 @@ def common_countdown_wait(wait_seconds, status_callback=None, next_user="无", s
         time_str = f"{wait_minutes}分{wait_secs:02d}秒"
     else:
         time_str = f"{wait_secs}秒"
-    print(f"⏳ 等待 {time_str} 后继续下一个用户...")
+    logger.info("⏳ 等待 %s 后继续下一个用户...", time_str)
     
-    # 如果有回调函数，执行倒计时
+    # 如果有回调函数，执行倒计时（每秒刷新一次显示）
     if status_callback:
         for remaining_seconds in range(wait_seconds, 0, -1):
-            # 检查停止标志
-            if stop_flag_func and stop_flag_func():
-                print("⏹️ 倒计时等待被停止")
-                return
-                
             remaining_minutes = remaining_seconds // 60
             remaining_secs = remaining_seconds % 60
             if remaining_minutes > 0:
@@ -2095,21 +2009,22 @@ def common_countdown_wait(wait_seconds, status_callback=None, next_user="无", s
                 countdown_str = f"{remaining_secs}秒"
             
             status_callback(f"⏳ 倒计时: {countdown_str} (下一个: {next_user})")
-            time.sleep(1)
-    else:
-        # 分段等待，每秒检查一次停止标志
-        for _ in range(wait_seconds):
-            if stop_flag_func and stop_flag_func():
-                print("⏹️ 倒计时等待被停止")
-                return
-            time.sleep(1)
+            if cancellation.sleep(1, stop_flag_func):
+                logger.info("⏹️ 倒计时等待被停止")
+                return False
+    elif cancellation.sleep(wait_seconds, stop_flag_func):
+        # 没有显示需求时一次等待到底，停止时立即返回
+        logger.info("⏹️ 倒计时等待被停止")
+        return False
+    return True
 
-def common_ocr_recognition(target_names, is_multi_target=False, stop_flag_func=None):
+def common_ocr_recognition(target_names, is_multi_target=False, stop_flag_func=None, feed_tracker=None):
     """通用OCR识别接口
     
     Args:
         target_names: 目标名称，可以是字符串（单目标）或列表（多目标）
         is_multi_target: 是否为多目标识别模式
+        feed_tracker: 朋友圈动态跟踪器（MomentsFeedTracker），提供时只识别滚动后新露出的区域
     
     Returns:
         单目标模式：返回位置坐标或None
@@ -2123,10 +2038,10 @@ def common_ocr_recognition(target_names, is_multi_target=False, stop_flag_func=N
         target_list = target_names
         is_multi_target = True
     
-    print(f"🔍 在当前视图中使用RapidOCR识别查找: {', '.join(target_list)}")
+    logger.info("🔍 在当前视图中使用RapidOCR识别查找: %s", ', '.join(target_list))
     
     if not ocr_engine or not ocr_engine.is_available():
-        print("⚠️ RapidOCR不可用")
+        logger.warning("⚠️ RapidOCR不可用")
         return {} if is_multi_target else None
     
     try:
@@ -2137,19 +2052,19 @@ def common_ocr_recognition(target_names, is_multi_target=False, stop_flag_func=N
             # 只截取朋友圈窗口区域
             left, top, right, bottom = pengyouquan_region
             width, height = right - left, bottom - top
-            print(f"📸 准备截取朋友圈窗口区域: left={left}, top={top}, width={width}, height={height}")
+            logger.info("📸 准备截取朋友圈窗口区域: left=%s, top=%s, width=%s, height=%s", left, top, width, height)
             
             # 确保坐标和尺寸都是正数
             if width > 0 and height > 0 and left >= 0 and top >= 0:
-                screenshot = pyautogui.screenshot(region=(left, top, width, height))
-                print(f"✅ 成功截取朋友圈窗口区域")
+                screenshot = backend.grab(region=(left, top, width, height))
+                logger.info("✅ 成功截取朋友圈窗口区域")
             else:
-                print(f"⚠️ 朋友圈窗口区域参数异常，使用全屏截图")
-                screenshot = pyautogui.screenshot()
+                logger.warning("⚠️ 朋友圈窗口区域参数异常，使用全屏截图")
+                screenshot = backend.grab()
         else:
             # 如果获取朋友圈窗口区域失败，使用全屏截图
-            screenshot = pyautogui.screenshot()
-            print("📸 使用全屏截图（获取朋友圈窗口区域失败）")
+            screenshot = backend.grab()
+            logger.info("📸 使用全屏截图（获取朋友圈窗口区域失败）")
         
         # 保存当前截图（固定文件名，每次覆盖）- 已注释避免生成文件
         # import os
@@ -2169,35 +2084,51 @@ def common_ocr_recognition(target_names, is_multi_target=False, stop_flag_func=N
         # 执行OCR识别
         found_results = {}
         
+        if feed_tracker is not None:
+            # 增量识别模式：只识别新露出的条带，其余文字行按滚动偏移平移
+            feed_tracker.update(screenshot)
+            found_results = feed_tracker.find_targets(target_list)
+            scroll_offset = feed_tracker.last_offset
+            if scroll_offset is None:
+                logger.info("📋 整窗OCR识别到 %s 行文字", len(feed_tracker.lines))
+            elif scroll_offset.moved:
+                logger.debug("📋 增量OCR: 滚动 %spx，当前可见 %d 行文字，累计识别面积占比 %.0f%%",
+                             scroll_offset.offset, len(feed_tracker.lines), feed_tracker.ocr_area_ratio * 100)
+            for target_name in target_list:
+                if target_name in found_results:
+                    logger.info("✅ 增量OCR找到目标: %s 位置: %s", target_name, found_results[target_name])
+                else:
+                    logger.info("❌ 增量OCR未找到目标: %s", target_name)
+            return found_results if is_multi_target else found_results.get(target_list[0])
+        
         if is_multi_target:
             # 多目标识别模式
-            print(f"🔍 执行一次OCR识别，然后查找所有目标用户...")
+            logger.info("🔍 执行一次OCR识别，然后查找所有目标用户...")
             
             # 朋友圈用户名的颜色 #576b95 转换为RGB
             target_color_rgb = (87, 107, 149)  # #576b95
             tolerance = 40  # 增加颜色容差
             
-            print(f"🎨 使用颜色过滤OCR识别朋友圈用户名 (目标颜色: RGB{target_color_rgb}, 容差: {tolerance})")
+            logger.info("🎨 使用颜色过滤OCR识别朋友圈用户名 (目标颜色: RGB%s, 容差: %s)", target_color_rgb, tolerance)
             
             # 首先尝试颜色过滤识别
             color_found_any = False
             for target_name in target_list:
                 result = color_targeted_ocr_recognition(screenshot, target_name, target_color_rgb, tolerance, stop_flag_func)
                 if result:
-                    print(f"✅ 颜色过滤找到目标: {target_name}")
+                    logger.info("✅ 颜色过滤找到目标: %s", target_name)
                     found_results[target_name] = result
                     color_found_any = True
             
             # 如果颜色过滤没有找到任何目标，使用普通OCR识别
             if not color_found_any:
-                print("🔍 颜色过滤未找到任何目标，使用普通OCR识别...")
+                logger.info("🔍 颜色过滤未找到任何目标，使用普通OCR识别...")
                 
                 try:
-                    img_array = np.array(screenshot)
-                    ocr_results = ocr_engine.recognize_text(img_array)
+                    ocr_results = ocr_engine.recognize_text(screenshot, site="common_ocr_recognition")
                     
                     if ocr_results and len(ocr_results) > 0:
-                        print(f"📋 OCR识别到 {len(ocr_results)} 条文字，开始查找目标用户...")
+                        logger.info("📋 OCR识别到 %s 条文字，开始查找目标用户...", len(ocr_results))
                         
                         # 在OCR结果中查找所有目标用户
                         for target_name in target_list:
@@ -2216,7 +2147,7 @@ def common_ocr_recognition(target_names, is_multi_target=False, stop_flag_func=N
                                             center_y = int(sum([point[1] for point in bbox]) / 4)
                                             target_position = (center_x, center_y)
                                             
-                                            print(f"✅ OCR找到目标: {target_name} 位置: {target_position}")
+                                            logger.info("✅ OCR找到目标: %s 位置: %s", target_name, target_position)
                                             found_results[target_name] = target_position
                                             target_found = True
                                             break
@@ -2224,45 +2155,45 @@ def common_ocr_recognition(target_names, is_multi_target=False, stop_flag_func=N
                                             continue
                             
                             if not target_found:
-                                print(f"❌ OCR未找到目标: {target_name}")
+                                logger.info("❌ OCR未找到目标: %s", target_name)
                     else:
-                        print("📋 OCR识别结果为空")
+                        logger.info("📋 OCR识别结果为空")
                         for target_name in target_list:
-                            print(f"❌ OCR未找到目标: {target_name}")
+                            logger.info("❌ OCR未找到目标: %s", target_name)
                             
                 except Exception as e:
-                    print(f"❌ OCR识别失败: {e}")
+                    logger.error("❌ OCR识别失败: %s", e)
                     for target_name in target_list:
-                        print(f"❌ OCR未找到目标: {target_name}")
+                        logger.info("❌ OCR未找到目标: %s", target_name)
             else:
                 # 对于颜色过滤没找到的用户，标记为未找到
                 for target_name in target_list:
                     if target_name not in found_results:
-                        print(f"❌ 颜色过滤未找到目标: {target_name}")
+                        logger.info("❌ 颜色过滤未找到目标: %s", target_name)
         else:
             # 单目标识别模式
             target_name = target_list[0]
             result = smart_ocr_recognition(screenshot, target_name, stop_flag_func)
             if result:
-                print(f"✅ RapidOCR成功找到目标: {target_name}")
+                logger.info("✅ RapidOCR成功找到目标: %s", target_name)
                 return result
             else:
-                print("❌ RapidOCR未找到目标")
+                logger.info("❌ RapidOCR未找到目标")
                 return None
         
         return found_results if is_multi_target else (found_results.get(target_list[0]) if found_results else None)
         
     except Exception as e:
-        print(f"❌ RapidOCR识别失败: {e}")
+        logger.error("❌ RapidOCR识别失败: %s", e)
         return {} if is_multi_target else None
 
 def enhanced_recognition_in_current_view(target_name, stop_flag_func=None):
     """在当前视图中使用RapidOCR识别策略查找目标用户名"""
-    print(f"🔍 在当前视图中使用RapidOCR识别查找: {target_name}")
+    logger.info("🔍 在当前视图中使用RapidOCR识别查找: %s", target_name)
     
     # 直接使用RapidOCR识别
     if ocr_engine and ocr_engine.is_available():
-        print("📋 使用RapidOCR识别...")
+        logger.info("📋 使用RapidOCR识别...")
         try:
             # 获取朋友圈窗口区域
             pengyouquan_region = get_pengyouquan_window_region(stop_flag_func)
@@ -2271,19 +2202,19 @@ def enhanced_recognition_in_current_view(target_name, stop_flag_func=None):
                 # 只截取朋友圈窗口区域
                 left, top, right, bottom = pengyouquan_region
                 width, height = right - left, bottom - top
-                print(f"📸 准备截取朋友圈窗口区域: left={left}, top={top}, width={width}, height={height}")
+                logger.info("📸 准备截取朋友圈窗口区域: left=%s, top=%s, width=%s, height=%s", left, top, width, height)
                 
                 # 确保坐标和尺寸都是正数
                 if width > 0 and height > 0 and left >= 0 and top >= 0:
-                    screenshot = pyautogui.screenshot(region=(left, top, width, height))
-                    print(f"✅ 成功截取朋友圈窗口区域")
+                    screenshot = backend.grab(region=(left, top, width, height))
+                    logger.info("✅ 成功截取朋友圈窗口区域")
                 else:
-                    print(f"⚠️ 朋友圈窗口区域参数异常，使用全屏截图")
-                    screenshot = pyautogui.screenshot()
+                    logger.warning("⚠️ 朋友圈窗口区域参数异常，使用全屏截图")
+                    screenshot = backend.grab()
             else:
                 # 如果获取朋友圈窗口区域失败，使用全屏截图
-                screenshot = pyautogui.screenshot()
-                print("📸 使用全屏截图（获取朋友圈窗口区域失败）")
+                screenshot = backend.grab()
+                logger.info("📸 使用全屏截图（获取朋友圈窗口区域失败）")
             
             # 保存当前截图（固定文件名，每次覆盖）- 已注释避免生成文件
             # import os
@@ -2303,16 +2234,16 @@ def enhanced_recognition_in_current_view(target_name, stop_flag_func=None):
             # 使用RapidOCR进行识别
             result = smart_ocr_recognition(screenshot, target_name, stop_flag_func)
             if result:
-                print(f"✅ RapidOCR成功找到目标: {target_name}")
+                logger.info("✅ RapidOCR成功找到目标: %s", target_name)
                 return result
             else:
-                print("❌ RapidOCR未找到目标")
+                logger.info("❌ RapidOCR未找到目标")
                 return None
         except Exception as e:
-            print(f"❌ RapidOCR识别失败: {e}")
+            logger.error("❌ RapidOCR识别失败: %s", e)
             return None
     else:
-        print("⚠️ RapidOCR不可用")
+        logger.warning("⚠️ RapidOCR不可用")
         return None
 
 def common_scroll_controller(ocr_callback, stop_condition_callback=None, scroll_description="滚动查找", stop_flag_func=None):
@@ -2327,55 +2258,64 @@ def common_scroll_controller(ocr_callback, stop_condition_callback=None, scroll_
     Returns:
         OCR识别结果或None
     """
-    print(f"🔄 开始{scroll_description}")
-    print(f"📋 滚动策略: 持续滚动直到检测到'昨天'标记")
+    logger.info("🔄 开始%s", scroll_description)
+    logger.info("📋 滚动策略: 持续滚动直到检测到'昨天'标记")
     
     scroll_count = 0
+    still_count = 0
+    scroll_estimator = ScrollOffsetEstimator()
     while True:
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 滚动操作被停止")
+            logger.info("⏹️ 滚动操作被停止")
             return None
             
         scroll_count += 1
-        print(f"\n🔄 第 {scroll_count} 次滚动")
-        
-        # 按一次下键
-        pyautogui.press('down')
-        print("⬇️ 已按下键滚动")
+        logger.debug("\n🔄 第 %s 次滚动", scroll_count)
         
-        # 等待滚动动画完成和内容加载
-        print("⏳ 等待滚动动画完成...")
-        time.sleep(0.8)  # 增加等待时间，确保动画完成
+        # 记录滚动前的画面，用于判断滚动是否生效
+        reference_frame = capture_pengyouquan_frame()
         
-        # 再等待一下确保内容完全加载
-        print("⏳ 等待内容加载...")
-        time.sleep(0.5)
+        # 按一次下键，等待滚动动画完成和内容加载
+        logger.debug("⏳ 按下键滚动，等待画面稳定...")
+        act_and_wait_stable(lambda: input_scheduler.press('down', post_delay=0), get_pengyouquan_window_rect(), timeout=2,
+                            stop_flag_func=stop_flag_func, description="滚动画面", kind="scroll")
+        logger.debug("⬇️ 已按下键滚动")
         
         # 检查停止标志
         if stop_flag_func and stop_flag_func():
-            print("⏹️ 滚动操作被停止")
+            logger.info("⏹️ 滚动操作被停止")
             return None
         
+        # 画面没有移动时跳过本次OCR，连续多次未移动视为到达底部
+        if not check_scroll_moved(scroll_estimator, reference_frame):
+            still_count += 1
+            logger.debug("⏸️ 画面未滚动（连续 %s 次），跳过本次OCR识别", still_count)
+            if still_count >= MAX_STILL_SCROLLS:
+                logger.info("🛑 画面连续未滚动，已到达朋友圈底部，停止滚动")
+                return None
+            continue
+        still_count = 0
+        
         # 检查是否识别到"昨天"文字（停止条件）
-        print("🔍 检查是否到达'昨天'标记...")
+        logger.debug("🔍 检查是否到达'昨天'标记...")
         if check_yesterday_marker(stop_flag_func):
-            print("🛑 识别到'昨天'标记，停止滚动")
+            logger.info("🛑 识别到'昨天'标记，停止滚动")
             return None
         
         # 检查自定义停止条件
         if stop_condition_callback and stop_condition_callback():
-            print("🛑 满足自定义停止条件，停止滚动")
+            logger.info("🛑 满足自定义停止条件，停止滚动")
             return None
         
-        print("📸 开始OCR识别...")
+        logger.debug("📸 开始OCR识别...")
         # 执行OCR识别回调
         result = ocr_callback(scroll_count)
         
         if result:
             return result
         else:
-            print(f"❌ 第 {scroll_count} 次滚动未找到目标，继续滚动...")
+            logger.debug("❌ 第 %s 次滚动未找到目标，继续滚动...", scroll_count)
 
 def enhanced_scroll_and_find_name(target_name, stop_flag_func=None):
     """增强滚动查找功能，每按一次下键就进行一次OCR识别，直到找到昨天标记为止"""
@@ -2383,7 +2323,7 @@ def enhanced_scroll_and_find_name(target_name, stop_flag_func=None):
         """OCR识别回调函数"""
         result = common_ocr_recognition(target_name, is_multi_target=False, stop_flag_func=stop_flag_func)
         if result:
-            print(f"✅ 在第 {scroll_count} 次滚动后找到目标: {target_name}")
+            logger.info("✅ 在第 %s 次滚动后找到目标: %s", scroll_count, target_name)
         return result
     
     # 使用通用滚动控制器
@@ -2394,60 +2334,62 @@ def enhanced_scroll_and_find_name(target_name, stop_flag_func=None):
     )
     
     if not result:
-        print(f"❌ 已到达'昨天'标记仍未找到目标: {target_name}")
+        logger.info("❌ 已到达'昨天'标记仍未找到目标: %s", target_name)
     
     return result
 
+@profiled("pengyouquan_dianzan_action")
+@traced("pengyouquan_dianzan_action", "flow")
 def pengyouquan_dianzan_action(target_name, enable_comment=False, comment_text="", stop_flag_func=None):
     """在朋友圈中查找指定名字并点赞"""
-    print(f"👍 开始查找并点赞: {target_name}")
+    logger.info("👍 开始查找并点赞: %s", target_name)
     if enable_comment and comment_text:
-        print(f"💬 同时启用评论功能: {comment_text}")
-    print("🚀 使用RapidOCR识别策略 + 滚动查找")
+        logger.info("💬 同时启用评论功能: %s", comment_text)
+    logger.info("🚀 使用RapidOCR识别策略 + 滚动查找")
     
     # 检查停止标志
     if stop_flag_func and stop_flag_func():
-        print("⏹️ 朋友圈点赞操作被停止")
+        logger.info("⏹️ 朋友圈点赞操作被停止")
         return False
     
     # 等待朋友圈加载完成
-    print("⏳ 等待朋友圈加载 (5秒)...")
+    logger.info("⏳ 等待朋友圈加载 (5秒)...")
     #time.sleep(5)
     
     # 首先使用通用OCR检查当前页面
-    print(f"📋 使用通用OCR检查当前页面是否有: {target_name}")
+    logger.info("📋 使用通用OCR检查当前页面是否有: %s", target_name)
     name_position = common_ocr_recognition(target_name, is_multi_target=False, stop_flag_func=stop_flag_func)
     
     # 检查停止标志
     if stop_flag_func and stop_flag_func():
-        print("⏹️ 朋友圈点赞操作被停止")
+        logger.info("⏹️ 朋友圈点赞操作被停止")
         return False
     
     # 如果当前页面没有找到，开始滚动查找
     if not name_position:
-        print(f"❌ 当前页面未找到 '{target_name}'，开始滚动查找...")
+        logger.info("❌ 当前页面未找到 '%s'，开始滚动查找...", target_name)
         name_position = enhanced_scroll_and_find_name(target_name, stop_flag_func)
     
     if name_position:
-        print(f"✅ 找到目标名字: {target_name} 位置: {name_position}")
+        logger.info("✅ 找到目标名字: %s 位置: %s", target_name, name_position)
         
         # 直接查找并点击点赞按钮，不点击用户名
         if find_and_click_dianzan(target_name, name_position, enable_comment=enable_comment, comment_text=comment_text, stop_flag_func=stop_flag_func):
-            print(f"👍 成功给 {target_name} 点赞!")
+            logger.info("👍 成功给 %s 点赞!", target_name)
             return True
         else:
-            print(f"❌ 未能找到点赞按钮")
+            logger.info("❌ 未能找到点赞按钮")
             return False
     else:
-        print(f"❌ 未找到目标名字: {target_name}")
+        logger.info("❌ 未找到目标名字: %s", target_name)
         return False
 
 def enhanced_multi_recognition_in_current_view(target_names, stop_flag_func=None):
     """在当前视图中同时查找多个目标名字"""
-    print(f"🔍 在当前视图中使用RapidOCR同时识别查找: {', '.join(target_names)}")
+    logger.info("🔍 在当前视图中使用RapidOCR同时识别查找: %s", ', '.join(target_names))
     
     if not ocr_engine:
-        print("⚠️ RapidOCR不可用")
+        logger.warning("⚠️ RapidOCR不可用")
         return {}
     
     try:
@@ -2458,19 +2400,19 @@ def enhanced_multi_recognition_in_current_view(target_names, stop_flag_func=None
             # 只截取朋友圈窗口区域
             left, top, right, bottom = pengyouquan_region
             width, height = right - left, bottom - top
-            print(f"📸 准备截取朋友圈窗口区域: left={left}, top={top}, width={width}, height={height}")
+            logger.info("📸 准备截取朋友圈窗口区域: left=%s, top=%s, width=%s, height=%s", left, top, width, height)
             
             # 确保坐标和尺寸都是正数
             if width > 0 and height > 0 and left >= 0 and top >= 0:
-                screenshot = pyautogui.screenshot(region=(left, top, width, height))
-                print(f"✅ 成功截取朋友圈窗口区域")
+                screenshot = backend.grab(region=(left, top, width, height))
+                logger.info("✅ 成功截取朋友圈窗口区域")
             else:
-                print(f"⚠️ 朋友圈窗口区域参数异常，使用全屏截图")
-                screenshot = pyautogui.screenshot()
+                logger.warning("⚠️ 朋友圈窗口区域参数异常，使用全屏截图")
+                screenshot = backend.grab()
         else:
             # 如果获取朋友圈窗口区域失败，使用全屏截图
-            screenshot = pyautogui.screenshot()
-            print("📸 使用全屏截图（获取朋友圈窗口区域失败）")
+            screenshot = backend.grab()
+            logger.info("📸 使用全屏截图（获取朋友圈窗口区域失败）")
         
         # 保存当前截图（固定文件名，每次覆盖）- 已注释避免生成文件
         # import os
@@ -2491,38 +2433,34 @@ def enhanced_multi_recognition_in_current_view(target_names, stop_flag_func=None
         found_results = {}
         
         # 一次性OCR识别获取所有文字
-        print(f"🔍 执行一次OCR识别，然后查找所有目标用户...")
+        logger.info("🔍 执行一次OCR识别，然后查找所有目标用户...")
         
-        # 将PIL图像转换为numpy数组
-        if hasattr(screenshot, 'save'):  # PIL Image
-            img_array = np.array(screenshot)
-        else:
-            img_array = screenshot
+        img_array = screenshot
         
         # 朋友圈用户名的颜色 #576b95 转换为RGB
         target_color_rgb = (87, 107, 149)  # #576b95
         tolerance = 40  # 增加颜色容差
         
-        print(f"🎨 使用颜色过滤OCR识别朋友圈用户名 (目标颜色: RGB{target_color_rgb}, 容差: {tolerance})")
+        logger.info("🎨 使用颜色过滤OCR识别朋友圈用户名 (目标颜色: RGB%s, 容差: %s)", target_color_rgb, tolerance)
         
         # 首先尝试颜色过滤识别
         color_found_any = False
         for target_name in target_names:
             result = color_targeted_ocr_recognition(screenshot, target_name, target_color_rgb, tolerance, stop_flag_func)
             if result:
-                print(f"✅ 颜色过滤找到目标: {target_name}")
+                logger.info("✅ 颜色过滤找到目标: %s", target_name)
                 found_results[target_name] = result
                 color_found_any = True
         
         # 如果颜色过滤没有找到任何目标，使用普通OCR识别
         if not color_found_any:
-            print("🔍 颜色过滤未找到任何目标，使用普通OCR识别...")
+            logger.info("🔍 颜色过滤未找到任何目标，使用普通OCR识别...")
             
             try:
-                ocr_results = ocr_engine.recognize_text(img_array)
+                ocr_results = ocr_engine.recognize_text(img_array, site="enhanced_multi_recognition")
                 
                 if ocr_results and len(ocr_results) > 0:
-                    print(f"📋 OCR识别到 {len(ocr_results)} 条文字，开始查找目标用户...")
+                    logger.info("📋 OCR识别到 %s 条文字，开始查找目标用户...", len(ocr_results))
                     
                     # 在OCR结果中查找所有目标用户
                     for target_name in target_names:
@@ -2541,7 +2479,7 @@ def enhanced_multi_recognition_in_current_view(target_names, stop_flag_func=None
                                         center_y = int(sum([point[1] for point in bbox]) / 4)
                                         target_position = (center_x, center_y)
                                         
-                                        print(f"✅ OCR找到目标: {target_name} 位置: {target_position}")
+                                        logger.info("✅ OCR找到目标: %s 位置: %s", target_name, target_position)
                                         found_results[target_name] = target_position
                                         target_found = True
                                         break
@@ -2549,25 +2487,25 @@ def enhanced_multi_recognition_in_current_view(target_names, stop_flag_func=None
                                         continue
                         
                         if not target_found:
-                            print(f"❌ OCR未找到目标: {target_name}")
+                            logger.info("❌ OCR未找到目标: %s", target_name)
                 else:
-                    print("📋 OCR识别结果为空")
+                    logger.info("📋 OCR识别结果为空")
                     for target_name in target_names:
-                        print(f"❌ OCR未找到目标: {target_name}")
+                        logger.info("❌ OCR未找到目标: %s", target_name)
                         
             except Exception as e:
-                print(f"❌ OCR识别失败: {e}")
+                logger.error("❌ OCR识别失败: %s", e)
                 for target_name in target_names:
-                    print(f"❌ OCR未找到目标: {target_name}")
+                    logger.info("❌ OCR未找到目标: %s", target_name)
         else:
             # 对于颜色过滤没找到的用户，标记为未找到
             for target_name in target_names:
                 if target_name not in found_results:
-                    print(f"❌ 颜色过滤未找到目标: {target_name}")
+                    logger.info("❌ 颜色过滤未找到目标: %s", target_name)
         
         return found_results
     except Exception as e:
-        print(f"❌ RapidOCR识别失败: {e}")
+        logger.error("❌ RapidOCR识别失败: %s", e)
         return {}
 
 def enhanced_multi_scroll_and_find_names(target_names, stop_flag_func=None):
@@ -2579,17 +2517,17 @@ def enhanced_multi_scroll_and_find_names(target_names, stop_flag_func=None):
         """多目标OCR识别回调函数"""
         nonlocal found_results, remaining_targets
         
-        print(f"🎯 剩余待查找目标: {', '.join(remaining_targets)}")
+        logger.info("🎯 剩余待查找目标: %s", ', '.join(remaining_targets))
         current_results = common_ocr_recognition(remaining_targets, is_multi_target=True, stop_flag_func=stop_flag_func)
         
         # 处理找到的结果
         for target_name, result in current_results.items():
-            print(f"✅ 在第 {scroll_count} 次滚动后找到目标: {target_name}")
+            logger.info("✅ 在第 %s 次滚动后找到目标: %s", scroll_count, target_name)
             found_results[target_name] = result
             remaining_targets.remove(target_name)
         
         if current_results:
-            print(f"📊 本次滚动找到 {len(current_results)} 个目标")
+            logger.info("📊 本次滚动找到 %s 个目标", len(current_results))
         
         # 返回None继续滚动，直到所有目标找到或遇到昨天标记
         return None
@@ -2597,7 +2535,7 @@ def enhanced_multi_scroll_and_find_names(target_names, stop_flag_func=None):
     def stop_condition():
         """停止条件：所有目标都找到了"""
         if not remaining_targets:
-            print("🎉 所有目标都已找到，提前结束滚动")
+            logger.info("🎉 所有目标都已找到，提前结束滚动")
             return True
         return False
     
@@ -2610,14 +2548,27 @@ def enhanced_multi_scroll_and_find_names(target_names, stop_flag_func=None):
     )
     
     if remaining_targets:
-        print(f"❌ 已到达'昨天'标记仍未找到的目标: {', '.join(remaining_targets)}")
+        logger.info("❌ 已到达'昨天'标记仍未找到的目标: %s", ', '.join(remaining_targets))
     
-    print(f"📊 多目标查找完成，共找到 {len(found_results)} 个目标")
+    logger.info("📊 多目标查找完成，共找到 %s 个目标", len(found_results))
     return found_results
 
+@profiled("pengyouquan_multi_dianzan_action")
+@traced("pengyouquan_multi_dianzan_action", "flow")
 def pengyouquan_multi_dianzan_action(target_names, wait_seconds=0, status_callback=None, enable_comment=False, comment_text="", stop_flag_func=None):
-    """在朋友圈中查找多个名字并立即点赞（找到一个点赞一个）"""
-    print(f"👍 开始多目标查找并点赞: {', '.join(target_names)}")
+    """在朋友圈中查找多个名字并立即点赞（找到一个点赞一个）
+    
+    停止或出错时同样保存时序档案并输出指标汇总。
+    """
+    try:
+        return _multi_dianzan(target_names, wait_seconds, status_callback, enable_comment, comment_text, stop_flag_func)
+    finally:
+        save_timing_profile()
+        metrics.report("pengyouquan_multi_dianzan_action")
+
+def _multi_dianzan(target_names, wait_seconds, status_callback, enable_comment, comment_text, stop_flag_func):
+    """pengyouquan_multi_dianzan_action 的主体"""
+    logger.info("👍 开始多目标查找并点赞: %s", ', '.join(target_names))
     if wait_seconds > 0:
         wait_minutes = wait_seconds // 60
         wait_secs = wait_seconds % 60
@@ -2625,18 +2576,19 @@ def pengyouquan_multi_dianzan_action(target_names, wait_seconds=0, status_callba
             time_str = f"{wait_minutes}分{wait_secs:02d}秒"
         else:
             time_str = f"{wait_secs}秒"
-        print(f"🚀 使用RapidOCR多目标识别策略 + 即时点赞 (间隔: {time_str})")
+        logger.info("🚀 使用RapidOCR多目标识别策略 + 即时点赞 (间隔: %s)", time_str)
     else:
-        print("🚀 使用RapidOCR多目标识别策略 + 即时点赞")
+        logger.info("🚀 使用RapidOCR多目标识别策略 + 即时点赞")
     
     # 检查停止标志
     if stop_flag_func and stop_flag_func():
-        print("⏹️ 朋友圈多目标点赞操作被停止")
+        logger.info("⏹️ 朋友圈多目标点赞操作被停止")
         return None
     
     # 等待朋友圈加载完成
-    print("⏳ 等待朋友圈加载 (5秒)...")
+    logger.info("⏳ 等待朋友圈加载 (5秒)...")
     #time.sleep(5)
+    metrics.start_exporter()
     
     # 统计结果
     success_count = 0
@@ -2644,30 +2596,34 @@ def pengyouquan_multi_dianzan_action(target_names, wait_seconds=0, status_callba
     failed_names = []
     found_users = []
     not_found_users = []
+    located_names = set()
+    scanned_steps = 0  # 已滚动的次数，用于统计每个目标的滚动次数
+    
+    # 朋友圈动态跟踪器：首次整窗识别，之后每次滚动只识别新露出的区域
+    feed_tracker = None
+    if ocr_engine and ocr_engine.is_available():
+        feed_tracker = MomentsFeedTracker(functools.partial(ocr_engine.recognize_text, site="moments_feed_tracker"))
     
     # 首先检查当前页面
-    print(f"📋 使用通用OCR检查当前页面是否有目标用户")
-    current_results = common_ocr_recognition(target_names, is_multi_target=True, stop_flag_func=stop_flag_func)
+    logger.info("📋 使用通用OCR检查当前页面是否有目标用户")
+    current_results = common_ocr_recognition(target_names, is_multi_target=True, stop_flag_func=stop_flag_func, feed_tracker=feed_tracker)
     
-    # 对当前页面找到的用户立即点赞
     total_processed = 0
-    for target_name, name_position in current_results.items():
-        # 检查停止标志
-        if stop_flag_func and stop_flag_func():
-            print("⏹️ 朋友圈多目标点赞操作被停止")
-            return {
-                'success_count': success_count,
-                'failed_count': failed_count,
-                'failed_names': failed_names,
-                'found_users': found_users,
-                'not_found_users': not_found_users
-            }
-            
-        print(f"\n👍 正在给 {target_name} 点赞...")
-        print(f"✅ 目标位置: {name_position}")
-        
-        if find_and_click_dianzan(target_name, name_position, enable_comment=enable_comment, comment_text=comment_text, stop_flag_func=stop_flag_func):
-            print(f"👍 成功给 {target_name} 点赞!")
+    
+    def like_target(target_name, name_position, steps=0):
+        """给找到的目标点赞，更新统计，并按设置的间隔等待"""
+        nonlocal success_count, failed_count, total_processed
+        located_names.add(target_name)
+        SCROLL_STEPS.observe(steps, outcome="found")
+        logger.info("\n👍 正在给 %s 点赞...", target_name)
+        logger.info("✅ 目标位置: %s", name_position)
+        
+        dianzan_done = find_and_click_dianzan(target_name, name_position, enable_comment=enable_comment, comment_text=comment_text, stop_flag_func=stop_flag_func)
+        if feed_tracker:
+            # 点赞/评论会改变画面布局，下一帧重新整窗识别
+            feed_tracker.invalidate()
+        if dianzan_done:
+            logger.info("👍 成功给 %s 点赞!", target_name)
             success_count += 1
             found_users.append(target_name)
             total_processed += 1
@@ -2679,26 +2635,119 @@ def pengyouquan_multi_dianzan_action(target_names, wait_seconds=0, status_callba
                 next_user = remaining_names[0] if remaining_names else '无'
                 common_countdown_wait(wait_seconds, status_callback, next_user, stop_flag_func)
             else:
-                time.sleep(1)  # 点赞后稍等一下
+                cancellation.sleep(1, stop_flag_func)  # 点赞后稍等一下
         else:
-            print(f"❌ 未能找到 {target_name} 的点赞按钮")
+            logger.info("❌ 未能找到 %s 的点赞按钮", target_name)
             failed_count += 1
             failed_names.append(target_name)
             total_processed += 1
     
+    # 对当前页面找到的用户立即点赞
+    for target_name, name_position in current_results.items():
+        # 检查停止标志
+        if stop_flag_func and stop_flag_func():
+            logger.info("⏹️ 朋友圈多目标点赞操作被停止")
+            return {
+                'success_count': success_count,
+                'failed_count': failed_count,
+                'failed_names': failed_names,
+                'found_users': found_users,
+                'not_found_users': not_found_users
+            }
+        
+        like_target(target_name, name_position)
+    
     # 计算剩余需要查找的目标
     remaining_targets = [name for name in target_names if name not in current_results]
     
+    def mark_remaining_failed(include_not_found=False):
+        """将剩余目标全部记为未找到"""
+        nonlocal failed_count
+        for name in remaining_targets:
+            logger.info("❌ 未找到用户: %s", name)
+            failed_count += 1
+            failed_names.append(name)
+            if include_not_found:
+                not_found_users.append(name)
+        remaining_targets.clear()
+    
+    # 流水线模式：滚动/截图与OCR识别并行，决策在当前线程进行
+    if remaining_targets and feed_tracker and PIPELINED_SCAN:
+        logger.info("\n❌ 当前页面未找到的目标: %s", ', '.join(remaining_targets))
+        logger.info("🔄 开始流水线滚动查找并立即点赞...")
+        
+        def scroll_once(direction):
+            act_and_wait_stable(lambda: input_scheduler.press(direction, post_delay=0), get_pengyouquan_window_rect(),
+                                timeout=2, stop_flag_func=stop_flag_func, description="滚动画面", kind="scroll")
+        
+        pipeline = MomentsScanPipeline(feed_tracker, capture_pengyouquan_frame, scroll_once,
+                                       lambda: list(remaining_targets), stop_flag_func=stop_flag_func)
+        pipeline.start()
+        try:
+            still_count = 0
+            while remaining_targets:
+                frame_result = pipeline.next_result()
+                if frame_result is None or (stop_flag_func and stop_flag_func()):
+                    logger.info("⏹️ 朋友圈多目标点赞操作被停止")
+                    mark_remaining_failed(include_not_found=True)
+                    break
+                
+                scanned_steps = frame_result.seq
+                logger.info("\n🔄 第 %s 帧（滚动 %.2fs，OCR %.2fs）",
+                            frame_result.seq, frame_result.scroll_time, frame_result.ocr_time)
+                
+                # 画面连续多次未移动视为到达底部
+                if not frame_result.moved:
+                    still_count += 1
+                    logger.info("⏸️ 画面未滚动（连续 %s 次）", still_count)
+                    if still_count >= MAX_STILL_SCROLLS:
+                        logger.info("🛑 画面连续未滚动，已到达朋友圈底部，停止滚动")
+                        if status_callback:
+                            status_callback("🛑 已到达朋友圈底部，停止滚动")
+                        mark_remaining_failed()
+                    continue
+                still_count = 0
+                
+                if frame_result.yesterday:
+                    logger.info("🛑 识别到'昨天'标记，停止滚动")
+                    if status_callback:
+                        status_callback("🛑 识别到'昨天'标记，停止滚动")
+                    mark_remaining_failed()
+                    break
+                
+                hits = [name for name in frame_result.found if name in remaining_targets]
+                if not hits:
+                    continue
+                
+                # 回滚：暂停滚动，排空流水线，按当前画面重新定位目标
+                positions = pipeline.pause_and_locate(hits)
+                for target_name in hits:
+                    if stop_flag_func and stop_flag_func():
+                        break
+                    logger.info("✅ 在第 %s 帧找到目标: %s", frame_result.seq, target_name)
+                    if target_name in positions:
+                        like_target(target_name, positions[target_name], scanned_steps)
+                    else:
+                        logger.warning("⚠️ 回滚后未能重新定位 %s", target_name)
+                        failed_count += 1
+                        failed_names.append(target_name)
+                    remaining_targets.remove(target_name)
+                pipeline.resume()
+        finally:
+            pipeline.stop()
+    
     # 如果还有剩余目标，开始滚动查找并立即点赞
     if remaining_targets:
-        print(f"\n❌ 当前页面未找到的目标: {', '.join(remaining_targets)}")
-        print(f"🔄 开始RapidOCR滚动查找并立即点赞...")
+        logger.info("\n❌ 当前页面未找到的目标: %s", ', '.join(remaining_targets))
+        logger.info("🔄 开始RapidOCR滚动查找并立即点赞...")
         
         scroll_count = 0
+        still_count = 0
+        scroll_estimator = ScrollOffsetEstimator()
         while True:
             # 检查停止标志
             if stop_flag_func and stop_flag_func():
-                print("⏹️ 朋友圈多目标点赞操作被停止")
+                logger.info("⏹️ 朋友圈多目标点赞操作被停止")
                 # 将剩余目标标记为未找到
                 for name in remaining_targets:
                     failed_count += 1
@@ -2708,25 +2757,25 @@ def pengyouquan_multi_dianzan_action(target_names, wait_seconds=0, status_callba
                 
             scroll_count += 1
             if not remaining_targets:  # 如果所有目标都找到了，提前结束
-                print("🎉 所有目标都已找到，提前结束滚动")
+                logger.info("🎉 所有目标都已找到，提前结束滚动")
                 break
                 
-            print(f"\n🔄 第 {scroll_count} 次滚动")
-            print(f"🎯 剩余待查找目标: {', '.join(remaining_targets)}")
+            logger.info("\n🔄 第 %s 次滚动", scroll_count)
+            logger.info("🎯 剩余待查找目标: %s", ', '.join(remaining_targets))
             
-            # 按一次下键
-            pyautogui.press('down')
-            print("⬇️ 已按下键滚动")
+            # 记录滚动前的画面，用于判断滚动是否生效（跟踪器自带帧间对比）
+            reference_frame = None if feed_tracker else capture_pengyouquan_frame()
             
-            # 等待滚动动画完成和内容加载
-            print("⏳ 等待滚动动画完成...")
-            time.sleep(0.8)
-            print("⏳ 等待内容加载...")
-            time.sleep(0.5)
+            # 按一次下键，等待滚动动画完成和内容加载
+            logger.info("⏳ 按下键滚动，等待画面稳定...")
+            act_and_wait_stable(lambda: input_scheduler.press('down', post_delay=0), get_pengyouquan_window_rect(), timeout=2,
+                                stop_flag_func=stop_flag_func, description="滚动画面", kind="scroll")
+            logger.info("⬇️ 已按下键滚动")
+            scanned_steps = scroll_count
             
             # 检查停止标志
             if stop_flag_func and stop_flag_func():
-                print("⏹️ 朋友圈多目标点赞操作被停止")
+                logger.info("⏹️ 朋友圈多目标点赞操作被停止")
                 # 将剩余目标标记为未找到
                 for name in remaining_targets:
                     failed_count += 1
@@ -2734,33 +2783,61 @@ def pengyouquan_multi_dianzan_action(target_names, wait_seconds=0, status_callba
                     not_found_users.append(name)
                 break
             
+            if feed_tracker:
+                # 增量识别：只OCR新露出的条带，同时得到滚动是否生效
+                logger.info("📸 开始增量多目标OCR识别...")
+                scroll_results = common_ocr_recognition(remaining_targets, is_multi_target=True, stop_flag_func=stop_flag_func, feed_tracker=feed_tracker)
+                scroll_moved = feed_tracker.last_offset is None or feed_tracker.last_offset.moved
+            else:
+                scroll_results = None
+                scroll_moved = check_scroll_moved(scroll_estimator, reference_frame)
+            
+            # 画面没有移动时跳过本次OCR，连续多次未移动视为到达底部
+            if not scroll_moved:
+                still_count += 1
+                logger.info("⏸️ 画面未滚动（连续 %s 次），跳过本次OCR识别", still_count)
+                if still_count >= MAX_STILL_SCROLLS:
+                    logger.info("🛑 画面连续未滚动，已到达朋友圈底部，停止滚动")
+                    if status_callback:
+                        status_callback("🛑 已到达朋友圈底部，停止滚动")
+                    for name in remaining_targets:
+                        logger.info("❌ 未找到用户: %s", name)
+                        failed_count += 1
+                        failed_names.append(name)
+                    remaining_targets.clear()
+                    break
+                continue
+            still_count = 0
+            
             # 检查是否识别到"昨天"文字（停止条件）
-            print("🔍 检查是否到达'昨天'标记...")
-            if check_yesterday_marker(stop_flag_func):
-                print("🛑 识别到'昨天'标记，停止滚动")
+            logger.info("🔍 检查是否到达'昨天'标记...")
+            reached_yesterday = feed_tracker.has_yesterday_marker() if feed_tracker else check_yesterday_marker(stop_flag_func)
+            if reached_yesterday:
+                logger.info("🛑 识别到'昨天'标记，停止滚动")
                 # 通过状态回调通知GUI
                 if status_callback:
                     status_callback("🛑 识别到'昨天'标记，停止滚动")
                 # 将剩余目标标记为未找到
                 if remaining_targets:
-                    print(f"❌ 已到达'昨天'标记仍未找到的目标: {', '.join(remaining_targets)}")
+                    logger.info("❌ 已到达'昨天'标记仍未找到的目标: %s", ', '.join(remaining_targets))
                     for name in remaining_targets:
-                        print(f"❌ 未找到用户: {name}")
+                        logger.info("❌ 未找到用户: %s", name)
                         failed_count += 1
                         failed_names.append(name)
                 # 清空剩余目标
                 remaining_targets.clear()
                 break
             
-            print("📸 开始多目标OCR识别...")
-            # 进行多目标OCR识别
-            scroll_results = common_ocr_recognition(remaining_targets, is_multi_target=True, stop_flag_func=stop_flag_func)
+            if scroll_results is None:
+                logger.info("📸 开始多目标OCR识别...")
+                # 进行多目标OCR识别
+                scroll_results = common_ocr_recognition(remaining_targets, is_multi_target=True, stop_flag_func=stop_flag_func)
             
             # 对找到的用户立即点赞
             for target_name, name_position in scroll_results.items():
                 # 检查停止标志
                 if stop_flag_func and stop_flag_func():
-                    print("⏹️ 朋友圈多目标点赞操作被停止")
+                    logger.info("⏹️ 朋友圈多目标点赞操作被停止")
                     # 将剩余目标标记为未找到
                     for name in remaining_targets:
                         failed_count += 1
@@ -2774,37 +2851,16 @@ def pengyouquan_multi_dianzan_action(target_names, wait_seconds=0, status_callba
                         'not_found_users': not_found_users
                     }
                     
-                print(f"✅ 在第 {scroll_count} 次滚动后找到目标: {target_name}")
-                print(f"\n👍 立即给 {target_name} 点赞...")
-                print(f"✅ 目标位置: {name_position}")
-                
-                if find_and_click_dianzan(target_name, name_position, enable_comment=enable_comment, comment_text=comment_text, stop_flag_func=stop_flag_func):
-                    print(f"👍 成功给 {target_name} 点赞!")
-                    success_count += 1
-                    found_users.append(target_name)
-                    total_processed += 1
-                    
-                    # 如果设置了等待时间且不是最后一个用户，则等待
-                    if wait_seconds > 0 and total_processed < len(target_names):
-                        # 找到下一个要处理的用户
-                        remaining_names = [name for name in target_names if name not in found_users]
-                        next_user = remaining_names[0] if remaining_names else '无'
-                        common_countdown_wait(wait_seconds, status_callback, next_user, stop_flag_func)
-                    else:
-                        time.sleep(1)  # 点赞后稍等一下
-                else:
-                    print(f"❌ 未能找到 {target_name} 的点赞按钮")
-                    failed_count += 1
-                    failed_names.append(target_name)
-                    total_processed += 1
+                logger.info("✅ 在第 %s 次滚动后找到目标: %s", scroll_count, target_name)
+                like_target(target_name, name_position, scroll_count)
                 
                 # 从剩余目标中移除已处理的用户
                 remaining_targets.remove(target_name)
             
             if scroll_results:
-                print(f"📊 本次滚动找到并处理 {len(scroll_results)} 个目标")
+                logger.info("📊 本次滚动找到并处理 %s 个目标", len(scroll_results))
             else:
-                print(f"❌ 第 {scroll_count} 次滚动未找到任何目标，继续滚动...")
+                logger.info("❌ 第 %s 次滚动未找到任何目标，继续滚动...", scroll_count)
     
     # 返回详细结果
     result = {
@@ -2815,12 +2871,15 @@ def pengyouquan_multi_dianzan_action(target_names, wait_seconds=0, status_callba
         'not_found_users': not_found_users
     }
     
-    print(f"\n📊 多目标点赞完成!")
-    print(f"   成功点赞: {success_count} 个")
-    print(f"   失败: {failed_count} 个")
+    logger.info("\n📊 多目标点赞完成!")
+    logger.info("   成功点赞: %s 个", success_count)
+    logger.info("   失败: %s 个", failed_count)
     if failed_names:
-        print(f"   失败用户: {', '.join(failed_names)}")
+        logger.info("   失败用户: %s", ', '.join(failed_names))
     
+    for name in target_names:
+        if name not in located_names:
+            SCROLL_STEPS.observe(scanned_steps, outcome="not_found")
     return result
 
 def find_and_click_pengyouquan_with_dianzan(target_name=None, stop_flag_func=None, enable_window_resize=True):
@@ -2831,24 +2890,24 @@ def find_and_click_pengyouquan_with_dianzan(target_name=None, stop_flag_func=Non
         stop_flag_func: 停止标志检查函数
         enable_window_resize: 是否启用窗口大小调整
     """
-    print("👥💖 开始执行朋友圈完整功能...")
+    logger.info("👥💖 开始执行朋友圈完整功能...")
     
     # 将微信窗口置于最前
     if not ensure_wechat_is_active():
-        print("❌ 无法激活微信窗口")
+        logger.info("❌ 无法激活微信窗口")
         return False
     
     # 查找并点击朋友圈
     if not find_and_click_pengyouquan(stop_flag_func):
-        print("❌ 无法打开朋友圈")
+        logger.info("❌ 无法打开朋友圈")
         return False
     
-    print("✅ 朋友圈已打开")
-    time.sleep(3)  # 等待朋友圈加载
+    logger.info("✅ 朋友圈已打开")
+    cancellation.sleep(3)  # 等待朋友圈加载
     
     # GUI模式下必须提供目标用户名
     if target_name is None or not target_name:
-        print("❌ 未提供目标用户名")
+        logger.info("❌ 未提供目标用户名")
         return False
     
     # 执行点赞操作
@@ -16,9 +16,11 @@ from pathlib import Path
 import threading
 import time
 
+from config_store import CONFIG_FILE, update_config
+
 class WeChatLauncher:
     def __init__(self):
-        self.config_file = "wechat_config.json"
+        self.config_file = CONFIG_FILE
         self.common_paths = [
             r"C:\Program Files\Tencent\WeChat\WeChat.exe",
             r"C:\Program Files (x86)\Tencent\WeChat\WeChat.exe",
@@ -50,10 +52,12 @@ class WeChatLauncher:
     
     def save_config(self, wechat_path):
         """保存微信路径到配置文件"""
+        def apply(config):
+            config['wechat_path'] = wechat_path
+
         try:
-            config = {'wechat_path': wechat_path}
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            # 只更新微信路径，保留文件中的其他配置（上次输入、时序档案等）
+            update_config(apply, self.config_file)
             print(f"微信路径已保存到配置文件: {wechat_path}")
         except Exception as e:
             print(f"保存配置文件失败: {e}")
@@ -0,0 +1,1035 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+微信界面模拟器
+用 PIL 在内存中绘制微信界面，作为 SimulatedBackend 的画面源，响应模拟的点击/按键/粘贴：
+1. 主窗口：Ctrl+F 打开搜索框，Ctrl+V 粘贴后显示"联系人"/"群聊"分组结果，点击结果打开聊天，
+   聊天输入框支持全选删除、粘贴和回车发送
+2. 朋友圈窗口：昵称 #576b95、时间 #9e9e9e（含"昨天"）、点赞按钮、已点赞/未点赞弹出界面、
+   评论输入框和发送按钮，上下键带滚动动画
+3. 界面变化带有可配置的延迟（搜索结果渲染、弹出界面、打开聊天等），等待逻辑按真实方式工作
+
+SimulatedOCR 根据模拟器画过的文字做模板匹配，代替 RapidOCR 给出确定的识别结果，
+配合 run_benchmark() 可以在无界面的 Linux 上端到端运行 search_group 和
+pengyouquan_multi_dianzan_action，得到可重复的耗时。
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from logging_config import get_logger
+from platform_backend import Box, SimulatedBackend
+from metrics import OCR_LATENCY
+from tracing import tracer
+
+logger = get_logger(__name__)
+
+NICKNAME_COLOR = (87, 107, 149)       # #576b95 朋友圈昵称
+TIMESTAMP_COLOR = (158, 158, 158)     # #9e9e9e 朋友圈时间
+TEXT_COLOR = (25, 25, 25)
+HINT_COLOR = (150, 150, 150)
+BACKGROUND_COLOR = (255, 255, 255)
+DESKTOP_COLOR = (36, 62, 92)
+SEPARATOR_COLOR = (229, 229, 229)
+
+# 界面变化的模拟延迟（秒）
+DEFAULT_LATENCY = {
+    "search_box": 0.15,       # Ctrl+F 后搜索框获得焦点
+    "search_results": 0.35,   # 粘贴搜索内容后结果渲染
+    "chat_open": 0.3,         # 点击搜索结果后打开聊天界面
+    "popup": 0.15,            # 点击点赞按钮后弹出界面
+    "comment_box": 0.2,       # 点击评论后出现评论输入框
+    "like": 0.1,              # 点赞后点赞列表出现
+    "scroll": 0.25,           # 滚动动画时长
+}
+
+SCROLL_STEP = 160             # 每次按上下键滚动的像素
+FONT_ENV = "WECHAT_SIM_FONT"
+
+# 常见的中文字体位置（Windows / Linux / macOS）
+CJK_FONT_CANDIDATES = [
+    r"C:\Windows\Fonts\msyh.ttc",
+    r"C:\Windows\Fonts\simhei.ttf",
+    r"C:\Windows\Fonts\simsun.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/wqy-microhei/wqy-microhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+]
+
+
+def find_cjk_font():
+    """查找可用的中文字体，找不到时返回None"""
+    candidates = [os.environ.get(FONT_ENV, "")] + CJK_FONT_CANDIDATES
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+# ==================== 文字绘制 ====================
+
+class TextRenderer:
+    """文字绘制，并记录画过的文字供 SimulatedOCR 识别
+
+    没有中文字体时，非ASCII字符画成由码位决定的方块图案（每个字图案不同），
+    界面不可读但识别结果仍然确定，不影响耗时测量。
+    """
+
+    def __init__(self, font_path=None):
+        self.font_path = font_path or find_cjk_font()
+        if self.font_path is None:
+            logger.warning("⚠️ 未找到中文字体，中文将以方块图案绘制（可用环境变量 WECHAT_SIM_FONT 指定字体）")
+        self.vocabulary = set()       # {(文字, 字号, 颜色)}
+        self._fonts = {}
+        self._masks = {}
+        self._lock = threading.Lock()
+
+    def font(self, size):
+        if size not in self._fonts:
+            if self.font_path:
+                self._fonts[size] = ImageFont.truetype(self.font_path, size)
+            else:
+                self._fonts[size] = ImageFont.load_default(size)
+        return self._fonts[size]
+
+    def _glyph_pattern(self, char, size):
+        """没有中文字体时的替代字形：4x4 方块图案，由字符码位决定"""
+        bits = zlib.crc32(char.encode('utf-8')) | 0x8001
+        cell = max(2, size // 4)
+        pattern = Image.new('L', (cell * 4, cell * 4), 0)
+        draw = ImageDraw.Draw(pattern)
+        for index in range(16):
+            if bits >> index & 1:
+                x, y = index % 4 * cell, index // 4 * cell
+                draw.rectangle((x, y, x + cell - 2, y + cell - 2), fill=255)
+        return pattern
+
+    def mask(self, text, size):
+        """文字的灰度蒙版（'L'模式图像，255为笔画）"""
+        key = (text, size)
+        with self._lock:
+            if key in self._masks:
+                return self._masks[key]
+        font = self.font(size)
+        height = int(size * 1.4)
+        use_pattern = self.font_path is None
+        widths = [size if use_pattern and ord(char) > 127 else max(1, int(font.getlength(char)))
+                  for char in text]
+        mask = Image.new('L', (max(1, sum(widths)), height), 0)
+        draw = ImageDraw.Draw(mask)
+        x = 0
+        for char, width in zip(text, widths):
+            if use_pattern and ord(char) > 127:
+                mask.paste(self._glyph_pattern(char, size), (x, int(size * 0.15)))
+            else:
+                draw.text((x, 0), char, fill=255, font=font)
+            x += width
+        with self._lock:
+            self._masks[key] = mask
+        return mask
+
+    def measure(self, text, size):
+        return self.mask(text, size).size
+
+    def draw(self, image, xy, text, color, size):
+        """在图像上绘制文字，返回文字宽高"""
+        if not text:
+            return (0, 0)
+        mask = self.mask(text, size)
+        image.paste(Image.new('RGB', mask.size, color), (int(xy[0]), int(xy[1])), mask)
+        with self._lock:
+            self.vocabulary.add((text, size, color))
+        return mask.size
+
+
+# ==================== 图标 ====================
+
+ASSET_NAMES = ("dianzan.png", "nozan.png", "yizan.png", "pinglun.png", "fasong.png", "pengyouquan.png")
+
+
+def _draw_heart(draw, x, y, size, color, filled):
+    """画一个简单的心形"""
+    radius = size // 4
+    left_circle = (x, y, x + radius * 2, y + radius * 2)
+    right_circle = (x + radius * 2, y, x + radius * 4, y + radius * 2)
+    points = [(x, y + radius), (x + radius * 2, y + size), (x + radius * 4, y + radius)]
+    if filled:
+        draw.ellipse(left_circle, fill=color)
+        draw.ellipse(right_circle, fill=color)
+        draw.polygon(points, fill=color)
+    else:
+        draw.arc(left_circle, 150, 360, fill=color, width=2)
+        draw.arc(right_circle, 180, 30, fill=color, width=2)
+        draw.line([points[0], points[1], points[2]], fill=color, width=2)
+
+
+def build_builtin_icon(name, renderer):
+    """绘制内置图标（assets 目录中没有对应图片时使用）"""
+    if name == "dianzan.png":
+        icon = Image.new('RGB', (32, 20), (247, 247, 247))
+        draw = ImageDraw.Draw(icon)
+        for cx in (12, 20):
+            draw.ellipse((cx - 3, 7, cx + 3, 13), fill=NICKNAME_COLOR)
+        return icon
+    if name in ("nozan.png", "yizan.png"):
+        icon = Image.new('RGB', (88, 38), (76, 76, 76))
+        draw = ImageDraw.Draw(icon)
+        liked = name == "yizan.png"
+        _draw_heart(draw, 12, 12, 14, (250, 81, 81) if liked else (255, 255, 255), filled=liked)
+        renderer.draw(icon, (34, 10), "取消" if liked else "赞", (255, 255, 255), 14)
+        return icon
+    if name == "pinglun.png":
+        icon = Image.new('RGB', (88, 38), (76, 76, 76))
+        draw = ImageDraw.Draw(icon)
+        draw.rounded_rectangle((10, 11, 28, 25), radius=3, outline=(255, 255, 255), width=2)
+        draw.polygon([(14, 25), (14, 30), (19, 25)], fill=(255, 255, 255))
+        renderer.draw(icon, (36, 10), "评论", (255, 255, 255), 14)
+        return icon
+    if name == "fasong.png":
+        icon = Image.new('RGB', (56, 30), (7, 193, 96))
+        renderer.draw(icon, (14, 6), "发送", (255, 255, 255), 14)
+        return icon
+    if name == "pengyouquan.png":
+        icon = Image.new('RGB', (36, 36), (46, 46, 46))
+        draw = ImageDraw.Draw(icon)
+        colors = [(250, 157, 59), (250, 81, 81), (87, 107, 149), (7, 193, 96), (255, 195, 0), (40, 170, 230)]
+        for index, color in enumerate(colors):
+            draw.pieslice((4, 4, 32, 32), index * 60, index * 60 + 50, fill=color)
+        draw.ellipse((13, 13, 23, 23), fill=(46, 46, 46))
+        return icon
+    raise ValueError(f"未知的图标: {name}")
+
+
+def default_asset_dir():
+    """程序的图标目录（与 get_resource_path('assets/...') 一致），模拟器只从中读取真实图标"""
+    base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, 'assets')
+
+
+def simulator_asset_dir():
+    """模拟器写出图标的临时目录（不写入程序的 assets 目录，避免合成图标被打包或覆盖真实图标）"""
+    return os.path.join(tempfile.gettempdir(), "wechat_simulator_assets")
+
+
+# ==================== 场景数据 ====================
+
+class MomentPost:
+    """一条朋友圈动态"""
+
+    def __init__(self, name, content, time_label, liked=False):
+        self.name = name
+        self.content = content
+        self.time_label = time_label
+        self.liked = liked
+        self.comments = []
+
+    def __repr__(self):
+        return f"MomentPost('{self.name}', '{self.time_label}', liked={self.liked})"
+
+
+def default_posts(target_names=(), target_positions=None, total=24, yesterday_from=None):
+    """生成一组朋友圈动态
+
+    Args:
+        target_names: 需要出现在动态中的用户名
+        target_positions: 对应的动态序号，默认均匀分布在"昨天"之前
+        total: 动态总数
+        yesterday_from: 从第几条开始时间显示"昨天"，默认为总数的 3/4
+    """
+    if yesterday_from is None:
+        yesterday_from = total * 3 // 4
+    if target_positions is None:
+        step = max(1, yesterday_from // (len(target_names) + 1)) if target_names else 1
+        target_positions = [step * (index + 1) for index in range(len(target_names))]
+    fillers = ["Chen Yu", "Lin Hai", "Zhou Min", "Xu Lei", "Sun Qi", "Ma Jun", "Guo Fei", "He Tao"]
+    posts = []
+    for index in range(total):
+        name = fillers[index % len(fillers)]
+        if index in target_positions:
+            name = target_names[target_positions.index(index)]
+        if index >= yesterday_from:
+            time_label = "昨天"
+        elif index < 3:
+            time_label = f"{(index + 1) * 5}分钟前"
+        else:
+            time_label = f"{index - 1}小时前"
+        posts.append(MomentPost(name, f"Post {index + 1}: weekend trip photos and notes", time_label))
+    return posts
+
+
+# ==================== 模拟器 ====================
+
+class WeChatSimulator:
+    """微信界面模拟器（SimulatedBackend 的画面源）
+
+    用法：
+        simulator = WeChatSimulator(posts=default_posts(["Alice"]), groups=["Project Team"])
+        simulator.open_moments()
+        set_backend(simulator.backend)
+        ...
+        simulator.sent_messages / simulator.posts[i].liked
+    """
+
+    MAIN_TITLE = "微信"
+    MOMENTS_TITLE = "朋友圈"
+
+    def __init__(self, posts=None, contacts=None, groups=None, screen_size=(1920, 1080),
+                 main_rect=(160, 90, 1160, 810), moments_rect=(1240, 40, 1800, 1000),
+                 latency=None, font_path=None, asset_dir=None):
+        """
+        Args:
+            posts: 朋友圈动态列表（MomentPost），默认 default_posts()
+            contacts: 联系人名称列表
+            groups: 群聊名称列表
+            screen_size: 屏幕尺寸
+            main_rect / moments_rect: 主窗口和朋友圈窗口的初始矩形 (left, top, right, bottom)
+            latency: 覆盖 DEFAULT_LATENCY 中的延迟
+            font_path: 字体文件，默认自动查找中文字体
+            asset_dir: 读取真实图标的目录，存在同名图片时使用真实图标，默认为程序的 assets 目录
+        """
+        self.size = tuple(screen_size)
+        self.posts = posts if posts is not None else default_posts()
+        self.contacts = list(contacts or ["Alice", "Bob", "Carol"])
+        self.groups = list(groups or ["Project Team", "Family Group"])
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.renderer = TextRenderer(font_path)
+        self.asset_dir = asset_dir or default_asset_dir()
+        self.icons = {name: self._load_icon(name) for name in ASSET_NAMES}
+
+        # 主窗口状态
+        self.search_active = False
+        self.search_text = ""
+        self.search_results_visible = False
+        self.current_chat = None
+        self.input_text = ""
+        self.chats = {}                # {会话名: [消息]}
+        self.sent_messages = []        # [(会话名, 消息)]
+        # 朋友圈状态
+        self.scroll = 0.0
+        self._scroll_from = 0.0
+        self._scroll_to = 0.0
+        self._scroll_started = 0.0
+        self.popup_post = None         # 弹出界面所属的动态序号
+        self.comment_post = None       # 正在评论的动态序号
+        self.comment_text = ""
+        # 输入焦点：'search' / 'chat_input' / 'comment' / None
+        self.focus = None
+        self._select_all = False
+        self._pending = []             # [(到期时间, 回调)]
+        self._version = 0
+        self._frame_cache = (None, None)
+
+        self.backend = SimulatedBackend(self)
+        self.main_hwnd = self.backend.add_window(self.MAIN_TITLE, main_rect)
+        self._moments_rect = moments_rect
+        self.moments_hwnd = None
+
+    def _load_icon(self, name):
+        path = os.path.join(self.asset_dir, name)
+        if os.path.exists(path):
+            try:
+                return Image.open(path).convert('RGB')
+            except Exception as e:
+                logger.warning("⚠️ 读取图标失败，使用内置图标: %s, %s", path, e)
+        return build_builtin_icon(name, self.renderer)
+
+    def ensure_assets(self, directory=None):
+        """把模拟器画出的图标写入临时目录，核心引擎改从该目录加载模板（见 install）
+
+        Args:
+            directory: 写出图标的目录，默认 simulator_asset_dir()
+
+        Returns:
+            写出图标的目录
+        """
+        directory = directory or simulator_asset_dir()
+        os.makedirs(directory, exist_ok=True)
+        for name, icon in self.icons.items():
+            icon.save(os.path.join(directory, name))
+        logger.info("🖼️ 已写入模拟器图标: %s", directory)
+        return directory
+
+    # ==================== 状态变化 ====================
+
+    def _changed(self):
+        self._version += 1
+
+    def _schedule(self, kind, callback):
+        """按 latency[kind] 延迟执行界面变化"""
+        self._pending.append((time.perf_counter() + self.latency.get(kind, 0.0), callback))
+
+    def _apply_due(self):
+        now = time.perf_counter()
+        due = [item for item in self._pending if item[0] <= now]
+        if due:
+            self._pending = [item for item in self._pending if item[0] > now]
+            for _, callback in sorted(due, key=lambda item: item[0]):
+                callback()
+            self._changed()
+
+    def liked_names(self):
+        """已点赞动态的用户名（先应用已到期的界面变化）"""
+        with self.backend.lock:
+            self._apply_due()
+            return sorted({post.name for post in self.posts if post.liked})
+
+    def open_moments(self):
+        """打开朋友圈窗口（相当于在主窗口点击朋友圈图标）"""
+        if self.moments_hwnd is None or not self.backend.is_window(self.moments_hwnd):
+            self.moments_hwnd = self.backend.add_window(self.MOMENTS_TITLE, self._moments_rect)
+            self.scroll = self._scroll_from = self._scroll_to = 0.0
+        self.backend.bring_to_front(self.moments_hwnd)
+        self._changed()
+        return self.moments_hwnd
+
+    # ==================== 输入处理 ====================
+
+    def handle_input(self, action, args, kwargs):
+        """SimulatedBackend 的输入回调"""
+        self._apply_due()
+        if action == 'click':
+            x, y = args[0], args[1] if len(args) > 1 else None
+            if isinstance(x, (tuple, list)):
+                # 与 pyautogui 一致：传入 Box 时点击中心
+                box = Box(*x)
+                x, y = box.left + box.width // 2, box.top + box.height // 2
+            if x is not None and y is not None:
+                self._click(int(x), int(y))
+        elif action == 'press' and args:
+            self._press(str(args[0]).lower())
+        elif action == 'hotkey':
+            self._hotkey(tuple(str(key).lower() for key in args))
+        elif action == 'typewrite' and args:
+            self._type_text(str(args[0]))
+        self._changed()
+
+    def _window_at(self, x, y):
+        """按绘制顺序（前台窗口在最上层）返回坐标所在的窗口句柄"""
+        for hwnd in reversed(self._z_order()):
+            left, top, right, bottom = self.backend.window_rect(hwnd)
+            if left <= x < right and top <= y < bottom:
+                return hwnd
+        return None
+
+    def _z_order(self):
+        handles = [hwnd for hwnd, _ in self.backend.list_windows() if not self.backend.is_minimized(hwnd)]
+        foreground = self.backend.foreground_window()
+        if foreground in handles:
+            handles.remove(foreground)
+            handles.append(foreground)
+        return handles
+
+    def _click(self, x, y):
+        hwnd = self._window_at(x, y)
+        if hwnd is None:
+            return
+        self.backend.bring_to_front(hwnd)
+        left, top, _, _ = self.backend.window_rect(hwnd)
+        if hwnd == self.main_hwnd:
+            self._click_main(x - left, y - top)
+        elif hwnd == self.moments_hwnd:
+            self._click_moments(x - left, y - top)
+
+    def _press(self, key):
+        foreground = self.backend.foreground_window()
+        if key in ('down', 'up', 'pagedown', 'pageup') and foreground == self.moments_hwnd:
+            step = SCROLL_STEP if key in ('down', 'up') else self._moments_viewport()[1] - 60
+            self._start_scroll(step if key in ('down', 'pagedown') else -step)
+        elif key == 'enter':
+            if self.focus == 'chat_input':
+                self._send_chat_message()
+            elif self.focus == 'comment':
+                self._send_comment()
+        elif key in ('delete', 'backspace'):
+            if self._select_all:
+                self._set_focused_text("")
+            else:
+                self._set_focused_text(self._focused_text()[:-1])
+        elif key == 'esc':
+            self.search_active = self.search_results_visible = False
+            self.popup_post = None
+            self.focus = None
+        self._select_all = False
+
+    def _hotkey(self, keys):
+        if keys == ('ctrl', 'f') and self.backend.foreground_window() == self.main_hwnd:
+            def open_search():
+                self.search_active = True
+                self.search_text = ""
+                self.search_results_visible = False
+                self.focus = 'search'
+            self._schedule("search_box", open_search)
+        elif keys == ('ctrl', 'a'):
+            self._select_all = True
+            return
+        elif keys == ('ctrl', 'v'):
+            self._type_text(self.backend.clipboard)
+        self._select_all = False
+
+    def _focused_text(self):
+        return {'search': self.search_text, 'chat_input': self.input_text,
+                'comment': self.comment_text}.get(self.focus, "")
+
+    def _set_focused_text(self, text):
+        if self.focus == 'search':
+            self.search_text = text
+            self.search_results_visible = False
+            if text:
+                self._schedule("search_results", self._show_search_results)
+        elif self.focus == 'chat_input':
+            self.input_text = text
+        elif self.focus == 'comment':
+            self.comment_text = text
+
+    def _type_text(self, text):
+        if self.focus is None:
+            return
+        base = "" if self._select_all else self._focused_text()
+        self._set_focused_text(base + text)
+        self._select_all = False
+
+    def _show_search_results(self):
+        if self.search_active and self.search_text:
+            self.search_results_visible = True
+
+    # ==================== 主窗口 ====================
+
+    def _main_size(self):
+        left, top, right, bottom = self.backend.window_rect(self.main_hwnd)
+        return right - left, bottom - top
+
+    def _main_layout(self):
+        """主窗口各区域（窗口坐标）"""
+        width, height = self._main_size()
+        list_right = 310
+        return {
+            "sidebar": (0, 0, 60, height),
+            "moments_icon": (12, 160, 48, 196),
+            "search_box": (72, 22, list_right - 12, 50),
+            "list": (60, 0, list_right, height),
+            "chat": (list_right, 0, width, height),
+            "input": (list_right, int(height * 0.75), width, height),
+        }
+
+    def _search_matches(self):
+        term = self.search_text.strip()
+        if not term:
+            return [], []
+        contacts = [name for name in self.contacts if term.lower() in name.lower()]
+        groups = [name for name in self.groups if term.lower() in name.lower()]
+        return contacts, groups
+
+    def _search_result_items(self):
+        """搜索结果列表 [(类型, 文字, 矩形)]，类型为 header/contact/group"""
+        layout = self._main_layout()
+        left, _, right, _ = layout["list"]
+        contacts, groups = self._search_matches()
+        items = []
+        y = 86
+        for header, names, kind in (("联系人", contacts, "contact"), ("群聊", groups, "group")):
+            if not names:
+                continue
+            items.append(("header", header, (left, y, right, y + 28)))
+            y += 28
+            for name in names:
+                items.append((kind, name, (left, y, right, y + 56)))
+                y += 56
+        items.append(("header", "搜索网络结果", (left, y, right, y + 28)))
+        return items
+
+    def _click_main(self, x, y):
+        layout = self._main_layout()
+        if _inside(layout["moments_icon"], x, y):
+            self.open_moments()
+            return
+        if self.search_active and self.search_results_visible:
+            for kind, text, rect in self._search_result_items():
+                if kind in ("contact", "group") and _inside(rect, x, y):
+                    self._open_chat(text)
+                    return
+        if _inside(layout["search_box"], x, y):
+            self.search_active = True
+            self.focus = 'search'
+            return
+        if self.current_chat and _inside(layout["input"], x, y):
+            self.focus = 'chat_input'
+            return
+        if not _inside(layout["list"], x, y):
+            self.search_active = self.search_results_visible = False
+            if self.focus == 'search':
+                self.focus = None
+
+    def _open_chat(self, name):
+        self.search_active = self.search_results_visible = False
+        self.focus = None
+
+        def show_chat():
+            self.current_chat = name
+            self.input_text = ""
+            self.chats.setdefault(name, [])
+        self._schedule("chat_open", show_chat)
+
+    def _send_chat_message(self):
+        text = self.input_text.strip()
+        if self.current_chat and text:
+            self.chats.setdefault(self.current_chat, []).append(text)
+            self.sent_messages.append((self.current_chat, text))
+        self.input_text = ""
+
+    def _render_main(self):
+        width, height = self._main_size()
+        image = Image.new('RGB', (width, height), (245, 245, 245))
+        draw = ImageDraw.Draw(image)
+        layout = self._main_layout()
+        text = self.renderer
+
+        # 侧边栏
+        draw.rectangle(layout["sidebar"], fill=(46, 46, 46))
+        draw.rectangle((14, 30, 46, 62), fill=(120, 150, 190))
+        image.paste(self.icons["pengyouquan.png"], layout["moments_icon"][:2])
+
+        # 会话列表和搜索框
+        draw.rectangle(layout["list"], fill=(247, 247, 247))
+        box = layout["search_box"]
+        draw.rectangle(box, fill=(255, 255, 255) if self.search_active else (226, 226, 226))
+        if self.search_text:
+            text.draw(image, (box[0] + 10, box[1] + 5), self.search_text, TEXT_COLOR, 14)
+        elif not self.search_active:
+            text.draw(image, (box[0] + 10, box[1] + 5), "搜索", HINT_COLOR, 14)
+
+        if self.search_active and self.search_results_visible:
+            for kind, label, rect in self._search_result_items():
+                if kind == "header":
+                    text.draw(image, (rect[0] + 14, rect[1] + 6), label, HINT_COLOR, 12)
+                else:
+                    draw.rectangle((rect[0] + 12, rect[1] + 8, rect[0] + 52, rect[1] + 48), fill=_avatar_color(label))
+                    text.draw(image, (rect[0] + 62, rect[1] + 16), label, TEXT_COLOR, 14)
+        else:
+            for index, name in enumerate(list(self.chats)[-8:]):
+                y = 70 + index * 64
+                draw.rectangle((72, y + 10, 112, y + 50), fill=_avatar_color(name))
+                text.draw(image, (122, y + 20), name, TEXT_COLOR, 14)
+
+        # 聊天区域
+        chat_left = layout["chat"][0]
+        draw.rectangle(layout["chat"], fill=(237, 237, 237))
+        draw.line((chat_left, 60, width, 60), fill=SEPARATOR_COLOR)
+        if self.current_chat:
+            text.draw(image, (chat_left + 24, 18), self.current_chat, TEXT_COLOR, 18)
+            y = 80
+            for message in self.chats.get(self.current_chat, [])[-8:]:
+                message_width, message_height = text.measure(message, 14)
+                bubble = (width - 40 - message_width - 20, y, width - 40, y + message_height + 16)
+                draw.rectangle(bubble, fill=(149, 236, 105))
+                text.draw(image, (bubble[0] + 10, y + 8), message, TEXT_COLOR, 14)
+                y += message_height + 30
+            input_rect = layout["input"]
+            draw.rectangle(input_rect, fill=(255, 255, 255) if self.focus == 'chat_input' else (245, 245, 245))
+            draw.line((input_rect[0], input_rect[1], width, input_rect[1]), fill=SEPARATOR_COLOR)
+            if self.input_text:
+                text.draw(image, (input_rect[0] + 20, input_rect[1] + 16), self.input_text, TEXT_COLOR, 14)
+        return image
+
+    # ==================== 朋友圈窗口 ====================
+
+    def _moments_size(self):
+        left, top, right, bottom = self.backend.window_rect(self.moments_hwnd)
+        return right - left, bottom - top
+
+    def _moments_viewport(self):
+        """动态区域的 (顶部, 高度)"""
+        _, height = self._moments_size()
+        return 48, height - 48
+
+    def _current_scroll(self):
+        duration = self.latency.get("scroll", 0.0)
+        progress = 1.0 if duration <= 0 else min(1.0, (time.perf_counter() - self._scroll_started) / duration)
+        # 先快后慢的滚动动画
+        eased = 1 - (1 - progress) ** 2
+        return self._scroll_from + (self._scroll_to - self._scroll_from) * eased
+
+    def _start_scroll(self, delta):
+        layout = self._post_layout()
+        feed_height = layout[-1]["bottom"] + 40 if layout else 0
+        max_scroll = max(0, feed_height - self._moments_viewport()[1])
+        current = self._current_scroll()
+        target = min(max(self._scroll_to + delta, 0), max_scroll)
+        self.popup_post = None
+        if target != self._scroll_to:
+            self._scroll_from, self._scroll_to = current, target
+            self._scroll_started = time.perf_counter()
+
+    def _post_layout(self):
+        """各条动态在动态流中的位置（不含滚动偏移）"""
+        width, _ = self._moments_size()
+        chars_per_line = max(8, (width - 100) // 9)
+        layout = []
+        y = 240   # 封面高度
+        for index, post in enumerate(self.posts):
+            top = y
+            lines = [post.content[i:i + chars_per_line] for i in range(0, len(post.content), chars_per_line)]
+            time_y = top + 46 + len(lines) * 22 + 8
+            button = self.icons["dianzan.png"]
+            like_button = (width - 24 - button.width, time_y - 2, width - 24, time_y - 2 + button.height)
+            y = time_y + 28
+            interactions = None
+            if post.liked or post.comments:
+                interactions = (72, y, width - 24, y + 8 + 22 * ((1 if post.liked else 0) + len(post.comments)))
+                y = interactions[3] + 10
+            comment_box = None
+            if self.comment_post == index:
+                comment_box = (72, y, width - 24, y + 44)
+                y = comment_box[3] + 10
+            layout.append({"index": index, "top": top, "lines": lines, "time_y": time_y,
+                           "like_button": like_button, "interactions": interactions,
+                           "comment_box": comment_box, "bottom": y + 8})
+            y += 16
+        return layout
+
+    def _popup_rects(self, like_button):
+        """弹出界面左右两部分（点赞/取消、评论）的位置"""
+        left_icon = self.icons["yizan.png" if self.posts[self.popup_post].liked else "nozan.png"]
+        right_icon = self.icons["pinglun.png"]
+        center_y = (like_button[1] + like_button[3]) // 2
+        right = like_button[0] - 8
+        comment_rect = (right - right_icon.width, center_y - right_icon.height // 2, right,
+                        center_y - right_icon.height // 2 + right_icon.height)
+        like_rect = (comment_rect[0] - left_icon.width, center_y - left_icon.height // 2, comment_rect[0],
+                     center_y - left_icon.height // 2 + left_icon.height)
+        return like_rect, comment_rect
+
+    def _visible_offset(self):
+        """动态流坐标 → 窗口坐标的纵向偏移"""
+        viewport_top, _ = self._moments_viewport()
+        return viewport_top - int(round(self._current_scroll()))
+
+    def _click_moments(self, x, y):
+        offset = self._visible_offset()
+        layout = self._post_layout()
+        # 弹出界面
+        if self.popup_post is not None:
+            entry = layout[self.popup_post]
+            like_rect, comment_rect = self._popup_rects(_shift(entry["like_button"], offset))
+            post_index = self.popup_post
+            self.popup_post = None
+            if _inside(like_rect, x, y):
+                post = self.posts[post_index]
+
+                def toggle_like():
+                    post.liked = not post.liked
+                self._schedule("like", toggle_like)
+                return
+            if _inside(comment_rect, x, y):
+                def open_comment_box():
+                    self.comment_post = post_index
+                    self.comment_text = ""
+                    self.focus = 'comment'
+                self._schedule("comment_box", open_comment_box)
+                return
+        # 评论输入框
+        if self.comment_post is not None:
+            box = _shift(layout[self.comment_post]["comment_box"], offset)
+            send_rect = self._send_button_rect(box)
+            if _inside(send_rect, x, y):
+                self._send_comment()
+                return
+            if _inside(box, x, y):
+                self.focus = 'comment'
+                return
+        # 点赞按钮
+        for entry in layout:
+            if _inside(_shift(entry["like_button"], offset), x, y):
+                post_index = entry["index"]
+
+                def open_popup():
+                    self.popup_post = post_index
+                self._schedule("popup", open_popup)
+                return
+        self.comment_post = None
+        if self.focus == 'comment':
+            self.focus = None
+
+    def _send_button_rect(self, box):
+        icon = self.icons["fasong.png"]
+        left = box[2] - 8 - icon.width
+        top = (box[1] + box[3]) // 2 - icon.height // 2
+        return (left, top, left + icon.width, top + icon.height)
+
+    def _send_comment(self):
+        if self.comment_post is not None and self.comment_text.strip():
+            self.posts[self.comment_post].comments.append(self.comment_text.strip())
+        self.comment_post = None
+        self.comment_text = ""
+        self.focus = None
+
+    def _render_moments(self):
+        width, height = self._moments_size()
+        image = Image.new('RGB', (width, height), BACKGROUND_COLOR)
+        draw = ImageDraw.Draw(image)
+        text = self.renderer
+        offset = self._visible_offset()
+        viewport_top, _ = self._moments_viewport()
+
+        # 封面
+        draw.rectangle((0, offset, width, offset + 220), fill=(61, 74, 92))
+        for entry in self._post_layout():
+            top, bottom = entry["top"] + offset, entry["bottom"] + offset
+            if bottom < viewport_top or top > height:
+                continue
+            post = self.posts[entry["index"]]
+            draw.rectangle((18, top + 18, 60, top + 60), fill=_avatar_color(post.name))
+            text.draw(image, (72, top + 16), post.name, NICKNAME_COLOR, 15)
+            for line_index, line in enumerate(entry["lines"]):
+                text.draw(image, (72, top + 44 + line_index * 22), line, TEXT_COLOR, 15)
+            text.draw(image, (72, entry["time_y"] + offset), post.time_label, TIMESTAMP_COLOR, 13)
+            image.paste(self.icons["dianzan.png"], _shift(entry["like_button"], offset)[:2])
+            if entry["interactions"]:
+                box = _shift(entry["interactions"], offset)
+                draw.rectangle(box, fill=(243, 243, 245))
+                line_y = box[1] + 4
+                if post.liked:
+                    _draw_heart(draw, box[0] + 8, line_y + 4, 12, NICKNAME_COLOR, filled=False)
+                    text.draw(image, (box[0] + 28, line_y), "我", NICKNAME_COLOR, 14)
+                    line_y += 22
+                for comment in post.comments:
+                    text.draw(image, (box[0] + 8, line_y), "我:", NICKNAME_COLOR, 14)
+                    text.draw(image, (box[0] + 34, line_y), comment, TEXT_COLOR, 14)
+                    line_y += 22
+            if entry["comment_box"]:
+                box = _shift(entry["comment_box"], offset)
+                draw.rectangle(box, fill=(247, 247, 247), outline=SEPARATOR_COLOR)
+                text.draw(image, (box[0] + 10, box[1] + 13), self.comment_text or "评论",
+                          TEXT_COLOR if self.comment_text else HINT_COLOR, 14)
+                image.paste(self.icons["fasong.png"], self._send_button_rect(box)[:2])
+            draw.line((18, bottom + 8, width - 18, bottom + 8), fill=SEPARATOR_COLOR)
+            if self.popup_post == entry["index"]:
+                like_rect, comment_rect = self._popup_rects(_shift(entry["like_button"], offset))
+                image.paste(self.icons["yizan.png" if post.liked else "nozan.png"], like_rect[:2])
+                image.paste(self.icons["pinglun.png"], comment_rect[:2])
+
+        # 标题栏
+        draw.rectangle((0, 0, width, viewport_top), fill=(247, 247, 247))
+        draw.line((0, viewport_top, width, viewport_top), fill=SEPARATOR_COLOR)
+        text.draw(image, (width // 2 - 22, 14), "朋友圈", TEXT_COLOR, 16)
+        return image
+
+    # ==================== 画面源接口 ====================
+
+    def render(self):
+        """合成当前屏幕画面（SimulatedBackend 的画面源接口）"""
+        self._apply_due()
+        key = (self._version, int(round(self._current_scroll())), tuple(self._z_order()),
+               tuple(self.backend.window_rect(hwnd) for hwnd in self._z_order()))
+        cached_key, cached_frame = self._frame_cache
+        if cached_key == key:
+            return cached_frame
+
+        screen = Image.new('RGB', self.size, DESKTOP_COLOR)
+        for hwnd in self._z_order():
+            left, top, _, _ = self.backend.window_rect(hwnd)
+            if hwnd == self.main_hwnd:
+                screen.paste(self._render_main(), (left, top))
+            elif hwnd == self.moments_hwnd:
+                screen.paste(self._render_moments(), (left, top))
+        self._frame_cache = (key, screen)
+        return screen
+
+
+def _inside(rect, x, y):
+    return rect is not None and rect[0] <= x < rect[2] and rect[1] <= y < rect[3]
+
+
+def _shift(rect, offset):
+    return (rect[0], rect[1] + offset, rect[2], rect[3] + offset)
+
+
+def _avatar_color(name):
+    value = zlib.crc32(name.encode('utf-8'))
+    return (60 + value % 150, 60 + (value >> 8) % 150, 60 + (value >> 16) % 150)
+
+
+# ==================== 模拟OCR ====================
+
+class SimulatedOCR:
+    """根据模拟器画过的文字做模板匹配的OCR，接口与 EnhancedOCREngine 的 recognize_text 相同
+
+    识别结果是确定的：同一画面每次得到相同结果，用于可重复的耗时测量。
+    彩色文字、颜色过滤后的黑白图像和窗口裁剪图都可以识别（按笔画灰度匹配）。
+    """
+
+    INK_THRESHOLD = 190           # 灰度低于该值视为笔画
+    MIN_SCORE = 0.8
+    WORD_GAP = 3                  # 文字左右两侧至少留出的空白像素（排除长文字中的一部分）
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self._templates = {}
+
+    def is_available(self):
+        return True
+
+    def _template(self, text, size, color):
+        key = (text, size, color)
+        if key not in self._templates:
+            mask = np.array(self.simulator.renderer.mask(text, size), dtype=np.float32) / 255.0
+            # 文字画在白底上后的灰度
+            gray_color = 0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2]
+            gray = 255.0 - mask * (255.0 - gray_color)
+            ink = (gray < self.INK_THRESHOLD).astype(np.float32)
+            rows, cols = np.nonzero(ink)
+            if rows.size == 0:
+                self._templates[key] = None
+            else:
+                top, left = rows.min(), cols.min()
+                self._templates[key] = (ink[top:rows.max() + 1, left:cols.max() + 1], left, top)
+        return self._templates[key]
+
+    def recognize_text(self, image, method="rapid", site="unknown"):
+        """识别图像中的文字（与真实OCR引擎一样记录耗时区间和按调用位置 site 的耗时指标）
+
+        Returns:
+            [[四点边界框, 文字, 置信度], ...]，按从上到下、从左到右排序
+        """
+        start = time.perf_counter()
+        try:
+            with tracer.span("ocr.recognize_text", "ocr", shape=getattr(image, 'shape', None)):
+                return self._recognize(image)
+        finally:
+            OCR_LATENCY.observe(time.perf_counter() - start, site=site)
+
+    def _recognize(self, image):
+        array = np.asarray(image)
+        if array.ndim == 3:
+            gray = cv2.cvtColor(array[:, :, :3].astype(np.uint8), cv2.COLOR_RGB2GRAY)
+        else:
+            gray = array.astype(np.uint8)
+        ink = (gray < self.INK_THRESHOLD).astype(np.float32)
+        if not ink.any():
+            return []
+
+        candidates = []
+        for text, size, color in sorted(self.simulator.renderer.vocabulary):
+            template = self._template(text, size, color)
+            if template is None:
+                continue
+            tmpl = template[0]
+            height, width = tmpl.shape
+            if height > ink.shape[0] or width > ink.shape[1] or tmpl.min() == tmpl.max():
+                continue
+            scores = cv2.matchTemplate(ink, tmpl, cv2.TM_CCOEFF_NORMED)
+            ys, xs = np.where(scores >= self.MIN_SCORE)
+            for y, x in zip(ys, xs):
+                if self._isolated(ink, x, y, width, height):
+                    candidates.append((float(scores[y, x]), len(text), text, int(x), int(y), width, height))
+
+        # 得分高的优先，得分相同时长文字优先；与已选框重叠的丢弃
+        results = []
+        taken = []
+        for score, _, text, x, y, width, height in sorted(candidates, key=lambda item: (-round(item[0], 2), -item[1])):
+            box = (x, y, x + width, y + height)
+            if any(_overlap(box, other) for other in taken):
+                continue
+            taken.append(box)
+            results.append([[[x, y], [x + width, y], [x + width, y + height], [x, y + height]], text, round(score, 3)])
+        results.sort(key=lambda item: (item[0][0][1] // 10, item[0][0][0]))
+        return results
+
+
+    def _isolated(self, ink, x, y, width, height):
+        """文字框左右两侧是否是空白（否则只是更长文字的一部分）"""
+        rows = ink[y:y + height]
+        left = rows[:, max(0, x - self.WORD_GAP):x]
+        right = rows[:, x + width:x + width + self.WORD_GAP]
+        return not left.any() and not right.any()
+
+
+def _overlap(a, b):
+    """两个框的重叠面积超过较小框的一半"""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return False
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return width * height > smaller * 0.5
+
+
+# ==================== 端到端基准 ====================
+
+def install(simulator, use_simulated_ocr=True):
+    """把模拟器接入核心引擎：替换平台后端，必要时替换OCR引擎
+
+    模拟器的界面耗时不代表本机，时序档案和运行指标改用临时目录中的独立文件，
+    不写入 wechat_config.json，也不混入本机的指标历史；模拟器的图标同样写入临时目录，
+    核心引擎改从该目录加载模板，程序的 assets 目录保持不变。
+
+    Returns:
+        核心引擎模块
+    """
+    from metrics import metrics
+    from platform_backend import set_backend
+    from timing_profile import TimingProfile, set_timing_profile
+    import wechat_core_engine as engine
+
+    set_backend(simulator.backend)
+    set_timing_profile(TimingProfile(os.path.join(tempfile.gettempdir(), "wechat_simulator_timing.json")))
+    metrics.settings["directory"] = os.path.join(tempfile.gettempdir(), "wechat_simulator_metrics")
+    engine.set_asset_dir(simulator.ensure_assets())
+    if use_simulated_ocr or not engine.RAPID_OCR_AVAILABLE:
+        engine.ocr_engine = SimulatedOCR(simulator)
+        engine.RAPID_OCR_AVAILABLE = True
+    return engine
+
+
+def run_benchmark(targets=("Alice Wang", "Bob Li"), group="Project Team", message="Benchmark message",
+                  use_simulated_ocr=True, latency=None):
+    """在模拟器上端到端运行群发和朋友圈点赞，打印耗时和结果
+
+    Returns:
+        {"search_group": {...}, "multi_dianzan": {...}}
+    """
+    posts = default_posts(list(targets))
+    simulator = WeChatSimulator(posts=posts, groups=[group, "Family Group"], latency=latency)
+    engine = install(simulator, use_simulated_ocr)
+    report = {}
+
+    start = time.perf_counter()
+    sent = engine.search_group(group, message=message)
+    report["search_group"] = {
+        "ok": bool(sent) and (group, message) in simulator.sent_messages,
+        "elapsed": time.perf_counter() - start,
+        "actions": len(simulator.backend.actions),
+    }
+
+    simulator.open_moments()
+    actions_before = len(simulator.backend.actions)
+    start = time.perf_counter()
+    result = engine.pengyouquan_multi_dianzan_action(list(targets))
+    liked = simulator.liked_names()
+    report["multi_dianzan"] = {
+        "ok": bool(result) and set(targets) <= set(liked),
+        "elapsed": time.perf_counter() - start,
+        "actions": len(simulator.backend.actions) - actions_before,
+        "liked": liked,
+    }
+
+    print("\n📊 模拟器端到端基准:")
+    for flow, entry in report.items():
+        status = "✅" if entry["ok"] else "❌"
+        print(f"   {status} {flow}: {entry['elapsed']:.2f}s，{entry['actions']} 个输入/窗口动作")
+    return report
+
+
+if __name__ == "__main__":
+    run_benchmark()